@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+#
+# Regression check of the PulseGenerator: the pulses of a few cells generated
+# together (one batch) must be the same as the pulses of each cell generated
+# alone, and the same as the one cell algorithm (shaper lookup for each bunch
+# crossing and sample, float sum and noise added as double at the end) fed
+# with the same random stream.
+#
+import os
+import sys
+import random
+import numpy as np
+
+from GaugiKernel import Logger, LoggingLevel
+from CaloCell.CaloDefs import Detector, CaloSampling
+from CaloCellBuilder import PulseGenerator
+import ROOT
+
+mainLogger = Logger.getModuleLogger("check_pulse_generator")
+
+shaper_file  = os.environ['LORENZETTI_GEOMETRY_DATA_DIR'] + "/pulseLar.dat"
+bcid_start   = -8
+bcid_end     = 7
+bc_duration  = 25.
+nsamples     = 5
+sampling_bc  = -2
+ncells       = 8
+
+
+def read_shaper( path ):
+  time, shaper = [], []
+  with open(path) as f:
+    for line in f:
+      if not line.strip(): continue
+      a, b = line.split()
+      time.append( np.float32(a) ); shaper.append( np.float32(b) )
+  zero = max( i for i, t in enumerate(time) if t == 0 )
+  resolution = time[1] - time[0] if len(shaper) > 2 else time[0]
+  return shaper, zero, np.float32(resolution)
+
+
+def c_round( value ):
+  # round half away from zero, as in C
+  return float( np.sign(value) * np.floor( abs(value) + 0.5 ) )
+
+
+def create_cells( deposits ):
+  cells = []
+  for c, (cell_hash, (edep, tof)) in enumerate( deposits.items() ):
+    cell = ROOT.xAOD.CaloDetDescriptor( 0.001*c, 0.001*c, 0.025, 0.025, cell_hash, 0,
+                                        CaloSampling.EMB2, Detector.LAR,
+                                        bc_duration, bcid_start, bcid_end )
+    for bcid in range( bcid_start, bcid_end+1 ):
+      cell.edep( bcid, edep[bcid-bcid_start] )
+      cell.tof( bcid, tof[bcid-bcid_start] )
+    cells.append( cell )
+  return cells
+
+
+def reference( ctx, key, cell_hash, edep, tof, shaper, shzi, shr, config ):
+  """
+    One cell algorithm, with float32 values as in the c++ code
+  """
+  rng = ctx.random( key, cell_hash )
+  deform = config['DeformationStd'] != 0
+  nbc = bcid_end - bcid_start + 1
+  deformation = [[ np.float32( rng.gaus( config['DeformationMean'], config['DeformationStd'] ) ) if deform
+                   else np.float32( config['DeformationMean'] ) for i in range(nsamples) ] for b in range(nbc) ]
+  pulse_sum = [ np.float32(0) ] * nsamples
+  bunches = []
+  for b, bcid in enumerate( range( bcid_start, bcid_end+1 ) ):
+    lag   = np.float32(bcid) * np.float32(bc_duration)
+    phase = c_round( np.float32(tof[b]) / shr )
+    pulse = []
+    for i in range( nsamples ):
+      index = int( shzi - int(lag / shr) + (i + sampling_bc) * float( np.float32(25.) / shr ) + phase )
+      if index < 0 or index > len(shaper)-1:
+        pulse.append( np.float32(0) )
+        continue
+      value = np.float32( np.float32(edep[b]) * shaper[index] ) + np.float32( config['Pedestal'] )
+      pulse.append( np.float32( value + deformation[b][i] ) )
+    pulse_sum = [ np.float32( s + p ) for s, p in zip( pulse_sum, pulse ) ]
+    bunches.append( pulse )
+  noise = [ rng.gaus( config['NoiseMean'], config['NoiseStd'] ) for i in range(nsamples) ]
+  return [ np.float32( float(s) + n ) for s, n in zip( pulse_sum, noise ) ], bunches
+
+
+def check( config ):
+
+  mainLogger.info( "Checking the PulseGenerator with %s", config )
+  tool = PulseGenerator( "PulseGenerator",
+                         OutputLevel     = LoggingLevel.toC('WARNING'),
+                         NSamples        = nsamples,
+                         ShaperFile      = shaper_file,
+                         SamplingRate    = 25.0,
+                         StartSamplingBC = sampling_bc,
+                         PulsePerBunch   = True,
+                         **config )
+  tool.core().initialize()
+  key = ROOT.Gaugi.RandomStream.hash( "PulseGenerator" )
+  shaper, shzi, shr = read_shaper( shaper_file )
+
+  ctx = ROOT.SG.EventContext( "EventContext" )
+  ctx.setSeed( 512 )
+  ctx.setEventNumber( 7 )
+
+  nbc = bcid_end - bcid_start + 1
+  deposits = {}
+  for c in range( ncells ):
+    edep = [ random.choice( [0., random.uniform(0, 5000)] ) for b in range(nbc) ]
+    tof  = [ random.uniform(-10, 10) for b in range(nbc) ]
+    deposits[ 20025610 + 7*c ] = ( edep, tof )
+
+  batch  = create_cells( deposits )
+  single = create_cells( deposits )
+
+  vec = ROOT.std.vector['Gaugi::EDM*']()
+  for cell in batch:
+    vec.push_back( cell )
+  tool.core().execute( ctx, vec )
+  for cell in reversed( single ):
+    tool.core().execute( ctx, cell )
+
+  failures = 0
+  for cell_b, cell_s in zip( batch, single ):
+    cell_hash = cell_b.hash()
+    pulse_b, pulse_s = list( cell_b.pulse() ), list( cell_s.pulse() )
+    if pulse_b != pulse_s:
+      mainLogger.error( "cell %d: batch pulse %s and single cell pulse %s", cell_hash, pulse_b, pulse_s )
+      failures += 1
+    pulse_r, bunches_r = reference( ctx, key, cell_hash, *deposits[cell_hash], shaper, shzi, shr, config )
+    if not np.allclose( pulse_b, pulse_r, rtol=1e-6, atol=1e-6 ):
+      mainLogger.error( "cell %d: batch pulse %s and one cell algorithm pulse %s", cell_hash, pulse_b, pulse_r )
+      failures += 1
+    for b, bcid in enumerate( range( bcid_start, bcid_end+1 ) ):
+      if not np.allclose( list( cell_b.pulse(bcid) ), bunches_r[b], rtol=1e-6, atol=1e-6 ):
+        mainLogger.error( "cell %d: pulse of the bunch crossing %d differs from the one cell algorithm", cell_hash, bcid )
+        failures += 1
+  return failures
+
+
+random.seed( 512 )
+failures = 0
+failures += check( dict( Pedestal=0., DeformationMean=0., DeformationStd=0., NoiseMean=0., NoiseStd=50. ) )
+failures += check( dict( Pedestal=1., DeformationMean=0.5, DeformationStd=2., NoiseMean=1., NoiseStd=50. ) )
+
+if failures:
+  mainLogger.error( "PulseGenerator check failed with %d differences", failures )
+  sys.exit(1)
+mainLogger.info( "PulseGenerator check passed" )
@@ -0,0 +1,79 @@
+
+/*
+ * Check of Gaugi::RandomStream.
+ *
+ * - the philox block must match the Random123 known answer vectors of
+ *   philox4x32_10 (kat_vectors);
+ * - the same (seed, event, tool, id) must always give the same stream and a
+ *   change of any of them must give another stream.
+ *
+ * Build (no ROOT or Geant4 needed):
+ *   g++ -std=c++17 -O2 -I core/GaugiKernel test_random_stream.cxx -o test_random_stream
+ */
+
+#include "GaugiKernel/Random.h"
+#include <cstdio>
+#include <vector>
+
+using Gaugi::RandomStream;
+
+static int failures = 0;
+
+#define CHECK( cond, msg ) \
+  if( !(cond) ){ printf("FAILED: %s\n", msg); failures++; } \
+  else{ printf("OK    : %s\n", msg); }
+
+
+bool known_answer( uint32_t c0, uint32_t c1, uint32_t c2, uint32_t c3, uint32_t k0, uint32_t k1,
+                   uint32_t r0, uint32_t r1, uint32_t r2, uint32_t r3 )
+{
+  uint32_t ctr[4] = {c0, c1, c2, c3};
+  const uint32_t key[2] = {k0, k1};
+  RandomStream::philox( ctr, key );
+  bool ok = ctr[0]==r0 && ctr[1]==r1 && ctr[2]==r2 && ctr[3]==r3;
+  if( !ok ) printf("philox gives %08x %08x %08x %08x, expected %08x %08x %08x %08x\n",
+                   ctr[0], ctr[1], ctr[2], ctr[3], r0, r1, r2, r3);
+  return ok;
+}
+
+
+std::vector<double> draw( RandomStream rng, int n=64 )
+{
+  std::vector<double> values;
+  for( int i=0; i < n; ++i ) values.push_back( i%2 ? rng.uniform() : rng.gaus(0., 1.) );
+  return values;
+}
+
+
+int main()
+{
+  CHECK( known_answer( 0, 0, 0, 0, 0, 0,
+                       0x6627e8d5, 0xe169c58d, 0xbc57ac4c, 0x9b00dbd8 ), "philox4x32_10 zero vector" );
+  CHECK( known_answer( 0xffffffff, 0xffffffff, 0xffffffff, 0xffffffff, 0xffffffff, 0xffffffff,
+                       0x408f276d, 0x41c83b0e, 0xa20bc7c6, 0x6d5451fd ), "philox4x32_10 ones vector" );
+  CHECK( known_answer( 0x243f6a88, 0x85a308d3, 0x13198a2e, 0x03707344, 0xa4093822, 0x299f31d0,
+                       0xd16cfe09, 0x94fdcceb, 0x5001e420, 0x24126ea1 ), "philox4x32_10 pi vector" );
+
+  const uint64_t seed=512, event=1234, id=98765;
+  const std::string tool="PulseGenerator";
+  auto ref = draw( RandomStream(seed, event, tool, id) );
+
+  CHECK( draw( RandomStream(seed, event, tool, id) ) == ref, "same (seed, event, tool, id) gives the same stream" );
+  CHECK( draw( RandomStream(seed, event, RandomStream::hash(tool), id) ) == ref, "tool name and tool hash give the same stream" );
+  CHECK( draw( RandomStream(seed+1, event, tool, id) ) != ref, "another seed gives another stream" );
+  CHECK( draw( RandomStream(seed, event+1, tool, id) ) != ref, "another event gives another stream" );
+  CHECK( draw( RandomStream(seed, event+(1ULL<<32), tool, id) ) != ref, "another event (high bits) gives another stream" );
+  CHECK( draw( RandomStream(seed, event, "OptimalFilter", id) ) != ref, "another tool gives another stream" );
+  CHECK( draw( RandomStream(seed, event, tool, id+1) ) != ref, "another id gives another stream" );
+  CHECK( draw( RandomStream(seed, event, tool, id+(1ULL<<32)) ) != ref, "another id (high bits) gives another stream" );
+
+  // the order of the streams must not matter (e.g. cells done by other threads)
+  RandomStream a(seed, event, tool, id), b(seed, event, tool, id+1);
+  a.uniform(); b.uniform(); b.uniform();
+  RandomStream c(seed, event, tool, id);
+  c.uniform();
+  CHECK( a.uniform() == c.uniform(), "a stream does not depend on the other streams" );
+
+  printf("%s\n", failures ? "random stream check failed" : "random stream check passed");
+  return failures ? 1 : 0;
+}
@@ -41,7 +41,20 @@ class RunManager: public MsgService,
     int         m_nThreads;
     float       m_seed;
     bool        m_useGUI;
+    /*! Batch startup: no cosmetic waits into the header */
+    bool        m_fastStartup;
     std::string m_output;
+    /*! Particles with fast simulation (e.g. frozen showers) */
+    std::vector<std::string> m_fastSimParticles;
+    /*! Transport only the tracks inside of the cones around the truth particles (off if zero) */
+    float       m_roiConeSize;
+    std::string m_truthKey;
+    /*! Use the task based manager (thread pool) instead of the MT manager */
+    bool        m_useTasking;
+    /*! Number of events claimed by each thread at a time (geant default if zero) */
+    int         m_eventModulo;
+    /*! Number of events kept in memory by each worker before sending them to the output */
+    int         m_eventsPerWrite;
 
     std::vector< Gaugi::Algorithm* >   m_acc;
     PrimaryGenerator                  *m_generator;
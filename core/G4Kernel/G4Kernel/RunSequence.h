@@ -6,6 +6,7 @@
 #include "GaugiKernel/Algorithm.h"
 #include "GaugiKernel/StoreGate.h"
 #include "GaugiKernel/Timer.h"
+#include "GaugiKernel/Profiler.h"
 #include "G4Run.hh"
 #include "globals.hh"
 #include "G4Step.hh"
@@ -17,7 +18,8 @@ class RunSequence : public G4Run, public MsgService
   public:
 
     /** Constructor **/
-    RunSequence( int numberOfThreads, int timeout, std::vector<Gaugi::Algorithm*>, std::string output );
+    RunSequence( int numberOfThreads, int timeout, std::vector<Gaugi::Algorithm*>, std::string output, TBufferMerger *merger,
+                 int eventsPerWrite=100 );
     
     /** Destructor **/
     virtual ~RunSequence();
@@ -59,9 +61,19 @@ class RunSequence : public G4Run, public MsgService
 
     Gaugi::Timer m_timeout;
 
+    // per tool wall/cpu time and process memory profile
+    Gaugi::Profiler m_profiler;
+
+    std::string m_profileOutput;
+
     unsigned m_stepCounter, m_msgCounter;
 
     int m_event_timeout;
+
+    // the store is sent to the merger every m_eventsPerWrite events, so each worker keeps at most
+    // this number of events in memory
+    int m_eventsPerWrite;
+    unsigned m_eventCounter;
 };
 
   
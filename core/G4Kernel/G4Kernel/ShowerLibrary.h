@@ -0,0 +1,96 @@
+#ifndef ShowerLibrary_h
+#define ShowerLibrary_h
+
+#include "GaugiKernel/MsgStream.h"
+#include "G4ThreeVector.hh"
+#include <cstdlib>
+#include <map>
+#include <memory>
+#include <string>
+#include <vector>
+
+
+/**
+ * @class ShowerLibrary
+ * @brief Pre-recorded (frozen) electromagnetic showers.
+ *
+ * Each shower is a list of energy spots in the frame of the incoming particle
+ * (l along the direction, u/v transverse, see frame), with the energy as a
+ * fraction of the particle energy and the time after the shower start. The
+ * library is a tree (ShowerLibrary) with one shower per entry:
+ *
+ *  - pdgid, energy [MeV] and eta (direction) of the incoming particle;
+ *  - spot_l, spot_u, spot_v [mm], spot_e (fraction) and spot_t [ns].
+ *
+ * The file keeps the generated eta and energy of each shower. When loaded, the
+ * showers are grouped by particle and by |eta| and energy bins (the bin edges),
+ * so a library generated with a continuous gun has many showers in each bin.
+ * The library is loaded only once for all threads.
+ */
+class ShowerLibrary : public MsgService
+{
+
+  public:
+
+    struct Spot {
+      float l;
+      float u;
+      float v;
+      float e;
+      float t;
+    };
+
+    struct Shower {
+      float energy;
+      float eta;
+      /*! Sum of the spot energies (fraction of the particle energy deposited) */
+      float fraction;
+      std::vector<Spot> spots;
+    };
+
+    /*! Get the library from the file (load it case not exist). Shared by all threads */
+    static std::shared_ptr<const ShowerLibrary> get( std::string path, 
+                                                     const std::vector<float> &etaBins={}, 
+                                                     const std::vector<float> &energyBins={}, 
+                                                     int outputLevel=1 );
+
+    /*! Bin of the value for these edges (values out of the edges go to the first or last bin) */
+    static int bin( const std::vector<float> &edges, float value );
+
+    /*! Transverse axes for this direction. Used to record and to use the showers */
+    static void frame( const G4ThreeVector &dir, G4ThreeVector &u, G4ThreeVector &v );
+
+    /*! Random shower from the eta/energy bin of the particle, or from the closest bin with showers 
+     *  (nullptr case the particle is not in the library) */
+    const Shower* find( int pdgid, float energy, float eta, double random ) const;
+
+    /*! True if there are showers for this particle */
+    bool contains( int pdgid ) const { return m_showers.count( key(pdgid) ); };
+
+    /*! Number of showers */
+    size_t size() const { return m_size; };
+
+    /** Constructor **/
+    ShowerLibrary( std::string path, const std::vector<float> &etaBins, const std::vector<float> &energyBins, int outputLevel );
+
+  private:
+
+    /*! e+ and e- showers are the same */
+    static int key( int pdgid ) { return std::abs(pdgid)==11 ? 11 : std::abs(pdgid); };
+
+    /*! Closest bin with showers */
+    template<class T> static typename std::map<int, T>::const_iterator closest( const std::map<int, T> &bins, int bin );
+
+    typedef std::map< int, std::vector<Shower> > energy_map_t;
+
+    /*! pdgid -> |eta| bin -> energy bin */
+    std::map< int, std::map< int, energy_map_t > > m_showers;
+
+    /*! Bin edges (|eta| and MeV). One bin case empty */
+    std::vector<float> m_etaBins;
+    std::vector<float> m_energyBins;
+
+    size_t m_size;
+};
+
+#endif
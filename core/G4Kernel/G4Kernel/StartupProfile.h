@@ -0,0 +1,61 @@
+#ifndef StartupProfile_h
+#define StartupProfile_h
+
+#include "GaugiKernel/MsgStream.h"
+#include <mutex>
+#include <string>
+#include <vector>
+
+
+/**
+ * @class StartupProfile
+ * @brief Wall time of each step of the simulation startup.
+ *
+ * The steps are sequential, so each one is marked only when it ends and its
+ * time is the difference to the end of the previous step. Steps marked by
+ * many threads (e.g. the workers) end when the last thread marks it. The
+ * startup ends with the first event (stop), so the total does not include
+ * the event loop.
+ */
+class StartupProfile : public MsgService
+{
+
+  public:
+
+    StartupProfile( std::string name="StartupProfile" );
+    ~StartupProfile()=default;
+
+    /*! Start the clock (remove all steps) */
+    void start();
+
+    /*! The step ends now (thread safe). Ignored after stop */
+    void mark( std::string step );
+
+    /*! The last step ends now and all next marks are ignored (thread safe, only the first call counts) */
+    void stop( std::string step );
+
+    /*! Human readable summary table */
+    std::string summary() const;
+
+    /*! Summary as json */
+    std::string json() const;
+
+    /*! Write the json summary into a file */
+    bool dump( std::string path ) const;
+
+  private:
+
+    struct Step {
+      std::string name;
+      double end; // [ms]
+      unsigned calls;
+    };
+
+    double m_start;
+    bool m_stopped;
+    std::vector<Step> m_steps;
+    // marked by the master and the worker threads
+    mutable std::mutex m_mutex; //!
+};
+
+#endif
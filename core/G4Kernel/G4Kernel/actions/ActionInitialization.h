@@ -3,14 +3,18 @@
 
 #include "GaugiKernel/MsgStream.h"
 #include "GaugiKernel/Algorithm.h"
+#include "GaugiKernel/StoreGate.h"
 #include "G4Kernel/inputs/PrimaryGenerator.h"
+#include "G4Kernel/StartupProfile.h"
 #include "G4VUserActionInitialization.hh"
 
 
 class ActionInitialization : public G4VUserActionInitialization, public MsgService
 {
   public:
-    ActionInitialization( int numberOfThreads, int timeout, PrimaryGenerator *gen, std::vector<Gaugi::Algorithm*> acc, std::string output );
+    ActionInitialization( int numberOfThreads, int timeout, PrimaryGenerator *gen, std::vector<Gaugi::Algorithm*> acc, std::string output,
+                          TBufferMerger *merger, float roiConeSize=0, std::string truthKey="Particles",
+                          int eventsPerWrite=100, StartupProfile *startup=nullptr );
     virtual ~ActionInitialization();
 
     virtual void BuildForMaster() const;
@@ -22,8 +26,17 @@ class ActionInitialization : public G4VUserActionInitialization, public MsgServi
     std::vector<Gaugi::Algorithm*> m_acc;
     PrimaryGenerator *m_generator;
     std::string m_output;
+    /*! Output shared by all worker threads */
+    TBufferMerger *m_merger;
     int m_numberOfThreads;
     int m_timeout;
+    /*! Transport only the tracks inside of the cones around the truth particles (off if zero) */
+    float m_roiConeSize;
+    std::string m_truthKey;
+    /*! Number of events kept in memory by each worker before sending them to the merger */
+    int m_eventsPerWrite;
+    /*! Startup steps marked by the run actions (off if null) */
+    StartupProfile *m_startup;
 };
 
 #endif
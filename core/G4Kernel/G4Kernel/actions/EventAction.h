@@ -2,6 +2,7 @@
 #define EventAction_h
 
 #include "GaugiKernel/MsgStream.h"
+#include "G4Kernel/StartupProfile.h"
 #include "G4UserEventAction.hh"
 #include "globals.hh"
 
@@ -9,11 +10,16 @@
 class EventAction : public G4UserEventAction, public MsgService
 {
   public:
-    EventAction();
+    EventAction( StartupProfile *startup=nullptr );
     virtual ~EventAction();
 
     virtual void  BeginOfEventAction(const G4Event* event);
     virtual void    EndOfEventAction(const G4Event* event);
+
+  private:
+
+    /*! The startup ends with the first event of any thread */
+    StartupProfile *m_startup;
     
 };
                      
@@ -3,6 +3,8 @@
 
 #include "GaugiKernel/MsgStream.h"
 #include "GaugiKernel/Algorithm.h"
+#include "GaugiKernel/StoreGate.h"
+#include "G4Kernel/StartupProfile.h"
 
 /** geant 4 includes **/
 #include "G4UserRunAction.hh"
@@ -13,7 +15,8 @@ class G4Run;
 class RunAction : public G4UserRunAction, public MsgService
 {
   public:
-    RunAction( int numberOfThreads, int timeout, std::vector<Gaugi::Algorithm*>, std::string output);
+    RunAction( int numberOfThreads, int timeout, std::vector<Gaugi::Algorithm*>, std::string output, TBufferMerger *merger,
+               int eventsPerWrite=100, StartupProfile *startup=nullptr );
     virtual ~RunAction();
     virtual G4Run* GenerateRun();
     virtual void BeginOfRunAction(const G4Run*);
@@ -22,8 +25,15 @@ class RunAction : public G4UserRunAction, public MsgService
 
   private:
 
+    /*! True for the master of a multithreaded run (it does not loop over the events) */
+    bool isMasterOfWorkers() const;
+
     std::vector<Gaugi::Algorithm*> m_acc;
     std::string m_output;
+    TBufferMerger *m_merger;
+    int m_eventsPerWrite;
+    /*! Marks the end of the physics tables (master) and of the worker startup */
+    StartupProfile *m_startup;
     int m_numberOfThreads;
     int m_timeout;
 };
@@ -0,0 +1,33 @@
+#ifndef StackingAction_h
+#define StackingAction_h
+
+#include "GaugiKernel/MsgStream.h"
+#include "G4UserStackingAction.hh"
+#include "globals.hh"
+#include <string>
+#include <vector>
+
+
+class StackingAction : public G4UserStackingAction, public MsgService
+{
+  public:
+    StackingAction( float coneSize, std::string truthKey );
+    virtual ~StackingAction();
+
+    /*! Kill the tracks outside of all truth particle cones */
+    virtual G4ClassificationOfNewTrack ClassifyNewTrack(const G4Track* track);
+    /*! Read the truth particles of the new event */
+    virtual void PrepareNewEvent();
+
+  private:
+
+    /*! Is (eta,phi) inside of the cone of one truth particle? */
+    bool inside( float eta, float phi ) const;
+
+    float m_coneSize;
+    std::string m_truthKey;
+    /*! Truth particle (eta,phi) positions of the current event (same as the RoIs of RootStreamHITMaker) */
+    std::vector<std::pair<float,float>> m_centers;
+};
+
+#endif
@@ -4,7 +4,6 @@ __all__ = ["ComponentAccumulator"]
 from GaugiKernel import Cpp, LoggingLevel
 from GaugiKernel.constants import MINUTES
 from G4Kernel import EventReader
-import os
 import time
 import gc
 import ROOT
@@ -24,6 +23,11 @@ class ComponentAccumulator(Cpp):
                  NumberOfThreads: int = 1,
                  Timeout: int = 120*MINUTES,
                  UseGUI: bool = False,
+                 RoIConeSize: float = 0,
+                 UseTasking: bool = False,
+                 EventModulo: int = 1,
+                 FastStartup: bool = True,
+                 EventsPerWrite: int = 100,
                  #OutputLevel: int = LoggingLevel.toC('INFO'),
                  ):
 
@@ -39,16 +43,28 @@ class ComponentAccumulator(Cpp):
         self.setProperty("Timeout", Timeout)
         self.setProperty("Seed", Seed)
         self.setProperty("UseGUI", UseGUI)
+        # batch mode: no waits into the header and at the end (the output is closed by the core)
+        self.setProperty("FastStartup", FastStartup)
+        # kill the tracks outside of the truth particle cones (only when the hits outside are not saved)
+        self.setProperty("RoIConeSize", RoIConeSize)
+        # events claimed one at a time by each thread (zero for the geant chunks)
+        self.setProperty("UseTasking", UseTasking)
+        self.setProperty("EventModulo", EventModulo)
+        # each worker sends its events to the output at this interval (memory bound per worker)
+        self.setProperty("EventsPerWrite", EventsPerWrite)
+        # the frozen showers are attached by the detector
+        if getattr(self.__detector, "ShowerLibrary", ""):
+            self.setProperty("FastSimulationParticles", ["e-", "e+", "gamma"])
 
         if UseGUI:
             [self._core.addUICommand(cmd) for cmd in detector.get_ui_commands()] 
-        self.outputFiles = [ f"{self.OutputFile}.{thread}" for thread in range(self.NumberOfThreads)]
 
 
     def __del__(self):
         del self._core
         gc.collect()
-        time.sleep(2)
+        if not self.FastStartup:
+            time.sleep(2)
 
     def run(self, evt: int = -1):
         """
@@ -63,8 +79,8 @@ class ComponentAccumulator(Cpp):
             evt=self.__numberOfEvents
         if (evt > self.__numberOfEvents):
             evt = self.__numberOfEvents
+        # all threads write into the output file (merged in memory by the core)
         self._core.run(evt)
-        self.merge()
 
     def __add__(self, algs):
         if type(algs) is not list:
@@ -84,6 +100,7 @@ class ComponentAccumulator(Cpp):
             Generator reader object
         """
         self.__numberOfEvents = gen.GetEntries()
+        self.setProperty("InputTruthKey", gen.OutputTruthKey)
         self._core.setGenerator(gen.core())
 
 
@@ -94,7 +111,3 @@ class ComponentAccumulator(Cpp):
         return self.__detector
 
 
-    def merge(self):
-        os.system(f"hadd -f {self.OutputFile} {' '.join(self.outputFiles)}")
-        [os.remove(f) for f in self.outputFiles]
-
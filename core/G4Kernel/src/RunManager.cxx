@@ -2,12 +2,17 @@
 
 #include "G4Kernel/RunManager.h"
 #include "G4Kernel/actions/ActionInitialization.h"
+#include "G4Kernel/StartupProfile.h"
 #include "GaugiKernel/Algorithm.h"
 
 
 
 #ifdef G4MULTITHREADED
 #include "G4MTRunManager.hh"
+#include "G4Version.hh"
+#if G4VERSION_NUMBER >= 1100
+#include "G4TaskRunManager.hh"
+#endif
 #include <thread> 
 #include <X11/Xlib.h>
 #else
@@ -16,6 +21,7 @@
 #include "G4UImanager.hh"
 #include "G4UIcommand.hh"
 #include "FTFP_BERT.hh"
+#include "G4FastSimulationPhysics.hh"
 #include "Randomize.hh"
 #include "G4VisExecutive.hh"
 #include "G4UIExecutive.hh"
@@ -39,6 +45,13 @@ RunManager::RunManager( std::string name ):
   declareProperty( "Seed"           , m_seed=0                  );
   declareProperty( "Timeout"        , m_timeout = 3*60          ); // 3 minutes as default
   declareProperty( "UseGUI"         , m_useGUI=false            );
+  declareProperty( "FastStartup"    , m_fastStartup=true        );
+  declareProperty( "FastSimulationParticles", m_fastSimParticles={} );
+  declareProperty( "RoIConeSize"    , m_roiConeSize=0           );
+  declareProperty( "UseTasking"     , m_useTasking=false        );
+  declareProperty( "EventModulo"    , m_eventModulo=1           );
+  declareProperty( "InputTruthKey"  , m_truthKey="Particles"    );
+  declareProperty( "EventsPerWrite" , m_eventsPerWrite=100      );
   MSG_INFO( "Run manager was created." );
 
 }
@@ -66,8 +79,12 @@ void RunManager::setDetectorConstruction( G4VUserDetectorConstruction *det )
 
 void RunManager::run( int evt )
 {
+  // wall time of each startup step (the physics tables and the workers are marked by the run actions)
+  StartupProfile startup( "StartupProfile" );
+  startup.start();
 
   header();
+  startup.mark( "header" );
   
   int argc=1;
   char* argv[1] = {"app"};
@@ -92,9 +109,26 @@ void RunManager::run( int evt )
 #ifdef G4MULTITHREADED  
   MSG_INFO( "Create MT Manager..." );
 
-  G4MTRunManager * runManager = new G4MTRunManager;
+  G4MTRunManager * runManager = nullptr;
+  if( m_useTasking ){
+#if G4VERSION_NUMBER >= 1100
+    // the events are tasks into a thread pool
+    runManager = new G4TaskRunManager;
+#else
+    MSG_WARNING( "The task run manager is not available for this geant version. Using the MT manager." );
+#endif
+  }
+  if( !runManager ) runManager = new G4MTRunManager;
   MSG_INFO( "Create MT Manager... done" );
 
+  // Number of events claimed by a thread each time it asks the master for work. One means that
+  // the threads take the next event only when the previous one is done, so a few slow events do
+  // not hold a chunk of events in the same thread while the others are idle. The entry read by
+  // each worker is the event id, so the random seeds do not depend on the scheduling.
+  if( m_eventModulo > 0 ){
+    runManager->SetEventModulo( m_eventModulo );
+  }
+
   if ( m_nThreads > 0 ) {
     MSG_INFO( "Create MT Manager with " << m_nThreads << " threads..." );
 
@@ -116,26 +150,54 @@ void RunManager::run( int evt )
   }
 
   G4VModularPhysicsList* physicsList = new FTFP_BERT;
+  if( !m_fastSimParticles.empty() ){
+    // the models are attached to the regions by the detector construction
+    auto fastSimulation = new G4FastSimulationPhysics();
+    for ( auto &particle : m_fastSimParticles ){
+      MSG_INFO( "Fast simulation for " << particle );
+      fastSimulation->ActivateFastSimulation( particle );
+    }
+    physicsList->RegisterPhysics( fastSimulation );
+  }
   runManager->SetUserInitialization(physicsList);
 
   MSG_INFO( "Creating the action initalizer..." );
   MSG_INFO( m_output );
-  ActionInitialization* actionInitialization = new ActionInitialization(m_nThreads, m_timeout, m_generator, m_acc, m_output);
+  if( m_roiConeSize > 0 ){
+    MSG_INFO( "Transport only the tracks inside of the " << m_truthKey << " cones (deltaR < " << m_roiConeSize << ")" );
+  }
+  // Each worker sends its store to this file every EventsPerWrite events and the buffers are merged
+  // in memory, so the output is ready when the run ends. Must be destroyed after the run manager (all stores saved)
+  auto merger = std::unique_ptr<TBufferMerger>( new TBufferMerger( m_output.c_str() ) );
+  ActionInitialization* actionInitialization = new ActionInitialization(m_nThreads, m_timeout, m_generator, m_acc, m_output,
+                                                                        merger.get(), m_roiConeSize, m_truthKey, m_eventsPerWrite,
+                                                                        &startup);
   runManager->SetUserInitialization(actionInitialization);
-
-  MSG_INFO( "Creating the vis executive...");
-  G4VisManager* visManager = new G4VisExecutive;
-  visManager->Initialize();
+  startup.mark( "run manager" );
+
+  // the visualization is only used by the GUI session
+  G4VisManager* visManager = nullptr;
+  if( m_useGUI ){
+    MSG_INFO( "Creating the vis executive...");
+    visManager = new G4VisExecutive;
+    visManager->Initialize();
+  }
   G4UImanager* UImanager = G4UImanager::GetUIpointer();
   
   std::stringstream runCommand; runCommand << "/run/beamOn " << evt ;
   m_uiCommands.push_back( runCommand.str() );
+  // geometry construction and physics list (the physics tables are only built by the first beamOn)
   UImanager->ApplyCommand("/run/initialize");
+  startup.mark( "geometry and physics list" );
   UImanager->ApplyCommand("/run/printProgress 1");
   UImanager->ApplyCommand("/run/verbose 2");
   for ( auto cmd : m_uiCommands ){
     UImanager->ApplyCommand( cmd );
   }
+  // the startup ended with the first event (see EventAction)
+  MSG_INFO( "Startup time per step:\n" << startup.summary() );
+  startup.dump( m_output + ".startup.json" );
+
   if(m_useGUI){
     ui->SessionStart();
     delete ui;
@@ -143,7 +205,9 @@ void RunManager::run( int evt )
 
 
   delete runManager;
-  delete visManager;
+  if( visManager ) delete visManager;
+  // write the last merged buffers and close the output
+  merger.reset();
 }
 
 
@@ -168,10 +232,10 @@ void RunManager::header()
   std::vector<std::string> s{"Using Gaugi as core...", "Using Geant4 as simulator layer...", "Power up..."};
 
   for( unsigned dot=0; dot<3; ++dot ){
-    sleep(1); // Wait 1 seconds
+    if( !m_fastStartup ) sleep(1); // Wait 1 seconds
     std::cout << s[dot] << std::endl;
   }
-  sleep(2); // Wait 2 seconds
+  if( !m_fastStartup ) sleep(2); // Wait 2 seconds
 }
 
 
@@ -8,19 +8,27 @@
 #include <string>
 #include <iostream>
 #include <time.h>
+#include <algorithm>
 
 
 
 RunSequence::RunSequence( int numberOfThreads, int timeout,
                                             std::vector<Gaugi::Algorithm*> acc , 
-                                            std::string output ): 
+                                            std::string output,
+                                            TBufferMerger *merger,
+                                            int eventsPerWrite ): 
   IMsgService("RunSequence"),
   G4Run(), 
-  m_store( output + "." + std::to_string(G4Threading::G4GetThreadId()) ),
+  // all threads write into the same output, merged in memory every eventsPerWrite events
+  m_store( merger->GetFile() ),
   m_ctx( "EventContext" ),
   m_toolHandles(acc),
   m_lock(false),
-  m_event_timeout(timeout)
+  m_profiler("RunSequence::Profiler"),
+  m_profileOutput( output + "." + std::to_string(G4Threading::G4GetThreadId()) + ".profile.json" ),
+  m_event_timeout(timeout),
+  m_eventsPerWrite( std::max(1, eventsPerWrite) ),
+  m_eventCounter(0)
 {
   // Tranfer all rights to the event context
   m_ctx.setStoreGateSvc( &m_store );
@@ -34,6 +42,7 @@ RunSequence::RunSequence( int numberOfThreads, int timeout,
     if (toolHandle->bookHistograms( m_ctx ).isFailure() ){
       MSG_FATAL("It's not possible to book histograms for " << toolHandle->name());
     }
+    m_profiler.bookHistograms( &m_store, toolHandle->name(), {"pre_execute", "post_execute", "fillHistograms"} );
   }
 }
 
@@ -54,6 +63,8 @@ RunSequence::~RunSequence()
   MSG_INFO( "Mean total time: " << mean_tot_time << " +- " << std_tot_time << " [s]");
   MSG_INFO("=========================================================");
   */
+  MSG_INFO( "Profile per tool (mean per event):\n" << m_profiler.summary() );
+  m_profiler.dump( m_profileOutput );
   m_store.save();
 }
 
@@ -78,9 +89,11 @@ void RunSequence::BeginOfEvent()
     m_store.histI("EventCounter")->Fill("Event",1);
     for( auto &toolHandle : m_toolHandles){
       MSG_DEBUG( "Launching pre execute step for " << toolHandle->name() );
+      auto start = Gaugi::Profiler::now();
       if (toolHandle->pre_execute( m_ctx ).isFailure() ){
         MSG_FATAL("It's not possible to pre execute " << toolHandle->name());
       }
+      m_profiler.fill( &m_store, toolHandle->name(), "pre_execute", start );
     }
   }
 
@@ -129,12 +142,16 @@ void RunSequence::EndOfEvent()
     MSG_INFO("RunSequence::EndOfEvent...");
     for( auto &toolHandle : m_toolHandles){
       MSG_DEBUG( "Launching post execute step for " << toolHandle->name() );
+      auto start = Gaugi::Profiler::now();
       if (toolHandle->post_execute( m_ctx ).isFailure() ){
         MSG_FATAL("It's not possible to post execute for " << toolHandle->name());
       }
+      m_profiler.fill( &m_store, toolHandle->name(), "post_execute", start );
+      start = Gaugi::Profiler::now();
       if (toolHandle->fillHistograms( m_ctx ).isFailure() ){
         MSG_FATAL("It's not possible to fill histograms for " << toolHandle->name());
       }
+      m_profiler.fill( &m_store, toolHandle->name(), "fillHistograms", start );
     }
     m_store.cd("Event");
     m_store.histI("EventCounter")->Fill("Completed",1);
@@ -154,6 +171,12 @@ void RunSequence::EndOfEvent()
   m_store.hist1( "EndOfEvent" )->Fill( timer.resume() );
   m_store.hist1( "Event" )->Fill( m_timeout.resume() );
 
+  // send the last events to the merger, the trees and histograms start again from zero
+  if( ++m_eventCounter % m_eventsPerWrite == 0 ){
+    MSG_DEBUG( "Sending " << m_eventsPerWrite << " events to the output" );
+    m_store.write();
+  }
+
   MSG_INFO( "Event loop was completed with " << m_stepCounter << " G4Steps and " << m_timeout.resume() << " seconds." );
 }
 
@@ -0,0 +1,133 @@
+
+#include "G4Kernel/ShowerLibrary.h"
+#include "TFile.h"
+#include "TTree.h"
+#include <algorithm>
+#include <cmath>
+#include <mutex>
+#include <tuple>
+
+
+
+std::shared_ptr<const ShowerLibrary> ShowerLibrary::get( std::string path, const std::vector<float> &etaBins, 
+                                                         const std::vector<float> &energyBins, int outputLevel )
+{
+  static std::mutex mutex;
+  static std::map< std::tuple<std::string, std::vector<float>, std::vector<float>>, std::shared_ptr<const ShowerLibrary> > libraries;
+  std::lock_guard<std::mutex> lock(mutex);
+  auto &library = libraries[ std::make_tuple(path, etaBins, energyBins) ];
+  if( !library ) library = std::make_shared<const ShowerLibrary>( path, etaBins, energyBins, outputLevel );
+  return library;
+}
+
+//!=====================================================================
+
+int ShowerLibrary::bin( const std::vector<float> &edges, float value )
+{
+  if( edges.size() < 2 ) return 0;
+  int idx = std::upper_bound( edges.begin(), edges.end(), value ) - edges.begin() - 1;
+  return std::min( std::max( idx, 0 ), (int)edges.size()-2 );
+}
+
+//!=====================================================================
+
+void ShowerLibrary::frame( const G4ThreeVector &dir, G4ThreeVector &u, G4ThreeVector &v )
+{
+  u = dir.orthogonal().unit();
+  v = dir.cross(u);
+}
+
+//!=====================================================================
+
+ShowerLibrary::ShowerLibrary( std::string path, const std::vector<float> &etaBins, const std::vector<float> &energyBins, int outputLevel ):
+  IMsgService("ShowerLibrary"),
+  m_etaBins(etaBins),
+  m_energyBins(energyBins),
+  m_size(0)
+{
+  setMsgLevel(outputLevel);
+
+  if( !std::is_sorted( m_etaBins.begin(), m_etaBins.end() ) || !std::is_sorted( m_energyBins.begin(), m_energyBins.end() ) ){
+    MSG_FATAL( "The eta and energy bin edges of the shower library must be sorted." );
+  }
+
+  std::unique_ptr<TFile> file( TFile::Open(path.c_str(), "read") );
+  if( !file || file->IsZombie() ){
+    MSG_FATAL( "It's not possible to open the shower library " << path );
+  }
+
+  TTree *tree = (TTree*)file->Get("ShowerLibrary");
+  if( !tree ){
+    MSG_FATAL( "It's not possible to find the ShowerLibrary tree into " << path );
+  }
+
+  int pdgid=0;
+  float energy=0, eta=0;
+  std::vector<float> *spot_l=nullptr, *spot_u=nullptr, *spot_v=nullptr, *spot_e=nullptr, *spot_t=nullptr;
+  tree->SetBranchAddress( "pdgid"  , &pdgid  );
+  tree->SetBranchAddress( "energy" , &energy );
+  tree->SetBranchAddress( "eta"    , &eta    );
+  tree->SetBranchAddress( "spot_l" , &spot_l );
+  tree->SetBranchAddress( "spot_u" , &spot_u );
+  tree->SetBranchAddress( "spot_v" , &spot_v );
+  tree->SetBranchAddress( "spot_e" , &spot_e );
+  tree->SetBranchAddress( "spot_t" , &spot_t );
+
+  size_t nBins=0, nAbove=0;
+  double fraction=0;
+
+  for ( Long64_t entry = 0; entry < tree->GetEntries(); ++entry )
+  {
+    tree->GetEntry(entry);
+    if( energy <= 0 ) continue;
+    Shower shower{ energy, eta, 0, {} };
+    shower.spots.reserve( spot_e->size() );
+    for ( size_t i = 0; i < spot_e->size(); ++i ){
+      shower.spots.push_back( Spot{ spot_l->at(i), spot_u->at(i), spot_v->at(i), spot_e->at(i), spot_t->at(i) } );
+      shower.fraction += spot_e->at(i);
+    }
+    // the deposits can not be more than the particle energy
+    if( shower.fraction > 1.01 ) nAbove++;
+    fraction += shower.fraction;
+
+    auto &showers = m_showers[key(pdgid)][bin( m_etaBins, std::abs(eta) )][bin( m_energyBins, energy )];
+    if( showers.empty() ) nBins++;
+    showers.push_back( std::move(shower) );
+    m_size++;
+  }
+  tree->ResetBranchAddresses();
+  delete spot_l; delete spot_u; delete spot_v; delete spot_e; delete spot_t;
+
+  MSG_INFO( "Shower library " << path << " with " << m_size << " showers into " << nBins << " bins (" 
+            << (nBins ? m_size/nBins : 0) << " showers per bin, mean deposited fraction " << (m_size ? fraction/m_size : 0) << ")." );
+  if( nAbove ){
+    MSG_WARNING( nAbove << " showers deposit more than the particle energy. Check the library." );
+  }
+}
+
+//!=====================================================================
+
+template<class T> typename std::map<int, T>::const_iterator ShowerLibrary::closest( const std::map<int, T> &bins, int bin )
+{
+  auto it = bins.lower_bound( bin );
+  if( it == bins.end() ) return std::prev(it);
+  if( it != bins.begin() && bin - std::prev(it)->first < it->first - bin ) return std::prev(it);
+  return it;
+}
+
+//!=====================================================================
+
+const ShowerLibrary::Shower* ShowerLibrary::find( int pdgid, float energy, float eta, double random ) const
+{
+  auto particle = m_showers.find( key(pdgid) );
+  if( particle == m_showers.end() || particle->second.empty() ) return nullptr;
+
+  // bin of the particle (or the closest one with showers)
+  auto etaIt    = closest( particle->second, bin( m_etaBins, std::abs(eta) ) );
+  auto energyIt = closest( etaIt->second, bin( m_energyBins, energy ) );
+
+  // random shower of the bin
+  const auto &showers = energyIt->second;
+  size_t idx = std::min( (size_t)(random * showers.size()), showers.size()-1 );
+  return &showers[idx];
+}
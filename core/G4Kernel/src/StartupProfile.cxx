@@ -0,0 +1,114 @@
+
+#include "G4Kernel/StartupProfile.h"
+#include "GaugiKernel/Profiler.h"
+#include <algorithm>
+#include <fstream>
+#include <iomanip>
+#include <sstream>
+
+
+
+StartupProfile::StartupProfile( std::string name ):
+  IMsgService(name),
+  m_start(0),
+  m_stopped(false)
+{}
+
+//!=====================================================================
+
+void StartupProfile::start()
+{
+  std::lock_guard<std::mutex> lock(m_mutex);
+  m_steps.clear();
+  m_stopped = false;
+  m_start = Gaugi::Profiler::now().wall;
+}
+
+//!=====================================================================
+
+void StartupProfile::mark( std::string step )
+{
+  double end = Gaugi::Profiler::now().wall;
+  std::lock_guard<std::mutex> lock(m_mutex);
+  if( m_stopped ) return;
+  auto it = std::find_if( m_steps.begin(), m_steps.end(), [&step](const Step &s){ return s.name==step; } );
+  if( it == m_steps.end() ){
+    m_steps.push_back( Step{step, end, 1} );
+  }else{
+    // marked by many threads, ends with the last one
+    it->end = std::max( it->end, end );
+    it->calls++;
+  }
+}
+
+//!=====================================================================
+
+void StartupProfile::stop( std::string step )
+{
+  double end = Gaugi::Profiler::now().wall;
+  std::lock_guard<std::mutex> lock(m_mutex);
+  if( m_stopped ) return;
+  m_steps.push_back( Step{step, end, 1} );
+  m_stopped = true;
+}
+
+//!=====================================================================
+
+std::string StartupProfile::summary() const
+{
+  std::lock_guard<std::mutex> lock(m_mutex);
+  std::stringstream ss;
+  ss << std::fixed << std::setprecision(3);
+  ss << std::left << std::setw(40) << "step" << std::right << std::setw(8) << "calls"
+     << std::setw(14) << "wall[ms]" << std::endl;
+  double begin = m_start;
+  for( auto &step : m_steps ){
+    ss << std::left << std::setw(40) << step.name << std::right << std::setw(8) << step.calls
+       << std::setw(14) << step.end - begin << std::endl;
+    begin = step.end;
+  }
+  ss << std::left << std::setw(40) << "total" << std::right << std::setw(8) << ""
+     << std::setw(14) << begin - m_start << std::endl;
+  return ss.str();
+}
+
+//!=====================================================================
+
+std::string StartupProfile::json() const
+{
+  std::lock_guard<std::mutex> lock(m_mutex);
+  std::stringstream ss;
+  ss << std::setprecision(6);
+  ss << "{" << std::endl;
+  ss << "  \"name\": \"" << getLogName() << "\"," << std::endl;
+  ss << "  \"unit\": {\"time\": \"ms\"}," << std::endl;
+  ss << "  \"steps\": [";
+  double begin = m_start;
+  for( size_t i=0; i < m_steps.size(); ++i ){
+    auto &step = m_steps[i];
+    ss << (i ? "," : "") << std::endl;
+    ss << "    {\"step\": \"" << step.name << "\""
+       << ", \"calls\": " << step.calls
+       << ", \"wall\": " << step.end - begin
+       << ", \"since_start\": " << step.end - m_start << "}";
+    begin = step.end;
+  }
+  ss << std::endl << "  ]," << std::endl;
+  ss << "  \"total\": " << begin - m_start << std::endl;
+  ss << "}" << std::endl;
+  return ss.str();
+}
+
+//!=====================================================================
+
+bool StartupProfile::dump( std::string path ) const
+{
+  std::ofstream out( path );
+  if( !out.is_open() ){
+    MSG_ERROR( "It's not possible to open the startup profile output " << path );
+    return false;
+  }
+  out << json();
+  MSG_INFO( "Startup profile saved into " << path );
+  return true;
+}
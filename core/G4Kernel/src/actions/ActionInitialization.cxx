@@ -4,6 +4,7 @@
 #include "G4Kernel/actions/RunAction.h"
 #include "G4Kernel/actions/EventAction.h"
 #include "G4Kernel/actions/SteppingAction.h"
+#include "G4Kernel/actions/StackingAction.h"
 #include "G4MTRunManager.hh"
 #include <iostream>
 
@@ -11,15 +12,25 @@ ActionInitialization::ActionInitialization( int numberOfThreads,
                                             int timeout,
                                             PrimaryGenerator *gen,
                                             std::vector<Gaugi::Algorithm*> acc , 
-                                            std::string output)
+                                            std::string output,
+                                            TBufferMerger *merger,
+                                            float roiConeSize,
+                                            std::string truthKey,
+                                            int eventsPerWrite,
+                                            StartupProfile *startup)
  : 
   IMsgService("ActionInitialization"), 
   G4VUserActionInitialization(),
   m_acc(acc),
   m_generator(gen),
   m_output(output),
+  m_merger(merger),
   m_numberOfThreads(numberOfThreads),
-  m_timeout(timeout)
+  m_timeout(timeout),
+  m_roiConeSize(roiConeSize),
+  m_truthKey(truthKey),
+  m_eventsPerWrite(eventsPerWrite),
+  m_startup(startup)
 {
 
   for ( auto toolHandle : m_acc )
@@ -49,7 +60,10 @@ ActionInitialization::~ActionInitialization()
 
 void ActionInitialization::BuildForMaster() const
 {
-  //SetUserAction(new RunAction(m_acc, m_output));
+  // only used to mark the end of the physics tables (no event loop into the master)
+  if( m_startup ){
+    SetUserAction(new RunAction(m_numberOfThreads, m_timeout, m_acc, m_output, m_merger, m_eventsPerWrite, m_startup));
+  }
 }
 
 
@@ -57,8 +71,11 @@ void ActionInitialization::Build() const
 {
   MSG_INFO( "Build()" );
   SetUserAction(new PrimaryGeneratorAction(m_generator));
-  SetUserAction(new RunAction(m_numberOfThreads, m_timeout, m_acc, m_output));
-  SetUserAction(new EventAction());
+  SetUserAction(new RunAction(m_numberOfThreads, m_timeout, m_acc, m_output, m_merger, m_eventsPerWrite, m_startup));
+  SetUserAction(new EventAction(m_startup));
   SetUserAction(new SteppingAction());
+  if( m_roiConeSize > 0 ){
+    SetUserAction(new StackingAction(m_roiConeSize, m_truthKey));
+  }
 }  
 
@@ -9,9 +9,10 @@
 #include <iomanip>
 
 
-EventAction::EventAction()
+EventAction::EventAction( StartupProfile *startup )
  : IMsgService("EventAction"), 
-   G4UserEventAction()
+   G4UserEventAction(),
+   m_startup(startup)
 {;}
 
 
@@ -23,6 +24,7 @@ void EventAction::BeginOfEventAction(const G4Event* /*event*/)
 {  
   auto* acc = static_cast<RunSequence*>(G4RunManager::GetRunManager()->GetNonConstCurrentRun());
   MSG_DEBUG( "EventAction::BeginOfEvent()" );
+  if( m_startup ) m_startup->stop( "first event" );
   acc->BeginOfEvent();
 }
 
@@ -4,6 +4,7 @@
 
 #include "G4Run.hh"
 #include "G4RunManager.hh"
+#include "G4Threading.hh"
 #include "G4UnitsTable.hh"
 #include "G4SystemOfUnits.hh"
 
@@ -14,11 +15,15 @@
 
 #include <iostream>
 
-RunAction::RunAction( int numberOfThreads, int timeout, std::vector<Gaugi::Algorithm*> acc, std::string output )
+RunAction::RunAction( int numberOfThreads, int timeout, std::vector<Gaugi::Algorithm*> acc, std::string output, TBufferMerger *merger,
+                      int eventsPerWrite, StartupProfile *startup )
  : IMsgService("RunAction"),
    G4UserRunAction(),
    m_acc(acc),
    m_output(output),
+   m_merger(merger),
+   m_eventsPerWrite(eventsPerWrite),
+   m_startup(startup),
    m_numberOfThreads(numberOfThreads),
    m_timeout(timeout)
 {;}
@@ -31,16 +36,29 @@ RunAction::~RunAction()
 }
 
 
+bool RunAction::isMasterOfWorkers() const
+{
+  return IsMaster() && G4Threading::IsMultithreadedApplication();
+}
+
+
 G4Run* RunAction::GenerateRun()
 {
+  // the master only collects the worker runs (geant default run)
+  if( isMasterOfWorkers() ) return G4UserRunAction::GenerateRun();
   MSG_INFO("Creating the RunSequence..");
-  return new RunSequence(m_numberOfThreads, m_timeout, m_acc, m_output);
+  return new RunSequence(m_numberOfThreads, m_timeout, m_acc, m_output, m_merger, m_eventsPerWrite);
 }
 
 
 void RunAction::BeginOfRunAction(const G4Run* /*run*/)
 {
   MSG_INFO( "RunAction::BeginOfRunAction" );
+  // the physics tables are built by the master just before its run starts and each
+  // worker builds its own (shared) tables after the thread was spawned
+  if( m_startup ){
+    m_startup->mark( isMasterOfWorkers() ? "physics tables" : "worker threads" );
+  }
 }
 
 
@@ -0,0 +1,86 @@
+
+#include "G4Kernel/RunSequence.h"
+#include "G4Kernel/actions/StackingAction.h"
+#include "G4Kernel/CaloPhiRange.h"
+#include "TruthParticle/TruthParticleContainer.h"
+
+#include "G4Track.hh"
+#include "G4RunManager.hh"
+#include "G4SystemOfUnits.hh"
+#include <cmath>
+
+
+StackingAction::StackingAction( float coneSize, std::string truthKey )
+ : IMsgService("StackingAction"),
+   G4UserStackingAction(),
+   m_coneSize(coneSize),
+   m_truthKey(truthKey)
+{;}
+
+//!=====================================================================
+
+StackingAction::~StackingAction()
+{;}
+
+//!=====================================================================
+
+void StackingAction::PrepareNewEvent()
+{
+  // called after the primary generator, so the truth particles of this event are already
+  // into the store. These are the same particles used by RootStreamHITMaker to keep the hits
+  m_centers.clear();
+  RunSequence* acc = static_cast<RunSequence*> (G4RunManager::GetRunManager()->GetNonConstCurrentRun()); 
+  SG::ReadHandle<xAOD::TruthParticleContainer> particles( m_truthKey, acc->getContext() );
+  if( !particles.isValid() ){
+    MSG_WARNING( "It's not possible to read the truth particles using this key " << m_truthKey << ". All tracks will be kept." );
+    return;
+  }
+  for ( const auto par : **particles.ptr() ){
+    m_centers.push_back( std::make_pair( par->eta(), par->phi() ) );
+  }
+  MSG_DEBUG( "Transport restricted to " << m_centers.size() << " cones of " << m_coneSize );
+}
+
+//!=====================================================================
+
+/**
+ * A track is killed only when its position and its direction are both outside of all
+ * truth particle cones: it is far from the RoIs and it is not flying into them. The
+ * position is not used for tracks close to the beam line, where its eta/phi are
+ * meaningless. Without truth particles all tracks are kept.
+ *
+ * The saved hits (RootStreamHITMaker with OnlyRoI) are the same as without the cones
+ * only if no killed track would deposit energy into the windows around the particles.
+ * So the cone must cover the window (deltaR larger than its half diagonal) plus a
+ * margin for the tracks that leave the cone and deposit energy back into the window.
+ */
+G4ClassificationOfNewTrack StackingAction::ClassifyNewTrack(const G4Track* track)
+{
+  if( m_centers.empty() ) return fUrgent;
+
+  const G4ThreeVector &dir = track->GetMomentumDirection();
+  // along the beam axis, eta is not defined
+  if( dir.perp() <= 0 ) return fUrgent;
+  // flying into one of the cones
+  if( inside( dir.eta(), dir.phi() ) ) return fUrgent;
+
+  // produced inside of one of the cones
+  const G4ThreeVector &pos = track->GetPosition();
+  if( pos.perp() > 1*cm && inside( pos.eta(), pos.phi() ) ) return fUrgent;
+
+  return fKill;
+}
+
+//!=====================================================================
+
+bool StackingAction::inside( float eta, float phi ) const
+{
+  for ( const auto &center : m_centers ){
+    float deta = eta - center.first;
+    float dphi = CaloPhiRange::diff( phi, center.second );
+    if( deta*deta + dphi*dphi < m_coneSize*m_coneSize ) return true;
+  }
+  return false;
+}
+
+//!=====================================================================
@@ -55,6 +55,12 @@ namespace Gaugi{
       /*! Return the name of the algorithm */
       const std::string& name() const;
 
+      /*! True if execute can run concurrently with other algorithms of the same event */
+      bool isThreadSafe() const;
+
+      /*! True if execute can run for several events (contexts) at the same time */
+      bool isReentrant() const;
+
     
     protected:
       
@@ -67,10 +73,20 @@ namespace Gaugi{
       bool isInitialized() const;
       bool isFinalized() const;
 
+      /*! Must be called in the constructor by the algorithms that do not share any
+       * state (store, random generator, tools) with other algorithms during execute */
+      void setThreadSafe( bool threadSafe=true );
+
+      /*! Must be called in the constructor by the algorithms without any state changed
+       * during execute (all the event data lives into the event context or its store) */
+      void setReentrant( bool reentrant=true );
+
     private:
 
       bool m_isInitialized;
       bool m_isFinalized;
+      bool m_isThreadSafe;
+      bool m_isReentrant;
   };
 
 }/// namespace
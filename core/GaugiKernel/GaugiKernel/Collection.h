@@ -15,8 +15,8 @@ namespace SG{
   {  
     public:
 
-      /*! Contructor */
-      Collection()=default;
+      /*! Contructor. A collection that is not the owner does not delete the objects (e.g. pooled objects) */
+      Collection( bool owner=true ):m_owner(owner){};
       
       /*! Destructor */
       ~Collection();
@@ -32,13 +32,15 @@ namespace SG{
 
       /*! Hold all object pointers */
       std::map<unsigned long int, T* > m_collection;
+      /*! Delete all objects in the end */
+      bool m_owner;
   };
 
   template<class T>
   Collection<T>::~Collection<T>()
   {
     for(auto& p : m_collection){
-      if(p.second)
+      if(m_owner && p.second)
         delete p.second;
     }
     m_collection.clear();
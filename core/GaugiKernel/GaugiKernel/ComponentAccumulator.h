@@ -5,8 +5,13 @@
 #include "GaugiKernel/Algorithm.h"
 #include "GaugiKernel/StoreGate.h"
 #include "GaugiKernel/Timer.h"
+#include "GaugiKernel/Profiler.h"
+#include "GaugiKernel/ThreadPool.h"
 #include <string>
 #include <vector>
+#include <set>
+#include <memory>
+#include <mutex>
 #include <ROOT/TBufferMerger.hxx>
 using namespace ROOT::Experimental;
 
@@ -33,10 +38,56 @@ namespace Gaugi{
 
       void run( SG::EventContext *ctx, int evt ) const;
 
+      /*! Run all events using NumberOfThreads event loops (one event context and store for each
+       * thread). The events are processed in chunks of EventChunkSize events and each chunk is
+       * merged into the output file in the event order as soon as it is done, so each thread
+       * keeps at most one chunk in memory */
+      void run( const std::vector<int> &events, std::string output ) const;
+
       void finalize();
 
+      /*! Per tool execution profile */
+      Profiler& profiler();
+
     private:
 
+      /*! Build the data flow graph from the Input*Key(s) and Output*Key(s) properties */
+      void buildDataFlow();
+
+      /*! Get all keys read and written by the tool */
+      void getKeys( Gaugi::Algorithm *toolHandle, std::set<std::string> &inputs, std::set<std::string> &outputs ) const;
+
+      /*! Execute all tools following the data flow graph */
+      void schedule( SG::EventContext *ctx, int evt, std::vector<Profiler::Sample> &start, std::vector<Profiler::Sample> &end ) const;
+
+      /*! Hold the tool (position) while it is executed for one event. Only not reentrant tools
+       * are locked and only when there is more than one event loop */
+      std::unique_lock<std::mutex> acquire( size_t i ) const;
+
+      // number of event loops (threads), each one with its own event context
+      int m_numberOfThreads;
+      // one lock for each tool
+      std::vector< std::unique_ptr<std::mutex> > m_locks;
+      // the event loops share the same message stream
+      mutable std::mutex m_msgMutex;
+
+      // number of threads used to execute independent tools of the same event (serial if <= 1)
+      int m_numberOfAlgThreads;
+
+      // run seed of the random streams (see SG::EventContext::random)
+      int m_seed;
+      // number of events sent to the merger at once by each event loop
+      int m_eventChunkSize;
+      std::unique_ptr<ThreadPool> m_pool;
+
+      // for each tool (position), the tools that must wait until it finish
+      std::vector< std::vector<size_t> > m_children;
+      // for each tool (position), the number of tools that must finish before it
+      std::vector< size_t > m_parents;
+
+      // per tool wall/cpu time and memory profile
+      mutable Profiler m_profiler;
+
       // monitoring variables
       //Timer m_timer;
       // Store gate
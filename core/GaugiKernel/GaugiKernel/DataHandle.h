@@ -3,9 +3,11 @@
 
 #include "GaugiKernel/StoreGate.h"
 #include "GaugiKernel/MsgStream.h"
+#include "GaugiKernel/Random.h"
 #include <string>
 #include <map>
 #include <memory>
+#include <mutex>
 
 
 namespace SG{
@@ -53,10 +55,24 @@ namespace SG{
       void setNumberOfThreads(int numberOfThreads) { m_numberOfThreads=numberOfThreads;};
       int getNumberOfThreads(){return m_numberOfThreads;};
 
+      /*! Run seed used by all random streams */
+      void setSeed( uint64_t seed ){ m_seed=seed; };
+      uint64_t getSeed() const { return m_seed; };
+
+      /*! Event number used by all random streams of this event */
+      void setEventNumber( long eventNumber ){ m_eventNumber=eventNumber; };
+      long getEventNumber() const { return m_eventNumber; };
+
+      /*! Random stream of the tool (name hash, see Gaugi::RandomStream::hash) for this event. 
+       * The id gives independent streams into the same tool (e.g. the cell hash) */
+      Gaugi::RandomStream random( uint64_t tool, uint64_t id=0 ) const
+      { return Gaugi::RandomStream( m_seed, (uint64_t)m_eventNumber, tool, id ); };
+
 
       /*! Get all keys into the storage */
       std::vector<std::string> keys() const
       { 
+        std::lock_guard<std::mutex> lock(m_mutex);
         std::vector<std::string> keys;
         for( auto &it : m_storable_ptr)
         {
@@ -67,6 +83,7 @@ namespace SG{
 
       bool exist( std::string key ) const
       {
+        std::lock_guard<std::mutex> lock(m_mutex);
         return m_storable_ptr.count(key);
       };
 
@@ -74,11 +91,17 @@ namespace SG{
     private:
 
       std::map< std::string, std::unique_ptr<const DataHandle > > m_storable_ptr;
+
+      // algorithms of the same event can record/get concurrently
+      mutable std::mutex m_mutex; //!
       
       StoreGate *m_store;
 
       int m_threadId;
       int m_numberOfThreads;
+
+      uint64_t m_seed;
+      long m_eventNumber;
   };
 
 
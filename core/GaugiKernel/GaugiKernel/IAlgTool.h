@@ -26,6 +26,15 @@ class IAlgTool
 	/*! Create all resouces here */    
 	virtual StatusCode initialize()=0;
 	virtual StatusCode execute( SG::EventContext &ctx, Gaugi::EDM * ) const=0;
+	/*! Execute for many objects at once (e.g. all cells of a sampling). The default calls
+	 * execute for each one, tools can override it to process all objects as arrays */
+	virtual StatusCode execute( SG::EventContext &ctx, const std::vector<Gaugi::EDM*> &edms ) const
+	{
+	  for ( auto edm : edms ){
+	    if ( execute( ctx, edm ).isFailure() ) return StatusCode::FAILURE;
+	  }
+	  return StatusCode::SUCCESS;
+	};
 	/*! Destroy all allocated memory and close all services */
 	virtual StatusCode finalize()=0;
 
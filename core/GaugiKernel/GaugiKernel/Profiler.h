@@ -0,0 +1,73 @@
+#ifndef Profiler_h
+#define Profiler_h
+
+#include "GaugiKernel/MsgStream.h"
+#include "GaugiKernel/StoreGate.h"
+#include <string>
+#include <vector>
+#include <map>
+#include <mutex>
+
+namespace Gaugi{
+
+  class Profiler : public MsgService {
+
+    public:
+
+        /*! Snapshot of the clocks and the resident memory */
+        struct Sample {
+          double wall; // [ms]
+          double cpu;  // [ms]
+          double rss;  // [MB]
+        };
+
+        /*! Accumulated statistics for one tool step */
+        struct Record {
+          std::string tool;
+          std::string step;
+          unsigned long calls=0;
+          double wall=0, wall2=0, wallMax=0;
+          double cpu=0, cpuMax=0;
+          double rss=0, rssMax=0; // process wide, not only this tool
+        };
+
+        Profiler( std::string name="Profiler" );
+        ~Profiler()=default;
+
+        /*! Get the current wall time, thread cpu time and resident memory */
+        static Sample now();
+
+        /*! Book the profile histograms for the tool under Event/Profile/<tool> */
+        void bookHistograms( SG::StoreGate *store, const std::string &tool, const std::vector<std::string> &steps );
+
+        /*! Accumulate the cost of the step since the start sample */
+        void fill( SG::StoreGate *store, const std::string &tool, const std::string &step, const Sample &start );
+
+        /*! Accumulate the cost of the step between the start and end samples (taken in the same thread) */
+        void fill( SG::StoreGate *store, const std::string &tool, const std::string &step, const Sample &start, const Sample &end );
+
+        /*! Human readable summary table */
+        std::string summary() const;
+
+        /*! Summary as json */
+        std::string json() const;
+
+        /*! Write the json summary into a file */
+        bool dump( std::string path ) const;
+
+        /*! Reset all accumulated statistics */
+        void reset();
+
+        const std::vector<Record>& records() const { return m_records; };
+
+    private:
+
+      std::vector<Record> m_records;
+      // index of each tool/step into the records
+      std::map<std::string, size_t> m_index;
+      // the same profiler can be filled by many event loops
+      std::mutex m_mutex; //!
+  };
+
+}// namespace
+#endif
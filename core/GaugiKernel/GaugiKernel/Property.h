@@ -2,6 +2,7 @@
 #define Property_h
 
 #include <string>
+#include <vector>
 #include <map>
 
 
@@ -76,6 +77,12 @@ namespace Gaugi{
   
       bool hasProperty( std::string name);
 
+      /* Names of all declared properties */
+      std::vector<std::string> getPropertyNames() const;
+
+      /* Check if the property was declared with the type T */
+      template<typename T> bool isPropertyType( std::string name ) const;
+
 
     private:
 
@@ -170,6 +177,19 @@ namespace Gaugi{
     return false;
   }
 
+  inline std::vector<std::string> PropertyService::getPropertyNames() const {
+    std::vector<std::string> names;
+    for( auto &it : m_properties )
+      names.push_back(it.first);
+    return names;
+  }
+
+  template<typename T> inline bool PropertyService::isPropertyType( std::string name ) const
+  {
+    auto it = m_properties.find(name);
+    return it != m_properties.end() && dynamic_cast<Property<T>*>(it->second.get()) != nullptr;
+  }
+
 
 }//namespace
 #endif
@@ -0,0 +1,143 @@
+#ifndef Random_h
+#define Random_h
+
+#include <cstdint>
+#include <cstddef>
+#include <cmath>
+#include <string>
+
+
+namespace Gaugi{
+
+  /**
+   * @class RandomStream
+   * @brief Counter-based random stream (Philox4x32-10, Random123).
+   *
+   * Each number is a pure function of the key and of the counter: the key comes
+   * from the run seed and the tool name and the counter holds the event number,
+   * the stream id (e.g. the cell hash) and the position into the stream. So the
+   * numbers of one (seed, event, tool, id) are always the same, independent of
+   * the thread, of the event order or of the job splitting. There is no state to
+   * initialize, so one stream can be created for each cell.
+   */
+  class RandomStream
+  {
+    public:
+
+      RandomStream( uint64_t seed, uint64_t event, uint64_t tool, uint64_t id=0 ):
+        m_pos(4), m_hasGaus(false), m_gaus(0)
+      {
+        uint64_t key = mix( seed ) ^ tool ^ mix( event >> 32 );
+        m_key[0] = (uint32_t)key;
+        m_key[1] = (uint32_t)(key >> 32);
+        m_counter[0] = 0;
+        m_counter[1] = (uint32_t)event;
+        m_counter[2] = (uint32_t)id;
+        m_counter[3] = (uint32_t)(id >> 32);
+      };
+
+      RandomStream( uint64_t seed, uint64_t event, const std::string &tool, uint64_t id=0 ):
+        RandomStream( seed, event, hash(tool), id )
+      {};
+
+      /*! Next 32 random bits */
+      uint32_t integer()
+      {
+        if( m_pos == 4 ) next();
+        return m_block[m_pos++];
+      };
+
+      /*! Uniform integer in [0, n) */
+      uint32_t integer( uint32_t n )
+      {
+        return (uint32_t)( ( (uint64_t)integer() * n ) >> 32 );
+      };
+
+      /*! Uniform in (0, 1) */
+      double uniform()
+      {
+        return ( integer() + 0.5 ) * 2.3283064365386963e-10; // 2^-32
+      };
+
+      /*! Normal (Box-Muller, the second value is kept for the next call) */
+      double gaus( double mean=0, double sigma=1 )
+      {
+        if( m_hasGaus ){
+          m_hasGaus = false;
+          return mean + sigma*m_gaus;
+        }
+        double r   = std::sqrt( -2*std::log( uniform() ) );
+        double phi = 2*M_PI*uniform();
+        m_gaus     = r*std::sin(phi);
+        m_hasGaus  = true;
+        return mean + sigma*r*std::cos(phi);
+      };
+
+      /*! Fill n normal values (each Box-Muller pair takes two 32 bit words, half a philox block) */
+      void gaus( float *values, size_t n, float mean=0, float sigma=1 )
+      {
+        for( size_t i=0; i < n; ++i ) values[i] = gaus( mean, sigma );
+      };
+
+      /*! Stable hash of a name (FNV-1a), the same for any platform and run */
+      static uint64_t hash( const std::string &name )
+      {
+        uint64_t h = 0xcbf29ce484222325ULL;
+        for( unsigned char c : name ){
+          h ^= c;
+          h *= 0x100000001b3ULL;
+        }
+        return h;
+      };
+
+      /*! Philox4x32-10 block: ten rounds over the counter with the key */
+      static void philox( uint32_t ctr[4], const uint32_t key[2] )
+      {
+        uint32_t k0=key[0], k1=key[1];
+        for( int round=0; round < 10; ++round ){
+          if( round ){
+            k0 += 0x9E3779B9;
+            k1 += 0xBB67AE85;
+          }
+          uint64_t p0 = (uint64_t)0xD2511F53 * ctr[0];
+          uint64_t p1 = (uint64_t)0xCD9E8D57 * ctr[2];
+          uint32_t c0 = (uint32_t)(p1 >> 32) ^ ctr[1] ^ k0;
+          uint32_t c2 = (uint32_t)(p0 >> 32) ^ ctr[3] ^ k1;
+          ctr[1] = (uint32_t)p1;
+          ctr[3] = (uint32_t)p0;
+          ctr[0] = c0;
+          ctr[2] = c2;
+        }
+      };
+
+    private:
+
+      /*! splitmix64 finalizer, so close seeds give unrelated keys */
+      static uint64_t mix( uint64_t x )
+      {
+        x += 0x9E3779B97F4A7C15ULL;
+        x = (x ^ (x >> 30)) * 0xBF58476D1CE4E5B9ULL;
+        x = (x ^ (x >> 27)) * 0x94D049BB133111EBULL;
+        return x ^ (x >> 31);
+      };
+
+      /*! Next block of four numbers */
+      void next()
+      {
+        for( int i=0; i < 4; ++i ) m_block[i] = m_counter[i];
+        philox( m_block, m_key );
+        m_counter[0]++;
+        m_pos = 0;
+      };
+
+      uint32_t m_key[2];
+      uint32_t m_counter[4];
+      uint32_t m_block[4];
+      int m_pos;
+      bool m_hasGaus;
+      double m_gaus;
+  };
+
+}
+
+#endif
@@ -7,6 +7,7 @@
 #include <string>
 #include <vector>
 #include <map>
+#include <memory>
 
 /** ROOT libs **/
 #include "TObject.h"
@@ -29,11 +30,20 @@ namespace SG
       /** Constructor **/
       StoreGate( std::string outputfile);
 
+      /** Constructor using an opened file (e.g. one of the TBufferMerger files) **/
+      StoreGate( std::shared_ptr<TFile> file );
+
       /** Destructor **/
       ~StoreGate()=default;     
       
       void save();
 
+      /** Send all objects of a TBufferMerger file to the merger and reset them, so the memory
+       * only holds what was filled since the last write. The trees are reset by the file and the
+       * histograms here, since the merger adds each write to the output. Nothing is done for
+       * other files **/
+      void write();
+
       /** Create directory **/
       void mkdir(std::string );
       
@@ -71,7 +81,7 @@ namespace SG
       // the current path
       std::string m_currentPath;
       // file
-      std::unique_ptr<TFile> m_file;
+      std::shared_ptr<TFile> m_file;
 
       // ROOT objects
       std::map<std::string, TObject *> m_objs;
@@ -0,0 +1,44 @@
+#ifndef ThreadPool_h
+#define ThreadPool_h
+
+#include <condition_variable>
+#include <functional>
+#include <future>
+#include <mutex>
+#include <queue>
+#include <thread>
+#include <vector>
+
+namespace Gaugi{
+
+  /*
+   * @class ThreadPool
+   * @brief Fixed number of workers consuming a FIFO of tasks. The workers
+   *        are created once and live until the pool is destroyed.
+   */
+  class ThreadPool {
+
+    public:
+
+        ThreadPool( unsigned numberOfThreads );
+        ~ThreadPool();
+
+        /*! Queue the task. The future holds any exception thrown by the task */
+        std::future<void> submit( std::function<void()> task );
+
+        /*! Number of workers */
+        unsigned size() const { return m_workers.size(); };
+
+    private:
+
+      void loop();
+
+      std::vector<std::thread> m_workers;
+      std::queue<std::packaged_task<void()>> m_tasks;
+      std::mutex m_mutex;
+      std::condition_variable m_cv;
+      bool m_stop;
+  };
+
+}// namespace
+#endif
@@ -1,7 +1,8 @@
 __all__ = ["ComponentAccumulator"]
 
 from GaugiKernel import Logger
-from GaugiKernel.macros import MSG_WARNING
+from GaugiKernel.macros import MSG_INFO, MSG_WARNING
+from GaugiKernel import list2stdvector
 from typing import List
 import numpy as np
 import os
@@ -12,8 +13,12 @@ import os
 class ComponentAccumulator( Logger ):
 
   def __init__(self, 
-               name            : str, 
-               output          : str, 
+               name               : str, 
+               output             : str, 
+               NumberOfAlgThreads : int=1,
+               NumberOfThreads    : int=1,
+               Seed               : int=0,
+               EventChunkSize     : int=100,
               ):
     
     Logger.__init__(self)
@@ -22,10 +27,24 @@ class ComponentAccumulator( Logger ):
     from ROOT import RunManager
     from ROOT import Gaugi as GK
     self.__acc = GK.ComponentAccumulator( name )
-    from ROOT import SG
-    self.__ctx = SG.EventContext("EventContext")
-    self.__store = SG.StoreGate(output)
-    self.__ctx.setStoreGateSvc(self.__store)
+    # independent algorithms (data flow) of the same event run concurrently
+    self.__acc.setProperty( "NumberOfAlgThreads", NumberOfAlgThreads )
+    # events are shared between threads, each one with its own event context and store
+    self.__acc.setProperty( "NumberOfThreads", NumberOfThreads )
+    # all random streams are derived from (seed, event number, tool, id), so the result does not
+    # depend on the number of threads, on the event order or on the job splitting
+    self.__acc.setProperty( "Seed", Seed )
+    # with more than one thread, the events are merged into the output in chunks of this size,
+    # so each thread keeps at most one chunk in memory
+    self.__acc.setProperty( "EventChunkSize", EventChunkSize )
+    self.__numberOfThreads = NumberOfThreads
+    self.__output = output
+    self.__ctx = None
+    if NumberOfThreads <= 1:
+      from ROOT import SG
+      self.__ctx = SG.EventContext("EventContext")
+      self.__store = SG.StoreGate(output)
+      self.__ctx.setStoreGateSvc(self.__store)
 
   def SetReader(self, reader):
     self.__reader = reader
@@ -43,14 +62,26 @@ class ComponentAccumulator( Logger ):
 
   def configure(self):
     self.__acc.initialize()
-    self.__acc.bookHistograms(self.__ctx)
+    # the multithreading loop books one store for each thread
+    if self.__ctx is not None:
+      self.__acc.bookHistograms(self.__ctx)
 
  
   def run( self , events : List[int] ):
     self.configure()
-    for evt in events:
-        self.__acc.run(self.__ctx, evt)
+    if self.__ctx is not None:
+      for evt in events:
+          self.__acc.run(self.__ctx, evt)
+    else:
+      self.__acc.run( list2stdvector('int', events), self.__output )
       
     self.__acc.finalize()
-    self.__ctx.getStoreGateSvc().save()
+    self.summary()
+    if self.__ctx is not None:
+      self.__ctx.getStoreGateSvc().save()
+
+  def summary(self):
+    profiler = self.__acc.profiler()
+    MSG_INFO(self, "Profile per tool (mean per event):\n%s", profiler.summary())
+    profiler.dump( os.path.splitext(self.__output)[0] + ".profile.json" )
  
\ No newline at end of file
@@ -8,7 +8,9 @@ Algorithm::Algorithm():
   IMsgService(),
   PropertyService(),
   m_isInitialized(false),
-  m_isFinalized(false)
+  m_isFinalized(false),
+  m_isThreadSafe(false),
+  m_isReentrant(false)
 {;}
 
 //!=====================================================================
@@ -45,3 +47,31 @@ bool Algorithm::isFinalized() const
 {
   return m_isFinalized;
 }
+
+//!=====================================================================
+
+void Algorithm::setThreadSafe( bool threadSafe )
+{
+  m_isThreadSafe=threadSafe;
+}
+
+//!=====================================================================
+
+bool Algorithm::isThreadSafe() const
+{
+  return m_isThreadSafe;
+}
+
+//!=====================================================================
+
+void Algorithm::setReentrant( bool reentrant )
+{
+  m_isReentrant=reentrant;
+}
+
+//!=====================================================================
+
+bool Algorithm::isReentrant() const
+{
+  return m_isReentrant;
+}
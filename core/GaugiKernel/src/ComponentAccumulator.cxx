@@ -9,6 +9,11 @@
 #include <string>
 #include <cstring>
 #include <sys/resource.h>
+#include <atomic>
+#include <condition_variable>
+#include <exception>
+#include <mutex>
+#include <thread>
 using namespace SG;
 using namespace Gaugi;
 
@@ -20,10 +25,15 @@ ComponentAccumulator::ComponentAccumulator( std::string name
                                             //int numberOfThreads
                                             //std::shared_ptr<ROOT::Experimental::TBufferMergerFile> file
                                             ): 
-  IMsgService(name)
+  IMsgService(name),
+  m_profiler(name + "::Profiler")
   //m_ctx( "EventContext" )
   //m_store( output, threadId )
 {
+  declareProperty( "NumberOfThreads"   , m_numberOfThreads=1    );
+  declareProperty( "NumberOfAlgThreads", m_numberOfAlgThreads=1 );
+  declareProperty( "Seed"              , m_seed=0               );
+  declareProperty( "EventChunkSize"    , m_eventChunkSize=100   );
   //m_store = new SG::StoreGate(output, threadId);
   //m_ctx.setStoreGateSvc( m_store );
   //m_ctx.setThreadId(threadId);
@@ -60,6 +70,16 @@ void ComponentAccumulator::initialize( )
  
   }
 
+  buildDataFlow();
+
+  m_locks.clear();
+  for ( size_t i=0; i < m_toolHandles.size(); ++i )
+    m_locks.emplace_back( new std::mutex() );
+
+  if ( m_numberOfAlgThreads > 1 ){
+    MSG_INFO( "Executing independent tools with " << m_numberOfAlgThreads << " threads." );
+    m_pool = std::unique_ptr<ThreadPool>( new ThreadPool(m_numberOfAlgThreads) );
+  }
 
 }
 
@@ -87,6 +107,11 @@ void ComponentAccumulator::bookHistograms( SG::EventContext *ctx ) const
   store->add( new TH1I("EventCounter" , ";;Count;"           , 3  , 0 ,   3) );
   std::vector<std::string> labels{"Event", "Completed"};
   store->setLabels( store->histI("EventCounter"), labels );
+
+  for ( auto toolHandle : m_toolHandles )
+  {
+    m_profiler.bookHistograms( store, toolHandle->name(), {"execute", "fillHistograms"} );
+  }
 }
 
 
@@ -107,26 +132,62 @@ void ComponentAccumulator::finalize()
 
 void ComponentAccumulator::run(SG::EventContext *ctx , int evt ) const
 {
-  MSG_INFO("======================= Event "<< evt << " =========================");
+  {
+    std::lock_guard<std::mutex> guard(m_msgMutex);
+    MSG_INFO("======================= Event "<< evt << " =========================");
+  }
   Timer timer;
 
   timer.start();
   ctx->clear();
+  // the random streams of all tools come from (seed, event). Readers can replace the
+  // event number by the one saved into the event, see RootStreamHITReader
+  ctx->setSeed( m_seed );
+  ctx->setEventNumber( evt );
   auto store = ctx->getStoreGateSvc();
 
   bool completed = true;
-  for( auto &toolHandle : m_toolHandles){
+
+  if ( !m_pool ){
+
+    for( size_t i=0; i < m_toolHandles.size(); ++i ){
+        auto toolHandle = m_toolHandles[i];
+        auto guard = acquire(i);
     
-      //MSG_INFO( "Launching execute step for " << toolHandle->name() );
-      if (toolHandle->execute( *ctx , evt ).isFailure() ){
-          MSG_FATAL("It's not possible to execute for " << toolHandle->name());
-      }
+        //MSG_INFO( "Launching execute step for " << toolHandle->name() );
+        auto start = Profiler::now();
+        if (toolHandle->execute( *ctx , evt ).isFailure() ){
+            MSG_FATAL("It's not possible to execute for " << toolHandle->name());
+        }
+        m_profiler.fill( store, toolHandle->name(), "execute", start );
+
+        //MSG_INFO( "Launching booking step for " << toolHandle->name() );
+        start = Profiler::now();
+        if (toolHandle->fillHistograms( *ctx ).isFailure() ){
+            MSG_FATAL("It's not possible to fill histograms for " << toolHandle->name());
+        }
+        m_profiler.fill( store, toolHandle->name(), "fillHistograms", start );
+    }
 
-      //MSG_INFO( "Launching booking step for " << toolHandle->name() );
-      if (toolHandle->fillHistograms( *ctx ).isFailure() ){
-          MSG_FATAL("It's not possible to fill histograms for " << toolHandle->name());
-      }
+  }else{
+
+    std::vector<Profiler::Sample> start( m_toolHandles.size() ), end( m_toolHandles.size() );
+    schedule( ctx, evt, start, end );
+
+    // The store is not thread safe. Histograms are always filled in the configuration order
+    for( size_t i=0; i < m_toolHandles.size(); ++i ){
+        auto toolHandle = m_toolHandles[i];
+        m_profiler.fill( store, toolHandle->name(), "execute", start[i], end[i] );
+
+        auto guard = acquire(i);
+        auto fstart = Profiler::now();
+        if (toolHandle->fillHistograms( *ctx ).isFailure() ){
+            MSG_FATAL("It's not possible to fill histograms for " << toolHandle->name());
+        }
+        m_profiler.fill( store, toolHandle->name(), "fillHistograms", fstart );
+    }
   }
+
   store->cd("Event");
   store->histI("EventCounter")->Fill("Completed", completed ? 1 : 0 );
   timer.stop();
@@ -134,6 +195,242 @@ void ComponentAccumulator::run(SG::EventContext *ctx , int evt ) const
   store->hist1( "Event" )->Fill( timer.resume() );
 }
 
+//!=====================================================================
+
+Profiler& ComponentAccumulator::profiler()
+{
+  return m_profiler;
+}
+
+//!=====================================================================
+
+void ComponentAccumulator::getKeys( Gaugi::Algorithm *toolHandle, std::set<std::string> &inputs, std::set<std::string> &outputs ) const
+{
+  auto endsWith = []( const std::string &name, const std::string &suffix ){
+    return name.size() >= suffix.size() && name.compare( name.size()-suffix.size(), suffix.size(), suffix )==0;
+  };
+
+  for ( auto &name : toolHandle->getPropertyNames() )
+  {
+    std::set<std::string> *keys = nullptr;
+    if ( name.rfind("Input", 0)==0 )        keys = &inputs;
+    else if ( name.rfind("Output", 0)==0 )  keys = &outputs;
+    else continue;
+
+    if ( endsWith(name, "Key") && toolHandle->isPropertyType<std::string>(name) ){
+      std::string key;
+      toolHandle->getProperty( name, key );
+      if ( !key.empty() ) keys->insert(key);
+    }else if ( endsWith(name, "Keys") && toolHandle->isPropertyType<std::vector<std::string>>(name) ){
+      std::vector<std::string> values;
+      toolHandle->getProperty( name, values );
+      for ( auto &key : values ){
+        if ( !key.empty() ) keys->insert(key);
+      }
+    }
+  }
+}
+
+//!=====================================================================
+
+void ComponentAccumulator::buildDataFlow()
+{
+  size_t n = m_toolHandles.size();
+  std::vector< std::set<std::string> > inputs(n), outputs(n);
+  for ( size_t i=0; i < n; ++i ) getKeys( m_toolHandles[i], inputs[i], outputs[i] );
 
+  auto intersect = []( const std::set<std::string> &a, const std::set<std::string> &b ){
+    for ( auto &key : a ){
+      if ( b.count(key) ) return true;
+    }
+    return false;
+  };
+
+  m_children.assign( n, {} );
+  m_parents.assign( n, 0 );
+
+  // Only the previous tools are taken into account, so the configuration order is
+  // kept for every key: read after write, write after read and write after write.
+  for ( size_t i=0; i < n; ++i ){
+    for ( size_t j=0; j < i; ++j ){
+      if ( intersect(outputs[j], inputs[i]) || intersect(inputs[j], outputs[i]) || intersect(outputs[j], outputs[i]) ){
+        m_children[j].push_back(i);
+        m_parents[i]++;
+      }
+    }
+    MSG_DEBUG( m_toolHandles[i]->name() << " waits for " << m_parents[i] << " tool(s) and it is " 
+               << (m_toolHandles[i]->isThreadSafe() ? "" : "not ") << "thread safe." );
+  }
+}
 
+//!=====================================================================
 
+void ComponentAccumulator::schedule( SG::EventContext *ctx, int evt, std::vector<Profiler::Sample> &start, std::vector<Profiler::Sample> &end ) const
+{
+  size_t n = m_toolHandles.size();
+  std::vector<size_t> parents = m_parents;
+  // ordered by the configuration position, so the launch order is always the same
+  std::set<size_t> ready;
+  for ( size_t i=0; i < n; ++i ){
+    if ( parents[i]==0 ) ready.insert(i);
+  }
+
+  std::mutex mutex;
+  std::condition_variable cv;
+  std::vector<size_t> done;
+  std::vector<std::exception_ptr> errors(n);
+  size_t finished=0, running=0;
+  bool failed=false;
+
+  auto execute = [&]( size_t i ){
+    auto guard = acquire(i);
+    start[i] = Profiler::now();
+    if ( m_toolHandles[i]->execute( *ctx, evt ).isFailure() ){
+      throw std::runtime_error( "It's not possible to execute for " + m_toolHandles[i]->name() );
+    }
+    end[i] = Profiler::now();
+  };
+
+  auto release = [&]( size_t i ){
+    finished++;
+    for ( auto child : m_children[i] ){
+      if ( --parents[child]==0 ) ready.insert(child);
+    }
+  };
+
+  while ( finished < n )
+  {
+    if ( !failed )
+    {
+      for ( auto it=ready.begin(); it!=ready.end(); )
+      {
+        size_t i = *it;
+        if ( !m_toolHandles[i]->isThreadSafe() ){ ++it; continue; }
+        running++;
+        it = ready.erase(it);
+        m_pool->submit( [&, i](){
+          try{
+            execute(i);
+          }catch(...){
+            errors[i] = std::current_exception();
+          }
+          std::lock_guard<std::mutex> lock(mutex);
+          done.push_back(i);
+          cv.notify_one();
+        });
+      }
+
+      // Serial fallback: not thread safe tools run alone in the current thread
+      if ( running==0 && !ready.empty() ){
+        size_t i = *ready.begin();
+        ready.erase( ready.begin() );
+        execute(i);
+        release(i);
+        continue;
+      }
+    }
+
+    // stop only after all running tools
+    if ( running==0 ) break;
+
+    std::vector<size_t> completed;
+    {
+      std::unique_lock<std::mutex> lock(mutex);
+      cv.wait( lock, [&done]{ return !done.empty(); } );
+      completed.swap(done);
+    }
+
+    for ( auto i : completed ){
+      running--;
+      if ( errors[i] ) failed=true;
+      release(i);
+    }
+  }
+
+  // report the first failure following the configuration order
+  for ( auto &error : errors ){
+    if ( error ) std::rethrow_exception(error);
+  }
+}
+
+//!=====================================================================
+
+std::unique_lock<std::mutex> ComponentAccumulator::acquire( size_t i ) const
+{
+  if ( m_numberOfThreads > 1 && !m_toolHandles[i]->isReentrant() )
+    return std::unique_lock<std::mutex>( *m_locks[i] );
+  return std::unique_lock<std::mutex>();
+}
+
+//!=====================================================================
+
+void ComponentAccumulator::run( const std::vector<int> &events, std::string output ) const
+{
+  int nthreads = std::max( 1, std::min( m_numberOfThreads, (int)events.size() ) );
+  MSG_INFO( "Running " << events.size() << " events with " << nthreads << " event loops." );
+
+  // Must be destroyed after all stores, so the last buffers are merged into the output
+  TBufferMerger merger( output.c_str() );
+
+  std::vector< std::unique_ptr<SG::StoreGate> > stores;
+  std::vector< std::unique_ptr<SG::EventContext> > contexts;
+
+  for ( int thread=0; thread < nthreads; ++thread )
+  {
+    stores.emplace_back( new SG::StoreGate( merger.GetFile() ) );
+    contexts.emplace_back( new SG::EventContext( "EventContext" ) );
+    contexts.back()->setStoreGateSvc( stores.back().get() );
+    contexts.back()->setThreadId( thread );
+    contexts.back()->setNumberOfThreads( nthreads );
+    bookHistograms( contexts.back().get() );
+  }
+
+  // The events are split into chunks of EventChunkSize events. Each thread takes the next chunk
+  // and, when it is done, sends its store to the merger only after all previous chunks, so the
+  // merged output keeps the same event order as the serial loop. Each thread holds at most one
+  // chunk in memory, i.e. about NumberOfThreads x EventChunkSize events.
+  size_t chunkSize = std::max( 1, m_eventChunkSize );
+  size_t nchunks = ( events.size() + chunkSize - 1 ) / chunkSize;
+  std::atomic<size_t> next(0);
+  std::mutex mutex;
+  std::condition_variable cv;
+  size_t committed = 0;
+  bool failed = false;
+  std::vector<std::exception_ptr> errors( nthreads );
+  std::vector<std::thread> threads;
+
+  for ( int thread=0; thread < nthreads; ++thread )
+  {
+    threads.emplace_back( [&, thread](){
+      try{
+        for ( size_t chunk = next++; chunk < nchunks; chunk = next++ )
+        {
+          for ( size_t i = chunk*chunkSize; i < std::min( events.size(), (chunk+1)*chunkSize ); ++i )
+            run( contexts[thread].get(), events[i] );
+
+          std::unique_lock<std::mutex> lock(mutex);
+          cv.wait( lock, [&]{ return committed==chunk || failed; } );
+          if ( failed ) return;
+          stores[thread]->write();
+          committed++;
+          cv.notify_all();
+        }
+      }catch(...){
+        errors[thread] = std::current_exception();
+        std::lock_guard<std::mutex> lock(mutex);
+        failed = true;
+        cv.notify_all();
+      }
+    });
+  }
+
+  for ( auto &thread : threads ) thread.join();
+
+  for ( auto &error : errors ){
+    if ( error ) std::rethrow_exception(error);
+  }
+
+  for ( auto &ctx : contexts ) ctx->clear();
+  // all events were already sent, only the objects filled after the last chunk are left
+  for ( auto &store : stores ) store->save();
+}
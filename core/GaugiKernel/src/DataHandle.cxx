@@ -10,7 +10,10 @@ using namespace SG;
 
 EventContext::EventContext( std::string name ): 
   IMsgService(name),
-  m_threadId(0)
+  m_threadId(0),
+  m_numberOfThreads(1),
+  m_seed(0),
+  m_eventNumber(0)
 {;}
 
 
@@ -25,6 +28,7 @@ void EventContext::clear()
 {
   //for (auto &it : m_storable_ptr)
   //  std::cout << it.first << std::endl;
+  std::lock_guard<std::mutex> lock(m_mutex);
   m_storable_ptr.clear();
 }
 
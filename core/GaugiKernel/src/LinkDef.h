@@ -5,6 +5,7 @@
 #include "GaugiKernel/AlgTool.h"
 #include "GaugiKernel/IAlgTool.h"
 #include "GaugiKernel/Timer.h"
+#include "GaugiKernel/Profiler.h"
 #include "GaugiKernel/ComponentAccumulator.h"
 
 #include "GaugiKernel/DataHandle.h"
@@ -20,6 +21,7 @@
 
 
 #pragma link C++ class Timer+;
+#pragma link C++ class Gaugi::Profiler+;
 #pragma link C++ class MsgService+;
 #pragma link C++ class IMsgService+;
 #pragma link C++ class PropertyService+;
@@ -0,0 +1,192 @@
+
+#include "GaugiKernel/Profiler.h"
+#include <chrono>
+#include <fstream>
+#include <iomanip>
+#include <sstream>
+#include <cmath>
+#include <cstdlib>
+#include <time.h>
+#include <fcntl.h>
+#include <unistd.h>
+
+namespace Gaugi{
+
+  //!=====================================================================
+
+  Profiler::Profiler( std::string name ):
+    IMsgService(name)
+  {}
+
+  //!=====================================================================
+
+  Profiler::Sample Profiler::now()
+  {
+    Sample s;
+    auto wall = std::chrono::steady_clock::now().time_since_epoch();
+    s.wall = std::chrono::duration<double, std::milli>(wall).count();
+
+    // cpu time consumed by the current thread only
+    struct timespec ts;
+    clock_gettime(CLOCK_THREAD_CPUTIME_ID, &ts);
+    s.cpu = ts.tv_sec*1e3 + ts.tv_nsec*1e-6;
+
+    // resident set size (second field of statm, in pages). The file is opened once
+    // and read with pread, so each sample costs one read and no open or stream.
+    static const int statm = open( "/proc/self/statm", O_RDONLY | O_CLOEXEC );
+    static const double pageSize = sysconf(_SC_PAGESIZE)/(1024.*1024.);
+    char buffer[128];
+    ssize_t n = statm < 0 ? -1 : pread( statm, buffer, sizeof(buffer)-1, 0 );
+    if( n > 0 ){
+      buffer[n] = 0;
+      char *pos = nullptr;
+      strtol( buffer, &pos, 10 ); // total pages
+      s.rss = strtol( pos, nullptr, 10 ) * pageSize;
+    }else{
+      s.rss = 0;
+    }
+    return s;
+  }
+
+  //!=====================================================================
+
+  void Profiler::bookHistograms( SG::StoreGate *store, const std::string &tool, const std::vector<std::string> &steps )
+  {
+    std::string path = "Event/Profile/" + tool;
+    store->cd();
+    store->mkdir( path );
+    store->cd( path );
+    for( auto &step : steps ){
+      store->add( new TH1F( (step+"_wall").c_str(), ";wall time[ms];Count;", 500 , 0 , 5000 ) );
+      store->add( new TH1F( (step+"_cpu").c_str() , ";cpu time[ms];Count;" , 500 , 0 , 5000 ) );
+      store->add( new TH1F( (step+"_rss").c_str() , ";#Delta process RSS[MB];Count;", 200 , -100 , 100 ) );
+    }
+  }
+
+  //!=====================================================================
+
+  void Profiler::fill( SG::StoreGate *store, const std::string &tool, const std::string &step, const Sample &start )
+  {
+    fill( store, tool, step, start, now() );
+  }
+
+  //!=====================================================================
+
+  void Profiler::fill( SG::StoreGate *store, const std::string &tool, const std::string &step, const Sample &start, const Sample &end )
+  {
+    double wall = end.wall - start.wall;
+    double cpu  = end.cpu  - start.cpu;
+    double rss  = end.rss  - start.rss;
+
+    {
+      std::lock_guard<std::mutex> lock(m_mutex);
+      std::string key = tool + "/" + step;
+      auto it = m_index.find(key);
+      if( it == m_index.end() ){
+        Record rec; rec.tool=tool; rec.step=step;
+        it = m_index.emplace( key, m_records.size() ).first;
+        m_records.push_back(rec);
+      }
+
+      auto &rec = m_records[it->second];
+      rec.calls++;
+      rec.wall    += wall;
+      rec.wall2   += wall*wall;
+      rec.wallMax  = std::max(rec.wallMax, wall);
+      rec.cpu     += cpu;
+      rec.cpuMax   = std::max(rec.cpuMax, cpu);
+      rec.rss     += rss;
+      rec.rssMax   = std::max(rec.rssMax, rss);
+    }
+
+    if( store ){
+      store->cd( "Event/Profile/" + tool );
+      auto h = store->hist1( step + "_wall" );
+      // not booked, keep only the summary
+      if( !h ) return;
+      h->Fill( wall );
+      store->hist1( step + "_cpu" )->Fill( cpu );
+      store->hist1( step + "_rss" )->Fill( rss );
+    }
+  }
+
+  //!=====================================================================
+
+  /*
+   * The time columns are the mean for each call. The rss column is the mean
+   * change of the process resident memory for each call, so with many threads
+   * it also counts the memory of the steps running at the same time.
+   */
+  std::string Profiler::summary() const
+  {
+    std::stringstream ss;
+    ss << std::fixed << std::setprecision(3);
+    ss << std::left << std::setw(30) << "tool" << std::setw(16) << "step"
+       << std::right << std::setw(8) << "calls" << std::setw(14) << "wall[ms]"
+       << std::setw(14) << "+-" << std::setw(14) << "cpu[ms]" << std::setw(18) << "proc rss[MB]" << std::endl;
+    for( auto &rec : m_records ){
+      double mean = rec.calls ? rec.wall/rec.calls : 0;
+      double std  = rec.calls ? std::sqrt( std::max(0., rec.wall2/rec.calls - mean*mean) ) : 0;
+      ss << std::left << std::setw(30) << rec.tool << std::setw(16) << rec.step
+         << std::right << std::setw(8) << rec.calls << std::setw(14) << mean
+         << std::setw(14) << std
+         << std::setw(14) << (rec.calls ? rec.cpu/rec.calls : 0)
+         << std::setw(18) << (rec.calls ? rec.rss/rec.calls : 0) << std::endl;
+    }
+    return ss.str();
+  }
+
+  //!=====================================================================
+
+  std::string Profiler::json() const
+  {
+    std::stringstream ss;
+    ss << std::setprecision(6);
+    ss << "{" << std::endl;
+    ss << "  \"name\": \"" << getLogName() << "\"," << std::endl;
+    ss << "  \"unit\": {\"time\": \"ms\", \"rss\": \"MB (process)\"}," << std::endl;
+    ss << "  \"records\": [";
+    for( size_t i=0; i < m_records.size(); ++i ){
+      auto &rec = m_records[i];
+      double mean = rec.calls ? rec.wall/rec.calls : 0;
+      ss << (i ? "," : "") << std::endl;
+      ss << "    {\"tool\": \"" << rec.tool << "\", \"step\": \"" << rec.step << "\""
+         << ", \"calls\": " << rec.calls
+         << ", \"wall_total\": " << rec.wall
+         << ", \"wall_mean\": " << mean
+         << ", \"wall_std\": " << (rec.calls ? std::sqrt( std::max(0., rec.wall2/rec.calls - mean*mean) ) : 0)
+         << ", \"wall_max\": " << rec.wallMax
+         << ", \"cpu_total\": " << rec.cpu
+         << ", \"cpu_mean\": " << (rec.calls ? rec.cpu/rec.calls : 0)
+         << ", \"cpu_max\": " << rec.cpuMax
+         << ", \"rss_total\": " << rec.rss
+         << ", \"rss_mean\": " << (rec.calls ? rec.rss/rec.calls : 0)
+         << ", \"rss_max\": " << rec.rssMax << "}";
+    }
+    ss << std::endl << "  ]" << std::endl << "}" << std::endl;
+    return ss.str();
+  }
+
+  //!=====================================================================
+
+  bool Profiler::dump( std::string path ) const
+  {
+    std::ofstream out( path );
+    if( !out.is_open() ){
+      MSG_ERROR( "It's not possible to open the profile output " << path );
+      return false;
+    }
+    out << json();
+    MSG_INFO( "Profile summary saved into " << path );
+    return true;
+  }
+
+  //!=====================================================================
+
+  void Profiler::reset()
+  {
+    m_records.clear();
+    m_index.clear();
+  }
+
+}// namespace
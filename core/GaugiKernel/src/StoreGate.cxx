@@ -13,11 +13,20 @@ StoreGate::StoreGate( std::string outputfile):
 {
   // This must be used for multithreading root reader 
   ROOT::EnableThreadSafety();
-  m_file = std::unique_ptr<TFile>(new TFile( outputfile.c_str(), "recreate"));
+  m_file = std::shared_ptr<TFile>(new TFile( outputfile.c_str(), "recreate"));
   
 }
 
 
+StoreGate::StoreGate( std::shared_ptr<TFile> file ): 
+  IMsgService("StoreGate"),
+  m_currentPath(""),
+  m_file(file)
+{
+  ROOT::EnableThreadSafety();
+}
+
+
 
 void StoreGate::save()
 {
@@ -41,6 +50,20 @@ void StoreGate::save()
 }
 
 
+void StoreGate::write()
+{
+  if( !dynamic_cast<TBufferMergerFile*>( m_file.get() ) ) return;
+  MSG_DEBUG( "Sending all root objects to the merger" );
+  m_file->Write();
+  for( auto &it : m_objs )
+  {
+    // keep the labels, only the contents and statistics are reset
+    if( it.second->InheritsFrom( TH1::Class() ) ) static_cast<TH1*>(it.second)->Reset("ICESM");
+  }
+  m_file->cd( m_currentPath.c_str() );
+}
+
+
 void StoreGate::mkdir( std::string path ){
   MSG_DEBUG( "Creating a directory with name " << path );
   if (!m_file->GetDirectory(path.c_str())){
@@ -65,6 +88,9 @@ bool StoreGate::add( TObject* obj, bool force){
     MSG_WARNING("It's not possible to attach the histogram with name " << feature << " into this path " << m_currentPath);
 		return false;
   }
+  // the merger files are only sent by write(), so the entries are merged in the write order
+  if( obj->InheritsFrom( TTree::Class() ) && dynamic_cast<TBufferMergerFile*>( m_file.get() ) )
+    static_cast<TTree*>(obj)->SetAutoSave(0);
   m_objs[fullpath] = obj;
   return true;
 }
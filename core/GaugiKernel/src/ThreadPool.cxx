@@ -0,0 +1,56 @@
+
+#include "GaugiKernel/ThreadPool.h"
+
+using namespace Gaugi;
+
+
+ThreadPool::ThreadPool( unsigned numberOfThreads ):
+  m_stop(false)
+{
+  for( unsigned i=0; i < numberOfThreads; ++i )
+    m_workers.emplace_back( &ThreadPool::loop, this );
+}
+
+//!=====================================================================
+
+ThreadPool::~ThreadPool()
+{
+  {
+    std::lock_guard<std::mutex> lock(m_mutex);
+    m_stop=true;
+  }
+  m_cv.notify_all();
+  for( auto &worker : m_workers ) worker.join();
+}
+
+//!=====================================================================
+
+std::future<void> ThreadPool::submit( std::function<void()> task )
+{
+  std::packaged_task<void()> ptask(task);
+  auto future = ptask.get_future();
+  {
+    std::lock_guard<std::mutex> lock(m_mutex);
+    m_tasks.push( std::move(ptask) );
+  }
+  m_cv.notify_one();
+  return future;
+}
+
+//!=====================================================================
+
+void ThreadPool::loop()
+{
+  while(true){
+    std::packaged_task<void()> task;
+    {
+      std::unique_lock<std::mutex> lock(m_mutex);
+      m_cv.wait( lock, [this]{ return m_stop || !m_tasks.empty(); } );
+      // finish all queued tasks before stop
+      if( m_stop && m_tasks.empty() ) return;
+      task = std::move( m_tasks.front() );
+      m_tasks.pop();
+    }
+    task();
+  }
+}
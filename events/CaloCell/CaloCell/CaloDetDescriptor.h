@@ -2,6 +2,7 @@
 #define CaloDetDescriptor_h
 
 #include "CaloCell/enumeration.h"
+#include "CaloCell/CaloGeometry.h"
 #include "GaugiKernel/EDM.h"
 #include "GaugiKernel/macros.h"
 #include "G4Step.hh"
@@ -32,31 +33,43 @@ namespace xAOD{
                bool anomalous=false
               );
 
+      /** Contructor from the static cell description **/
+      CaloDetDescriptor( 
+               const CaloCellGeometry *geometry,
+               // bunch crossing information
+               float bc_duration, 
+               int bcid_start, 
+               int bcid_end, 
+               bool anomalous=false
+              );
+
       /** Destructor **/
       ~CaloDetDescriptor()=default;
       
 
 
       /*
-       * Cell identification
+       * Cell identification (from the static cell description)
        */
 
       /*! Cell eta center */
-      PRIMITIVE_SETTER_AND_GETTER( float, m_eta, setEta, eta );
+      float eta() const { return m_geometry->eta; };
       /*! Cell phi center */
-      PRIMITIVE_SETTER_AND_GETTER( float, m_phi, setPhi, phi );
+      float phi() const { return m_geometry->phi; };
       /*! Cell delta eta */
-      PRIMITIVE_SETTER_AND_GETTER( float, m_deta, setDeltaEta , deltaEta);
+      float deltaEta() const { return m_geometry->deta; };
       /*! Cell delta phi */
-      PRIMITIVE_SETTER_AND_GETTER( float, m_dphi, setDeltaPhi, deltaPhi );
+      float deltaPhi() const { return m_geometry->dphi; };
       /*! Cell hash */
-      PRIMITIVE_SETTER_AND_GETTER( unsigned long int, m_hash, setHash, hash );
-
-      PRIMITIVE_SETTER_AND_GETTER( float  , m_z  , setZ    , z   );
+      unsigned long int hash() const { return m_geometry->hash; };
+      /*! Cell z position */
+      float z() const { return m_geometry->z; };
       /*! Cell sampling id */
-      PRIMITIVE_SETTER_AND_GETTER( CaloSampling  , m_sampling , setSampling   , sampling  );
+      CaloSampling sampling() const { return m_geometry->sampling; };
       /*! Cell layer id */
-      PRIMITIVE_SETTER_AND_GETTER( Detector  , m_detector  , setDetector    , detector   );
+      Detector detector() const { return m_geometry->detector; };
+      /*! The static cell description */
+      const CaloCellGeometry* geometry() const { return m_geometry; };
      
 
       /*
@@ -71,24 +84,16 @@ namespace xAOD{
 
       /*! Energy deposity from simulated hits **/
       float edep( int bc_id=0 ) const{
-        if (m_edep.count(bc_id)){
-          return m_edep.at(bc_id);
-        }else{// return zero case bc not exist
-          return 0;
-        }
+        int idx = bc_id - m_bcid_start;
+        // return zero case bc not exist
+        return (idx >= 0 && idx < (int)m_edep.size()) ? m_edep[idx] : 0;
       }
 
       void edep( int bc_id, float e ){
-        m_edep[bc_id] += e;
+        int idx = bc_id - m_bcid_start;
+        if (idx >= 0 && idx < (int)m_edep.size())
+          m_edep[idx] += e;
       }
-      // float getZ()const 
-      // {
-      //   return m_z;
-      // }
-      // void setZ(float detZ)
-      // {
-      //   m_z = detZ;
-      // }
 
       /*
        * Time of flight (Global time from G4)
@@ -96,14 +101,14 @@ namespace xAOD{
 
       /*! Time of flight from simulated hits **/
       float tof( int bc_id=0 ) const{
-        if (m_tof.count(bc_id)){
-          return m_tof.at(bc_id);
-        }else{// return zero case bc not exist
-          return 0;
-        }
+        int idx = bc_id - m_bcid_start;
+        // return zero case bc not exist
+        return (idx >= 0 && idx < (int)m_tof.size()) ? m_tof[idx] : 0;
       }
       void tof( int bc_id, float t ){
-        m_tof[bc_id] = t;
+        int idx = bc_id - m_bcid_start;
+        if (idx >= 0 && idx < (int)m_tof.size())
+          m_tof[idx] = t;
       }
 
 
@@ -120,8 +125,8 @@ namespace xAOD{
       PRIMITIVE_SETTER_AND_GETTER( float, m_bc_duration , set_bc_duration , bc_duration );
       /*! Integrated pulse in bunch crossing zero */
       PRIMITIVE_SETTER_AND_GETTER( std::vector<float>, m_pulse, setPulse, pulse );
-      /*! Time (in ns) for each bunch crossing */
-      PRIMITIVE_SETTER_AND_GETTER( std::vector<float> , m_time , setTime , time   );
+      /*! Time (in ns) for each bunch crossing edge */
+      std::vector<float> time() const;
       
       PRIMITIVE_SETTER_AND_GETTER( float , m_sigma , setSigma , sigma   );
 
@@ -132,15 +137,17 @@ namespace xAOD{
 
 
       /*! get pulse for each bunch crossing (centered in bunch zero)*/
-      std::vector<float> pulse( int bc_id ) const {
-        // TODO: We should include some protection here
-        return m_pulsePerBunch.at(bc_id);
+      const std::vector<float>& pulse( int bc_id ) const {
+        // throws std::out_of_range case bc not exist
+        return m_pulsePerBunch.at(bc_id - m_bcid_start);
       }
 
 
       /*! set pulse for each bunch crossing */
       void setPulse( int bc_id , std::vector<float> pulse ){ 
-        m_pulsePerBunch[bc_id] = pulse;
+        int idx = bc_id - m_bcid_start;
+        if (idx >= 0 && idx < (int)m_pulsePerBunch.size())
+          m_pulsePerBunch[idx] = std::move(pulse);
       };
 
       /*
@@ -158,20 +165,8 @@ namespace xAOD{
  
  
 
-      /*! id sample */
-      CaloSampling m_sampling;
-      /*! id layer */
-      Detector m_detector;
-
-      
-      /*! eta center */
-      float m_eta;
-      /*! phi center */
-      float m_phi;
-      /*! delta eta */
-      float m_deta;
-      /*! delta phi */
-      float m_dphi;
+      /*! static cell description (eta/phi centers, sizes, z, sampling, detector and hash) */
+      const CaloCellGeometry *m_geometry;
 
 
       /*! The estimated energy from OF in bcid=0 */
@@ -190,19 +185,14 @@ namespace xAOD{
       float m_bc_duration;
 
 
-      /*! time (in ns) for each bunch between bcid_start and bcid_end */
-      std::vector<float> m_time;
-      /*! energy deposit between bcid_start and bcid_end */
-      std::map< int, float> m_edep;
-      /*! time of flight of a hit in the cell between bcid_start and bcid_end */
-      std::map< int, float> m_tof;
-      /*! Digitalized pulse for each bunch between bcid_start and bcid_end */
-      std::map< int, std::vector<float> > m_pulsePerBunch;
+      /*! energy deposit between bcid_start and bcid_end (indexed by bcid-bcid_start) */
+      std::vector<float> m_edep;
+      /*! time of flight of a hit in the cell between bcid_start and bcid_end (indexed by bcid-bcid_start) */
+      std::vector<float> m_tof;
+      /*! Digitalized pulse for each bunch between bcid_start and bcid_end (indexed by bcid-bcid_start) */
+      std::vector< std::vector<float> > m_pulsePerBunch;
 
 
-      /*! Access information unique ID number */
-      unsigned long int m_hash;
-      float m_z;
       float m_sigma;
 
       bool m_anomalous;
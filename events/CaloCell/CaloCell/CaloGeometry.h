@@ -0,0 +1,77 @@
+#ifndef CaloGeometry_h
+#define CaloGeometry_h
+
+#include "CaloCell/enumeration.h"
+#include <memory>
+#include <mutex>
+#include <shared_mutex>
+#include <unordered_map>
+
+
+namespace xAOD{
+
+  /**
+   * @struct CaloCellGeometry
+   * @brief Static (geometry only) description of one readout cell.
+   */
+  struct CaloCellGeometry
+  {
+    float eta;
+    float phi;
+    float deta;
+    float dphi;
+    float z;
+    CaloSampling sampling;
+    Detector detector;
+    unsigned long int hash;
+
+    bool operator==( const CaloCellGeometry &other ) const
+    {
+      return hash==other.hash && eta==other.eta && phi==other.phi && deta==other.deta && dphi==other.dphi &&
+             z==other.z && sampling==other.sampling && detector==other.detector;
+    }
+  };
+
+
+  /**
+   * @class CaloGeometry
+   * @brief Process-wide and immutable table of cell descriptions.
+   *
+   * Each cell geometry is stored only once (keyed by hash) and never changes or
+   * moves after it was added, so the per-event objects (hits and descriptors)
+   * only keep a pointer into this table. It is shared by all threads: lookups
+   * of cells already stored only take a shared lock, so the readers do not
+   * wait for each other.
+   */
+  class CaloGeometry
+  {
+    public:
+
+      /*! The single instance for the process */
+      static CaloGeometry& instance();
+
+      /*! Get the stored cell with the same geometry (add it case not exist) */
+      const CaloCellGeometry* get( const CaloCellGeometry &cell );
+
+      /*! Get the first stored cell by hash (nullptr case not exist) */
+      const CaloCellGeometry* find( unsigned long int hash ) const;
+
+      /*! Number of stored cells */
+      size_t size() const;
+
+    private:
+
+      CaloGeometry()=default;
+      CaloGeometry( const CaloGeometry& )=delete;
+      CaloGeometry& operator=( const CaloGeometry& )=delete;
+
+      /*! Stored cell with the same geometry (nullptr case not exist). The lock must be held */
+      const CaloCellGeometry* lookup( const CaloCellGeometry &cell ) const;
+
+      mutable std::shared_mutex m_mutex;
+      // the same hash can be used with other geometry (e.g. hits do not have the z position)
+      std::unordered_multimap< unsigned long int, std::unique_ptr<const CaloCellGeometry> > m_cells;
+  };
+
+}
+#endif
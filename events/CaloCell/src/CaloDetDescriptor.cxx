@@ -3,6 +3,7 @@
 #include "CaloCell/enumeration.h"
 #include "G4PhysicalConstants.hh"
 #include "G4SystemOfUnits.hh"
+#include <algorithm>
 
 using namespace xAOD;
 
@@ -22,42 +23,48 @@ CaloDetDescriptor::CaloDetDescriptor(
                   int bcid_end,
                   bool anomalous
                 ):
+  CaloDetDescriptor( CaloGeometry::instance().get( CaloCellGeometry{eta, phi, deta, dphi, detZ, sampling, detector, hash} ),
+                     bc_duration, bcid_start, bcid_end, anomalous )
+{}
+
+CaloDetDescriptor::CaloDetDescriptor( 
+                  const CaloCellGeometry *geometry,
+                  float bc_duration,
+                  int bcid_start,
+                  int bcid_end,
+                  bool anomalous
+                ):
   EDM(),
-  m_sampling(sampling),
-  m_detector(detector),
-  m_eta(eta),
-  m_phi(phi),
-  m_deta(deta),
-  m_dphi(dphi),
+  m_geometry(geometry),
   m_e(0),
+  m_tau(0),
   /* Bunch crossing information */
   m_bcid_start( bcid_start ),
   m_bcid_end( bcid_end ),
   m_bc_duration( bc_duration ),
-  m_hash(hash),
-  m_z(detZ),
+  m_edep( std::max(bcid_end-bcid_start+1, 0), 0 ),
+  m_tof( std::max(bcid_end-bcid_start+1, 0), 0 ),
+  m_pulsePerBunch( std::max(bcid_end-bcid_start+1, 0) ),
+  m_sigma(0),
   m_anomalous(anomalous)
+{}
+
+std::vector<float> CaloDetDescriptor::time() const
 {
-  // Initalize the time vector using the bunch crossing informations
-  // setZ(detZ);
+  // the bunch crossing edges, from bcid_start-0.5 to bcid_end+0.5
+  std::vector<float> time;
   float start = ( m_bcid_start - 0.5 ) * m_bc_duration;
   float step  = m_bc_duration;
   int total   = (m_bcid_end - m_bcid_start+1) + 1;
   for (int t = 0; t < total; ++t) {
-    m_time.push_back( (start + step*t) );
+    time.push_back( (start + step*t) );
   }
+  return time;
 }
 
 CaloDetDescriptor * CaloDetDescriptor::copy()
 {
-  auto det = new CaloDetDescriptor( m_eta, 
-                                    m_phi, 
-                                    m_deta, 
-                                    m_dphi, 
-                                    m_hash,
-                                    m_z,
-                                    m_sampling, 
-                                    m_detector,
+  auto det = new CaloDetDescriptor( m_geometry,
                                     m_bc_duration,
                                     m_bcid_start,
                                     m_bcid_end, 
@@ -66,6 +73,8 @@ CaloDetDescriptor * CaloDetDescriptor::copy()
   det->setE(e()); // estimated energy from OF
   det->setPulse( pulse() ); // pulse from generator
   det->setTau( tau() );
+  det->setSigma( sigma() );
+  det->m_pulsePerBunch = m_pulsePerBunch; // pulse for each bunch crossing
   for ( int bcid = bcid_start();  bcid <= bcid_end(); ++bcid )
   {
     det->edep( bcid, edep(bcid) ); // truth energy for each bunch crossing
@@ -63,10 +63,14 @@ bool CaloDetDescriptorConverter::convert( const CaloDetDescriptor_t &descriptor_
   descriptor->setPulse( descriptor_t.pulse); // pulse from generator
   descriptor->setTau( descriptor_t.tau );
   descriptor->setSigma( descriptor_t.sigma );
+  int pos=0;
   for ( int bcid = descriptor->bcid_start();  bcid <= descriptor->bcid_end(); ++bcid )
   {
-    descriptor->edep( bcid, descriptor_t.edep_per_bunch[bcid] ); // truth energy for each bunch crossing
-    descriptor->tof ( bcid, descriptor_t.tof[bcid]  ); // truth time of flight (it takes the last hit in the simulation order. Need to evaluate which strategy is the best.)
+    if(!descriptor_t.edep_per_bunch.empty())
+      descriptor->edep( bcid, descriptor_t.edep_per_bunch.at(pos) ); // truth energy for each bunch crossing
+    if(!descriptor_t.tof.empty())
+      descriptor->tof ( bcid, descriptor_t.tof.at(pos)  ); // truth time of flight (it takes the last hit in the simulation order. Need to evaluate which strategy is the best.)
+    pos++;
   }
   return true;
 }
\ No newline at end of file
@@ -0,0 +1,55 @@
+
+#include "CaloCell/CaloGeometry.h"
+
+using namespace xAOD;
+
+
+
+CaloGeometry& CaloGeometry::instance()
+{
+  static CaloGeometry geometry;
+  return geometry;
+}
+
+//!=====================================================================
+
+const CaloCellGeometry* CaloGeometry::get( const CaloCellGeometry &cell )
+{
+  // all cells are added at initialize, so the events only take the shared lock
+  {
+    std::shared_lock<std::shared_mutex> lock(m_mutex);
+    if( auto stored = lookup( cell ) ) return stored;
+  }
+  std::unique_lock<std::shared_mutex> lock(m_mutex);
+  // it can be added by another thread between both locks
+  if( auto stored = lookup( cell ) ) return stored;
+  return m_cells.emplace( cell.hash, std::unique_ptr<const CaloCellGeometry>(new CaloCellGeometry(cell)) )->second.get();
+}
+
+//!=====================================================================
+
+const CaloCellGeometry* CaloGeometry::lookup( const CaloCellGeometry &cell ) const
+{
+  auto range = m_cells.equal_range( cell.hash );
+  for ( auto it = range.first; it != range.second; ++it ){
+    if( *it->second == cell ) return it->second.get();
+  }
+  return nullptr;
+}
+
+//!=====================================================================
+
+const CaloCellGeometry* CaloGeometry::find( unsigned long int hash ) const
+{
+  std::shared_lock<std::shared_mutex> lock(m_mutex);
+  auto it = m_cells.find( hash );
+  return it == m_cells.end() ? nullptr : it->second.get();
+}
+
+//!=====================================================================
+
+size_t CaloGeometry::size() const
+{
+  std::shared_lock<std::shared_mutex> lock(m_mutex);
+  return m_cells.size();
+}
@@ -2,6 +2,7 @@
 #define CaloHit_h
 
 #include "CaloCell/enumeration.h"
+#include "CaloCell/CaloGeometry.h"
 #include "GaugiKernel/EDM.h"
 #include "GaugiKernel/macros.h"
 #include "G4Step.hh"
@@ -15,7 +16,7 @@ namespace xAOD{
   {  
     public:
 
-      CaloHit():EDM(){};
+      CaloHit():EDM(),m_geometry(nullptr){};
 
       /** Contructor **/
       CaloHit( 
@@ -35,69 +36,77 @@ namespace xAOD{
                int bcid_end 
               );
 
+      /** Contructor from the static cell description **/
+      CaloHit( const CaloCellGeometry *geometry,
+               // bunch crossing information
+               float bc_duration, 
+               int bcid_start, 
+               int bcid_end 
+              );
+
       /** Destructor **/
       ~CaloHit()=default;
       
       /*! Fill the deposit energy into the Hit */
       void fill( const G4Step * );
       void fill( const G4Step *, float sampNoiseStd ); // 
+      /*! Fill the deposit energy (in MeV) at the time t (in ns), without the geant step (fast simulation) */
+      void fill( float edep, float t, float sampNoiseStd );
       /** Zeroize the pulse/sample vectors **/
       void clear();
+      /** Zeroize the energy and time vectors and the first hit flag (reuse the hit in another event) **/
+      void reset();
 
 
       /*
-       * Hit identification
+       * Hit identification (from the static cell description)
        */
 
       /*! Hit eta center */
-      PRIMITIVE_SETTER_AND_GETTER( float, m_eta, setEta, eta );
+      float eta() const { return m_geometry->eta; };
       /*! Hit phi center */
-      PRIMITIVE_SETTER_AND_GETTER( float, m_phi, setPhi, phi );
+      float phi() const { return m_geometry->phi; };
       /*! Hit delta eta */
-      PRIMITIVE_SETTER_AND_GETTER( float, m_deta, setDeltaEta , deltaEta);
+      float deltaEta() const { return m_geometry->deta; };
       /*! Hit delta phi */
-      PRIMITIVE_SETTER_AND_GETTER( float, m_dphi, setDeltaPhi, deltaPhi );
+      float deltaPhi() const { return m_geometry->dphi; };
       /*! Hit hash */
-      PRIMITIVE_SETTER_AND_GETTER( unsigned long int, m_hash, setHash, hash );
+      unsigned long int hash() const { return m_geometry->hash; };
       /*! Hit sampling id */
-      PRIMITIVE_SETTER_AND_GETTER( CaloSampling  , m_sampling , setSampling   , sampling  );
+      CaloSampling sampling() const { return m_geometry->sampling; };
       /*! Hit layer id */
-      PRIMITIVE_SETTER_AND_GETTER( Detector  , m_detector  , setDetector    , detector   );
+      Detector detector() const { return m_geometry->detector; };
+      /*! The static cell description */
+      const CaloCellGeometry* geometry() const { return m_geometry; };
      
 
 
 
       /*! Energy deposity from simulated hits **/
       float edep( int bc_id=0 ) const{
-        if (m_edep.count(bc_id)){
-          return m_edep.at(bc_id);
-        }else{// return zero case bc not exist
-          return 0;
-        }
+        int idx = bc_id - m_bcid_start;
+        // return zero case bc not exist
+        return (idx >= 0 && idx < (int)m_edep.size()) ? m_edep[idx] : 0;
       }
 
       void edep( int bc_id, float e ){
-        m_edep[bc_id] += e;
+        int idx = bc_id - m_bcid_start;
+        if (idx >= 0 && idx < (int)m_edep.size())
+          m_edep[idx] += e;
       }
 
       /*! Time of flight from simulated hits **/ //
       float tof( int bc_id=0 ) const{
-        if (m_tof.count(bc_id)){
-          return m_tof.at(bc_id);
-        }else{// return zero case bc not exist
-          return 0;
-        }
+        int idx = bc_id - m_bcid_start;
+        // return zero case bc not exist
+        return (idx >= 0 && idx < (int)m_tof.size()) ? m_tof[idx] : 0;
       }
 
 
       void tof( int bc_id, float t ){ //setter
-        m_tof[bc_id] = t;
-        // if (m_tof[bc_id] == float(0)){
-        //   m_tof[bc_id] = t;
-        // }
-        // else{
-        //   m_tof[bc_id] = (m_tof[bc_id] + t)/2; //simple moving average with w=2
-        // }
+        int idx = bc_id - m_bcid_start;
+        if (idx >= 0 && idx < (int)m_tof.size())
+          m_tof[idx] = t;
       }
       
       /*
@@ -110,30 +119,21 @@ namespace xAOD{
       PRIMITIVE_SETTER_AND_GETTER( int, m_bcid_end    , set_bcid_end    , bcid_end      );
       /* Time space (in ns) between two bunch crossings */
       PRIMITIVE_SETTER_AND_GETTER( float, m_bc_duration , set_bc_duration , bc_duration );
-      /*! Time (in ns) for each bunch crossing */
-      PRIMITIVE_SETTER_AND_GETTER( std::vector<float> , m_time , setTime , time   );
+      /*! Time (in ns) for each bunch crossing edge */
+      std::vector<float> time() const;
 
 
 
     private:
  
       int find( float value) const ;
-       
 
-      /*! id sample */
-      CaloSampling m_sampling;
-      /*! id layer */
-      Detector m_detector;
+      /*! The time edge (in ns) at the position pos of the time vector */
+      float edge( int pos ) const;
+       
 
-      
-      /*! eta center */
-      float m_eta;
-      /*! phi center */
-      float m_phi;
-      /*! delta eta */
-      float m_deta;
-      /*! delta phi */
-      float m_dphi;
+      /*! static cell description (eta/phi centers, sizes, sampling, detector and hash) */
+      const CaloCellGeometry *m_geometry;
       /*! bunch crossing start id */
       int m_bcid_start;
       /*! bunch crossing end id */
@@ -142,15 +142,11 @@ namespace xAOD{
       float m_bc_duration;
 
 
-      /*! time (in ns) for each bunch between bcid_start and bcid_end */
-      std::vector<float> m_time;
-      /*! energy deposit between bcid_start and bcid_end */
-      std::map< int, float> m_edep;
-      /*!time of flight of a particle between bcid_start and bcid_end */
-      std::map< int, float> m_tof;
+      /*! energy deposit between bcid_start and bcid_end (indexed by bcid-bcid_start) */
+      std::vector<float> m_edep;
+      /*!time of flight of a particle between bcid_start and bcid_end (indexed by bcid-bcid_start) */
+      std::vector<float> m_tof;
       bool m_firstHit = false;
-      /*! Access information unique ID number */
-      unsigned long int m_hash;
 
   };
 
@@ -2,6 +2,8 @@
 #include "CaloHit/CaloHit.h"
 #include "G4PhysicalConstants.hh"
 #include "G4SystemOfUnits.hh"
+#include <algorithm>
+#include <cmath>
 using namespace xAOD;
 
 
@@ -20,31 +22,57 @@ CaloHit::CaloHit(     float eta,
                       int bcid_start, 
                       int bcid_end 
                   ):
+  CaloHit( CaloGeometry::instance().get( CaloCellGeometry{eta, phi, deta, dphi, 0, sampling, detector, hash} ),
+           bc_duration, bcid_start, bcid_end )
+{}
+
+
+CaloHit::CaloHit( const CaloCellGeometry *geometry,
+                  // bunch crossing information
+                  float bc_duration, 
+                  int bcid_start, 
+                  int bcid_end 
+                ):
   EDM(),
-  m_sampling(sampling),
-  m_detector(detector),
-  m_eta(eta),
-  m_phi(phi),
-  m_deta(deta),
-  m_dphi(dphi),
+  m_geometry(geometry),
   m_bcid_start(bcid_start),
   m_bcid_end(bcid_end),
   m_bc_duration(bc_duration),
-  m_hash(hash),
+  m_edep( std::max(bcid_end-bcid_start+1, 0), 0 ),
+  m_tof( std::max(bcid_end-bcid_start+1, 0), 0 ),
   m_firstHit(false)
+{}
+
+
+float CaloHit::edge( int pos ) const
 {
-  // Initalize the time vector using the bunch crossing informations
   float start = ( m_bcid_start - 0.5 ) * m_bc_duration;
   float step  = m_bc_duration;
-  int total   = (m_bcid_end - m_bcid_start+1) + 1;
+  return start + step*pos;
+}
+
+
+std::vector<float> CaloHit::time() const
+{
+  // the bunch crossing edges, from bcid_start-0.5 to bcid_end+0.5
+  std::vector<float> time;
+  int total = (m_bcid_end - m_bcid_start+1) + 1;
   for (int t = 0; t < total; ++t) {
-    m_time.push_back( (start + step*t) );
+    time.push_back( edge(t) );
   }
+  return time;
 }
 
 void CaloHit::clear()
 {
-  m_edep.clear(); // zeroize deposit energy for all bunchs
+  std::fill( m_edep.begin(), m_edep.end(), 0 ); // zeroize deposit energy for all bunchs
+}
+
+void CaloHit::reset()
+{
+  std::fill( m_edep.begin(), m_edep.end(), 0 );
+  std::fill( m_tof.begin(), m_tof.end(), 0 );
+  m_firstHit = false;
 }
 
 
@@ -60,12 +88,9 @@ void CaloHit::fill( const G4Step* step )
   // Get the bin index into the time vector
   int samp = find(t);
   if ( samp != -1 ){
-    int bcid = m_bcid_start + samp;
-
-    // cout << "sampling: "<< m_sampling << ", BCID: "<< bcid << ", samp: " << samp << ", HIT: " << m_hash << ", t: " << t << ", edep: "<< edep << ", m_edep[bcid]="<< m_edep[bcid] << ", m_tof[bcid]="<< m_tof[bcid] << "\n"; // 
-
-    m_edep[bcid]  +=  (edep/MeV);
-    m_tof[bcid]   =   t; // the TOF comes from the last hit
+    // samp is already the position of the bcid (bcid_start + samp) into the arrays
+    m_edep[samp]  +=  (edep/MeV);
+    m_tof[samp]   =   t; // the TOF comes from the last hit
 
   }
 }
@@ -78,22 +103,24 @@ void CaloHit::fill( const G4Step* step , float sampNoiseStd)
   // Get the particle time
   float t = (float)point->GetGlobalTime() / ns;
 
+  fill( edep/MeV, t, sampNoiseStd );
+}
+
+void CaloHit::fill( float edep, float t, float sampNoiseStd )
+{
   // Get the bin index into the time vector
   int samp = find(t);
   if ( samp != -1 ){
-    int bcid = m_bcid_start + samp;
-
-    // cout << "sampling: "<< m_sampling << ", BCID: "<< bcid << ", samp: " << samp << ", HIT: " << m_hash << ", t: " << t << ", edep: "<< edep << ", m_edep[bcid]="<< m_edep[bcid] << ", m_tof[bcid]="<< m_tof[bcid] <<", m_firstHit=" << m_firstHit << "\n"; // 
-
-    m_edep[bcid]+=(edep/MeV);
+    // samp is already the position of the bcid (bcid_start + samp) into the arrays
+    m_edep[samp]+=edep;
 
-    if ((m_edep[bcid] > sampNoiseStd/MeV) && !m_firstHit){
-      m_tof[bcid] = t; // the TOF comes from the FIRST sensible hit that allows to readout the cell energy, above n*sigmaNoise (n=1)
+    if ((m_edep[samp] > sampNoiseStd/MeV) && !m_firstHit){
+      m_tof[samp] = t; // the TOF comes from the FIRST sensible hit that allows to readout the cell energy, above n*sigmaNoise (n=1)
       m_firstHit  = true;
       // cout << "energy higher than "<< sampNoiseStd <<" MeV: tof="<< t<<"\n";
     }
-    else if ((m_edep[bcid] <= sampNoiseStd/MeV) && !m_firstHit){
-      m_tof[bcid] = 0.0;
+    else if ((m_edep[samp] <= sampNoiseStd/MeV) && !m_firstHit){
+      m_tof[samp] = 0.0;
     }
     // else if (m_firstHit){
     //   cout << "first hit TOF already saved. tof="<< m_tof[bcid] <<"\n";
@@ -106,7 +133,12 @@ void CaloHit::fill( const G4Step* step , float sampNoiseStd)
 
 int CaloHit::find( float value) const 
 {
-  auto binIterator = std::adjacent_find( m_time.begin(), m_time.end(), [=](float left, float right){ return left < value and value <= right; }  );
-  if ( binIterator == m_time.end() ) return -1;
-  return  binIterator - m_time.begin();
+  // same as searching (left < value <= right) into the time vector, without the vector
+  int total = m_bcid_end - m_bcid_start + 1;
+  if ( total <= 0 || !(edge(0) < value && value <= edge(total)) ) return -1;
+  int pos = std::min( std::max( (int)std::floor( (value - edge(0)) / m_bc_duration ), 0 ), total-1 );
+  // protection against the rounding close to the edges
+  while ( pos > 0 && !(edge(pos) < value) ) --pos;
+  while ( pos < total-1 && !(value <= edge(pos+1)) ) ++pos;
+  return ( edge(pos) < value && value <= edge(pos+1) ) ? pos : -1;
 }
\ No newline at end of file
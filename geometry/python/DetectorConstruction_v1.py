@@ -1,17 +1,19 @@
 __all__ = [
            "DetectorConstruction_v1", 
+           "ReadoutGeometry_v1",
+           "get_geometry_v1",
            ]
 
 
 import ROOT
 
-from typing import List
+from typing import List, Tuple
 from prettytable import PrettyTable
 from pprint import pprint
 from tqdm import tqdm
 
 from GaugiKernel.constants import *
-from GaugiKernel import Cpp
+from GaugiKernel import Cpp, Logger
 from GaugiKernel.macros import *
 
 from geometry.v1.PhysicalVolume   import Plates
@@ -20,6 +22,7 @@ from geometry.v1.TILE             import getTileBarrelCfg, getTileExtendedCfg
 from geometry.v1.EMEC             import getLArEMECCfg
 from geometry.v1.HEC              import getHECCfg
 from geometry.v1.DeadMaterials    import getDMVolumesCfg, getCrackVolumesCfg
+from geometry.GeometryCache       import GeometryCache
 #from geometry.detectors.Tracking      import *
 
 
@@ -34,12 +37,97 @@ def flatten(nested_list : List) -> List:
   return result
 
 
+def build_geometry_v1() -> Tuple[List, List]:
+  """
+  Build the calorimeter samplings and the extra (non sensitive) volumes.
+
+  Returns:
+      Tuple[List, List]: The samplings (Calorimeter) and the volumes (PhysicalVolume).
+  """
+  samplings = []
+  volumes = []
+  # Center
+  
+  #volumes.extend( getPixelBarrelCfg()   )
+  samplings.extend( getLArBarrelCfg()   )
+  samplings.extend( getTileBarrelCfg()  )
+  volumes.extend( getDMVolumesCfg()      )
+  # Right side (A)
+  samplings.extend( getTileExtendedCfg()    )
+  samplings.extend( getLArEMECCfg()         ) 
+  samplings.extend( getHECCfg()             )
+  volumes.extend( getCrackVolumesCfg()      )
+  # Left side (B)
+  samplings.extend( getTileExtendedCfg(left_side = True) )
+  samplings.extend( getLArEMECCfg(left_side=True)        ) 
+  samplings.extend( getHECCfg(left_side=True)            )    
+  volumes.extend( getCrackVolumesCfg(left_side=True)     )
+  return flatten(samplings), volumes
+
+
+# all modules used to build the geometry (any change gives a new cache key)
+_geometry_v1_modules = [ __name__,
+                         "geometry.v1.PhysicalVolume",
+                         "geometry.v1.SensitiveDetector",
+                         "geometry.v1.Calorimeter",
+                         "geometry.v1.ECAL",
+                         "geometry.v1.TILE",
+                         "geometry.v1.EMEC",
+                         "geometry.v1.HEC",
+                         "geometry.v1.DeadMaterials",
+                         "CaloCell.CaloDefs",
+                         "GaugiKernel.constants",
+                       ]
+
+
+def get_geometry_v1( UseCache : bool=True ) -> Tuple[List, List, str]:
+  """
+  Get the samplings and the volumes from the geometry cache (built and saved case not cached).
+
+  Args:
+      UseCache (bool): Use the geometry cache (always build case False).
+
+  Returns:
+      Tuple[List, List, str]: The samplings, the volumes and the volumes file
+                              read by the detector construction (None without cache).
+  """
+  if not UseCache:
+    return (*build_geometry_v1(), None)
+  cache = GeometryCache()
+  key = cache.key( "v1", _geometry_v1_modules )
+  geometry = cache.load( key )
+  if geometry is None:
+    geometry = build_geometry_v1()
+    if not cache.save( key, *geometry ):
+      return (*geometry, None)
+  return (*geometry, cache.volumes_file(key))
+
+
+class ReadoutGeometry_v1( Logger ):
+  """
+  Readout side of the geometry v1 (samplings only, without geant).
+  Can be used in place of DetectorConstruction_v1 by the CaloCellBuilder and the CaloHitBuilder.
+  """
+
+  def __init__( self, name : str, UseCache : bool=True ):
+    Logger.__init__(self)
+    self.name = name
+    self.samplings, self.volumes, _ = get_geometry_v1( UseCache )
+
+
 class DetectorConstruction_v1( Cpp ):
 
   def __init__( self, 
                 name              : str, 
                 UseMagneticField  : bool=False, 
                 CutOnPhi          : bool=False,
+                ShowerLibrary     : str="",
+                ShowerLibraryRegions : List[str]=None,
+                ShowerLibraryEnergyMin : float=10,
+                ShowerLibraryEnergyMax : float=1000,
+                ShowerLibraryEtaBins : List[float]=[round(0.2*i, 1) for i in range(17)],
+                ShowerLibraryEnergyBins : List[float]=[10., 20., 50., 100., 200., 500., 1000.],
+                UseCache          : bool=True,
               ):
 
     Cpp.__init__(self, ROOT.DetectorConstruction_v1(name) ) 
@@ -47,29 +135,29 @@ class DetectorConstruction_v1( Cpp ):
     self.setProperty( "UseMagneticField", UseMagneticField  )
     self.setProperty( "CutOnPhi"        , CutOnPhi          )
 
-    self.samplings = []
-    self.volumes = []
-    # Center
-    
-    #volumes.extend( getPixelBarrelCfg()   )
-    self.samplings.extend( getLArBarrelCfg()   )
-    self.samplings.extend( getTileBarrelCfg()  )
-    self.volumes.extend( getDMVolumesCfg()      )
-    # Right side (A)
-    self.samplings.extend( getTileExtendedCfg()    )
-    self.samplings.extend( getLArEMECCfg()         ) 
-    self.samplings.extend( getHECCfg()             )
-    self.volumes.extend( getCrackVolumesCfg()      )
-    # Left side (B)
-    self.samplings.extend( getTileExtendedCfg(left_side = True) )
-    self.samplings.extend( getLArEMECCfg(left_side=True)        ) 
-    self.samplings.extend( getHECCfg(left_side=True)            )    
-    self.volumes.extend( getCrackVolumesCfg(left_side=True)     )
-    self.samplings = flatten(self.samplings)
+    # loaded from the geometry cache when the configuration did not change
+    self.samplings, self.volumes, self.__volumesFile = get_geometry_v1( UseCache )
+
+    # Frozen showers (fast simulation) only into the LAr electromagnetic samplings as default
+    if ShowerLibraryRegions is None:
+      names = [samp.volume().Name for samp in self.samplings if samp.volume().Name.startswith("LAr::")]
+      ShowerLibraryRegions = list(dict.fromkeys(names))
+    self.setProperty( "ShowerLibrary"         , ShowerLibrary          )
+    self.setProperty( "ShowerLibraryRegions"  , ShowerLibraryRegions   )
+    self.setProperty( "ShowerLibraryEnergyMin", ShowerLibraryEnergyMin )
+    self.setProperty( "ShowerLibraryEnergyMax", ShowerLibraryEnergyMax )
+    # the showers are grouped (and picked at random) by |eta| and energy (MeV) bins
+    self.setProperty( "ShowerLibraryEtaBins"   , ShowerLibraryEtaBins    )
+    self.setProperty( "ShowerLibraryEnergyBins", ShowerLibraryEnergyBins )
     
   
   def compile(self):
     # Create all volumes inside of the detector
+    if self.__volumesFile:
+      # all volumes at once from the cache
+      if self._core.ReadVolumes( self.__volumesFile ):
+        return
+      MSG_WARNING( self, "It's not possible to read the volumes from %s. Adding one by one...", self.__volumesFile )
     
     volumes = [pv for pv in self.volumes]
     volumes.extend( [samp.volume() for samp in self.samplings] )
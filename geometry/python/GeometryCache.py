@@ -0,0 +1,116 @@
+
+__all__ = ["GeometryCache"]
+
+import os
+import sys
+import pickle
+import hashlib
+
+from typing import List, Tuple
+from GaugiKernel import Logger
+from GaugiKernel.macros import *
+
+
+class GeometryCache(Logger):
+  """
+  Versioned on disk cache of the detector description (samplings and volumes).
+
+  Each entry is keyed by a hash of the configuration: the cache format version,
+  the geometry name and options, the data folder and the sources of the modules
+  used to build it. Any change into the geometry code gives a new key, so a stale
+  description is never loaded. For each key, two files are written:
+
+   - <key>.pkl: the python samplings and volumes (readout side);
+   - <key>.volumes: one volume per line, read by the detector construction in one call.
+
+  The folder is taken from LORENZETTI_GEOMETRY_CACHE_DIR ($HOME/.cache/lorenzetti/geometry as default).
+  """
+
+  # increase when the format of the files changes
+  VERSION = 1
+
+  def __init__(self, path : str=None):
+    Logger.__init__(self)
+    if path is None:
+      path = os.environ.get( "LORENZETTI_GEOMETRY_CACHE_DIR",
+                             os.path.join( os.path.expanduser("~"), ".cache", "lorenzetti", "geometry" ) )
+    self.path = path
+
+
+  def key(self, name : str, modules : List[str], **options) -> str:
+    """
+    Hash of the geometry configuration.
+
+    Args:
+        name (str): The geometry name (e.g. v1).
+        modules (List[str]): The modules used to build the geometry (their sources are hashed).
+        options: Any option used to build the geometry.
+
+    Returns:
+        str: The cache key.
+    """
+    h = hashlib.sha1()
+    h.update( f"{self.VERSION}:{name}:{sorted(options.items())}".encode() )
+    h.update( os.environ.get("LORENZETTI_GEOMETRY_DATA_DIR", "").encode() )
+    for module in sorted(modules):
+      h.update( module.encode() )
+      with open( sys.modules[module].__file__, 'rb' ) as f:
+        h.update( f.read() )
+    return f"{name}.{h.hexdigest()}"
+
+
+  def volumes_file(self, key : str) -> str:
+    return os.path.join( self.path, key + ".volumes" )
+
+
+  def load(self, key : str) -> Tuple[List, List]:
+    """
+    Load the samplings and the volumes (None case not cached).
+    """
+    path = os.path.join( self.path, key + ".pkl" )
+    if not os.path.exists(path) or not os.path.exists(self.volumes_file(key)):
+      return None
+    try:
+      with open(path, 'rb') as f:
+        samplings, volumes = pickle.load(f)
+    except Exception as e:
+      MSG_WARNING( self, "It's not possible to read the geometry cache %s (%s). Rebuilding...", path, e )
+      return None
+    MSG_INFO( self, "Geometry loaded from %s", path )
+    return samplings, volumes
+
+
+  def save(self, key : str, samplings : List, volumes : List) -> bool:
+    """
+    Save the samplings and the volumes. The files are written with a temporary name and
+    renamed at the end, so jobs starting at the same time never read a partial file.
+    """
+    try:
+      os.makedirs( self.path, exist_ok=True )
+      tmp = f".{os.getpid()}.tmp"
+      path = os.path.join( self.path, key + ".pkl" )
+      with open(path + tmp, 'wb') as f:
+        pickle.dump( (samplings, volumes), f, protocol=pickle.HIGHEST_PROTOCOL )
+      # same order used by the detector construction (extra volumes first)
+      with open(self.volumes_file(key) + tmp, 'w') as f:
+        for pv in volumes + [samp.volume() for samp in samplings]:
+          f.write( self.volume_line(pv) + "\n" )
+      os.replace( self.volumes_file(key) + tmp, self.volumes_file(key) )
+      os.replace( path + tmp, path )
+    except OSError as e:
+      MSG_WARNING( self, "It's not possible to write the geometry cache into %s (%s).", self.path, e )
+      return False
+    MSG_INFO( self, "Geometry saved into %s", path )
+    return True
+
+
+  @staticmethod
+  def volume_line( pv ) -> str:
+    """
+    Same fields (and order) of DetectorConstruction_v1::AddVolume.
+    """
+    fields = [ pv.Name, int(pv.Plates), pv.AbsorberMaterial, pv.GapMaterial,
+               int(pv.NofLayers), pv.AbsorberThickness, pv.GapThickness,
+               pv.RMin, pv.RMax, pv.ZSize, pv.X, pv.Y, pv.Z,
+               pv.Cuts.ElectronCut, pv.Cuts.PositronCut, pv.Cuts.GammaCut, pv.Cuts.PhotonCut ]
+    return " ".join( v if isinstance(v, str) else (str(v) if isinstance(v, int) else repr(float(v))) for v in fields )
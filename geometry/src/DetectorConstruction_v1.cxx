@@ -1,5 +1,6 @@
 
 #include "DetectorConstruction_v1.h"
+#include "ShowerLibraryModel.h"
 #include "G4Material.hh"
 #include "G4NistManager.hh"
 #include "G4Box.hh"
@@ -25,6 +26,7 @@
 #include "G4RegionStore.hh"
 #include <string>
 #include <sstream>
+#include <fstream>
 
 namespace{
 template <typename T> int sign(T val) {
@@ -47,6 +49,10 @@ G4ThreadLocal G4GlobalMagFieldMessenger* DetectorConstruction_v1::m_magFieldMess
  * Properties:
  * - UseMagneticField: Toggle global magnetic field (2 Tesla).
  * - CutOnPhi: Restrict the detector to a phi wedge (used for debugging/visualization).
+ * - ShowerLibrary: Frozen shower library for the fast simulation (off case empty).
+ * - ShowerLibraryRegions: Regions (volume names) where the frozen showers are used.
+ * - ShowerLibraryEnergyMin/Max: Kinetic energy range (MeV) of the frozen showers.
+ * - ShowerLibraryEtaBins/EnergyBins: |eta| and energy (MeV) bin edges used to group the showers.
  */
 DetectorConstruction_v1::DetectorConstruction_v1(std::string name)
  : 
@@ -57,6 +63,12 @@ DetectorConstruction_v1::DetectorConstruction_v1(std::string name)
   declareProperty( "UseMagneticField"           , m_useMagneticField=true     );
   declareProperty( "CutOnPhi"                   , m_cutOnPhi=false            );
   declareProperty( "OutputLevel"                , m_outputLevel=0             ); 
+  declareProperty( "ShowerLibrary"              , m_showerLibrary=""          );
+  declareProperty( "ShowerLibraryRegions"       , m_showerLibraryRegions={}   );
+  declareProperty( "ShowerLibraryEnergyMin"     , m_showerLibraryEnergyMin=10 );
+  declareProperty( "ShowerLibraryEnergyMax"     , m_showerLibraryEnergyMax=1000 );
+  declareProperty( "ShowerLibraryEtaBins"       , m_showerLibraryEtaBins={}   );
+  declareProperty( "ShowerLibraryEnergyBins"    , m_showerLibraryEnergyBins={} );
 }
 
 
@@ -93,6 +105,38 @@ void DetectorConstruction_v1::AddVolume(std::string region,
 }
 
 
+//
+// Add all volumes from the geometry cache
+//
+bool DetectorConstruction_v1::ReadVolumes( std::string path )
+{
+  std::ifstream in( path );
+  if( !in.is_open() ){
+    MSG_ERROR( "It's not possible to open the volumes file " << path );
+    return false;
+  }
+
+  std::vector<Volume> volumes;
+  std::string line;
+  while( std::getline( in, line ) ){
+    if( line.empty() ) continue;
+    std::istringstream ss( line );
+    Volume v;
+    if( !(ss >> v.name >> v.plates >> v.absorberMaterial >> v.gapMaterial >> v.nofLayers >> v.absoThickness >> v.gapThickness
+             >> v.rMin >> v.rMax >> v.zSize >> v.x >> v.y >> v.z
+             >> v.electronCut >> v.positronCut >> v.gammaCut >> v.photonCut) ){
+      MSG_ERROR( "Bad volume line into " << path << ": " << line );
+      return false;
+    }
+    volumes.push_back( v );
+  }
+  // only added when all lines were read
+  m_volumes.insert( m_volumes.end(), volumes.begin(), volumes.end() );
+  MSG_INFO( volumes.size() << " volumes read from " << path );
+  return true;
+}
+
+
 
 G4VPhysicalVolume* DetectorConstruction_v1::Construct()
 {
@@ -563,6 +607,21 @@ void DetectorConstruction_v1::ConstructSDandField(){
     G4AutoDelete::Register(m_magFieldMessenger); 
   }
 
+  // Fast simulation models are created for each thread (the library is shared)
+  if ( !m_showerLibrary.empty() ){
+    auto library = ShowerLibrary::get( m_showerLibrary, m_showerLibraryEtaBins, m_showerLibraryEnergyBins, m_outputLevel );
+    for ( auto &name : m_showerLibraryRegions ){
+      auto region = G4RegionStore::GetInstance()->GetRegion(name);
+      if( !region ){
+        MSG_FATAL( "Region " << name << " not exist. It's not possible to attach the frozen showers." );
+      }
+      MSG_INFO( "Frozen showers from " << m_showerLibraryEnergyMin << " to " << m_showerLibraryEnergyMax << " MeV into " << name );
+      auto model = new ShowerLibraryModel( name+"_ShowerLibrary", region, library, 
+                                           m_showerLibraryEnergyMin, m_showerLibraryEnergyMax, m_outputLevel );
+      G4AutoDelete::Register(model);
+    }
+  }
+
 }
 
 
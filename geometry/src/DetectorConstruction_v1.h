@@ -75,6 +75,9 @@ class DetectorConstruction_v1 : public G4VUserDetectorConstruction, public MsgSe
                    double photonCut
                    );
 
+    /*! Add all volumes from the geometry cache file (one volume per line, same order of AddVolume) */
+    bool ReadVolumes( std::string path );
+
   private:
 
     std::vector<Volume> m_volumes;
@@ -120,6 +123,17 @@ class DetectorConstruction_v1 : public G4VUserDetectorConstruction, public MsgSe
     bool m_cutOnPhi;
     int m_outputLevel;
 
+    /*! Frozen shower library (fast simulation is off case empty) */
+    std::string m_showerLibrary;
+    /*! Regions with fast simulation */
+    std::vector<std::string> m_showerLibraryRegions;
+    /*! Kinetic energy range (in MeV) of the frozen showers */
+    float m_showerLibraryEnergyMin;
+    float m_showerLibraryEnergyMax;
+    /*! Bin edges (|eta| and MeV) used to group the frozen showers */
+    std::vector<float> m_showerLibraryEtaBins;
+    std::vector<float> m_showerLibraryEnergyBins;
+
     static G4ThreadLocal G4GlobalMagFieldMessenger*  m_magFieldMessenger;
 };
 
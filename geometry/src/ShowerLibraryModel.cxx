@@ -0,0 +1,92 @@
+
+#include "ShowerLibraryModel.h"
+#include "G4Kernel/RunSequence.h"
+#include "G4Electron.hh"
+#include "G4Positron.hh"
+#include "G4Gamma.hh"
+#include "G4FastStep.hh"
+#include "G4FastTrack.hh"
+#include "G4RunManager.hh"
+#include "G4Step.hh"
+#include "Randomize.hh"
+
+
+
+ShowerLibraryModel::ShowerLibraryModel( std::string name, G4Region *region, std::shared_ptr<const ShowerLibrary> library, 
+                                        float energyMin, float energyMax, int outputLevel ):
+  G4VFastSimulationModel( name, region ),
+  IMsgService(name),
+  m_library(library),
+  m_energyMin(energyMin),
+  m_energyMax(energyMax)
+{
+  setMsgLevel(outputLevel);
+}
+
+//!=====================================================================
+
+G4bool ShowerLibraryModel::IsApplicable( const G4ParticleDefinition &particle )
+{
+  return &particle == G4Electron::ElectronDefinition() || 
+         &particle == G4Positron::PositronDefinition() ||
+         &particle == G4Gamma::GammaDefinition();
+}
+
+//!=====================================================================
+
+G4bool ShowerLibraryModel::ModelTrigger( const G4FastTrack &fastTrack )
+{
+  const G4Track *track = fastTrack.GetPrimaryTrack();
+  float energy = track->GetKineticEnergy();
+  return energy > m_energyMin && energy <= m_energyMax && m_library->contains( track->GetDefinition()->GetPDGEncoding() );
+}
+
+//!=====================================================================
+
+/**
+ * @brief Replace the particle by a frozen shower.
+ * 
+ * The shower starts at the particle position, along its direction. The spot
+ * energies are fractions of the particle energy, so the shower is scaled from
+ * the library energy bin. The energy goes to the hits only through the spots:
+ * the fast step deposits nothing, otherwise the stepping action would send the
+ * particle energy to the hits again, on top of the spots.
+ */
+void ShowerLibraryModel::DoIt( const G4FastTrack &fastTrack, G4FastStep &fastStep )
+{
+  const G4Track *track = fastTrack.GetPrimaryTrack();
+  float energy = track->GetKineticEnergy();
+  const G4ThreeVector &pos = track->GetPosition();
+  const G4ThreeVector &dir = track->GetMomentumDirection();
+
+  auto shower = m_library->find( track->GetDefinition()->GetPDGEncoding(), energy, dir.eta(), G4UniformRand() );
+
+  fastStep.KillPrimaryTrack();
+  fastStep.ProposePrimaryTrackPathLength(0.0);
+  // no shower: the energy is deposited at the particle position (only once)
+  fastStep.ProposeTotalEnergyDeposited( shower ? 0 : energy );
+  if( !shower ) return;
+
+  G4ThreeVector u, v;
+  ShowerLibrary::frame( dir, u, v );
+
+  RunSequence* acc = static_cast<RunSequence*> (G4RunManager::GetRunManager()->GetNonConstCurrentRun()); 
+
+  // the spots are steps of this particle
+  G4Step step;
+  step.SetTrack( const_cast<G4Track*>(track) );
+  G4StepPoint *point = step.GetPreStepPoint();
+
+  float deposited = 0;
+  for ( const auto &spot : shower->spots )
+  {
+    point->SetPosition( pos + spot.l*dir + spot.u*u + spot.v*v );
+    point->SetGlobalTime( track->GetGlobalTime() + spot.t );
+    step.SetTotalEnergyDeposit( spot.e * energy );
+    acc->ExecuteEvent( &step );
+    deposited += spot.e * energy;
+  }
+  // the same fraction of the incident energy as the recorded shower (the rest leaked out)
+  MSG_DEBUG( "Frozen shower with " << shower->spots.size() << " spots: " << deposited << " of " << energy 
+             << " MeV deposited (library fraction " << shower->fraction << ")." );
+}
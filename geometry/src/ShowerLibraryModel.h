@@ -0,0 +1,49 @@
+#ifndef ShowerLibraryModel_h
+#define ShowerLibraryModel_h
+
+#include "GaugiKernel/MsgStream.h"
+#include "G4Kernel/ShowerLibrary.h"
+#include "G4VFastSimulationModel.hh"
+#include "G4Region.hh"
+#include <memory>
+#include <string>
+
+
+/**
+ * @class ShowerLibraryModel
+ * @brief Frozen shower fast simulation for electrons and photons.
+ *
+ * Electrons, positrons and photons with kinetic energy between EnergyMin and
+ * EnergyMax inside of the region (envelope) are killed and replaced by a shower
+ * from the library. Each spot is sent as a step to the RunSequence, so the
+ * energy goes to the hits through the same algorithms (CaloHitMaker) of the
+ * full simulation.
+ */
+class ShowerLibraryModel : public G4VFastSimulationModel, public MsgService
+{
+  public:
+
+    /** Constructor **/
+    ShowerLibraryModel( std::string name, G4Region *region, std::shared_ptr<const ShowerLibrary> library, 
+                        float energyMin, float energyMax, int outputLevel );
+
+    /** Destructor **/
+    virtual ~ShowerLibraryModel()=default;
+
+    /*! Only electrons, positrons and photons */
+    virtual G4bool IsApplicable( const G4ParticleDefinition &particle ) override;
+
+    /*! Energy inside of the library range */
+    virtual G4bool ModelTrigger( const G4FastTrack &fastTrack ) override;
+
+    /*! Deposit the shower spots and kill the particle */
+    virtual void DoIt( const G4FastTrack &fastTrack, G4FastStep &fastStep ) override;
+
+  private:
+
+    std::shared_ptr<const ShowerLibrary> m_library;
+    float m_energyMin;
+    float m_energyMax;
+};
+
+#endif
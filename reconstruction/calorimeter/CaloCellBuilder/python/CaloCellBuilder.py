@@ -44,7 +44,7 @@ class CaloCellBuilder( Logger ):
 
     Args:
         name (str): Name of the builder instance.
-        detector (DetectorConstruction): The detector geometry configuration object.
+        detector (DetectorConstruction_v1 | ReadoutGeometry_v1): The detector geometry configuration object.
         HistogramPath (str): Path in the output ROOT file for monitoring histograms.
         InputHitsKey (str): StoreGate key for input hits.
         OutputCellsKey (str): StoreGate key for output reconstructed cells.
@@ -143,9 +143,9 @@ class CaloCellBuilder( Logger ):
                                 InputCollectionKey    = samp.CollectionKey + "_Aux",
                                 OutputCollectionKey   = samp.CollectionKey,
                                 MinEnergy             = CrossTalkFlags.MinEnergy,
-                                AmpCapacitive         = CaloFlags.AmpCapacitive,
-                                AmpInductive          = CaloFlags.AmpInductive,
-                                AmpResistive          = CaloFlags.AmpResistive,
+                                AmpCapacitive         = CrossTalkFlags.AmpCapacitive,
+                                AmpInductive          = CrossTalkFlags.AmpInductive,
+                                AmpResistive          = CrossTalkFlags.AmpResistive,
                                 HistogramPath         = self.HistogramPath + '/CrossTalk',
                                 OutputLevel           = self.OutputLevel
                              )
@@ -1,10 +1,12 @@
-__all__ = ["PileupMerge"]
+__all__ = ["PileupMerge", "create_pileup_library", "pileup_library_manifest"]
 
 from GaugiKernel        import Cpp, LoggingLevel
 from GaugiKernel.macros import *
 from expand_folders     import expand_folders
 from typing             import List
 import ROOT
+import json
+import os
 
 class PileupMerge( Cpp ):
 
@@ -21,6 +23,11 @@ class PileupMerge( Cpp ):
                 PileupSigma         : float=0,
                 BunchIdStart        : int=-21,
                 BunchIdEnd          : int=4,
+                LowPileupLibrary    : str="",
+                HighPileupLibrary   : str="",
+                PremixedLibrary     : str="",
+                OnlyPileup          : bool=False,
+                NumberOfThreads     : int=1,
               ): 
     
     Cpp.__init__(self, ROOT.PileupMerge(name) )
@@ -36,3 +43,72 @@ class PileupMerge( Cpp ):
     self.setProperty( "NtupleName"            , NtupleName               )
     self.setProperty( "LowPileupInputFiles"   , LowPileupInputFiles      )
     self.setProperty( "HighPileupInputFiles"  , HighPileupInputFiles     )
+    self.setProperty( "LowPileupLibrary"      , LowPileupLibrary         )
+    self.setProperty( "HighPileupLibrary"     , HighPileupLibrary        )
+    # one premixed event (see premix_trf) for each signal event, in place of the minbias sampling
+    self.setProperty( "PremixedLibrary"       , PremixedLibrary          )
+    # only the pileup into the output hits (used to produce the premixed events)
+    self.setProperty( "OnlyPileup"            , OnlyPileup               )
+    # threads used to merge the bunch crossings of each event (same result for any number)
+    self.setProperty( "NumberOfThreads"       , NumberOfThreads          )
+
+
+
+def pileup_library_manifest( files      : List[str],
+                             NtupleName : str="CollectionTree",
+                             HitsKey    : str="Hits",
+                             EventKey   : str="Events" ) -> dict:
+  """
+  Description of the inputs of a pileup library: the format version, the
+  ntuple and keys and each input file with its size and modification time.
+  """
+  inputs = []
+  for f in files:
+    st = os.stat(f)
+    inputs.append( [os.path.abspath(f), st.st_size, st.st_mtime_ns] )
+  return { "version"   : int(ROOT.PileupLibrary.version()),
+           "ntuple"    : NtupleName,
+           "hits_key"  : HitsKey,
+           "event_key" : EventKey,
+           "files"     : inputs }
+
+
+def create_pileup_library( files      : List[str],
+                           output     : str,
+                           NtupleName : str="CollectionTree",
+                           HitsKey    : str="Hits",
+                           EventKey   : str="Events",
+                           overwrite  : bool=False ) -> str:
+  """
+  Convert the minbias (or premixed) HIT files into one memory-mapped pileup
+  library to be used by PileupMerge (Low/HighPileupLibrary or PremixedLibrary).
+
+  The inputs are saved into <output>.json next to the library. An existing
+  library is only reused if this manifest is the same (same format version,
+  ntuple, keys and input files, with the same size and modification time).
+  Otherwise it is built again.
+  """
+  manifest      = pileup_library_manifest( files, NtupleName, HitsKey, EventKey )
+  manifest_path = output + ".json"
+
+  if os.path.exists(output) and os.path.exists(manifest_path) and not overwrite:
+    try:
+      with open(manifest_path) as f:
+        if json.load(f) == manifest:
+          return output
+    except ValueError:
+      pass
+
+  # an interrupted build must not be trusted
+  if os.path.exists(manifest_path):
+    os.remove(manifest_path)
+  from ROOT.std import vector
+  paths = vector("string")()
+  for f in files:
+    paths.push_back(f)
+  library = ROOT.PileupLibrary("PileupLibrary")
+  if not library.build( paths, output, NtupleName, HitsKey, EventKey ):
+    raise RuntimeError(f"It is not possible to build the pileup library {output}")
+  with open(manifest_path, "w") as f:
+    json.dump(manifest, f)
+  return output
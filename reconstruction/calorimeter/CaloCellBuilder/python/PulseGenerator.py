@@ -21,6 +21,7 @@ class PulseGenerator( Cpp ):
                 NoiseStd        : float=0,
                 SamplingRate    : float=0,
                 StartSamplingBC : float=0,
+                PulsePerBunch   : bool=False,
               ):
                 
     Cpp.__init__(self, ROOT.PulseGenerator(name) )
@@ -34,6 +35,7 @@ class PulseGenerator( Cpp ):
     self.setProperty( "NoiseStd"        , NoiseStd          )
     self.setProperty( "SamplingRate"    , SamplingRate      )
     self.setProperty( "StartSamplingBC" , StartSamplingBC   )
+    self.setProperty( "PulsePerBunch"   , PulsePerBunch     )
 
 
      
@@ -1,10 +1,9 @@
 
 #include "CaloCell/CaloDetDescriptor.h"
 #include "AnomalyGenerator.h"
-#include "Randomize.hh"
-#include "TRandom.h"
 #include "EventInfo/EventInfoContainer.h"
 #include "EventInfo/EventInfoConverter.h"
+#include <algorithm>
 
 using namespace Gaugi;
 
@@ -27,7 +26,7 @@ using namespace Gaugi;
 AnomalyGenerator::AnomalyGenerator( std::string name ) : 
   IMsgService(name),
   AlgTool(),
-  m_rng(0)
+  m_streamKey(0)
 {
   declareProperty( "DeadModules"      , m_deadModules={}        );
   declareProperty( "Cells"            , m_cells={}              );
@@ -51,6 +50,7 @@ StatusCode AnomalyGenerator::initialize()
 {
   setMsgLevel( (MSG::Level)m_outputLevel );
   MSG_INFO("artificial anomalies will be applied to some cell signals")
+  m_streamKey = RandomStream::hash( name() );
   return StatusCode::SUCCESS;
 }
 
@@ -117,7 +117,8 @@ StatusCode AnomalyGenerator::execute( SG::EventContext &ctx, Gaugi::EDM *edm ) c
           MSG_INFO("events concerned by noise: "<<m_eventNumberRange[block]);
           MSG_INFO("increasing noise for cell with hash id: "<<cell->hash());
           // Add gaussian noise with increased noiseStd
-          AddGaussianNoise(pulse_sum, m_noiseMean, m_noiseStdFactor[block]*m_noiseStd);  
+          auto rng = ctx.random( m_streamKey, cell->hash() );
+          AddGaussianNoise(pulse_sum, m_noiseMean, m_noiseStdFactor[block]*m_noiseStd, rng);  
           MSG_INFO("pulse sum after noise: "<<pulse_sum);
           MSG_INFO("cell energy after noise: "<<cell->e());
         }
@@ -136,10 +137,10 @@ StatusCode AnomalyGenerator::execute( SG::EventContext &ctx, Gaugi::EDM *edm ) c
 
 //!=====================================================================
 
-void AnomalyGenerator::AddGaussianNoise( std::vector<float> &pulse, float noiseMean, float noiseStd) const
+void AnomalyGenerator::AddGaussianNoise( std::vector<float> &pulse, float noiseMean, float noiseStd, RandomStream &rng) const
 {
   for ( auto &value : pulse )
-    value += m_rng.Gaus( noiseMean, noiseStd );
+    value += rng.gaus( noiseMean, noiseStd );
 }
 
 //!=====================================================================
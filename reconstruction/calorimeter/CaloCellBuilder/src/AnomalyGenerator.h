@@ -4,7 +4,7 @@
 #include "GaugiKernel/StatusCode.h"
 #include "GaugiKernel/AlgTool.h"
 #include "GaugiKernel/EDM.h"
-#include "TRandom3.h"
+#include "GaugiKernel/Random.h"
 
 
 /**
@@ -35,7 +35,7 @@ class AnomalyGenerator : public Gaugi::AlgTool
 
   private:
 
-    void AddGaussianNoise( std::vector<float> &pulse, float noiseMean, float noiseStddev) const;
+    void AddGaussianNoise( std::vector<float> &pulse, float noiseMean, float noiseStddev, Gaugi::RandomStream &rng) const;
 
     float m_noiseMean;    
     float m_noiseStd;    
@@ -47,8 +47,8 @@ class AnomalyGenerator : public Gaugi::AlgTool
     std::string m_inputEventKey;
     /*! Output level message */
     int m_outputLevel;
-    /*! Random generator */
-    mutable TRandom3 m_rng;
+    /*! Random streams key (tool name hash), one stream for each cell and event */
+    uint64_t m_streamKey;
 };
 
 #endif
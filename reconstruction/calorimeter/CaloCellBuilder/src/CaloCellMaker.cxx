@@ -59,6 +59,9 @@ CaloCellMaker::CaloCellMaker( std::string name ) :
   declareProperty( "DetailedHistograms"       , m_detailedHistograms=false            );
   declareProperty( "HistogramPath"            , m_histPath="/CaloCellMaker"           );
 
+  // all the tools are owned by this algorithm
+  setThreadSafe();
+
 
 }
 
@@ -86,6 +89,22 @@ StatusCode CaloCellMaker::initialize()
   m_nEtaBins = m_etaBins.size() - 1;
   m_nPhiBins = m_phiBins.size() - 1;
 
+  // The geometry does not change between events, build all bins only once
+  float deltaEta = std::abs(m_etaBins[1] - m_etaBins[0]);
+  float deltaPhi = std::abs(m_phiBins[1] - m_phiBins[0]);
+  m_cells.clear();
+  m_cells.reserve( m_nEtaBins*m_nPhiBins );
+  for ( unsigned etaBin = 0; etaBin < m_nEtaBins; ++etaBin){
+    for ( unsigned phiBin = 0; phiBin < m_nPhiBins; ++phiBin){
+      float etaCenter = m_etaBins[etaBin] + deltaEta / 2;
+      float phiCenter = m_phiBins[phiBin] + deltaPhi / 2;
+      // local hash
+      unsigned bin = m_nPhiBins * etaBin + phiBin;
+      xAOD::CaloCellGeometry cell{ etaCenter, phiCenter, deltaEta, deltaPhi, m_z, (CaloSampling)m_sampling, (Detector)m_detector, hash(bin) };
+      m_cells.push_back( xAOD::CaloGeometry::instance().get(cell) );
+    }
+  }
+
   // Set message level
   setMsgLevel( (MSG::Level)m_outputLevel );
  
@@ -151,39 +170,19 @@ StatusCode CaloCellMaker::pre_execute( EventContext &ctx ) const
 
   collection.record( std::unique_ptr<xAOD::CaloDetDescriptorCollection>(new xAOD::CaloDetDescriptorCollection()) );
 
-  float deltaEta = std::abs(m_etaBins[1] - m_etaBins[0]); //[-3,-2], [2,3]
-  float deltaPhi = std::abs(m_phiBins[1] - m_phiBins[0]);
-
   //
-  // Prepare all sensitive objects like a two dimensional histogram
+  // Prepare all sensitive objects like a two dimensional histogram.
+  // Only the dynamic part is allocated, the geometry comes from the static table
   //
-  for ( unsigned etaBin = 0; etaBin < m_nEtaBins; ++etaBin){
-
-    //if (std::abs(m_etaBins[etaBin]) == std::abs(m_etaBins[etaBin+1]))
-    //  continue;
+  for ( const auto cell : m_cells ){
 
-    for ( unsigned phiBin = 0; phiBin < m_nPhiBins; ++phiBin){
+    // Create the calorimeter cell
+    auto *descriptor = new xAOD::CaloDetDescriptor( cell, m_bc_duration, m_bcid_start, m_bcid_end, false );
 
-      float etaCenter = m_etaBins[etaBin] + deltaEta / 2;
-      float phiCenter = m_phiBins[phiBin] + deltaPhi / 2;
-
-      unsigned bin = m_nPhiBins * etaBin + phiBin;
-
-      // Create the calorimeter cell
-      auto *descriptor = new xAOD::CaloDetDescriptor( etaCenter, phiCenter, deltaEta, deltaPhi, 
-                                                      hash(bin), 
-                                                      m_z,
-                                                      (CaloSampling)m_sampling,
-                                                      (Detector)m_detector,
-                                                      m_bc_duration, m_bcid_start, m_bcid_end,
-                                                      false);
-
-      if ( !collection->insert( descriptor->hash(), descriptor ) ){
-        MSG_FATAL( "It is not possible to include cell hash ("<< descriptor->hash() << ") into the collection. hash already exist.");
-      }
-
-    } // Loop over phi bins
-  }// Loop over eta bins
+    if ( !collection->insert( descriptor->hash(), descriptor ) ){
+      MSG_FATAL( "It is not possible to include cell hash ("<< descriptor->hash() << ") into the collection. hash already exist.");
+    }
+  }
 
   return StatusCode::SUCCESS;
 }
@@ -246,6 +245,9 @@ StatusCode CaloCellMaker::post_execute( EventContext &ctx ) const
   //
   // (step 1) Generate the pulse for all cells
   //
+  std::vector<Gaugi::EDM*> cells;
+  cells.reserve( hits.ptr()->size() );
+
   for ( const auto& hit : **hits.ptr() )
   {
     xAOD::CaloDetDescriptor *descriptor=nullptr;
@@ -264,13 +266,16 @@ StatusCode CaloCellMaker::post_execute( EventContext &ctx ) const
         descriptor->tof ( bcid, hit->tof(bcid)  );
       }  
       
-      if( m_pulseGenerator->execute(ctx, descriptor).isFailure() ){
-          MSG_ERROR( "It's not possible to execute Pulse generator." );
-          return StatusCode::FAILURE;
-      }
+      cells.push_back( descriptor );
     }
 
   }// loop over all hits
+
+  // all cells of this sampling in one call
+  if( m_pulseGenerator->execute(ctx, cells).isFailure() ){
+      MSG_ERROR( "It's not possible to execute Pulse generator." );
+      return StatusCode::FAILURE;
+  }
  
 
   for ( const auto& hit : **hits.ptr() )
@@ -4,6 +4,7 @@
 #include "GaugiKernel/Algorithm.h"
 #include "GaugiKernel/DataHandle.h"
 #include "GaugiKernel/AlgTool.h"
+#include "CaloCell/CaloGeometry.h"
 
 
 /**
@@ -97,6 +98,9 @@ class CaloCellMaker : public Gaugi::Algorithm
     unsigned int m_nEtaBins;
     unsigned int m_nPhiBins;
 
+    /*! Static description for each bin (shared by all events and threads) */
+    std::vector<const xAOD::CaloCellGeometry*> m_cells;
+
     /*! Pulse generator */
     Gaugi::AlgTool *m_pulseGenerator;
     /*! The tool list that will be executed into the post execute step */
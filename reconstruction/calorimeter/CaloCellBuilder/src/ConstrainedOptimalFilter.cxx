@@ -63,6 +63,33 @@ StatusCode ConstrainedOptimalFilter::initialize()
 {
   setMsgLevel(m_outputLevel);
   ReadShaper(m_pulsepath);
+
+  if( m_nsamples <= 0 || m_nsamples > 31 ){
+    MSG_ERROR( "Invalid number of samples: " << m_nsamples );
+    return StatusCode::FAILURE;
+  }
+
+  // The reference pulse and H depend only on the shaper, so build them once
+  std::vector<float> refpulse;
+  GeneratePulse(refpulse);
+  m_H.ResizeTo(m_nsamples, m_nsamples);
+  int extraZeros = int(m_nsamples / 2);
+  std::vector<float> fullVector;
+  for (int i = 0; i < extraZeros; i++) fullVector.push_back(0.0);
+  for (auto element : refpulse) fullVector.push_back(element);
+  for (int i = 0; i < extraZeros; i++) fullVector.push_back(0.0);
+  
+  for (int line = 0; line < m_nsamples; line++){
+    int firstIndex = fullVector.size() / 2 - line;
+    for (int col = 0; col < m_nsamples; col++){
+      m_H[line][col] = fullVector[firstIndex + col];
+    }
+  }
+
+  m_invHT.ResizeTo(m_nsamples, m_nsamples);
+  m_invHT.Transpose(m_H);
+  m_invHT.Invert();
+  m_weightsCache.clear();
   return StatusCode::SUCCESS;
 }
 
@@ -78,72 +105,66 @@ StatusCode ConstrainedOptimalFilter::finalize()
 /**
  * @brief Executes the COF algorithm.
  * 
- * 1. Generates the reference pulse.
- * 2. Builds the covariance matrix (H).
- * 3. Inverts the matrix to solve for the amplitude (a_hat).
- * 4. Applies an iterative procedure to select valid samples (passing threshold).
- * 5. Re-calculates the final energy using the selected samples.
+ * 1. Estimates the amplitudes (a_hat) using the inverse of H (computed in initialize).
+ * 2. Applies an iterative procedure to select valid samples (passing threshold).
+ * 3. Re-calculates the final energy using the selected samples. The pseudo-inverse
+ *    (G*G^T)^-1*G depends only on the passed samples, so it is cached by bitmask.
  */
 StatusCode ConstrainedOptimalFilter::execute( SG::EventContext &/*ctx*/, Gaugi::EDM *edm ) const
 {
-  std::vector<float> refpulse;
-  GeneratePulse(refpulse);
-  TMatrixD H(m_nsamples, m_nsamples);
-  TMatrixD saveH(m_nsamples, m_nsamples);
-  int extraZeros = int(m_nsamples / 2);
-  std::vector<float> fullVector;
-  for (int i = 0; i < extraZeros; i++) fullVector.push_back(0.0);
-  for (auto element : refpulse) fullVector.push_back(element);
-  for (int i = 0; i < extraZeros; i++) fullVector.push_back(0.0);
-  
-  for (int line = 0; line < m_nsamples; line++){
-    int firstIndex = fullVector.size() / 2 - line;
-    for (int col = 0; col < m_nsamples; col++){
-      H[line][col] = fullVector[firstIndex + col];
-      saveH[line][col] = fullVector[firstIndex + col];
-    }
-  }
-
   auto *cell = static_cast<xAOD::CaloDetDescriptor*>(edm); 
   auto pulse = cell->pulse();
   TVectorD tpulse(m_nsamples);
   for (int i = 0; i< m_nsamples; i++) tpulse[i] = pulse[i];
-  auto invH =  H.T().Invert();
-  auto a_hat = invH*tpulse;
+  auto a_hat = m_invHT*tpulse;
   
-  std::vector<bool> passedSamples(m_nsamples); 
-  int totalSamples = 0;
+  unsigned mask = 0;
   int newCentralSample = 0;
   for (int i = 0; i<m_nsamples; i++){
     if (a_hat[i] >= m_threshold){
-      passedSamples[i] = true;
-      totalSamples++;
+      mask |= (1u << i);
       if (i < m_nsamples/2) newCentralSample++;
     }
-    else passedSamples[i] = false;
   } 
-  if (!passedSamples[m_nsamples/2]){
-    passedSamples[m_nsamples/2] = true; //always accept the central samples
-    totalSamples++;
-  }
+  mask |= (1u << (m_nsamples/2)); //always accept the central samples
 
+  const auto &w = weights( mask, newCentralSample );
+  double a_hat_hat = 0;
+  for (int j = 0; j < m_nsamples; j++) a_hat_hat += w[j]*tpulse[j];
+  cell->setE(a_hat_hat);
+  return StatusCode::SUCCESS;
+}
+
+//!=====================================================================
+
+const std::vector<double>& ConstrainedOptimalFilter::weights( unsigned mask, int central ) const
+{
+  std::lock_guard<std::mutex> lock(m_cacheMutex);
+  auto it = m_weightsCache.find(mask);
+  if( it != m_weightsCache.end() ) return it->second;
+
+  int totalSamples = __builtin_popcount(mask);
   TMatrixD G(totalSamples, m_nsamples);
-  TMatrixD saveG(totalSamples, m_nsamples);
   int k = 0;
   for (int i = 0; i<m_nsamples; i++){
-    if (passedSamples[i]){
-      for (int j = 0; j < m_nsamples; j++) {
-        G[k][j]= saveH[i][j];
-        saveG[k][j] = saveH[i][j];
-      }
+    if (mask & (1u << i)){
+      for (int j = 0; j < m_nsamples; j++) G[k][j]= m_H[i][j];
       k++;
     }
   }
-  auto a_hat_hat = ((saveG*G.T()).Invert())*saveG*tpulse;
-  cell->setE(a_hat_hat[newCentralSample]);
-  return StatusCode::SUCCESS;
+  TMatrixD GT(TMatrixD::kTransposed, G);
+  TMatrixD GGT = G*GT;
+  GGT.Invert();
+  TMatrixD P = GGT*G;
+
+  std::vector<double> w(m_nsamples);
+  for (int j = 0; j < m_nsamples; j++) w[j] = P[central][j];
+  MSG_DEBUG( "New COF weights for the sample mask " << mask );
+  return m_weightsCache.emplace( mask, w ).first->second;
 }
 
+//!=====================================================================
+
 void ConstrainedOptimalFilter::GeneratePulse(  std::vector<float> &pulse) const
 {
   pulse.resize( m_nsamples );
@@ -5,6 +5,8 @@
 #include "GaugiKernel/EDM.h"
 #include "TMatrixD.h"
 #include "TVectorD.h"
+#include <unordered_map>
+#include <mutex>
 
 
 
@@ -37,6 +39,9 @@ class ConstrainedOptimalFilter : public Gaugi::AlgTool
 
   private:
 
+    /*! Get the row of (G*G^T)^-1 * G used to estimate the central sample given the passed samples */
+    const std::vector<double>& weights( unsigned mask, int central ) const;
+
     /*! optimal filter weights */
     int m_startSamplingBC;
     std::string m_pulsepath;
@@ -47,6 +52,13 @@ class ConstrainedOptimalFilter : public Gaugi::AlgTool
     int m_shaperZeroIndex;
     int m_nsamples;
     float m_samplingRate;
+
+    /*! H matrix built from the reference pulse and the inverse of H^T (computed once in initialize) */
+    TMatrixD m_H;
+    TMatrixD m_invHT;
+    /*! Pseudo-inverse rows keyed by the bitmask of passed samples (filled on demand) */
+    mutable std::unordered_map<unsigned, std::vector<double>> m_weightsCache; //!
+    mutable std::mutex m_cacheMutex; //!
 };
 
 #endif
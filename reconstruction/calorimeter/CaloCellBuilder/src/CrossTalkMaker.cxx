@@ -9,6 +9,7 @@
 #include "G4SystemOfUnits.hh"
 
 #include <map>
+#include <algorithm>
 
 
 using namespace Gaugi;
@@ -39,7 +40,10 @@ CrossTalkMaker::CrossTalkMaker( std::string name ) :
   declareProperty( "AmpCapacitive"          , m_AmpXt_C=4.2                         );
   declareProperty( "AmpInductive"           , m_AmpXt_L=2.3                         );
   declareProperty( "AmpResistive"           , m_AmpXt_R=1.0                         );
-}\
+
+  // the tools are shared only with the cell maker that produces the input collection
+  setThreadSafe();
+}
 
 //!=====================================================================
 
@@ -56,6 +60,16 @@ StatusCode CrossTalkMaker::initialize()
       MSG_FATAL( "It's not possible to iniatialize " << tool->name() << " tool." );
     }
   }
+
+  // The response only depends on the sample time, evaluate it once per sample
+  m_xtalkTable.resize(m_Nsamples);
+  m_cellTable.resize(m_Nsamples);
+  for ( unsigned samp_index=0; samp_index < m_Nsamples; ++samp_index )
+  {
+    m_xtalkTable[samp_index] = XTalk       ( m_tSamp*(samp_index+1), false );
+    m_cellTable[samp_index]  = CellFunction( m_tSamp*(samp_index+1), false );
+  }
+
   return StatusCode::SUCCESS;
 }
 //!=====================================================================
@@ -117,20 +131,27 @@ StatusCode CrossTalkMaker::execute( SG::EventContext &ctx , int /*evt*/ ) const
   
 
 
-  // loop over ordinary cell container
+  // cells in the collection order
+  std::vector<xAOD::CaloDetDescriptor*> descriptors;
+  descriptors.reserve( (**collection.ptr()).size() );
   for (const auto &pair : **collection.ptr() )
+    descriptors.push_back( pair.second );
+
+  // the neighbour table only depends on the geometry, build it once
+  bool rebuild = m_neighboursHash.size() != descriptors.size();
+  for ( unsigned idx=0; !rebuild && idx < descriptors.size(); ++idx )
+    rebuild = m_neighboursHash[idx] != descriptors[idx]->hash();
+  if ( rebuild ) buildNeighbours( descriptors );
+
+  // loop over ordinary cell container
+  for ( unsigned idx=0; idx < descriptors.size(); ++idx )
   {
-    auto descriptor = pair.second;
+    auto descriptor = descriptors[idx];
     xAOD::CaloDetDescriptor *xtdescriptor = descriptor->copy();
 
     // Step 1: check if we need to apply cx method for current cell. Only for cells higher than
     // min energy. Here, lets use the truth energy from the main bunch crossing.
-    bool bCrossTalkMakerConditions = ( !(xtdescriptor->edep() < m_minEnergy) && !(xtdescriptor->pulse().size() == 0) && !((xtdescriptor->sampling() != 3) && (xtdescriptor->sampling()  != 12)) );
-
-    
-    // if (descriptor->edep() < m_minEnergy) continue;
-    // if (descriptor->pulse().size() == 0) continue;
-    // if ((descriptor->sampling() != 3) && (descriptor->sampling()  != 12)) continue;
+    bool bCrossTalkMakerConditions = ( !(xtdescriptor->edep() < m_minEnergy) && !(xtdescriptor->pulse().size() < m_Nsamples) && !((xtdescriptor->sampling() != 3) && (xtdescriptor->sampling()  != 12)) );
 
     // ------------------------------------------------------------------------------
     // If there IS xtalk conditions, apply XT model to cell 1st neighbors,
@@ -143,92 +164,60 @@ StatusCode CrossTalkMaker::execute( SG::EventContext &ctx , int /*evt*/ ) const
                 << ", nsamples " << xtdescriptor->pulse().size() << ", truthEne "<< xtdescriptor->edep() << ", ene " << xtdescriptor->e() 
                 << ", eta/phi "<< xtdescriptor->eta() << "/"<< xtdescriptor->phi() );
 
-      // Step 2: build a 3x3 window around the central cell.
-      //    Since this is a cell candidate, lets take all cells around this cells using a 3x3 window.
-      //    First lets retrieve the full container in memory (not const objects inside of the collection)
-      std::vector<const xAOD::CaloDetDescriptor*> cells_around;
-
-      // loop over ordinary cell container
-      for (auto &pairAround : **collection.ptr() ){
-        auto neighborDescriptor = pairAround.second;
-        if ( neighborDescriptor->pulse().size() == 0) continue; // protection: if there is no pulseShape, skip that cell. 
-        if ( xtdescriptor->sampling() != neighborDescriptor->sampling() ) continue;  // cells_around must belong to the same sampling of central_cell
-        if ( xtdescriptor == neighborDescriptor) continue; // central_cell must not belong to cells_around
-        // build a 3x3 window around the central cell
-        float diffEta = std::abs( xtdescriptor->eta() - neighborDescriptor->eta() );
-        float diffPhi = std::abs( CaloPhiRange::fix( xtdescriptor->phi() - neighborDescriptor->phi() ) );
-        if( diffEta <= 3*xtdescriptor->deltaEta()/2 && diffPhi <= 3*xtdescriptor->deltaPhi()/2 ){
-          cells_around.push_back(neighborDescriptor);
-        }
-      }
+      // Step 2: Loop over the 3x3 window (cells_around) to extract xtalk effect from the central_cell surroundings.
+      std::vector<float> final_xt_pulse(m_Nsamples, 0);
 
-      // Step 3: Loop over cells_around to extract xtalk effect from the central_cell surroundings.
-      std::vector<float> final_xt_pulse(5);
-
-      for (auto cell : cells_around){
-    
-        auto pulseCellXT = cell->pulse();
-        std::vector<float> neighbor_xt_pulse;
-        float distorted_sample_ind=0, distorted_sample_cap=0;
-        
-        // case 1: diagonal from central cell
-        if (cell->eta() != descriptor->eta() && cell->phi() != descriptor->phi())
-        {
-          for (unsigned samp_index=0; samp_index<5; ++samp_index)
-          {
-            distorted_sample_ind = XTalkTF( pulseCellXT[samp_index],samp_index,true, true);
-            distorted_sample_cap = 0; // there is no capacitive cross-talk effect in the cell diagonal
-            samples_xtalk_ind.push_back(distorted_sample_ind); // histogram
-            samples_xtalk_cap.push_back(distorted_sample_cap);  // histogram
-            neighbor_xt_pulse.push_back(distorted_sample_ind + distorted_sample_cap);
-          }
-        }else {
-          // case 2: is inside central cross position        
-          for (int samp_index=0; samp_index<5; samp_index++)
-          {
-            distorted_sample_ind = XTalkTF( pulseCellXT[samp_index],samp_index,true, true);
-            distorted_sample_cap = XTalkTF( pulseCellXT[samp_index],samp_index,true, false);
-            samples_xtalk_ind.push_back(distorted_sample_ind); // histogram
-            samples_xtalk_cap.push_back(distorted_sample_cap); // histogram
-            neighbor_xt_pulse.push_back(distorted_sample_ind + distorted_sample_cap);
-          }
-        }
+      for (auto nidx : m_neighbours[idx]){
 
-        // sum all xtalk effects around center cell
-        for (int i=0; i<5; i++){
-          final_xt_pulse[i] += neighbor_xt_pulse[i];
+        const xAOD::CaloDetDescriptor *cell = descriptors[nidx];
+        const auto &pulseCellXT = cell->pulse();
+        if ( pulseCellXT.size() < m_Nsamples ) continue; // protection: if there is no pulseShape, skip that cell.
+
+        // case 1: diagonal from central cell. There is no capacitive cross-talk effect in the cell diagonal
+        bool diagonal = cell->eta() != descriptor->eta() && cell->phi() != descriptor->phi();
+
+        for (unsigned samp_index=0; samp_index<m_Nsamples; ++samp_index)
+        {
+          float distorted_sample_ind = XTalkTF( pulseCellXT[samp_index],samp_index,true, true);
+          float distorted_sample_cap = diagonal ? 0 : XTalkTF( pulseCellXT[samp_index],samp_index,true, false);
+          samples_xtalk_ind.push_back(distorted_sample_ind); // histogram
+          samples_xtalk_cap.push_back(distorted_sample_cap); // histogram
+          // sum all xtalk effects around center cell
+          final_xt_pulse[samp_index] += distorted_sample_ind + distorted_sample_cap;
         }
 
       }// end-for in cells_around
 
 
-      // Step 4: add total pulse distortion from neighbor cells into the central cell of the 3x3 window.
+      // Step 3: add total pulse distortion from neighbor cells into the central cell of the 3x3 window.
       auto centralCellPulse = descriptor->pulse(); 
-      auto pulseBefore      = descriptor->pulse();
+      const auto &pulseBefore = descriptor->pulse();
       auto energyBefore     = descriptor->e();
 
-      for (int i=0; i<5; i++)
+      for (unsigned i=0; i<m_Nsamples; i++)
       {
         samples_signal.push_back(centralCellPulse[i]); // add to fillHistograms
         centralCellPulse[i] = centralCellPulse[i] + final_xt_pulse[i]; 
         samples_signal_xtalk.push_back(centralCellPulse[i]); // add to fillHistograms
       }
 
-      // Step 5: change pulse value of central cell of the 3x3 window with adjacent xtalk effects.
-      descriptor->setPulse(centralCellPulse);
+      // Step 4: change pulse value of central cell of the 3x3 window with adjacent xtalk effects.
+      // Only the copy is changed, the neighbours always see the original pulses.
+      xtdescriptor->setPulse(centralCellPulse);
 
-      // Step 6: Call for Estimation Methods tool (or any other tool applied into cells, AFTER pulse generation.)
+      // Step 5: Call for Estimation Methods tool (or any other tool applied into cells, AFTER pulse generation.)
       for ( auto tool : m_toolHandles )
       {
         // digitalization
-        if( tool->execute( ctx, descriptor ).isFailure() ){
+        if( tool->execute( ctx, xtdescriptor ).isFailure() ){
           MSG_ERROR( "It's not possible to execute the tool with name " << tool->name() );
+          delete xtdescriptor;
           return StatusCode::FAILURE;
         }
       }
 
-      auto pulseAfter   = centralCellPulse;
-      auto energyAfter  = descriptor->e();
+      const auto &pulseAfter = centralCellPulse;
+      auto energyAfter  = xtdescriptor->e();
 
       // fillHistograms( ctx, samples_xtalk_ind, samples_xtalk_cap, samples_signal, samples_signal_xtalk );
       MSG_DEBUG(" e: "<< energyBefore <<"  Pulse before: " << pulseBefore[0] << "   "<< pulseBefore[1] << "   "<< pulseBefore[2] << "   "<< pulseBefore[3] << "   "<< pulseBefore[4]);
@@ -242,10 +231,10 @@ StatusCode CrossTalkMaker::execute( SG::EventContext &ctx , int /*evt*/ ) const
 
     // ------------------------------------------------------------------------------
     // If there is NO xtalk conditions, add the cell normally into new XT Container.
-    //  Look, here, the current descriptor hasn't been changed.
+    //  Look, here, the copy hasn't been changed.
     // -------------------------------------------------------------------------------
-    if ( !xtCollection->insert( descriptor->hash(), descriptor ) ){
-        MSG_FATAL( "It is not possible to include cell hash ("<< descriptor->hash() << ") into the collection. hash already exist.");
+    if ( !xtCollection->insert( xtdescriptor->hash(), xtdescriptor ) ){
+        MSG_FATAL( "It is not possible to include cell hash ("<< xtdescriptor->hash() << ") into the collection. hash already exist.");
     }
 
   }
@@ -298,9 +287,9 @@ float CrossTalkMaker::XTalkTF(float sample, int samp_index, bool diagonal, bool
   float BaseAmpXTc = m_AmpXt_C/100*sample ;
   float BaseAmpXTl = m_AmpXt_L/100*sample ;
   // float BaseAmpXTr = m_AmpXt_R*sample ;
-  float XTcSamples = BaseAmpXTc * XTalk       (25*(samp_index+1) , false ); //+ delayPerCell[cell] + m_tau_0, false ) ) ;
-  float XTlSamples = BaseAmpXTl * XTalk       (25*(samp_index+1) , false ); //+ delayPerCell[cell] + m_tau_0, false ) ) ;
-  // float XTrSamples = BaseAmpXTr * CellFunction(25*(samp_index+1) , false ); //+ delayPerCell[cell] + m_tau_0, false ) ) ;
+  float XTcSamples = BaseAmpXTc * m_xtalkTable[samp_index]; // XTalk(25*(samp_index+1), false)
+  float XTlSamples = BaseAmpXTl * m_xtalkTable[samp_index]; // XTalk(25*(samp_index+1), false)
+  // float XTrSamples = BaseAmpXTr * m_cellTable[samp_index]; // CellFunction(25*(samp_index+1), false)
 
   if (diagonal && inductive){
     // ind_part = XTlSamples;
@@ -319,6 +308,70 @@ float CrossTalkMaker::XTalkTF(float sample, int samp_index, bool diagonal, bool
 
 }
 
+//!=====================================================================
+
+/**
+ * @brief Build the 3x3 window of each central cell candidate (EMB2/EMEC2).
+ *
+ * Neighbours are the cells from the same sampling with |deta| <= 1.5*deta and
+ * |dphi| <= 1.5*dphi of the central cell, excluding the cell itself. Cells are
+ * sorted by eta so only the eta window is visited. The neighbours are stored
+ * as positions into the collection order.
+ */
+void CrossTalkMaker::buildNeighbours( const std::vector<xAOD::CaloDetDescriptor*> &descriptors ) const
+{
+  MSG_INFO( "Building the cross talk neighbour table for " << descriptors.size() << " cells." );
+
+  m_neighbours.assign( descriptors.size(), std::vector<unsigned>() );
+  m_neighboursHash.resize( descriptors.size() );
+  for ( unsigned idx=0; idx < descriptors.size(); ++idx )
+    m_neighboursHash[idx] = descriptors[idx]->hash();
+
+  // candidates sorted by eta for each sampling
+  std::map< int, std::vector<unsigned> > bySampling;
+  for ( unsigned idx=0; idx < descriptors.size(); ++idx ){
+    int sampling = (int)descriptors[idx]->sampling();
+    if( sampling != 3 && sampling != 12 ) continue;
+    bySampling[sampling].push_back(idx);
+  }
+
+  for ( auto &pair : bySampling )
+  {
+    auto &cells = pair.second;
+    std::stable_sort( cells.begin(), cells.end(), [&](unsigned a, unsigned b){
+      return descriptors[a]->eta() < descriptors[b]->eta();
+    });
+
+    // eta values in the same order to be searched
+    std::vector<float> etas( cells.size() );
+    for ( unsigned k=0; k < cells.size(); ++k )
+      etas[k] = descriptors[cells[k]]->eta();
+
+    for ( auto idx : cells )
+    {
+      const auto central = descriptors[idx];
+      float etaWindow = 3*central->deltaEta()/2;
+      float phiWindow = 3*central->deltaPhi()/2;
+      auto first = std::lower_bound( etas.begin(), etas.end(), central->eta() - etaWindow );
+      auto &neighbours = m_neighbours[idx];
+
+      for ( unsigned k=first-etas.begin(); k < cells.size() && etas[k] <= central->eta() + etaWindow; ++k )
+      {
+        if ( cells[k] == idx ) continue; // central_cell must not belong to cells_around
+        const auto cell = descriptors[cells[k]];
+        float diffEta = std::abs( central->eta() - cell->eta() );
+        float diffPhi = std::abs( CaloPhiRange::fix( central->phi() - cell->phi() ) );
+        if( diffEta <= etaWindow && diffPhi <= phiWindow )
+          neighbours.push_back( cells[k] );
+      }
+      // keep the same order used by the collection
+      std::sort( neighbours.begin(), neighbours.end() );
+    }
+  }
+}
+
+//!=====================================================================
+
 double CrossTalkMaker::XTalk(double x, bool type) const
 {
   TF1* XT_cellTF = new TF1("XT_cellTF","((exp(-x/[0])*x*x)/(2 *[0]*[0]*([0] - [1])) - (exp(-(x/[0]))*x*[1])/([0]*pow([0] - [1],2)) + exp(-(x/[0]))*[1]*[1]/pow([0] - [1],3) + (exp(-(x/[1]))*[1]*[1])/pow(-[0] + [1],3) + (1/(2*[2]*[0] *pow(([0] - [1]),3)))*exp(-x* (1/[0] + 1/[1]))* (-2 *exp(x *(1/[0] + 1/[1]))*[0] *pow(([0] - [1]),3) - 2 *exp(x/[0])*[0]*pow([1],3) + exp(x/[1]) *(x*x *pow(([0] - [1]),2) + 2*x*[0]*([0]*[0] - 3*[0]*[1] + 2*[1]*[1]) + 2*[0]*[0]*([0]*[0] - 3*[0]*[1] + 3*[1]*[1]))) + ((1 - (exp((-x + [2])/[0])*(x - [2])*([0] - 2*[1]))/pow(([0] - [1]),2) - (exp((-x + [2])/[0])*(x - [2])*(x- [2]))/(2*[0]*([0] - [1])) + (exp((-x + [2])/[1])*[1]*[1]*[1])/pow(([0] - [1]),3) - (exp((-x + [2])/[0])*[0]*([0]*[0] - 3*[0]*[1] + 3*[1]*[1]))/pow(([0] - [1]),3))* 0.5*( 1+sign(1, x -[2]) ) )/[2])*[3]*[4]*[3]*[0]*[0]",0., m_tmax2);
@@ -57,6 +57,9 @@ class CrossTalkMaker : public Gaugi::Algorithm
     double  CellFunction(double x, bool type) const;
     float   XTalkTF( float sample, int samp_index, bool diagonal, bool inductive) const;
 
+    /*! Build the 3x3 neighbour table (same sampling) for the cells in the collection order */
+    void    buildNeighbours( const std::vector<xAOD::CaloDetDescriptor*> &descriptors ) const;
+
     /*! The tool list that will be executed into the post execute step */
     std::vector< Gaugi::AlgTool* > m_toolHandles;
 
@@ -92,6 +95,15 @@ class CrossTalkMaker : public Gaugi::Algorithm
     double tau_0_mean  = 0 ;
     double tau_std     = 0.5 ;
 
+    /*! XTalk and CellFunction responses tabulated in the sample grid (25*(i+1) ns) */
+    std::vector<double> m_xtalkTable;
+    std::vector<double> m_cellTable;
+
+    /*! Neighbour positions (collection order) for each cell. Geometry only, built once */
+    mutable std::vector<std::vector<unsigned>> m_neighbours; //!
+    /*! Cell hashes used to build the neighbour table */
+    mutable std::vector<unsigned long int> m_neighboursHash; //!
+
 };
 
 #endif
\ No newline at end of file
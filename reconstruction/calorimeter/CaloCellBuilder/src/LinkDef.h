@@ -3,9 +3,10 @@
 #include "src/CaloCellMerge.h"
 #include "src/PulseGenerator.h"
 #include "src/OptimalFilter.h"
-//#include "src/CrossTalkMaker.h"
+#include "src/CrossTalkMaker.h"
 
 #include "src/PileupMerge.h"
+#include "src/PileupLibrary.h"
 #include "src/ConstrainedOptimalFilter.h"
 #include "src/AnomalyGenerator.h"
 
@@ -19,8 +20,9 @@
 #pragma link C++ class CaloCellMerge+;
 #pragma link C++ class PulseGenerator+;
 #pragma link C++ class OptimalFilter+;
-//#pragma link C++ class CrossTalkMaker+;
+#pragma link C++ class CrossTalkMaker+;
 #pragma link C++ class ConstrainedOptimalFilter+;
 #pragma link C++ class PileupMerge+;
+#pragma link C++ class PileupLibrary+;
 #pragma link C++ class AnomalyGenerator+;
 #endif
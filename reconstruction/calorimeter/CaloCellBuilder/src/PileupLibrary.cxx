@@ -0,0 +1,261 @@
+
+#include "PileupLibrary.h"
+#include "CaloHit/CaloHitConverter.h"
+#include "EventInfo/EventInfoConverter.h"
+#include "TChain.h"
+#include <fstream>
+#include <cstring>
+#include <unordered_map>
+#include <fcntl.h>
+#include <unistd.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+
+
+namespace {
+  // file identification
+  const char     kMagic[8] = {'L','Z','T','P','U','L','I','B'};
+  // 2: dense cell column and cell hash table
+  const uint32_t kVersion  = 2;
+
+  struct Header {
+    char     magic[8];
+    uint32_t version;
+    uint32_t reserved;
+    uint64_t nEvents;
+    uint64_t nHits;
+    uint64_t nEdep;
+    uint64_t nCells;
+  };
+
+  template<class T>
+  void write( std::ofstream &out, const std::vector<T> &vec )
+  {
+    out.write( reinterpret_cast<const char*>(vec.data()), vec.size()*sizeof(T) );
+  }
+}
+
+//!=====================================================================
+
+PileupLibrary::PileupLibrary( std::string name ):
+  IMsgService(name),
+  m_data(nullptr),
+  m_size(0),
+  m_nEvents(0),
+  m_nHits(0),
+  m_nEdep(0),
+  m_nCells(0)
+{}
+
+//!=====================================================================
+
+PileupLibrary::~PileupLibrary()
+{
+  close();
+}
+
+//!=====================================================================
+
+uint32_t PileupLibrary::version()
+{
+  return kVersion;
+}
+
+//!=====================================================================
+
+/**
+ * @brief Read all minbias events and write the columnar library.
+ *
+ * Only the edep/bcid/hash branches are enabled. Hits without any energy
+ * deposit are dropped since they do not contribute into the merge.
+ */
+bool PileupLibrary::build( const std::vector<std::string> &paths, std::string output,
+                           std::string ntupleName, std::string hitsKey, std::string eventKey )
+{
+  TChain chain;
+  for ( auto &path : paths )
+    chain.Add( (path+"/"+ntupleName).c_str() );
+
+  std::string hitsName  = "CaloHitContainer_"+hitsKey;
+  std::string eventName = "EventInfoContainer_"+eventKey;
+
+  if( !chain.FindBranch(hitsName.c_str()) || !chain.FindBranch(eventName.c_str()) ){
+    MSG_ERROR( "It's not possible to find the branches " << hitsName << " and " << eventName );
+    return false;
+  }
+
+  chain.SetBranchStatus("*",0);
+  chain.SetBranchStatus( (hitsName+".edep").c_str()      , 1 );
+  chain.SetBranchStatus( (hitsName+".bcid_start").c_str(), 1 );
+  chain.SetBranchStatus( (hitsName+".bcid_end").c_str()  , 1 );
+  chain.SetBranchStatus( (hitsName+".hash").c_str()      , 1 );
+  chain.SetBranchStatus( (eventName+".avgmu").c_str()    , 1 );
+
+  std::vector<xAOD::CaloHit_t>   *collection_hits=nullptr;
+  std::vector<xAOD::EventInfo_t> *collection_events=nullptr;
+  chain.SetBranchAddress( hitsName.c_str() , &collection_hits   );
+  chain.SetBranchAddress( eventName.c_str(), &collection_events );
+
+  std::vector<uint64_t> eventOffset{0};
+  std::vector<float>    avgmu;
+  std::vector<uint64_t> hash;
+  std::vector<int32_t>  bcidStart, bcidEnd;
+  std::vector<uint64_t> edepOffset{0};
+  std::vector<float>    edep;
+  std::vector<uint32_t> cell;
+  std::vector<uint64_t> cellHash;
+  std::unordered_map<uint64_t, uint32_t> cellIndex;
+
+  Long64_t entries = chain.GetEntries();
+  MSG_INFO( "Building the pileup library with " << entries << " events into " << output );
+
+  for ( Long64_t entry=0; entry < entries; ++entry )
+  {
+    if( chain.GetEntry(entry) <= 0 ){
+      MSG_ERROR( "It's not possible to read the entry " << entry );
+      delete collection_hits; delete collection_events;
+      return false;
+    }
+
+    avgmu.push_back( collection_events->empty() ? 0 : collection_events->at(0).avgmu );
+
+    for ( const auto &hit_t : *collection_hits )
+    {
+      bool empty=true;
+      for ( auto e : hit_t.edep ){
+        if( e != 0 ) { empty=false; break; }
+      }
+      if( empty ) continue;
+
+      hash.push_back( hit_t.hash );
+      auto it = cellIndex.find( hit_t.hash );
+      if( it == cellIndex.end() ){
+        it = cellIndex.emplace( hit_t.hash, cellHash.size() ).first;
+        cellHash.push_back( hit_t.hash );
+      }
+      cell.push_back( it->second );
+      bcidStart.push_back( hit_t.bcid_start );
+      bcidEnd.push_back( hit_t.bcid_start + (int)hit_t.edep.size() - 1 );
+      edep.insert( edep.end(), hit_t.edep.begin(), hit_t.edep.end() );
+      edepOffset.push_back( edep.size() );
+    }
+    eventOffset.push_back( hash.size() );
+  }
+
+  delete collection_hits;
+  delete collection_events;
+
+  // write into a temporary file and rename it to avoid partial libraries
+  std::string tmp = output + ".tmp." + std::to_string(getpid());
+  std::ofstream out( tmp, std::ios::binary );
+  if( !out.is_open() ){
+    MSG_ERROR( "It's not possible to create the file " << tmp );
+    return false;
+  }
+
+  Header header;
+  std::memcpy( header.magic, kMagic, sizeof(kMagic) );
+  header.version  = kVersion;
+  header.reserved = 0;
+  header.nEvents  = avgmu.size();
+  header.nHits    = hash.size();
+  header.nEdep    = edep.size();
+  header.nCells   = cellHash.size();
+  out.write( reinterpret_cast<const char*>(&header), sizeof(Header) );
+
+  // 8 bytes columns first to keep all of them aligned
+  write( out, eventOffset );
+  write( out, hash        );
+  write( out, edepOffset  );
+  write( out, cellHash    );
+  write( out, avgmu       );
+  write( out, bcidStart   );
+  write( out, bcidEnd     );
+  write( out, cell        );
+  write( out, edep        );
+  out.close();
+
+  if( std::rename( tmp.c_str(), output.c_str() ) != 0 ){
+    MSG_ERROR( "It's not possible to move " << tmp << " to " << output );
+    return false;
+  }
+
+  MSG_INFO( "Pileup library with " << header.nEvents << " events, " << header.nHits << " hits and " << header.nCells << " cells saved into " << output );
+  return true;
+}
+
+//!=====================================================================
+
+bool PileupLibrary::open( std::string path )
+{
+  close();
+
+  int fd = ::open( path.c_str(), O_RDONLY );
+  if( fd < 0 ){
+    MSG_ERROR( "It's not possible to open the pileup library " << path );
+    return false;
+  }
+
+  struct stat st;
+  if( fstat(fd, &st) != 0 || (size_t)st.st_size < sizeof(Header) ){
+    MSG_ERROR( "Invalid pileup library " << path );
+    ::close(fd);
+    return false;
+  }
+
+  m_size = st.st_size;
+  void *data = mmap( nullptr, m_size, PROT_READ, MAP_SHARED, fd, 0 );
+  ::close(fd);
+  if( data == MAP_FAILED ){
+    MSG_ERROR( "It's not possible to map the pileup library " << path );
+    return false;
+  }
+  m_data = data;
+
+  const Header *header = reinterpret_cast<const Header*>(m_data);
+  if( std::memcmp( header->magic, kMagic, sizeof(kMagic) ) != 0 || header->version != kVersion ){
+    MSG_ERROR( "The file " << path << " is not a pileup library (or it was built by another version)" );
+    close();
+    return false;
+  }
+
+  m_nEvents = header->nEvents;
+  m_nHits   = header->nHits;
+  m_nEdep   = header->nEdep;
+  m_nCells  = header->nCells;
+
+  size_t expected = sizeof(Header) + (m_nEvents+1)*sizeof(uint64_t) + m_nHits*sizeof(uint64_t) + (m_nHits+1)*sizeof(uint64_t)
+                    + m_nCells*sizeof(uint64_t) + m_nEvents*sizeof(float) + 2*m_nHits*sizeof(int32_t)
+                    + m_nHits*sizeof(uint32_t) + m_nEdep*sizeof(float);
+  if( expected != m_size ){
+    MSG_ERROR( "The pileup library " << path << " is corrupted (size " << m_size << ", expected " << expected << ")" );
+    close();
+    return false;
+  }
+
+  const char *ptr = reinterpret_cast<const char*>(m_data) + sizeof(Header);
+  m_eventOffset = reinterpret_cast<const uint64_t*>(ptr); ptr += (m_nEvents+1)*sizeof(uint64_t);
+  m_hash        = reinterpret_cast<const uint64_t*>(ptr); ptr += m_nHits*sizeof(uint64_t);
+  m_edepOffset  = reinterpret_cast<const uint64_t*>(ptr); ptr += (m_nHits+1)*sizeof(uint64_t);
+  m_cellHash    = reinterpret_cast<const uint64_t*>(ptr); ptr += m_nCells*sizeof(uint64_t);
+  m_avgmu       = reinterpret_cast<const float*>(ptr);    ptr += m_nEvents*sizeof(float);
+  m_bcidStart   = reinterpret_cast<const int32_t*>(ptr);  ptr += m_nHits*sizeof(int32_t);
+  m_bcidEnd     = reinterpret_cast<const int32_t*>(ptr);  ptr += m_nHits*sizeof(int32_t);
+  m_cell        = reinterpret_cast<const uint32_t*>(ptr); ptr += m_nHits*sizeof(uint32_t);
+  m_edep        = reinterpret_cast<const float*>(ptr);
+
+  MSG_INFO( "Pileup library " << path << " mapped with " << m_nEvents << " events and " << m_nHits << " hits." );
+  return true;
+}
+
+//!=====================================================================
+
+void PileupLibrary::close()
+{
+  if( m_data ){
+    munmap( m_data, m_size );
+    m_data = nullptr;
+    m_size = 0;
+    m_nEvents = m_nHits = m_nEdep = m_nCells = 0;
+  }
+}
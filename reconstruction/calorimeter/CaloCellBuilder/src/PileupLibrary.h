@@ -0,0 +1,101 @@
+#ifndef PileupLibrary_h
+#define PileupLibrary_h
+
+#include "GaugiKernel/MsgStream.h"
+#include <string>
+#include <vector>
+#include <cstdint>
+
+
+/**
+ * @class PileupLibrary
+ * @brief Columnar, memory-mapped store of minimum bias hits.
+ *
+ * The minbias HIT files are converted once (build) into a flat binary file
+ * with one column per field (event offsets, avgmu, hash, bcid range and the
+ * edep arrays). Only hits with energy are kept. Each distinct hash is also a
+ * dense cell (cell column and cell hash table), so the merge can accumulate
+ * into flat arrays without any hash lookup per hit. The file is memory-mapped
+ * read-only (open) so all processes reading the same library share the
+ * same pages.
+ */
+class PileupLibrary : public MsgService
+{
+
+  public:
+
+    /** Constructor **/
+    PileupLibrary( std::string name="PileupLibrary" );
+
+    /** Destructor **/
+    ~PileupLibrary();
+
+    /*! Convert all minbias HIT files into the library file */
+    bool build( const std::vector<std::string> &paths, std::string output,
+                std::string ntupleName="CollectionTree", std::string hitsKey="Hits", std::string eventKey="Events" );
+
+    /*! Map the library file into memory */
+    bool open( std::string path );
+
+    /*! Unmap the library file */
+    void close();
+
+    bool isOpen() const { return m_data!=nullptr; };
+
+    /*! Format version written by build (and required by open) */
+    static uint32_t version();
+
+    /*! Number of minbias events */
+    size_t size() const { return m_nEvents; };
+
+    /*! Average mu of the event */
+    float avgmu( size_t evt ) const { return m_avgmu[evt]; };
+
+    /*! First and last (not included) hit position of the event */
+    uint64_t begin( size_t evt ) const { return m_eventOffset[evt]; };
+    uint64_t end( size_t evt ) const { return m_eventOffset[evt+1]; };
+
+    /*! Hit information */
+    uint64_t hash( uint64_t hit ) const { return m_hash[hit]; };
+
+    /*! Dense cell index of the hit (between 0 and cells()) */
+    uint32_t cell( uint64_t hit ) const { return m_cell[hit]; };
+
+    /*! Number of distinct cells into the library */
+    size_t cells() const { return m_nCells; };
+
+    /*! Hash of the dense cell */
+    uint64_t cellHash( uint32_t cell ) const { return m_cellHash[cell]; };
+
+    /*! Energy deposit of the hit into the bunch crossing (zero case bc not exist) */
+    float edep( uint64_t hit, int bcid ) const
+    {
+      int idx = bcid - m_bcidStart[hit];
+      if( idx < 0 || bcid > m_bcidEnd[hit] ) return 0;
+      return m_edep[ m_edepOffset[hit] + idx ];
+    };
+
+  private:
+
+    // mapped file
+    void  *m_data;
+    size_t m_size;
+
+    uint64_t m_nEvents;
+    uint64_t m_nHits;
+    uint64_t m_nEdep;
+    uint64_t m_nCells;
+
+    // columns (pointers into the mapped file)
+    const uint64_t *m_eventOffset;
+    const float    *m_avgmu;
+    const uint64_t *m_hash;
+    const int32_t  *m_bcidStart;
+    const int32_t  *m_bcidEnd;
+    const uint64_t *m_edepOffset;
+    const uint64_t *m_cellHash;
+    const uint32_t *m_cell;
+    const float    *m_edep;
+};
+
+#endif
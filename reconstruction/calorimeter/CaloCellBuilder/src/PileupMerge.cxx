@@ -6,8 +6,11 @@
 #include "EventInfo/EventInfoConverter.h"
 #include "TTree.h"
 #include "TChain.h"
+#include "TROOT.h"
 #include <omp.h>
+#include <numeric>
 #include <stdexcept> 
+#include <unordered_map>
 
 using namespace SG;
 using namespace Gaugi;
@@ -27,11 +30,22 @@ using namespace Gaugi;
  * - PileupAvg: Average number of pileup interactions (mu).
  * - PileupSigma: Fluctuations in mu.
  * - BunchIdStart/End: Time window in bunch crossings (-20 to 20 usually).
+ * - Low/HighPileupLibrary: Memory-mapped minbias libraries (see PileupLibrary). If set,
+ *   the events are sampled from memory instead of reading the input files.
+ * - PremixedLibrary: Library of premixed (pileup only) events. If set, exactly one
+ *   premixed event is added into each signal event (no minbias sampling).
+ * - OnlyPileup: Do not copy the input hit energy (used to produce the premixed events).
+ * - NumberOfThreads: Threads used to merge the bunch crossings (all available if zero).
+ *   Each bunch crossing has its own random stream (see SG::EventContext::random), so
+ *   the result is the same for any number of threads, event order or job splitting.
  */
 PileupMerge::PileupMerge( std::string name ) : 
   IMsgService(name),
   Algorithm(),
-  m_rng(128)
+  m_streamKey(0),
+  m_lowPileupLibrary(name+"_LowPileupLibrary"),
+  m_highPileupLibrary(name+"_HighPileupLibrary"),
+  m_premixedLibrary(name+"_PremixedLibrary")
 {
   declareProperty( "InputHitsKey"        , m_inputHitsKey="Hits"                 );
   declareProperty( "OutputHitsKey"       , m_outputHitsKey="Hits_Merged"         );
@@ -48,6 +62,11 @@ PileupMerge::PileupMerge( std::string name ) :
   declareProperty( "NtupleName"          , m_ntupleName="CollectionTree"         );
   declareProperty( "LowPileupInputFiles" , m_lowPileupInputFiles={}              );
   declareProperty( "HighPileupInputFiles", m_highPileupInputFiles={}             );
+  declareProperty( "LowPileupLibrary"    , m_lowPileupLibraryPath=""             );
+  declareProperty( "HighPileupLibrary"   , m_highPileupLibraryPath=""            );
+  declareProperty( "PremixedLibrary"     , m_premixedLibraryPath=""              );
+  declareProperty( "OnlyPileup"          , m_onlyPileup=false                    );
+  declareProperty( "NumberOfThreads"     , m_numberOfThreads=1                   );
 }
 
 //!=====================================================================
@@ -61,7 +80,43 @@ StatusCode PileupMerge::initialize()
 {
   CHECK_INIT();
   setMsgLevel(m_outputLevel);
-  m_rng.SetSeed(m_seed);
+  m_streamKey = RandomStream::hash( name() );
+
+  if( m_numberOfThreads <= 0 ) m_numberOfThreads = omp_get_max_threads();
+  // one minbias chain is read by each thread
+  if( m_numberOfThreads > 1 ) ROOT::EnableThreadSafety();
+  MSG_INFO( "Merging the bunch crossings with " << m_numberOfThreads << " thread(s)." );
+
+  // the same dense cell index for all libraries
+  auto index = [this]( const PileupLibrary &library, std::vector<int32_t> &cells ){
+    cells.resize( library.cells() );
+    for ( uint32_t cell=0; cell < library.cells(); ++cell )
+      cells[cell] = m_cellIndex.emplace( library.cellHash(cell), (int32_t)m_cellIndex.size() ).first->second;
+  };
+
+  if( !m_premixedLibraryPath.empty() ){
+    if( !m_premixedLibrary.open( m_premixedLibraryPath ) || m_premixedLibrary.size()==0 ){
+      MSG_ERROR( "It's not possible to open the premixed library (or it is empty)." );
+      return StatusCode::FAILURE;
+    }
+    index( m_premixedLibrary, m_premixedCells );
+    MSG_INFO( "Premixed library with " << m_premixedLibrary.size() << " events and " << m_cellIndex.size() << " cells." );
+    return StatusCode::SUCCESS;
+  }
+
+  if( !m_lowPileupLibraryPath.empty() || !m_highPileupLibraryPath.empty() ){
+    if( !m_lowPileupLibrary.open( m_lowPileupLibraryPath ) || !m_highPileupLibrary.open( m_highPileupLibraryPath ) ){
+      MSG_ERROR( "It's not possible to open the pileup libraries." );
+      return StatusCode::FAILURE;
+    }
+    if( m_lowPileupLibrary.size()==0 || m_highPileupLibrary.size()==0 ){
+      MSG_ERROR( "Empty pileup library." );
+      return StatusCode::FAILURE;
+    }
+    index( m_lowPileupLibrary , m_lowPileupCells  );
+    index( m_highPileupLibrary, m_highPileupCells );
+    MSG_INFO( "Pileup libraries with " << m_cellIndex.size() << " cells." );
+  }
   return StatusCode::SUCCESS;
 }
 
@@ -77,14 +132,14 @@ StatusCode PileupMerge::finalize()
 
 StatusCode PileupMerge::bookHistograms( EventContext &ctx ) const
 {
-  Read(ctx, m_lowPileupInputFiles , "low_minbias" );
-  Read(ctx, m_highPileupInputFiles, "high_minbias");
-
-
-
-  MSG_INFO( "Link all branches..." );
-  auto store = ctx.getStoreGateSvc();
+  // nothing to link, all minbias events come from the libraries
+  if( m_lowPileupLibrary.isOpen() || m_premixedLibrary.isOpen() ) return StatusCode::SUCCESS;
 
+  // one chain for each thread
+  for ( int thread=0; thread < m_numberOfThreads; ++thread ){
+    Read(ctx, m_lowPileupInputFiles , "low_minbias_" +std::to_string(thread) );
+    Read(ctx, m_highPileupInputFiles, "high_minbias_"+std::to_string(thread) );
+  }
 
   return StatusCode::SUCCESS;
 }
@@ -131,6 +186,11 @@ StatusCode PileupMerge::post_execute( EventContext &ctx ) const
     MSG_FATAL("It's not possible to read the xAOD::CaloHitContainer from this Contaxt using this key " << m_inputHitsKey );
   }
 
+  SG::ReadHandle<xAOD::EventInfoContainer> event(m_inputEventKey, ctx);
+  if( !event.isValid() ){
+    MSG_FATAL( "It's not possible to read the xAOD::EventInfoContainer from this Context" );
+  }
+
   std::vector<xAOD::CaloHit*> vec_hits;
   unsigned retry=0;
   bool ok(false);
@@ -146,7 +206,11 @@ StatusCode PileupMerge::post_execute( EventContext &ctx ) const
       MSG_INFO("Allocoate unconst hits...");
       allocate( container, vec_hits );
       MSG_INFO("Merging...")
-      nPileupMean = merge(ctx, vec_hits);
+      if( m_premixedLibrary.isOpen() ){
+        nPileupMean = premix(ctx, vec_hits);
+      }else{
+        nPileupMean = m_lowPileupLibrary.isOpen() ? mergeLibraries(ctx, vec_hits) : merge(ctx, vec_hits);
+      }
       MSG_INFO("Pileup mean: "<< nPileupMean)
       break;
     }catch (const std::runtime_error& e) {
@@ -176,10 +240,6 @@ StatusCode PileupMerge::post_execute( EventContext &ctx ) const
     MSG_INFO( "Writing new container event info...");
     {
       MSG_INFO("Avgmu: " << nPileupMean);
-      SG::ReadHandle<xAOD::EventInfoContainer> event(m_inputEventKey, ctx);
-      if( !event.isValid() ){
-        MSG_FATAL( "It's not possible to read the xAOD::EventInfoContainer from this Context" );
-      }
       // get the old ones
       auto const_evt = (**event.ptr()).front();
       SG::WriteHandle<xAOD::EventInfoContainer> output_events(m_outputEventKey, ctx);
@@ -208,152 +268,263 @@ StatusCode PileupMerge::post_execute( EventContext &ctx ) const
  * Iterates through bunch crossings (BCID) from start to end.
  * For each BCID, it determines the number of pileup interactions (Poisson)
  * and randomly selects events from the low/high pileup input files/trees.
- * It then reads the hits from those events and adds their energy to the
- * corresponding signal hits.
+ * It then reads the hits from those events and sums their energy into the
+ * overlay row of the bunch crossing, which is added into the signal hits
+ * at the end.
+ *
+ * The bunch crossings are shared by the threads. Each thread reads its own
+ * chains and each bunch crossing has its own random stream and overlay row,
+ * so the result does not depend on the number of threads.
  * 
  * @return The average number of pileup interactions added per bunch crossing.
  */
 float PileupMerge::merge( EventContext &ctx, std::vector<xAOD::CaloHit*> &vec_hits ) const{
 
-  MSG_INFO( "Link all branches..." );
-  auto store = ctx.getStoreGateSvc();
+  MSG_DEBUG( "Link the branches of the minbias chains..." );
+  std::vector<MinbiasReader> low_pileup( m_numberOfThreads ), high_pileup( m_numberOfThreads );
+  for ( int thread=0; thread < m_numberOfThreads; ++thread ){
+    link( ctx, "low_minbias_" +std::to_string(thread), low_pileup[thread]  );
+    link( ctx, "high_minbias_"+std::to_string(thread), high_pileup[thread] );
+  }
 
-  auto tree_low_pileup = ((TChain*)store->decorator("low_minbias"));
-  tree_low_pileup->SetBranchStatus("*",0);
-  tree_low_pileup->SetBranchStatus(("CaloHitContainer_"+m_inputHitsKey+".edep").c_str(), 1);
-  //tree_low_pileup->SetBranchStatus(("CaloHitContainer_"+m_inputHitsKey+".tof").c_str(), 1);
-  tree_low_pileup->SetBranchStatus(("CaloHitContainer_"+m_inputHitsKey+".bcid_start").c_str(), 1);
-  tree_low_pileup->SetBranchStatus(("CaloHitContainer_"+m_inputHitsKey+".bcid_end").c_str(), 1);
-  tree_low_pileup->SetBranchStatus(("CaloHitContainer_"+m_inputHitsKey+".hash").c_str(), 1);
-  tree_low_pileup->SetBranchStatus(("EventInfoContainer_"+m_inputEventKey+".avgmu").c_str(), 1);
-  
+  if (high_pileup[0].tree->GetEntry( 0 ) < 0){
+    MSG_FATAL("Not possible to read this event. repeat...");
+  }
 
+  float nHighPileup = high_pileup[0].events->at(0).avgmu;
+  int nWin = m_bcid_end - m_bcid_start;
+  std::unordered_map<unsigned long int, int > hit_map;
 
+  for (unsigned int idx=0; idx<(*high_pileup[0].hits).size(); idx++ )
+  {
+    hit_map.insert( std::make_pair((*high_pileup[0].hits)[idx].hash, idx) );
+  }
 
-  std::vector<xAOD::CaloHit_t> *collection_hits_low_pileup=nullptr;
-  InitBranch( tree_low_pileup,  ("CaloHitContainer_"+m_inputHitsKey).c_str(), &collection_hits_low_pileup );
-  std::vector<xAOD::EventInfo_t> *collection_events_low_pileup=nullptr;
-  InitBranch( tree_low_pileup,  ("EventInfoContainer_"+m_inputEventKey).c_str(), &collection_events_low_pileup );
+  // position of each signal hit into the minbias collections (all minbias events are saved with
+  // all hits in the same order, so the positions found into the first high pileup event are used)
+  std::vector<int> source( vec_hits.size(), -1 );
+  for ( size_t idx=0; idx < vec_hits.size(); ++idx )
+  {
+    auto it = hit_map.find( vec_hits[idx]->hash() );
+    if( it != hit_map.end() ) source[idx] = it->second;
+  }
 
-  auto tree_high_pileup = ((TChain*)store->decorator("high_minbias"));
-  tree_high_pileup->SetBranchStatus("*",0);
-  tree_high_pileup->SetBranchStatus(("CaloHitContainer_"+m_inputHitsKey+".edep").c_str(), 1);
-  //tree_high_pileup->SetBranchStatus(("CaloHitContainer_"+m_inputHitsKey+".tof").c_str(), 1);
-  tree_high_pileup->SetBranchStatus(("CaloHitContainer_"+m_inputHitsKey+".bcid_start").c_str(), 1);
-  tree_high_pileup->SetBranchStatus(("CaloHitContainer_"+m_inputHitsKey+".bcid_end").c_str(), 1);
-  tree_high_pileup->SetBranchStatus(("CaloHitContainer_"+m_inputHitsKey+".hash").c_str(), 1);
-  tree_high_pileup->SetBranchStatus(("EventInfoContainer_"+m_inputEventKey+".avgmu").c_str(), 1);
+  Overlay pileup( m_bcid_start, m_bcid_end, vec_hits.size() );
 
+  auto rng = random( ctx, 0 );
+  int pileupAvg = (int)rng.gaus( m_pileupAvg, m_pileupSigma);
 
+  MSG_INFO("Merging with Pileup Avg: "<< pileupAvg);
 
+  int nBC = m_bcid_end - m_bcid_start + 1;
+  std::vector<int> nPileup( nBC, 0 );
+  bool failed(false);
 
+  #pragma omp parallel for schedule(dynamic) num_threads(m_numberOfThreads)
+  for ( int ibc = 0; ibc < nBC; ++ibc ){
 
-  std::vector<xAOD::CaloHit_t> *collection_hits_high_pileup=nullptr;
-  InitBranch( tree_high_pileup,  ("CaloHitContainer_"+m_inputHitsKey).c_str(), &collection_hits_high_pileup );
-  std::vector<xAOD::EventInfo_t> *collection_events_high_pileup=nullptr;
-  InitBranch( tree_high_pileup,  ("EventInfoContainer_"+m_inputEventKey).c_str(), &collection_events_high_pileup );
+    int bcid = m_bcid_start + ibc;
+    auto rng_bc = random( ctx, ibc+1 );
+    MinbiasReader &low  = low_pileup [omp_get_thread_num()];
+    MinbiasReader &high = high_pileup[omp_get_thread_num()];
+    float *row = pileup.bc(bcid);
 
-  if (tree_high_pileup->GetEntry( 0 ) < 0){
-    MSG_FATAL("Not possible to read this event. repeat...");
+    nPileup[ibc] = poisson( rng_bc, pileupAvg );
+    int kPileup=nPileup[ibc];
+    long entry=-1;
+
+    while (kPileup>0)
+    {
+      MinbiasReader &reader = kPileup>nHighPileup? high : low;
+
+      if (entry > (reader.tree->GetEntries()-1)){
+        entry=-1;
+      }
+
+      if (entry<0){
+        entry = rng_bc.integer(reader.tree->GetEntries()-1);
+      }
+
+      // no exception can leave the parallel loop, the event is repeated at the end
+      if (reader.tree->GetEntry( entry ) <= 0 || reader.events->empty() || reader.hits->empty()){
+        #pragma omp atomic write
+        failed = true;
+        break;
+      }
+      entry++;
+      kPileup -= reader.events->at(0).avgmu;
+
+      // sum the minbias energy into the bunch crossing row (no allocation per hit)
+      const auto &minbias_hits = *reader.hits;
+      for ( size_t idx=0; idx < vec_hits.size(); ++idx )
+      {
+        if( source[idx] < 0 || source[idx] >= (int)minbias_hits.size() ) continue;
+        const auto &hit_t = minbias_hits[source[idx]];
+        int pos = bcid - hit_t.bcid_start;
+        if( pos >= 0 && pos < (int)hit_t.edep.size() ) row[idx] += hit_t.edep[pos];
+      }
+    }// while
   }
 
-  float nHighPileup = collection_events_high_pileup->at(0).avgmu;
-  int nWin = m_bcid_end - m_bcid_start;
-  std::map<unsigned long int, int > hit_map;
+  for ( auto &reader : low_pileup  ){ delete reader.hits; delete reader.events; }
+  for ( auto &reader : high_pileup ){ delete reader.hits; delete reader.events; }
 
-  for (unsigned int idx=0; idx<(*collection_hits_high_pileup).size(); idx++ )
-  {
-    auto hit_t = (*collection_hits_high_pileup).at(idx);
-    hit_map.insert( std::make_pair(hit_t.hash, idx) );
+  if (failed){
+    MSG_FATAL("Not possible to read the minbias events. repeat...");
   }
 
+  overlay( pileup, vec_hits );
+  int nPileUpMean = std::accumulate( nPileup.begin(), nPileup.end(), 0 );
+  return nPileUpMean/nWin;
+}
+
+//!=====================================================================
+
+/**
+ * @brief Merge using the memory-mapped minbias libraries.
+ *
+ * Same sampling as the file based merge (random start and sequential events,
+ * high pileup events while the remaining pileup is higher than the high
+ * pileup avgmu). The library hits are scatter-added by their dense cell
+ * (see PileupLibrary) into the overlay row of the bunch crossing, without
+ * any hash lookup, I/O or allocation per minbias hit. The libraries are
+ * read only, so all threads share them. The signal hits are only updated
+ * at the end.
+ */
+float PileupMerge::mergeLibraries( EventContext &ctx, std::vector<xAOD::CaloHit*> &vec_hits ) const{
 
-  std::vector<xAOD::CaloHit_t>   *collection_hits=nullptr;
-  std::vector<xAOD::EventInfo_t> *collection_events=nullptr;
-  TTree *tree=nullptr;
+  Overlay pileup( m_bcid_start, m_bcid_end, vec_hits.size() );
 
-  int nPileUpMean(0);
-  int pileupAvg = (int)m_rng.Gaus( m_pileupAvg, m_pileupSigma);
+  // signal hit of each library cell
+  auto cellTarget = target( pileup, vec_hits );
+  std::vector<int32_t> lowTarget( m_lowPileupCells.size() ), highTarget( m_highPileupCells.size() );
+  for ( size_t cell=0; cell < lowTarget.size(); ++cell )
+    lowTarget[cell] = cellTarget[m_lowPileupCells[cell]];
+  for ( size_t cell=0; cell < highTarget.size(); ++cell )
+    highTarget[cell] = cellTarget[m_highPileupCells[cell]];
+
+  float nHighPileup = m_highPileupLibrary.avgmu(0);
+  int nWin = m_bcid_end - m_bcid_start;
+  auto rng = random( ctx, 0 );
+  int pileupAvg = (int)rng.gaus( m_pileupAvg, m_pileupSigma);
 
   MSG_INFO("Merging with Pileup Avg: "<< pileupAvg);
 
-  int eventNumber=-1;
+  int nBC = m_bcid_end - m_bcid_start + 1;
+  std::vector<int> nPileup( nBC, 0 );
+
+  #pragma omp parallel for schedule(dynamic) num_threads(m_numberOfThreads)
+  for ( int ibc = 0; ibc < nBC; ++ibc ){
 
-  for ( int bcid = m_bcid_start;  bcid <= m_bcid_end; ++bcid){
+    int bcid = m_bcid_start + ibc;
+    auto rng_bc = random( ctx, ibc+1 );
+    float *row = pileup.bc(bcid);
 
-    int nPileup = poisson(pileupAvg);
-    int kPileup=nPileup;
-    nPileUpMean+=nPileup;
+    nPileup[ibc] = poisson( rng_bc, pileupAvg );
+    int kPileup=nPileup[ibc];
+    long entry=-1;
 
     while (kPileup>0)
     {
-      tree                 = kPileup>nHighPileup? tree_high_pileup                 : tree_low_pileup;
-      collection_hits      = kPileup>nHighPileup? collection_hits_high_pileup      : collection_hits_low_pileup;
-      collection_events    = kPileup>nHighPileup? collection_events_high_pileup    : collection_events_low_pileup;
-  
-
+      bool high = kPileup>nHighPileup;
+      const PileupLibrary &library = high? m_highPileupLibrary : m_lowPileupLibrary;
+      const int32_t *to = high? highTarget.data() : lowTarget.data();
 
-      if (eventNumber > (tree->GetEntries()-1)){
-        eventNumber=-1;
+      if (entry > (long)library.size()-1){
+        entry=-1;
       }
 
-      if (eventNumber<0){
-        eventNumber = m_rng.Integer(tree->GetEntries()-1);
+      if (entry<0){
+        entry = rng_bc.integer(library.size()-1);
       }
-      
-      MSG_DEBUG("Reading event " << eventNumber);
-   
 
-      if (tree->GetEntry( eventNumber ) <= 0){
-        MSG_FATAL("Not possible to read this event. repeat...");
-      }
+      kPileup -= library.avgmu(entry);
 
-      if (collection_events->empty()){
-        MSG_FATAL("Collection hits is empty!");
-      }
-      if (collection_hits->empty()){
-        MSG_FATAL("Collection hits is empty!");
-      }
-      eventNumber++;
-      kPileup -= collection_events->at(0).avgmu;
+      for ( uint64_t hit=library.begin(entry); hit < library.end(entry); ++hit )
+        row[ to[library.cell(hit)] ] += library.edep(hit, bcid);
 
-      for (auto hit_main : vec_hits)
-      {
-        if(hit_map.count(hit_main->hash()))
-        {
-          int idx = hit_map[hit_main->hash()];
-          auto hit_t = (*collection_hits).at(idx);
-          xAOD::CaloHit *hit = nullptr;
-          xAOD::CaloHitConverter cnv;
-          cnv.convert(hit_t, hit);
-          hit_main->edep( bcid, hit->edep(bcid) ); 
-          delete hit;
-        }
-      }
-      MSG_DEBUG( "Merging a total of " << nPileup << " pileup into bunch-crossing " << bcid << ". Current pileup is " <<(nPileup - kPileup));  
+      entry++;
     }// while
   }
 
-  delete collection_hits;
-  delete collection_events;
+  overlay( pileup, vec_hits );
+  int nPileUpMean = std::accumulate( nPileup.begin(), nPileup.end(), 0 );
   return nPileUpMean/nWin;
 }
 
 //!=====================================================================
 
+/**
+ * @brief Overlay one premixed event.
+ *
+ * The premixed events already hold the pileup summed over all bunch crossings
+ * (see premix_trf), so all bunch crossings of one event are added, without any
+ * sampling. The premixed event is chosen by the signal event number, so the
+ * same signal event always gets the same pileup, independent of the job splitting.
+ *
+ * @return The average number of pileup interactions of the premixed event.
+ */
+float PileupMerge::premix( EventContext &ctx, std::vector<xAOD::CaloHit*> &vec_hits ) const
+{
+  long nPremixed = m_premixedLibrary.size();
+  long premixed  = ( ctx.getEventNumber() + (long)m_seed ) % nPremixed;
+  if( premixed < 0 ) premixed += nPremixed;
+  MSG_DEBUG( "Overlay the premixed event " << premixed );
+
+  Overlay pileup( m_bcid_start, m_bcid_end, vec_hits.size() );
+
+  // signal hit of each library cell
+  auto cellTarget = target( pileup, vec_hits );
+  std::vector<int32_t> to( m_premixedCells.size() );
+  for ( size_t cell=0; cell < to.size(); ++cell )
+    to[cell] = cellTarget[m_premixedCells[cell]];
+
+  #pragma omp parallel for num_threads(m_numberOfThreads)
+  for ( int bcid = m_bcid_start;  bcid <= m_bcid_end; ++bcid )
+  {
+    float *row = pileup.bc(bcid);
+    for ( uint64_t hit=m_premixedLibrary.begin(premixed); hit < m_premixedLibrary.end(premixed); ++hit )
+      row[ to[m_premixedLibrary.cell(hit)] ] += m_premixedLibrary.edep(hit, bcid);
+  }
+
+  overlay( pileup, vec_hits );
+  return m_premixedLibrary.avgmu(premixed);
+}
+
+//!=====================================================================
+
+std::vector<int32_t> PileupMerge::target( const Overlay &pileup, const std::vector<xAOD::CaloHit*> &vec_hits ) const
+{
+  std::vector<int32_t> cellTarget( m_cellIndex.size(), pileup.trash() );
+  for ( size_t idx=0; idx < vec_hits.size(); ++idx )
+  {
+    auto it = m_cellIndex.find( vec_hits[idx]->hash() );
+    if( it != m_cellIndex.end() ) cellTarget[it->second] = idx;
+  }
+  return cellTarget;
+}
+
+//!=====================================================================
+
+void PileupMerge::overlay( const Overlay &pileup, std::vector<xAOD::CaloHit*> &vec_hits ) const
+{
+  for ( size_t idx=0; idx < vec_hits.size(); ++idx )
+  {
+    auto hit = vec_hits[idx];
+    for ( int bcid = pileup.bcidStart; bcid <= pileup.bcidEnd; ++bcid )
+      hit->edep( bcid, pileup.bc(bcid)[idx] );
+  }
+}
+
+//!=====================================================================
+
 void PileupMerge::allocate( SG::ReadHandle<xAOD::CaloHitContainer> &container , std::vector<xAOD::CaloHit*> &vec_hits ) const{
 
   MSG_INFO( "Convert hits to hash map with size " << container.ptr()->size() <<"...");
   for( const auto& const_hit : **container.ptr())
   {
     // Create the truth cell 
-    auto hit = new xAOD::CaloHit( const_hit->eta(),
-                                  const_hit->phi(),
-                                  const_hit->deltaEta(),
-                                  const_hit->deltaPhi(),
-                                  const_hit->hash(),
-                                  const_hit->sampling(),
-                                  const_hit->detector(),
+    auto hit = new xAOD::CaloHit( const_hit->geometry(),
                                   const_hit->bc_duration(),
                                   const_hit->bcid_start(),
                                   const_hit->bcid_end()
@@ -361,9 +532,12 @@ void PileupMerge::allocate( SG::ReadHandle<xAOD::CaloHitContainer> &container ,
 
 
 
-    for ( int bcid = hit->bcid_start();  bcid <= hit->bcid_end(); ++bcid )
-    {
-      hit->edep( bcid, const_hit->edep(bcid) ); // truth energy for each bunch crossing
+    // only the pileup into the output (premixed events)
+    if( !m_onlyPileup ){
+      for ( int bcid = hit->bcid_start();  bcid <= hit->bcid_end(); ++bcid )
+      {
+        hit->edep( bcid, const_hit->edep(bcid) ); // truth energy for each bunch crossing
+      }
     }
     vec_hits.push_back(hit);
   }
@@ -408,10 +582,10 @@ TBranch* PileupMerge::InitBranch(TTree* fChain, std::string branch_name, T* para
 
 //!=====================================================================
 
-int PileupMerge::poisson(double nAvg) const
+int PileupMerge::poisson( RandomStream &rng, double nAvg ) const
 {
   // Random number.
-  double rPoisson = m_rng.Uniform(0,1) * exp(nAvg);
+  double rPoisson = rng.uniform() * exp(nAvg);
   // Initialize.
   double rSum  = 0.;
   double rTerm = 1.;
@@ -429,6 +603,13 @@ int PileupMerge::poisson(double nAvg) const
 
 //!=====================================================================
 
+RandomStream PileupMerge::random( const EventContext &ctx, int stream ) const
+{
+  return ctx.random( m_streamKey, ((uint64_t)(uint32_t)(int)m_seed << 32) | (uint32_t)stream );
+}
+
+//!=====================================================================
+
 
 void PileupMerge::Read( EventContext &ctx, const std::vector<std::string> &paths, std::string name ) const
 {
@@ -440,3 +621,21 @@ void PileupMerge::Read( EventContext &ctx, const std::vector<std::string> &paths
   }
   store->decorate( name , file );
 }
+
+//!=====================================================================
+
+void PileupMerge::link( EventContext &ctx, std::string name, MinbiasReader &reader ) const
+{
+  auto store = ctx.getStoreGateSvc();
+  reader.tree = (TChain*)store->decorator(name);
+  reader.tree->SetBranchStatus("*",0);
+  reader.tree->SetBranchStatus(("CaloHitContainer_"+m_inputHitsKey+".edep").c_str(), 1);
+  reader.tree->SetBranchStatus(("CaloHitContainer_"+m_inputHitsKey+".bcid_start").c_str(), 1);
+  reader.tree->SetBranchStatus(("CaloHitContainer_"+m_inputHitsKey+".bcid_end").c_str(), 1);
+  reader.tree->SetBranchStatus(("CaloHitContainer_"+m_inputHitsKey+".hash").c_str(), 1);
+  reader.tree->SetBranchStatus(("EventInfoContainer_"+m_inputEventKey+".avgmu").c_str(), 1);
+  reader.hits   = nullptr;
+  reader.events = nullptr;
+  InitBranch( reader.tree, ("CaloHitContainer_"+m_inputHitsKey).c_str(), &reader.hits );
+  InitBranch( reader.tree, ("EventInfoContainer_"+m_inputEventKey).c_str(), &reader.events );
+}
@@ -7,8 +7,11 @@
 #include "EventInfo/EventInfoContainer.h"
 #include "TruthParticle/TruthParticleContainer.h"
 #include "CaloHit/CaloHitConverter.h"
+#include "PileupLibrary.h"
 //#include "EventInfo/EventInfoConverter.h"
-#include "TRandom3.h"
+#include "GaugiKernel/Random.h"
+#include "TChain.h"
+#include <unordered_map>
 
 
 /**
@@ -47,16 +50,61 @@ class PileupMerge : public Gaugi::Algorithm
 
   private:
  
-
+    /**
+     * @brief Pileup energy of each signal hit for each bunch crossing.
+     *
+     * Flat array indexed by [bcid][hit], where hit is the position of the signal hit
+     * into the merged hits, so the sum of the minbias events into one bunch crossing
+     * is done into one contiguous row. The last position of each row (trash) receives
+     * the energy of the cells without signal hit, so the sum is done without branches.
+     */
+    struct Overlay
+    {
+      Overlay( int bcid_start, int bcid_end, size_t nHits ):
+        bcidStart(bcid_start), bcidEnd(bcid_end), stride(nHits+1),
+        edep( (bcid_end-bcid_start+1)*(nHits+1), 0 )
+      {};
+
+      /*! Row of the bunch crossing */
+      float* bc( int bcid ) { return edep.data() + (bcid-bcidStart)*stride; };
+      const float* bc( int bcid ) const { return edep.data() + (bcid-bcidStart)*stride; };
+      /*! Position used by the cells without signal hit */
+      int32_t trash() const { return stride-1; };
+
+      int bcidStart;
+      int bcidEnd;
+      size_t stride;
+      std::vector<float> edep;
+    };
+
+    /*! Minbias chain and branch buffers (one for each thread) */
+    struct MinbiasReader
+    {
+      TChain *tree=nullptr;
+      std::vector<xAOD::CaloHit_t> *hits=nullptr;
+      std::vector<xAOD::EventInfo_t> *events=nullptr;
+    };
 
     template <class T> TBranch* InitBranch(TTree* fChain, std::string branch_name, T* param) const;
-    int poisson(double nAvg) const;
+    int poisson( Gaugi::RandomStream &rng, double nAvg ) const;
+    /*! Random stream of the event (0 for the pileup avg and 1+n for the n-th bunch crossing) */
+    Gaugi::RandomStream random( const SG::EventContext &ctx, int stream ) const;
     void Read( SG::EventContext &ctx, const std::vector<std::string> &paths, std::string name ) const;
+    /*! Link the minbias branches of the chain into the reader buffers */
+    void link( SG::EventContext &ctx, std::string name, MinbiasReader &reader ) const;
 
 
     void allocate( SG::ReadHandle<xAOD::CaloHitContainer> &container , std::vector<xAOD::CaloHit*> &vec_hits ) const;
     void deallocate( std::vector<xAOD::CaloHit*> &vec_hits ) const;
     float merge( SG::EventContext &ctx, std::vector<xAOD::CaloHit*> &vec_hits ) const;
+    /*! Same as merge but sampling the minbias events from the memory-mapped libraries */
+    float mergeLibraries( SG::EventContext &ctx, std::vector<xAOD::CaloHit*> &vec_hits ) const;
+    /*! Overlay exactly one premixed (pileup only) event from the premixed library */
+    float premix( SG::EventContext &ctx, std::vector<xAOD::CaloHit*> &vec_hits ) const;
+    /*! Signal hit (position into the overlay) of each dense cell. Trash case the cell has no signal hit */
+    std::vector<int32_t> target( const Overlay &pileup, const std::vector<xAOD::CaloHit*> &vec_hits ) const;
+    /*! Add the pileup energy into the signal hits (one pass over the hits) */
+    void overlay( const Overlay &pileup, std::vector<xAOD::CaloHit*> &vec_hits ) const;
 
 
 
@@ -66,10 +114,14 @@ class PileupMerge : public Gaugi::Algorithm
     std::string m_outputEventKey;
 
     int m_outputLevel;
-    mutable TRandom3 m_rng;
+    /*! Number of threads used to merge the bunch crossings (all available if zero) */
+    int m_numberOfThreads;
     float m_pileupAvg;
     float m_pileupSigma;
+    /*! Shift all random streams of this tool (the run seed comes from the event context) */
     float m_seed;
+    /*! Random streams key (tool name hash) */
+    uint64_t m_streamKey;
     int   m_maxRetry;
     float m_trunc_mu;
     /*! The start bunch crossing id for energy estimation */
@@ -81,6 +133,24 @@ class PileupMerge : public Gaugi::Algorithm
     std::vector<std::string> m_highPileupInputFiles;
     std::string m_ntupleName;
 
+    /*! Minbias libraries (see PileupLibrary). Used in place of the input files if not empty */
+    std::string m_lowPileupLibraryPath;
+    std::string m_highPileupLibraryPath;
+    PileupLibrary m_lowPileupLibrary;
+    PileupLibrary m_highPileupLibrary;
+    /*! Premixed library (pileup only events summed over the bunch crossing window, see premix_trf).
+     * One premixed event is added into each signal event in place of the minbias sampling */
+    std::string m_premixedLibraryPath;
+    PileupLibrary m_premixedLibrary;
+    /*! Do not copy the input hit energy (output with pileup only, used to build the premixed events) */
+    bool m_onlyPileup;
+    /*! Dense index of each cell found into the libraries (by hash) */
+    std::unordered_map<unsigned long int, int32_t> m_cellIndex;
+    /*! Dense index of each library cell */
+    std::vector<int32_t> m_lowPileupCells;
+    std::vector<int32_t> m_highPileupCells;
+    std::vector<int32_t> m_premixedCells;
+
 
 
 };
@@ -1,8 +1,7 @@
 
 #include "CaloCell/CaloDetDescriptor.h"
 #include "PulseGenerator.h"
-#include "Randomize.hh"
-#include "TRandom.h"
+#include <fstream>
 
 
 using namespace Gaugi;
@@ -21,13 +20,19 @@ using namespace Gaugi;
  * - Pedestal: Baseline voltage.
  * - NoiseMean/Std: Electronic noise parameters.
  * - SamplingRate: Readout sampling rate (usually 25ns).
+ * - PulsePerBunch: Keep the pulse of each bunch crossing into the cell.
+ *
+ * The shaper is tabulated at initialize and all cells of one sampling are
+ * generated together: energy[bcid][cell] and phase[bcid][cell] are read into
+ * contiguous rows and summed into pulse[sample][cell], with loops over cells
+ * that the compiler can vectorize and no allocation for each cell.
  */
 PulseGenerator::PulseGenerator( std::string name ) : 
   IMsgService(name),
   AlgTool(),
   m_shaperZeroIndex(0),
   m_shaperResolution(0),
-  m_rng(0)
+  m_streamKey(0)
 {
   declareProperty( "ShaperFile"       , m_shaperFile=""         );
   declareProperty( "Pedestal"         , m_pedestal = 0          );
@@ -39,6 +44,7 @@ PulseGenerator::PulseGenerator( std::string name ) :
   declareProperty( "NoiseStd"         , m_noiseStd=0            );
   declareProperty( "NSamples"         , m_nsamples=7            );
   declareProperty( "StartSamplingBC"  , m_startSamplingBC=0     );
+  declareProperty( "PulsePerBunch"    , m_pulsePerBunch=false   );
 }
 
 //!=====================================================================
@@ -53,6 +59,8 @@ StatusCode PulseGenerator::initialize()
   setMsgLevel( (MSG::Level)m_outputLevel );
   MSG_DEBUG( "Reading shaper values from: " << m_shaperFile << " and " << m_nsamples << " samples.");
   ReadShaper( m_shaperFile );
+  TabulateShaper();
+  m_streamKey = RandomStream::hash( name() );
   return StatusCode::SUCCESS;
 }
 
@@ -67,40 +75,116 @@ StatusCode PulseGenerator::finalize()
 
 /**
  * @brief Generates the pulse for a cell.
- * 
- * Loops over bunch crossings and sums the contribution of energy deposits
- * from each BCID, weighted by the shaper function at the appropriate time lag.
- * Adds noise and sets the final pulse in the cell object.
  */
 StatusCode PulseGenerator::execute( SG::EventContext &ctx, Gaugi::EDM *edm ) const
 {
-  auto *cell = static_cast<xAOD::CaloDetDescriptor*>(edm);
+  return execute( ctx, std::vector<Gaugi::EDM*>{edm} );
+}
 
-  auto pulse_size = m_nsamples;
+//!=====================================================================
 
-  // Create an pulse with zeros with n samples
-  std::vector<float> pulse_sum(pulse_size, 0.0);
-  // Loop over each bunch crossing
-  for ( int bcid = cell->bcid_start();  bcid <= cell->bcid_end(); ++bcid )
+/**
+ * @brief Generates the pulses for all cells of one sampling.
+ * 
+ * For each bunch crossing, the pulse of each cell is the shaper, shifted by the
+ * bunch crossing lag and by the truth time of flight (phase), times the energy
+ * deposit. The pulses of all bunch crossings are summed, the gaussian noise is
+ * added and the integrated pulse is set into the cell.
+ *
+ * Each cell has its own random stream (all deformations, bunch crossing by
+ * bunch crossing, and then the noise), so the result does not depend on the
+ * number of cells of the batch nor on their order. The deformations are only
+ * drawn if DeformationStd is not zero, so in this case the noise takes the
+ * first numbers of the stream. The noise is kept as double and added to the
+ * float pulse at the end, as pulse += noise in the one cell version.
+ */
+StatusCode PulseGenerator::execute( SG::EventContext &ctx, const std::vector<Gaugi::EDM*> &edms ) const
+{
+  size_t nCells = edms.size();
+  if( nCells == 0 ) return StatusCode::SUCCESS;
+
+  auto *first     = static_cast<xAOD::CaloDetDescriptor*>(edms.front());
+  int bcid_start  = first->bcid_start();
+  int nBC         = first->bcid_end() - bcid_start + 1;
+  int nSamples    = m_nsamples;
+  float shr       = m_shaperResolution;
+  int shzi        = m_shaperZeroIndex;
+  int kmax        = (int)m_shaper.size();
+  bool deform     = m_deformationStd != 0;
+  const float *table = m_shaperTable.data();
+  const float *mask  = m_shaperMask.data();
+
+  // [bcid][cell] and [sample][cell] rows
+  std::vector<float> energy( nBC*nCells ), phase( nBC*nCells );
+  std::vector<float> pulse( nSamples*nCells, 0 );
+  std::vector<double> noise( nSamples*nCells );
+  // [bcid][sample][cell], only if needed
+  std::vector<float> deformation( deform ? nBC*nSamples*nCells : 0 );
+  std::vector<float> perBunch( m_pulsePerBunch ? nBC*nSamples*nCells : 0 );
+
+  for ( size_t c=0; c < nCells; ++c )
   {
-    // Generate the pulse
-    std::vector<float> pulse;
-    // GenerateDeterministicPulse( pulse, cell->edep(bcid), 0, bcid*cell->bc_duration() ); // phase=0
-    GenerateDeterministicPulse( pulse, cell->edep(bcid), cell->tof(bcid), bcid*cell->bc_duration() ); // phase='truth' tof
-    // Accumulate into pulse sum (Sum all pulses)
-    for ( int samp=0; samp < pulse_size; ++samp ){
-      pulse_sum[samp] += pulse[samp];
+    auto *cell = static_cast<xAOD::CaloDetDescriptor*>(edms[c]);
+    for ( int b=0; b < nBC; ++b ){
+      energy[b*nCells+c] = cell->edep( bcid_start+b );
+      phase [b*nCells+c] = round( cell->tof( bcid_start+b ) / shr ); // phase='truth' tof
     }
+    // same numbers for this cell and event, independent of the thread and of the cell order
+    auto rng = ctx.random( m_streamKey, cell->hash() );
+    if( deform ){
+      for ( int b=0; b < nBC; ++b )
+        for ( int i=0; i < nSamples; ++i )
+          deformation[(b*nSamples+i)*nCells+c] = rng.gaus( m_deformationMean, m_deformationStd );
+    }
+    for ( int i=0; i < nSamples; ++i )
+      noise[i*nCells+c] = rng.gaus( m_noiseMean, m_noiseStd );
+  }
 
-    cell->setPulse( bcid, pulse ); 
+  for ( int b=0; b < nBC; ++b )
+  {
+    float lag = (bcid_start+b)*first->bc_duration();
+    const float *E = energy.data() + b*nCells;
+    const float *P = phase.data()  + b*nCells;
+
+    for ( int i=0; i < nSamples; ++i )
+    {
+      // shaper index of this sample without the phase
+      float offset = shzi - int(lag / shr) + (i + m_startSamplingBC) * (m_samplingRate / shr);
+      const float *D = deform ? deformation.data() + (b*nSamples+i)*nCells : nullptr;
+      float *S = pulse.data() + i*nCells;
+      float *B = m_pulsePerBunch ? perBunch.data() + (b*nSamples+i)*nCells : nullptr;
+
+      for ( size_t c=0; c < nCells; ++c )
+      {
+        // the borders of the table are zero, so samples out of the shaper give zero
+        int k = std::min( std::max( int(offset + P[c]), -1 ), kmax ) + 1;
+        float value = ( E[c] * table[k] + m_pedestal + (D ? D[c] : m_deformationMean) ) * mask[k];
+        S[c] += value;
+        if( B ) B[c] = value;
+      }
+    }
   }
 
-  // Add gaussian noise
-  AddGaussianNoise(pulse_sum, m_noiseMean, m_noiseStd);
+  for ( size_t c=0; c < nCells; ++c )
+  {
+    auto *cell = static_cast<xAOD::CaloDetDescriptor*>(edms[c]);
+    std::vector<float> pulse_sum( nSamples );
+    for ( int i=0; i < nSamples; ++i )
+      pulse_sum[i] = float( pulse[i*nCells+c] + noise[i*nCells+c] ); // summed as double
+
+    if( m_pulsePerBunch ){
+      for ( int b=0; b < nBC; ++b ){
+        std::vector<float> bunch( nSamples );
+        for ( int i=0; i < nSamples; ++i )
+          bunch[i] = perBunch[(b*nSamples+i)*nCells+c];
+        cell->setPulse( bcid_start+b, bunch );
+      }
+    }
 
-  // Add the integrated pulse centered in the bunch crossing zero
-  cell->setPulse( pulse_sum );
-  cell->setSigma( m_noiseStd );
+    // Add the integrated pulse centered in the bunch crossing zero
+    cell->setPulse( pulse_sum );
+    cell->setSigma( m_noiseStd );
+  }
 
   return StatusCode::SUCCESS;
 }
@@ -132,34 +216,15 @@ void PulseGenerator::ReadShaper( std::string filepath )
 
 //!=====================================================================
 
-void PulseGenerator::AddGaussianNoise( std::vector<float> &pulse, float noiseMean, float noiseStd) const
-{
-  for ( auto &value : pulse )
-    value += m_rng.Gaus( noiseMean, noiseStd );
-}
-
-//!=====================================================================
-
-void PulseGenerator::GenerateDeterministicPulse(  std::vector<float> &pulse,  float amplitude, float phase, float lag) const
+void PulseGenerator::TabulateShaper()
 {
-  pulse.resize( m_nsamples );
-  float shr    = m_shaperResolution;  
-  float shzi   = m_shaperZeroIndex; 
-
-  for (int i = 0; i < m_nsamples; i++) {
-    // random deformation (normal from geant)
-    float deformation = m_rng.Gaus(m_deformationMean, m_deformationStd);
-    int shaperIndex = int(shzi) - int(lag / shr) + (i + m_startSamplingBC) * (m_samplingRate / shr) + round(phase / shr);
-    if (shaperIndex < 0 || shaperIndex > (int)m_shaper.size() - 1){
-      pulse[i] = 0;
-      continue;
-    }
-    pulse[i] += amplitude * m_shaper[shaperIndex] + m_pedestal + deformation;
+  m_shaperTable.assign( m_shaper.size()+2, 0 );
+  m_shaperMask.assign( m_shaper.size()+2, 0 );
+  for ( size_t k=0; k < m_shaper.size(); ++k ){
+    m_shaperTable[k+1] = m_shaper[k];
+    m_shaperMask[k+1]  = 1;
   }
 }
 
-
-
-
-
+//!=====================================================================
 
@@ -4,7 +4,7 @@
 #include "GaugiKernel/StatusCode.h"
 #include "GaugiKernel/AlgTool.h"
 #include "GaugiKernel/EDM.h"
-#include "TRandom3.h"
+#include "GaugiKernel/Random.h"
 
 
 /**
@@ -13,7 +13,8 @@
  * 
  * This tool takes the energy deposit in a cell and generates a time-sampled
  * electronic pulse (using a shaper function). It also adds electronic noise
- * and can simulate defects.
+ * and can simulate defects. All cells of one sampling are generated at once,
+ * as arrays (see execute for many cells).
  */
 class PulseGenerator : public Gaugi::AlgTool
 {
@@ -34,14 +35,21 @@ class PulseGenerator : public Gaugi::AlgTool
      */
     virtual StatusCode execute( SG::EventContext &ctx, Gaugi::EDM *edm ) const override;
 
+    /**
+     * @brief Execute the pulse generation for all cells of one sampling.
+     * @param ctx Event context.
+     * @param edms The cells (CaloDetDescriptor), all with the same bunch crossing window.
+     * @return Status code indicating success or failure.
+     */
+    virtual StatusCode execute( SG::EventContext &ctx, const std::vector<Gaugi::EDM*> &edms ) const override;
     
 
 
   private:
 
     void ReadShaper( std::string );
-    void GenerateDeterministicPulse(  std::vector<float> &pulse,  float amplitude, float phase, float lag) const;
-    void AddGaussianNoise( std::vector<float> &pulse, float noiseMean, float noiseStddev) const;
+    /*! Tabulate the shaper on the grid of shaper indexes, with one zero at each side */
+    void TabulateShaper();
 
 
     /*! Number of samples to be generated */
@@ -65,13 +73,19 @@ class PulseGenerator : public Gaugi::AlgTool
     
     std::vector<float> m_shaper;
     std::vector<float> m_timeSeries;
+    /*! Shaper table (position k for the shaper index k-1). Indexes out of the shaper are
+     * clamped to the borders, where the shaper and the mask are zero */
+    std::vector<float> m_shaperTable;
+    std::vector<float> m_shaperMask;
+    /*! Keep the pulse of each bunch crossing into the cell (not saved into the output) */
+    bool m_pulsePerBunch;
     
     /*! The shaper configuration path */
     std::string m_shaperFile;
     /*! Output level message */
     int m_outputLevel;
-    /*! Random generator */
-    mutable TRandom3 m_rng;
+    /*! Random streams key (tool name hash), one stream for each cell and event */
+    uint64_t m_streamKey;
 };
 
 #endif
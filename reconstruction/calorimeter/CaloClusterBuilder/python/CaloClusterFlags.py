@@ -8,4 +8,7 @@ class CaloClusterFlags(EnumStringification):
     MinCenterEnergy  = 1*GeV
     EtaWindow        = 0.4
     PhiWindow        = 0.4
-    doForwardMoments = False
\ No newline at end of file
+    doForwardMoments = False
+    GridEtaWidth     = 0.1
+    GridPhiWidth     = 0.1
+    GridBySampling   = True
\ No newline at end of file
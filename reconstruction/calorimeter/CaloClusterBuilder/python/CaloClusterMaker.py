@@ -23,6 +23,9 @@ class CaloClusterMaker( Cpp ):
                 PhiWindow        : float=flags.PhiWindow,
                 MinCenterEnergy  : float=flags.MinCenterEnergy,
                 doForwardMoments : bool=flags.doForwardMoments,
+                GridEtaWidth     : float=flags.GridEtaWidth,
+                GridPhiWidth     : float=flags.GridPhiWidth,
+                GridBySampling   : bool=flags.GridBySampling,
                 OutputLevel      : str=0, 
                 HistogramPath    : str="Expert/Clusters",
               ):
@@ -38,6 +41,9 @@ class CaloClusterMaker( Cpp ):
         PhiWindow (float): Half-width of the cluster window in phi.
         MinCenterEnergy (float): Minimum energy required for the central cell/seed.
         doForwardMoments (bool): If True, calculates moments relevant for forward detectors.
+        GridEtaWidth (float): Eta bin size of the cell grid used in the window searches.
+        GridPhiWidth (float): Phi bin size of the cell grid used in the window searches.
+        GridBySampling (bool): If True, the cell grid is partitioned by sampling.
         OutputLevel (str): Logging level.
         HistogramPath (str): Path for monitoring histograms.
     """
@@ -51,6 +57,9 @@ class CaloClusterMaker( Cpp ):
     self.setProperty( "PhiWindow"            , PhiWindow            )
     self.setProperty( "MinCenterEnergy"      , MinCenterEnergy      )
     self.setProperty( "DoForwardMoments"     , doForwardMoments     )
+    self.setProperty( "GridEtaWidth"         , GridEtaWidth         )
+    self.setProperty( "GridPhiWidth"         , GridPhiWidth         )
+    self.setProperty( "GridBySampling"       , GridBySampling       )
     self.setProperty( "OutputLevel"          , OutputLevel          ) 
     self.setProperty( "HistogramPath"        , HistogramPath        )
 
@@ -0,0 +1,147 @@
+
+#include "G4Kernel/CaloPhiRange.h"
+#include "CaloCellGrid.h"
+#include "CaloCell/CaloCell.h"
+#include <algorithm>
+#include <cmath>
+
+
+
+CaloCellGrid::CaloCellGrid( const xAOD::CaloCellContainer *container, float etaWidth, float phiWidth, bool bySampling ):
+  m_container(container),
+  m_etaWidth(etaWidth),
+  m_phiWidth(phiWidth),
+  m_etaMin(0),
+  m_etaBins(1),
+  m_phiBins( std::max(1, (int)std::ceil( CaloPhiRange::twopi()/phiWidth )) ),
+  m_partitions(1),
+  m_bySampling(bySampling)
+{
+  const auto &cells = **container;
+
+  if( !cells.empty() ){
+    float etaMax = cells.front()->eta();
+    m_etaMin = etaMax;
+    for ( const auto cell : cells ){
+      m_etaMin = std::min( m_etaMin, cell->eta() );
+      etaMax   = std::max( etaMax  , cell->eta() );
+      if( m_bySampling )
+        m_partitions = std::max( m_partitions, (int)cell->descriptor()->sampling()+1 );
+    }
+    m_etaBins = std::max(1, (int)std::ceil( (etaMax-m_etaMin)/m_etaWidth ) + 1 );
+  }
+
+  // counting sort by bin, keeping the container order inside of each bin
+  size_t nbins = (size_t)m_partitions*m_etaBins*m_phiBins;
+  std::vector<unsigned> bins( cells.size() );
+  m_offset.assign( nbins+1, 0 );
+  for ( unsigned idx=0; idx < cells.size(); ++idx ){
+    const auto cell = cells[idx];
+    int partition = m_bySampling ? (int)cell->descriptor()->sampling() : 0;
+    bins[idx] = ((size_t)partition*m_etaBins + etaBin(cell->eta()))*m_phiBins + phiBin(cell->phi());
+    m_offset[ bins[idx]+1 ]++;
+  }
+  for ( size_t b=0; b < nbins; ++b )
+    m_offset[b+1] += m_offset[b];
+
+  m_cells.resize( cells.size() );
+  std::vector<unsigned> pos( m_offset.begin(), m_offset.end()-1 );
+  for ( unsigned idx=0; idx < cells.size(); ++idx )
+    m_cells[ pos[bins[idx]]++ ] = idx;
+}
+
+//!=====================================================================
+
+int CaloCellGrid::etaBin( float eta ) const
+{
+  int bin = (int)std::floor( (eta-m_etaMin)/m_etaWidth );
+  return std::min( std::max(bin, 0), m_etaBins-1 );
+}
+
+//!=====================================================================
+
+int CaloCellGrid::phiBin( float phi ) const
+{
+  int bin = (int)std::floor( (CaloPhiRange::fix(phi)-CaloPhiRange::phi_min())/m_phiWidth );
+  return std::min( std::max(bin, 0), m_phiBins-1 );
+}
+
+//!=====================================================================
+
+void CaloCellGrid::collect( int partition, float eta, float phi, float etaWindow, float phiWindow, std::vector<unsigned> &indices ) const
+{
+  const auto &cells = **m_container;
+
+  // one extra bin in each side to be safe against rounding in the edges
+  int etaLow  = std::max( (int)std::floor( (eta-etaWindow-m_etaMin)/m_etaWidth ) - 1, 0 );
+  int etaHigh = std::min( (int)std::floor( (eta+etaWindow-m_etaMin)/m_etaWidth ) + 1, m_etaBins-1 );
+  if( etaLow > etaHigh ) return;
+
+  float phiRef = CaloPhiRange::fix(phi) - CaloPhiRange::phi_min();
+  int phiLow  = (int)std::floor( (phiRef-phiWindow)/m_phiWidth ) - 1;
+  int phiHigh = (int)std::floor( (phiRef+phiWindow)/m_phiWidth ) + 1;
+  // the window covers all phi, no need to wrap around
+  if( phiHigh-phiLow+1 >= m_phiBins ){
+    phiLow = 0; phiHigh = m_phiBins-1;
+  }
+
+  for ( int ieta=etaLow; ieta <= etaHigh; ++ieta ){
+    for ( int iphi=phiLow; iphi <= phiHigh; ++iphi ){
+      // wrap around in phi
+      int wphi = ((iphi % m_phiBins) + m_phiBins) % m_phiBins;
+      size_t bin = ((size_t)partition*m_etaBins + ieta)*m_phiBins + wphi;
+      for ( unsigned k=m_offset[bin]; k < m_offset[bin+1]; ++k ){
+        const auto cell = cells[m_cells[k]];
+        float deltaEta = std::abs( eta - cell->eta() );
+        float deltaPhi = std::abs( CaloPhiRange::diff( phi , cell->phi() ));
+        if( deltaEta < etaWindow && deltaPhi < phiWindow )
+          indices.push_back( m_cells[k] );
+      }
+    }
+  }
+}
+
+//!=====================================================================
+
+std::vector<const xAOD::CaloCell*> CaloCellGrid::find( float eta, float phi, float etaWindow, float phiWindow ) const
+{
+  std::vector<unsigned> indices;
+  for ( int partition=0; partition < m_partitions; ++partition )
+    collect( partition, eta, phi, etaWindow, phiWindow, indices );
+
+  std::sort( indices.begin(), indices.end() );
+  const auto &cells = **m_container;
+  std::vector<const xAOD::CaloCell*> vec;
+  vec.reserve( indices.size() );
+  for ( auto idx : indices )
+    vec.push_back( cells[idx] );
+  return vec;
+}
+
+//!=====================================================================
+
+std::vector<const xAOD::CaloCell*> CaloCellGrid::find( float eta, float phi, float etaWindow, float phiWindow,
+                                                       const std::vector<CaloSampling> &samplings ) const
+{
+  std::vector<unsigned> indices;
+  const auto &cells = **m_container;
+
+  if( m_bySampling ){
+    for ( auto sampling : samplings ){
+      if( (int)sampling < m_partitions )
+        collect( (int)sampling, eta, phi, etaWindow, phiWindow, indices );
+    }
+  }else{
+    collect( 0, eta, phi, etaWindow, phiWindow, indices );
+    indices.erase( std::remove_if( indices.begin(), indices.end(), [&](unsigned idx){
+      return std::find( samplings.begin(), samplings.end(), cells[idx]->descriptor()->sampling() ) == samplings.end();
+    }), indices.end() );
+  }
+
+  std::sort( indices.begin(), indices.end() );
+  std::vector<const xAOD::CaloCell*> vec;
+  vec.reserve( indices.size() );
+  for ( auto idx : indices )
+    vec.push_back( cells[idx] );
+  return vec;
+}
@@ -0,0 +1,67 @@
+#ifndef CaloCellGrid_h
+#define CaloCellGrid_h
+
+#include "CaloCell/enumeration.h"
+#include "GaugiKernel/DataHandle.h"
+#include "CaloCell/CaloCellContainer.h"
+#include <vector>
+
+
+/**
+ * @class CaloCellGrid
+ * @brief Eta/phi grid index over one CaloCellContainer.
+ *
+ * Cells are binned by the center position in a regular eta x phi grid
+ * (optionally partitioned by sampling) so window searches only visit the
+ * neighbour bins instead of the full container. Cells are returned in the
+ * same order as the container, with the same selection used before:
+ * |deta| < etaWindow and |CaloPhiRange::diff| < phiWindow.
+ * Each algorithm builds its own grid for the event (it is not recorded
+ * into the event context, so it is never shared between algorithms).
+ */
+class CaloCellGrid : public SG::DataHandle
+{
+
+  public:
+
+    /** Constructor **/
+    CaloCellGrid( const xAOD::CaloCellContainer *container, float etaWidth, float phiWidth, bool bySampling );
+
+    ~CaloCellGrid()=default;
+
+    /*! All cells with center inside of the window */
+    std::vector<const xAOD::CaloCell*> find( float eta, float phi, float etaWindow, float phiWindow ) const;
+
+    /*! Cells with center inside of the window for the given samplings only */
+    std::vector<const xAOD::CaloCell*> find( float eta, float phi, float etaWindow, float phiWindow,
+                                             const std::vector<CaloSampling> &samplings ) const;
+
+    /*! The indexed container */
+    const xAOD::CaloCellContainer* container() const { return m_container; };
+
+  private:
+
+    /*! Collect the container index of all cells inside of the window for one partition */
+    void collect( int partition, float eta, float phi, float etaWindow, float phiWindow, std::vector<unsigned> &indices ) const;
+
+    int etaBin( float eta ) const;
+
+    int phiBin( float phi ) const;
+
+    const xAOD::CaloCellContainer *m_container;
+
+    float m_etaWidth;
+    float m_phiWidth;
+    float m_etaMin;
+    int m_etaBins;
+    int m_phiBins;
+    // one partition per sampling or only one for all cells
+    int m_partitions;
+    bool m_bySampling;
+
+    // compressed bin storage: cells of bin b are m_cells[m_offset[b]:m_offset[b+1]]
+    std::vector<unsigned> m_offset;
+    std::vector<unsigned> m_cells;
+};
+
+#endif
@@ -28,6 +28,8 @@ using namespace Gaugi;
  * - OutputClusterKey: Output collection of reconstructed clusters.
  * - Eta/PhiWindow: Size of the clustering window.
  * - MinCenterEnergy: Minimum energy required for the central cell to seed a cluster.
+ * - GridEtaWidth/GridPhiWidth: Bin size of the eta/phi grid used to search cells.
+ * - GridBySampling: Partition the grid by sampling.
  */
 CaloClusterMaker::CaloClusterMaker( std::string name ) : 
   IMsgService(name),
@@ -45,7 +47,12 @@ CaloClusterMaker::CaloClusterMaker( std::string name ) :
   declareProperty( "OutputLevel"         , m_outputLevel=1                   );
   declareProperty( "HistogramPath"       , m_histPath="Clusters"             );
   declareProperty( "MinCenterEnergy"     , m_minCenterEnergy=15*GeV          );
+  declareProperty( "GridEtaWidth"        , m_gridEtaWidth=0.1                );
+  declareProperty( "GridPhiWidth"        , m_gridPhiWidth=0.1                );
+  declareProperty( "GridBySampling"      , m_gridBySampling=true             );
   declareProperty( "OutputLevel"         , m_outputLevel=1                   );
+
+  setReentrant();
 }
 
 //!=====================================================================
@@ -126,7 +133,7 @@ StatusCode CaloClusterMaker::finalize()
 /**
  * @brief Core clustering logic executed for each event.
  * 
- * 1. Retrieves seeds and cell containers.
+ * 1. Retrieves seeds and cell containers. The eta/phi cell grid is built once per event.
  * 2. Iterates over seeds to find the corresponding "hot cell" (maximum energy) in the Second Layer (EMB2/EMEC2).
  * 3. Verifies if the energy in a 0.1x0.1 core is above threshold (MinCenterEnergy).
  * 4. If qualified, creates a CaloCluster, collects all cells within the Eta/Phi window, and calculates shower shapes.
@@ -154,6 +161,15 @@ StatusCode CaloClusterMaker::post_execute( EventContext &ctx ) const
   MSG_DEBUG( "Associate all particle seeds and clusters");
   MSG_DEBUG( "For cell container of key "<< m_cellsKey << ", there are "<< container.ptr()->size() <<" stored cells.");
 
+  // Build the eta/phi grid to avoid scanning all cells for each seed. The grid is kept
+  // into this algorithm (not recorded), so makers reading the same cells do not share it
+  const CaloCellGrid cellGrid( container.ptr(), m_gridEtaWidth, m_gridPhiWidth, m_gridBySampling );
+  const CaloCellGrid *grid = &cellGrid;
+
+  // Only PS, EM1, EM2 and EM3 cells
+  const std::vector<CaloSampling> em_samplings{ CaloSampling::PSB , CaloSampling::PSE  , CaloSampling::EMB1 , CaloSampling::EMB2,
+                                                CaloSampling::EMB3, CaloSampling::EMEC1, CaloSampling::EMEC2, CaloSampling::EMEC3 };
+
   // Loop over all truth particles (here, we have seeds)
   // for ( const auto part : **particles.ptr() )
   for ( const auto part : **seeds.ptr() )
@@ -162,16 +178,8 @@ StatusCode CaloClusterMaker::post_execute( EventContext &ctx ) const
     float emaxs2 = 0.0;
 
     // Searching the hottest cell looking for EM2 layer
-    for (const auto cell : **container.ptr() ){
-
-      const xAOD::CaloDetDescriptor* det = cell->descriptor();
-      
-      // Must be EM2 cells layer
-      if( (det->sampling() != CaloSampling::EMB2) && (det->sampling() != CaloSampling::EMEC2) ) continue;
-      // Check if cell is inside 
-      float deltaEta = std::abs( part->eta() - cell->eta() );
-      float deltaPhi = std::abs( CaloPhiRange::diff( part->phi() , cell->phi() ));
-      if (deltaEta < m_etaWindow/2 && deltaPhi < m_phiWindow/2 && cell->e() > emaxs2){
+    for (const auto cell : grid->find( part->eta(), part->phi(), m_etaWindow/2, m_phiWindow/2, {CaloSampling::EMB2, CaloSampling::EMEC2} ) ){
+      if (cell->e() > emaxs2){
         hotcell=cell; emaxs2=cell->e();
         MSG_DEBUG( "Hot cell found: " << cell->e() << " " << cell->eta() << " " << cell->phi() );
       }
@@ -181,17 +189,9 @@ StatusCode CaloClusterMaker::post_execute( EventContext &ctx ) const
 
       // Apply simple algorithm to check if most part of energy is not in the edges or not. Applying 0.1 X 0.1 window
       float etot=0.0;
-      for (const auto cell : **container.ptr() ){
-
-        // Only PS, EM1, EM2 and EM3 cells
+      for (const auto cell : grid->find( hotcell->eta(), hotcell->phi(), 0.05, 0.05, em_samplings ) ){
         if( cell->descriptor()->detector()!=Detector::TTEM ) continue;
-        
-        float deltaEta = std::abs( hotcell->eta() - cell->eta() );
-        float deltaPhi = std::abs( CaloPhiRange::diff( hotcell->phi() , cell->phi() ));
-        // 0.1 X 0.1 window
-        if (deltaEta < 0.05 && deltaPhi < 0.05){
-          etot+=cell->e();
-        }
+        etot+=cell->e();
       }
 
 
@@ -202,7 +202,7 @@ StatusCode CaloClusterMaker::post_execute( EventContext &ctx ) const
         MSG_INFO( "Creating one cluster since the center energy is higher than the energy cut" );
         xAOD::CaloCluster *clus = new xAOD::CaloCluster( hotcell->e(), hotcell->eta(), hotcell->phi(), m_etaWindow/2., m_phiWindow/2. );
         clus->setSeed(part);
-        fillCluster( ctx, clus, m_cellsKey );
+        fillCluster( grid, clus );
         m_showerShapes->execute( ctx, clus );
         clusters->push_back( clus );
       }
@@ -327,24 +327,12 @@ float CaloClusterMaker::dR( float eta1, float phi1, float eta2, float phi2 ) con
 
 //!=====================================================================
 
-void CaloClusterMaker::fillCluster( EventContext &ctx, xAOD::CaloCluster *clus, std::string key) const
+void CaloClusterMaker::fillCluster( const CaloCellGrid *grid, xAOD::CaloCluster *clus ) const
 {
-  SG::ReadHandle<xAOD::CaloCellContainer> container(key, ctx);
-  if( !container.isValid() ){
-    MSG_WARNING( "It's not possible to read the xAOD::CaloCellContainer from this Context using this key: " << key );
-    return;
-  }
-
-  for ( const auto cell : **container.ptr() ){
-
-    float deltaEta = std::abs( clus->eta() - cell->eta() );
-    float deltaPhi = std::abs( CaloPhiRange::diff( clus->phi() , cell->phi() ));
-    if( deltaEta < m_etaWindow/2 && deltaPhi < m_phiWindow/2 ){
-        clus->push_back(cell);
-    }
-  }// Loop over all cells
+  for ( const auto cell : grid->find( clus->eta(), clus->phi(), m_etaWindow/2, m_phiWindow/2 ) ){
+    clus->push_back(cell);
+  }// Loop over all cells inside of the window
 }
 
 
 
-
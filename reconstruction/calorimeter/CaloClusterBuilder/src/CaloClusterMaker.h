@@ -9,6 +9,7 @@
 #include "CaloCluster/CaloClusterContainer.h"
 #include "EventInfo/SeedContainer.h"
 #include "ShowerShapes.h"
+#include "CaloCellGrid.h"
 
 
 /**
@@ -55,8 +56,8 @@ class CaloClusterMaker : public Gaugi::Algorithm
   private:
  
     
-    void fillCluster( SG::EventContext &ctx,  xAOD::CaloCluster *clus, std::string key ) const;
-    
+    void fillCluster( const CaloCellGrid *grid,  xAOD::CaloCluster *clus ) const;
+
     float dR( float eta1, float phi1, float eta2, float phi2 ) const;
  
     
@@ -77,6 +78,11 @@ class CaloClusterMaker : public Gaugi::Algorithm
 
     float m_minCenterEnergy;
 
+    // cell grid configuration
+    float m_gridEtaWidth;
+    float m_gridPhiWidth;
+    bool m_gridBySampling;
+
 
 };
 
@@ -0,0 +1,35 @@
+__all__ = ["CaloFastSimMaker"]
+
+from GaugiKernel import Cpp, LoggingLevel
+from GaugiKernel.macros import *
+import ROOT
+
+
+class CaloFastSimMaker( Cpp ):
+
+  def __init__( self, name          : str,
+                ParametersFile      : str,
+                InputTruthKey       : str = "Particles",
+                NtupleName          : str = "FastSimParameters",
+                OutputLevel         : int = LoggingLevel.toC('INFO'),
+                ):
+
+    Cpp.__init__(self, ROOT.CaloFastSimMaker(name) )
+    self.Tools = []
+    self.setProperty( "ParametersFile"      , ParametersFile      )
+    self.setProperty( "InputTruthKey"       , InputTruthKey       )
+    self.setProperty( "NtupleName"          , NtupleName          )
+    self.setProperty( "OutputLevel"         , OutputLevel         )
+
+
+  def core(self):
+    # Attach all hit makers before return the core
+    for tool in self.Tools:
+      self._core.push_back(tool.core())
+    return self._core
+
+
+  def __add__( self, tool ):
+    self.Tools += tool
+    return self
+
@@ -5,6 +5,8 @@ from GaugiKernel import Logger, LoggingLevel
 from GaugiKernel.macros import MSG_INFO
 from CaloHitBuilder import CaloHitMaker
 from CaloHitBuilder import CaloHitMerge
+from CaloHitBuilder import CaloHitDispatcher
+from CaloHitBuilder import CaloFastSimMaker
 from G4Kernel import ComponentAccumulator
 
 
@@ -18,6 +20,10 @@ class CaloHitBuilder(Logger):
                  OutputHitsKey: str,
                  HistogramPath: str = "Expert",
                  OutputLevel: int = LoggingLevel.toC('INFO'),
+                 SparseHits: bool = False,
+                 FastSimParameters: str = "",
+                 InputTruthKey: str = "Particles",
+                 Detector = None,
                  ):
 
         Logger.__init__(self, name)
@@ -25,12 +31,30 @@ class CaloHitBuilder(Logger):
         self.HistogramPath = HistogramPath
         self.OutputLevel = OutputLevel
         self.OutputHitsKey = OutputHitsKey
+        # only the touched cells (False to keep the full granularity)
+        self.SparseHits = SparseHits
+        # parametrized showers from the truth particles instead of the geant steps (off if empty)
+        self.FastSimParameters = FastSimParameters
+        self.InputTruthKey = InputTruthKey
+        # the detector is taken from the accumulator if not given (geant)
+        self.Detector = Detector
         self.OutputCollectionKeys = []
 
     def configure(self):
 
         MSG_INFO(self, "Configure CaloHitBuilder.")
 
+        if self.FastSimParameters:
+            # the truth particles are deposited directly into the makers
+            dispatcher = CaloFastSimMaker("CaloFastSimMaker",
+                                          ParametersFile=self.FastSimParameters,
+                                          InputTruthKey=self.InputTruthKey,
+                                          OutputLevel=self.OutputLevel)
+        else:
+            # each step goes only to the makers of its r/z volume
+            dispatcher = CaloHitDispatcher("CaloHitDispatcher",
+                                           OutputLevel=self.OutputLevel)
+
         for samp in self.__detector.samplings:
 
             MSG_INFO(
@@ -42,15 +66,18 @@ class CaloHitBuilder(Logger):
             alg = CaloHitMaker("CaloHitMaker", samp,
                                OutputCollectionKey=samp.CollectionKey,
                                SamplingNoiseStd=samp.Noise,  # TOF selection
+                               SparseHits=self.SparseHits,
                                HistogramPath=histogramPath,
                                OutputLevel=self.OutputLevel,
                                # Use True when debug with only one thread
                                DetailedHistograms=False
                                )
 
-            self.__recoAlgs.append(alg)
+            dispatcher.Tools.append(alg)
             self.OutputCollectionKeys.append(samp.CollectionKey)
 
+        self.__recoAlgs.append(dispatcher)
+
         MSG_INFO(
             self,
             "Create CaloHitMerge and dump all hit collections into"
@@ -66,8 +93,8 @@ class CaloHitBuilder(Logger):
 
     def merge(self, acc: ComponentAccumulator):
         """
-        Obtains the detector from the ComponentAccumulator and appends
-        all the hit makers required by the accumulator's detector.
+        Obtains the detector from the ComponentAccumulator (case not given)
+        and appends all the hit makers required by the detector.
 
         Parameters
         ----------
@@ -75,7 +102,7 @@ class CaloHitBuilder(Logger):
             Accumulator to merge with
         """
 
-        self.__detector = acc.detector()
+        self.__detector = self.Detector if self.Detector else acc.detector()
         self.configure()
         for reco in self.__recoAlgs:
             acc += reco
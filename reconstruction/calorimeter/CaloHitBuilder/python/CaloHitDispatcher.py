@@ -0,0 +1,28 @@
+__all__ = ["CaloHitDispatcher"]
+
+from GaugiKernel import Cpp, LoggingLevel
+from GaugiKernel.macros import *
+import ROOT
+
+
+class CaloHitDispatcher( Cpp ):
+
+  def __init__( self, name          : str,
+                OutputLevel         : int = LoggingLevel.toC('INFO'),
+                ):
+
+    Cpp.__init__(self, ROOT.CaloHitDispatcher(name) )
+    self.Tools = []
+    self.setProperty( "OutputLevel"         , OutputLevel         )
+
+
+  def core(self):
+    # Attach all hit makers before return the core
+    for tool in self.Tools:
+      self._core.push_back(tool.core())
+    return self._core
+
+
+  def __add__( self, tool ):
+    self.Tools += tool
+    return self
@@ -0,0 +1,21 @@
+
+__all__ = ["CaloShowerLibraryMaker"]
+
+from GaugiKernel import Cpp, LoggingLevel
+from GaugiKernel.macros import *
+import ROOT
+
+
+class CaloShowerLibraryMaker( Cpp ):
+
+  def __init__( self, name    : str,
+                Regions       : list,
+                NtupleName    : str = "ShowerLibrary",
+                OutputLevel   : int = LoggingLevel.toC('INFO'),
+                ): 
+    
+    Cpp.__init__(self, ROOT.CaloShowerLibraryMaker(name) )
+    self.setProperty( "Regions"     , Regions     )
+    self.setProperty( "NtupleName"  , NtupleName  ) 
+    self.setProperty( "OutputLevel" , OutputLevel ) 
+
@@ -6,6 +6,18 @@ from . import CaloHitMaker
 __all__.extend(CaloHitMaker.__all__)
 from .CaloHitMaker import *
 
+from . import CaloHitDispatcher
+__all__.extend(CaloHitDispatcher.__all__)
+from .CaloHitDispatcher import *
+
+from . import CaloShowerLibraryMaker
+__all__.extend(CaloShowerLibraryMaker.__all__)
+from .CaloShowerLibraryMaker import *
+
+from . import CaloFastSimMaker
+__all__.extend(CaloFastSimMaker.__all__)
+from .CaloFastSimMaker import *
+
 from . import CaloHitMerge
 __all__.extend(CaloHitMerge.__all__)
 from .CaloHitMerge import *
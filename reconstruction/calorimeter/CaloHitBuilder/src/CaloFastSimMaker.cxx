@@ -0,0 +1,339 @@
+
+#include "CaloFastSimMaker.h"
+#include "TruthParticle/TruthParticleContainer.h"
+#include "G4Kernel/CaloPhiRange.h"
+#include "G4PhysicalConstants.hh"
+#include "G4SystemOfUnits.hh"
+#include "TFile.h"
+#include "TTree.h"
+#include <algorithm>
+#include <cmath>
+#include <limits>
+#include <tuple>
+
+using namespace Gaugi;
+using namespace SG;
+
+
+
+/**
+ * @class CaloFastSimMaker
+ * @brief Fast (parametrized) simulation of the calorimeter hits.
+ * 
+ * The parameters are read from a tree with one entry for each particle class
+ * (0 for electrons/photons, 1 for hadrons and 2 for muons), sampling, |eta| bin
+ * and energy bin (MeV). Each particle uses the closest bin: the fraction of its
+ * energy is deposited into each sampling and shared between the cells of the
+ * sampling using the lateral profile, integrated over the cell area, around the
+ * particle direction. Neutrinos are not simulated.
+ * 
+ * Properties:
+ * - InputTruthKey: StoreGate key for the truth particles.
+ * - ParametersFile: ROOT file with the fitted parameters.
+ * - NtupleName: Name of the parameters tree (FastSimParameters).
+ */
+CaloFastSimMaker::CaloFastSimMaker( std::string name ) : 
+  IMsgService(name),
+  Algorithm()
+{
+  declareProperty( "InputTruthKey"          , m_truthKey="Particles"          );
+  declareProperty( "ParametersFile"         , m_parametersFile=""             );
+  declareProperty( "NtupleName"             , m_ntupleName="FastSimParameters");
+  declareProperty( "OutputLevel"            , m_outputLevel=1                 );
+}
+
+//!=====================================================================
+
+void CaloFastSimMaker::push_back( CaloHitMaker *maker )
+{
+  m_makers.push_back(maker);
+}
+
+//!=====================================================================
+
+StatusCode CaloFastSimMaker::initialize()
+{
+  CHECK_INIT();
+  setMsgLevel( m_outputLevel );
+
+  m_samplings.clear();
+  for ( auto maker : m_makers ){
+    if( maker->initialize().isFailure() ){
+      MSG_FATAL( "It's not possible to initialize the maker with name " << maker->name() );
+    }
+    m_samplings[maker->sampling()].push_back(maker);
+  }
+
+  TFile file( m_parametersFile.c_str(), "read" );
+  if( file.IsZombie() ){
+    MSG_FATAL( "It's not possible to open the parameters file " << m_parametersFile );
+  }
+  TTree *tree = (TTree*)file.Get( m_ntupleName.c_str() );
+  if( !tree ){
+    MSG_FATAL( "It's not possible to find the tree " << m_ntupleName << " into " << m_parametersFile );
+  }
+
+  int particle, sampling;
+  float etaMin, etaMax, energyMin, energyMax;
+  Parameters par;
+  tree->SetBranchAddress( "particle"   , &particle      );
+  tree->SetBranchAddress( "sampling"   , &sampling      );
+  tree->SetBranchAddress( "eta_min"    , &etaMin        );
+  tree->SetBranchAddress( "eta_max"    , &etaMax        );
+  tree->SetBranchAddress( "energy_min" , &energyMin     );
+  tree->SetBranchAddress( "energy_max" , &energyMax     );
+  tree->SetBranchAddress( "fraction"   , &par.fraction  );
+  tree->SetBranchAddress( "alpha"      , &par.alpha     );
+  tree->SetBranchAddress( "r1"         , &par.r1        );
+  tree->SetBranchAddress( "r2"         , &par.r2        );
+  tree->SetBranchAddress( "rmax"       , &par.rmax      );
+
+  m_bins.clear();
+  for ( Long64_t entry = 0; entry < tree->GetEntries(); ++entry ){
+    tree->GetEntry(entry);
+    par.sampling = sampling;
+    auto it = std::find_if( m_bins.begin(), m_bins.end(), [&](const Bin &bin){
+      return bin.particle==particle && bin.etaMin==etaMin && bin.etaMax==etaMax && 
+             bin.energyMin==energyMin && bin.energyMax==energyMax;
+    });
+    if( it == m_bins.end() ){
+      m_bins.push_back( Bin{particle, etaMin, etaMax, energyMin, energyMax, {}} );
+      it = m_bins.end()-1;
+    }
+    if( !m_samplings.count(sampling) ){
+      MSG_WARNING( "There is no maker for the sampling " << sampling << ". Its energy will be lost." );
+    }
+    it->samplings.push_back(par);
+  }
+  file.Close();
+
+  MSG_INFO( "Fast simulation using " << m_bins.size() << " parametrization bins and " << m_makers.size() << " makers." );
+  return StatusCode::SUCCESS;
+}
+
+//!=====================================================================
+
+StatusCode CaloFastSimMaker::finalize()
+{
+  for ( auto maker : m_makers ){
+    if( maker->finalize().isFailure() ){
+      MSG_ERROR( "It's not possible to finalize the maker with name " << maker->name() );
+      return StatusCode::FAILURE;
+    }
+  }
+  return StatusCode::SUCCESS;
+}
+
+//!=====================================================================
+
+StatusCode CaloFastSimMaker::bookHistograms( SG::EventContext &ctx ) const
+{
+  for ( auto maker : m_makers ){
+    if( maker->bookHistograms(ctx).isFailure() ){
+      MSG_ERROR( "It's not possible to book histograms for " << maker->name() );
+      return StatusCode::FAILURE;
+    }
+  }
+  return StatusCode::SUCCESS;
+}
+
+//!=====================================================================
+
+StatusCode CaloFastSimMaker::pre_execute( EventContext &ctx ) const
+{
+  for ( auto maker : m_makers ){
+    if( maker->pre_execute(ctx).isFailure() ){
+      MSG_ERROR( "It's not possible to pre execute " << maker->name() );
+      return StatusCode::FAILURE;
+    }
+  }
+  return StatusCode::SUCCESS;
+}
+
+//!=====================================================================
+ 
+StatusCode CaloFastSimMaker::execute( EventContext &/*ctx*/ , const G4Step * /*step*/ ) const
+{
+  return StatusCode::SUCCESS;
+}
+
+//!=====================================================================
+
+StatusCode CaloFastSimMaker::execute( EventContext &ctx , int /*evt*/ ) const
+{
+  // standalone mode: there is no step action, so all maker steps are called here
+  if( pre_execute(ctx).isFailure() ) return StatusCode::FAILURE;
+
+  SG::ReadHandle<xAOD::TruthParticleContainer> particles( m_truthKey, ctx );
+  if( !particles.isValid() ){
+    MSG_FATAL( "It's not possible to read the xAOD::TruthParticleContainer from this Context using this key " << m_truthKey );
+  }
+
+  for ( const auto par : **particles.ptr() ){
+
+    int particle = particleClass( par->pdgid() );
+    if( particle < 0 ) continue;
+
+    // the truth energy comes from the generator (GeV)
+    float energy = par->e()*GeV;
+    const Bin *bin = find( particle, std::abs(par->eta()), energy );
+    if( !bin ) continue;
+
+    MSG_DEBUG( "Particle " << par->pdgid() << " with " << energy << " MeV in eta = " << par->eta() << ", phi = " << par->phi() );
+    for ( const auto &sampling : bin->samplings ){
+      if( sampling.fraction <= 0 ) continue;
+      if( deposit( ctx, sampling, par->eta(), par->phi(), sampling.fraction*energy ).isFailure() ){
+        MSG_ERROR( "It's not possible to deposit the energy into the sampling " << sampling.sampling );
+        return StatusCode::FAILURE;
+      }
+    }
+  }
+  return post_execute(ctx);
+}
+
+//!=====================================================================
+
+StatusCode CaloFastSimMaker::post_execute( EventContext &ctx ) const
+{
+  for ( auto maker : m_makers ){
+    if( maker->post_execute(ctx).isFailure() ){
+      MSG_ERROR( "It's not possible to post execute " << maker->name() );
+      return StatusCode::FAILURE;
+    }
+  }
+  return StatusCode::SUCCESS;
+}
+
+//!=====================================================================
+
+StatusCode CaloFastSimMaker::fillHistograms( EventContext &ctx ) const
+{
+  for ( auto maker : m_makers ){
+    if( maker->fillHistograms(ctx).isFailure() ){
+      MSG_ERROR( "It's not possible to fill histograms for " << maker->name() );
+      return StatusCode::FAILURE;
+    }
+  }
+  return StatusCode::SUCCESS;
+}
+
+//!=====================================================================
+
+int CaloFastSimMaker::particleClass( int pdgid ) const
+{
+  switch( std::abs(pdgid) ){
+    case 11: case 22: return 0; // electromagnetic
+    case 13: return 2; // muon
+    case 12: case 14: case 16: return -1; // neutrinos
+    default: return 1; // hadron
+  }
+}
+
+//!=====================================================================
+
+const CaloFastSimMaker::Bin* CaloFastSimMaker::find( int particle, float eta, float energy ) const
+{
+  // distance outside of the interval (zero if inside)
+  auto distance = []( float value, float low, float high ){
+    return value < low ? low-value : ( value > high ? value-high : 0.f );
+  };
+
+  const Bin *closest = nullptr;
+  float etaDist = 0, energyDist = 0;
+  for ( const auto &bin : m_bins ){
+    if( bin.particle != particle ) continue;
+    float de = distance( eta, bin.etaMin, bin.etaMax );
+    // the energy bins are logarithmic
+    float dE = distance( std::log(std::max(energy, 1.f)), std::log(std::max(bin.energyMin, 1.f)), std::log(std::max(bin.energyMax, 1.f)) );
+    if( !closest || de < etaDist || (de == etaDist && dE < energyDist) ){
+      closest = &bin; etaDist = de; energyDist = dE;
+    }
+  }
+  return closest;
+}
+
+//!=====================================================================
+
+float CaloFastSimMaker::density( const Parameters &par, float r ) const
+{
+  // each exponential is normalized in the plane (integral of 2*pi*r*exp(-r/r0) is 2*pi*r0^2)
+  float density = 0;
+  if( par.r1 > 0 ) density += par.alpha * std::exp(-r/par.r1) / (par.r1*par.r1);
+  if( par.r2 > 0 ) density += (1-par.alpha) * std::exp(-r/par.r2) / (par.r2*par.r2);
+  return density / CaloPhiRange::twopi();
+}
+
+//!=====================================================================
+
+float CaloFastSimMaker::tof( const CaloHitMaker *maker, float eta ) const
+{
+  float theta = 2*std::atan( std::exp(-eta) );
+  float sinTheta = std::sin(theta);
+  float cosTheta = std::cos(theta);
+
+  // path length inside of the r/z volume
+  float sMin = 0, sMax = std::numeric_limits<float>::max();
+  if( sinTheta > 0 ){
+    sMin = std::max( sMin, maker->rMin()/sinTheta );
+    sMax = std::min( sMax, maker->rMax()/sinTheta );
+  }
+  if( std::abs(cosTheta) > 0 ){
+    float a = maker->zMin()/cosTheta, b = maker->zMax()/cosTheta;
+    sMin = std::max( sMin, std::min(a,b) );
+    sMax = std::min( sMax, std::max(a,b) );
+  }
+  // the direction does not cross the volume, use the middle radius
+  float s = sMax > sMin ? 0.5*(sMin+sMax) : 0.5*(maker->rMin()+maker->rMax())/std::max(sinTheta, 1e-6f);
+  return s / (c_light/(mm/ns));
+}
+
+//!=====================================================================
+
+StatusCode CaloFastSimMaker::deposit( EventContext &ctx, const Parameters &par, float eta, float phi, float energy ) const
+{
+  auto it = m_samplings.find( par.sampling );
+  if( it == m_samplings.end() ) return StatusCode::SUCCESS;
+
+  // maker, eta, phi, weight and time for each cell inside of the profile
+  std::vector< std::tuple<CaloHitMaker*, float, float, float, float> > cells;
+  float total = 0;
+
+  for ( auto maker : it->second ){
+    const auto &etaBins = maker->etaBins();
+    const auto &phiBins = maker->phiBins();
+    if( etaBins.size() < 2 || phiBins.size() < 2 ) continue;
+
+    float t = -1;
+    // first bin with the upper edge above the profile
+    int first = std::max( (int)(std::upper_bound( etaBins.begin(), etaBins.end(), eta-par.rmax ) - etaBins.begin()) - 1, 0 );
+    for ( unsigned etaBin = first; etaBin < etaBins.size()-1 && etaBins[etaBin] < eta+par.rmax; ++etaBin ){
+      float etaCenter = 0.5*(etaBins[etaBin]+etaBins[etaBin+1]);
+      float deta = etaCenter - eta;
+      if( std::abs(deta) > par.rmax ) continue;
+
+      for ( unsigned phiBin = 0; phiBin < phiBins.size()-1; ++phiBin ){
+        float phiCenter = 0.5*(phiBins[phiBin]+phiBins[phiBin+1]);
+        float dphi = CaloPhiRange::diff( phiCenter, phi );
+        float r = std::sqrt( deta*deta + dphi*dphi );
+        if( r > par.rmax ) continue;
+
+        if( t < 0 ) t = tof( maker, etaCenter );
+        float area = std::abs( (etaBins[etaBin+1]-etaBins[etaBin]) * (phiBins[phiBin+1]-phiBins[phiBin]) );
+        float weight = density( par, r ) * area;
+        cells.emplace_back( maker, etaCenter, phiCenter, weight, t );
+        total += weight;
+      }
+    }
+  }
+
+  if( total <= 0 ) return StatusCode::SUCCESS;
+
+  for ( const auto &cell : cells ){
+    float edep = energy * std::get<3>(cell) / total;
+    if( std::get<0>(cell)->fill( ctx, std::get<1>(cell), std::get<2>(cell), edep, std::get<4>(cell) ).isFailure() ){
+      MSG_ERROR( "It's not possible to fill the energy into " << std::get<0>(cell)->name() );
+      return StatusCode::FAILURE;
+    }
+  }
+  return StatusCode::SUCCESS;
+}
@@ -0,0 +1,92 @@
+#ifndef CaloFastSimMaker_h
+#define CaloFastSimMaker_h
+
+#include "GaugiKernel/Algorithm.h"
+#include "GaugiKernel/DataHandle.h"
+#include "CaloHitMaker.h"
+#include <map>
+
+
+/**
+ * @class CaloFastSimMaker
+ * @brief Deposit the truth particles into the hit makers using parametrized showers.
+ * 
+ * Fast simulation without Geant4: the energy of each particle is shared between
+ * the samplings (longitudinal profile) and between the cells of each sampling
+ * (lateral profile) using the parameters fitted from the full simulation
+ * (see fastsim_fit.py). The hits are filled into the same makers (and collections)
+ * used by the full simulation.
+ */
+class CaloFastSimMaker : public Gaugi::Algorithm
+{
+  public:
+  
+    /** Contructor **/
+    CaloFastSimMaker( std::string name );
+    /** Destructor **/
+    ~CaloFastSimMaker()=default;
+    
+    /*! initialize the algorithm **/
+    virtual StatusCode initialize() override;
+    /*! Book all histograms into the current storegate **/
+    virtual StatusCode bookHistograms( SG::EventContext &ctx ) const override;
+    /*! Execute in step action step from geant core **/
+    virtual StatusCode execute( SG::EventContext &ctx , const G4Step *step) const override;
+    /*! Execute in ComponentAccumulator **/
+    virtual StatusCode execute( SG::EventContext &ctx , int /*evt*/ ) const override;
+    /*! execute before start the step action **/
+    virtual StatusCode pre_execute( SG::EventContext &ctx ) const override;
+    /*! execute after the step action **/ 
+    virtual StatusCode post_execute( SG::EventContext &ctx ) const override;
+    /*! fill hisogram in the end **/
+    virtual StatusCode fillHistograms( SG::EventContext &ctx ) const override;
+    /*! finalize the algorithm **/ 
+    virtual StatusCode finalize() override;
+
+    /*! Add a hit maker */
+    void push_back( CaloHitMaker *maker );
+
+  private:
+
+    /*! Shower parameters of one sampling */
+    struct Parameters {
+      int sampling;
+      /*! Fraction of the particle energy deposited into the sampling */
+      float fraction;
+      /*! Lateral profile: alpha*exp(-r/r1) + (1-alpha)*exp(-r/r2), in the (eta,phi) plane */
+      float alpha, r1, r2;
+      /*! Only the cells with center inside of this distance */
+      float rmax;
+    };
+
+    /*! All samplings for one particle class, eta and energy bin */
+    struct Bin {
+      int particle;
+      float etaMin, etaMax, energyMin, energyMax;
+      std::vector<Parameters> samplings;
+    };
+
+    /*! Particle class used by the parametrization (-1 for not interacting particles) */
+    int particleClass( int pdgid ) const;
+    /*! The closest bin for the particle */
+    const Bin* find( int particle, float eta, float energy ) const;
+    /*! Lateral energy density at the distance r */
+    float density( const Parameters &par, float r ) const;
+    /*! Time of flight (ns) from the origin to the middle of the maker volume */
+    float tof( const CaloHitMaker *maker, float eta ) const;
+    /*! Deposit the energy of the sampling into the cells around (eta,phi) */
+    StatusCode deposit( SG::EventContext &ctx, const Parameters &par, float eta, float phi, float energy ) const;
+
+    std::vector<CaloHitMaker*> m_makers;
+    /*! Makers for each sampling */
+    std::map< int, std::vector<CaloHitMaker*> > m_samplings;
+
+    std::vector<Bin> m_bins;
+
+    std::string m_truthKey;
+    std::string m_parametersFile;
+    std::string m_ntupleName;
+};
+
+
+#endif
@@ -0,0 +1,186 @@
+
+#include "CaloHitDispatcher.h"
+#include "TVector3.h"
+#include <algorithm>
+
+using namespace Gaugi;
+using namespace SG;
+
+
+
+/**
+ * @class CaloHitDispatcher
+ * @brief Routes the Geant4 steps to the hit makers.
+ * 
+ * The sensitive volumes are made of absorber and gap plates, so the logical volume
+ * of the step is not enough to know the sampling. The same r/z acceptance used by
+ * each CaloHitMaker is tabulated instead: all makers limits split the r/z plane
+ * in intervals and each interval holds the makers that fully cover it. The step
+ * position is transformed to (eta,phi) only once and filled only into these makers.
+ */
+CaloHitDispatcher::CaloHitDispatcher( std::string name ) : 
+  IMsgService(name),
+  Algorithm()
+{
+  declareProperty( "OutputLevel"            , m_outputLevel=1               );
+}
+
+//!=====================================================================
+
+void CaloHitDispatcher::push_back( CaloHitMaker *maker )
+{
+  m_makers.push_back(maker);
+}
+
+//!=====================================================================
+
+StatusCode CaloHitDispatcher::initialize()
+{
+  CHECK_INIT();
+  setMsgLevel( m_outputLevel );
+
+  m_rEdges.clear(); m_zEdges.clear();
+  for ( auto maker : m_makers ){
+    if( maker->initialize().isFailure() ){
+      MSG_FATAL( "It's not possible to initialize the maker with name " << maker->name() );
+    }
+    m_rEdges.push_back( maker->rMin() ); m_rEdges.push_back( maker->rMax() );
+    m_zEdges.push_back( maker->zMin() ); m_zEdges.push_back( maker->zMax() );
+  }
+
+  for ( auto edges : {&m_rEdges, &m_zEdges} ){
+    std::sort( edges->begin(), edges->end() );
+    edges->erase( std::unique( edges->begin(), edges->end() ), edges->end() );
+  }
+
+  int nr = std::max( (int)m_rEdges.size()-1, 0 );
+  int nz = std::max( (int)m_zEdges.size()-1, 0 );
+  m_table.assign( nr*nz, {} );
+
+  // the edges came from the makers, so each interval is entirely inside or outside of each maker
+  for ( int r=0; r < nr; ++r ){
+    for ( int z=0; z < nz; ++z ){
+      for ( auto maker : m_makers ){
+        if( maker->rMin() <= m_rEdges[r] && m_rEdges[r+1] <= maker->rMax() &&
+            maker->zMin() <= m_zEdges[z] && m_zEdges[z+1] <= maker->zMax() )
+        {
+          m_table[r*nz+z].push_back(maker);
+        }
+      }
+    }
+  }
+
+  MSG_INFO( "Dispatching steps to " << m_makers.size() << " makers using " << nr << "x" << nz << " r/z intervals." );
+  return StatusCode::SUCCESS;
+}
+
+//!=====================================================================
+
+StatusCode CaloHitDispatcher::finalize()
+{
+  for ( auto maker : m_makers ){
+    if( maker->finalize().isFailure() ){
+      MSG_ERROR( "It's not possible to finalize the maker with name " << maker->name() );
+      return StatusCode::FAILURE;
+    }
+  }
+  return StatusCode::SUCCESS;
+}
+
+//!=====================================================================
+
+StatusCode CaloHitDispatcher::bookHistograms( SG::EventContext &ctx ) const
+{
+  for ( auto maker : m_makers ){
+    if( maker->bookHistograms(ctx).isFailure() ){
+      MSG_ERROR( "It's not possible to book histograms for " << maker->name() );
+      return StatusCode::FAILURE;
+    }
+  }
+  return StatusCode::SUCCESS;
+}
+
+//!=====================================================================
+
+StatusCode CaloHitDispatcher::pre_execute( EventContext &ctx ) const
+{
+  for ( auto maker : m_makers ){
+    if( maker->pre_execute(ctx).isFailure() ){
+      MSG_ERROR( "It's not possible to pre execute " << maker->name() );
+      return StatusCode::FAILURE;
+    }
+  }
+  return StatusCode::SUCCESS;
+}
+
+//!=====================================================================
+ 
+StatusCode CaloHitDispatcher::execute( EventContext &ctx , const G4Step *step ) const
+{
+  G4ThreeVector pos = step->GetPreStepPoint()->GetPosition();
+
+  // same transformation (and precision) used by the makers
+  auto vpos = TVector3( pos.x(), pos.y(), pos.z());
+  float radius = vpos.Perp();
+  int r = find( m_rEdges, radius );
+  if( r < 0 ) return StatusCode::SUCCESS;
+  int z = find( m_zEdges, pos.z() );
+  if( z < 0 ) return StatusCode::SUCCESS;
+
+  auto &makers = m_table[ r*(m_zEdges.size()-1) + z ];
+  if( makers.empty() ) return StatusCode::SUCCESS;
+
+  float eta = vpos.PseudoRapidity();
+  float phi = vpos.Phi();
+  for ( auto maker : makers ){
+    if( maker->fill( ctx, step, eta, phi ).isFailure() ){
+      MSG_ERROR( "It's not possible to fill the step into " << maker->name() );
+      return StatusCode::FAILURE;
+    }
+  }
+  return StatusCode::SUCCESS;
+}
+
+//!=====================================================================
+
+StatusCode CaloHitDispatcher::execute( EventContext &/*ctx*/ , int /*evt*/ ) const
+{
+  MSG_ERROR("This method can not be execute in standalone mode.");
+  return StatusCode::FAILURE;
+}
+
+//!=====================================================================
+
+StatusCode CaloHitDispatcher::post_execute( EventContext &ctx ) const
+{
+  for ( auto maker : m_makers ){
+    if( maker->post_execute(ctx).isFailure() ){
+      MSG_ERROR( "It's not possible to post execute " << maker->name() );
+      return StatusCode::FAILURE;
+    }
+  }
+  return StatusCode::SUCCESS;
+}
+
+//!=====================================================================
+
+StatusCode CaloHitDispatcher::fillHistograms( EventContext &ctx ) const
+{
+  for ( auto maker : m_makers ){
+    if( maker->fillHistograms(ctx).isFailure() ){
+      MSG_ERROR( "It's not possible to fill histograms for " << maker->name() );
+      return StatusCode::FAILURE;
+    }
+  }
+  return StatusCode::SUCCESS;
+}
+
+//!=====================================================================
+
+int CaloHitDispatcher::find( const std::vector<float> &edges, double value ) const
+{
+  // first edge >= value, so the value is in (edges[i-1], edges[i]]
+  auto it = std::lower_bound( edges.begin(), edges.end(), value );
+  if( it == edges.begin() || it == edges.end() ) return -1;
+  return (it - edges.begin()) - 1;
+}
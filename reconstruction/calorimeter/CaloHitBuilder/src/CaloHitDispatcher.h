@@ -0,0 +1,60 @@
+#ifndef CaloHitDispatcher_h
+#define CaloHitDispatcher_h
+
+#include "GaugiKernel/Algorithm.h"
+#include "GaugiKernel/DataHandle.h"
+#include "CaloHitMaker.h"
+
+
+/**
+ * @class CaloHitDispatcher
+ * @brief Send each Geant4 step only to the hit makers that own its position.
+ * 
+ * The r/z limits of all makers are merged into one table built once, so each step
+ * costs one lookup instead of a call (and a coordinate transformation) per sampling.
+ */
+class CaloHitDispatcher : public Gaugi::Algorithm
+{
+  public:
+  
+    /** Contructor **/
+    CaloHitDispatcher( std::string name );
+    /** Destructor **/
+    ~CaloHitDispatcher()=default;
+    
+    /*! initialize the algorithm **/
+    virtual StatusCode initialize() override;
+    /*! Book all histograms into the current storegate **/
+    virtual StatusCode bookHistograms( SG::EventContext &ctx ) const override;
+    /*! Execute in step action step from geant core **/
+    virtual StatusCode execute( SG::EventContext &ctx , const G4Step *step) const override;
+    /*! Execute in ComponentAccumulator **/
+    virtual StatusCode execute( SG::EventContext &ctx , int /*evt*/ ) const override;
+    /*! execute before start the step action **/
+    virtual StatusCode pre_execute( SG::EventContext &ctx ) const override;
+    /*! execute after the step action **/ 
+    virtual StatusCode post_execute( SG::EventContext &ctx ) const override;
+    /*! fill hisogram in the end **/
+    virtual StatusCode fillHistograms( SG::EventContext &ctx ) const override;
+    /*! finalize the algorithm **/ 
+    virtual StatusCode finalize() override;
+
+    /*! Add a hit maker */
+    void push_back( CaloHitMaker *maker );
+
+  private:
+
+    /*! Interval (left < value <= right) for sorted edges, -1 if outside */
+    int find( const std::vector<float> &edges, double value ) const;
+
+    std::vector<CaloHitMaker*> m_makers;
+
+    /*! All r and z limits (sorted) */
+    std::vector<float> m_rEdges;
+    std::vector<float> m_zEdges;
+    /*! Makers for each (r,z) interval, index r*(nz)+z */
+    std::vector<std::vector<CaloHitMaker*>> m_table;
+};
+
+
+#endif
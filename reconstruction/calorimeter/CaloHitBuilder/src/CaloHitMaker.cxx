@@ -4,6 +4,7 @@
 #include "CaloHit/CaloHitCollection.h"
 #include "EventInfo/EventInfoContainer.h"
 #include "CaloHitMaker.h"
+#include "CaloHitPool.h"
 
 #include "G4Kernel/CaloPhiRange.h"
 #include "G4Kernel/constants.h"
@@ -36,6 +37,8 @@ using namespace SG;
  * - Eta/PhiBins: Readout segmentation.
  * - RMin/Max, ZMin/Max: Spatial boundaries of the sensitive volume.
  * - Sampling: Identifier for the calorimeter layer.
+ * - SparseHits: Create only the hits touched by a step (recycled between events). The
+ *   cells without energy are not saved, so this is off by default.
  */
 CaloHitMaker::CaloHitMaker( std::string name ) : 
   IMsgService(name),
@@ -59,6 +62,7 @@ CaloHitMaker::CaloHitMaker( std::string name ) :
   declareProperty( "DetailedHistograms"       , m_detailedHistograms=false            );
   declareProperty( "HistogramPath"            , m_histPath="/CaloHitMaker"            );
   declareProperty( "SamplingNoiseStd"         , m_noiseStd=0                          );
+  declareProperty( "SparseHits"               , m_sparseHits=false                    );
 
 
 
@@ -74,6 +78,24 @@ StatusCode CaloHitMaker::initialize()
   setMsgLevel( (MSG::Level)m_outputLevel );
   m_nEtaBins = m_etaBins.size() - 1;
   m_nPhiBins = m_phiBins.size() - 1;
+  m_etaInvWidth = m_nEtaBins / (m_etaBins.back() - m_etaBins.front());
+  m_phiInvWidth = m_nPhiBins / (m_phiBins.back() - m_phiBins.front());
+
+  // The geometry does not change between events, build all bins only once
+  float deltaEta = std::abs(m_etaBins[1] - m_etaBins[0]);
+  float deltaPhi = std::abs(m_phiBins[1] - m_phiBins[0]);
+  m_cells.clear();
+  m_cells.reserve( m_nEtaBins*m_nPhiBins );
+  for ( unsigned etaBin = 0; etaBin < m_nEtaBins; ++etaBin){
+    for ( unsigned phiBin = 0; phiBin < m_nPhiBins; ++phiBin){
+      float etaCenter = m_etaBins[etaBin] + deltaEta / 2;
+      float phiCenter = m_phiBins[phiBin] + deltaPhi / 2;
+      // local hash
+      unsigned bin = m_nPhiBins * etaBin + phiBin;
+      xAOD::CaloCellGeometry cell{ etaCenter, phiCenter, deltaEta, deltaPhi, 0, (CaloSampling)m_sampling, (Detector)m_detector, hash(bin) };
+      m_cells.push_back( xAOD::CaloGeometry::instance().get(cell) );
+    }
+  }
 
   return StatusCode::SUCCESS;
 }
@@ -108,45 +130,41 @@ StatusCode CaloHitMaker::bookHistograms( SG::EventContext &ctx ) const
  * Initializes the CaloHitCollection in the event store. Pre-populates it with 
  * empty hits for every defined readout cell (bin) to be ready for energy accumulation.
  * This ensures that every cell has a corresponding object, even if empty.
+ * In sparse mode the collection starts empty and the hits are taken from the
+ * pool of the store only when a step lands into the cell (see fill).
  */
 StatusCode CaloHitMaker::pre_execute( EventContext &ctx ) const
 {
+  if( m_sparseHits ){
+    auto store = ctx.getStoreGateSvc();
+    // one pool for each store, shared by all makers
+    if( !store->decorator("CaloHitPool") ){
+      store->decorate( "CaloHitPool", new CaloHitPool() );
+    }
+    // the hits belong to the pool
+    SG::WriteHandle<xAOD::CaloHitCollection> collection( m_collectionKey, ctx );
+    collection.record( std::unique_ptr<xAOD::CaloHitCollection>(new xAOD::CaloHitCollection(false)) );
+    MSG_DEBUG("Pre_execute done.");
+    return StatusCode::SUCCESS;
+  }
+
   // Build the CaloHitCollection and attach into the EventContext
   // Create the hit collection into the event context
   SG::WriteHandle<xAOD::CaloHitCollection> collection( m_collectionKey, ctx );
   collection.record( std::unique_ptr<xAOD::CaloHitCollection>(new xAOD::CaloHitCollection()) );
 
-  float deltaEta = std::abs(m_etaBins[1] - m_etaBins[0]);
-  float deltaPhi = std::abs(m_phiBins[1] - m_phiBins[0]);
-
   //
-  // Prepare all sensitive objects like a two dimensional histogram
+  // Prepare all sensitive objects like a two dimensional histogram.
+  // Only the dynamic part is allocated, the geometry comes from the static table
   //
-  for ( unsigned etaBin = 0; etaBin < m_nEtaBins; ++etaBin){ // Rows
-
-    //if (std::abs(m_etaBins[etaBin]) == std::abs(m_etaBins[etaBin+1]))
-    //  continue;
+  for ( const auto cell : m_cells ){
 
-    for ( unsigned phiBin = 0; phiBin < m_nPhiBins; ++phiBin){ // Cols
-
-      float etaCenter = m_etaBins[etaBin] + deltaEta / 2;
-      float phiCenter = m_phiBins[phiBin] + deltaPhi / 2;
-     
-      // local hash
-      unsigned bin = m_nPhiBins * etaBin + phiBin;
-      
-      // Create the calorimeter cell
-      auto *hit = new xAOD::CaloHit( etaCenter, phiCenter, deltaEta, deltaPhi, hash(bin), 
-                                     (CaloSampling)m_sampling,
-                                     (Detector)m_detector,
-                                     m_bc_duration, m_bcid_start, m_bcid_end );
-      if( !collection->insert( hit->hash(), hit) )
-      {
-        MSG_FATAL( "It is not possible to include hit hash ("<< hit->hash() << ") into the collection. hash already exist.");
-      }
-
-    } // Loop over phi bins
-  }// Loop over eta bins
+    auto *hit = new xAOD::CaloHit( cell, m_bc_duration, m_bcid_start, m_bcid_end );
+    if( !collection->insert( hit->hash(), hit) )
+    {
+      MSG_FATAL( "It is not possible to include hit hash ("<< hit->hash() << ") into the collection. hash already exist.");
+    }
+  }
 
   MSG_DEBUG("Pre_execute done.");
   return StatusCode::SUCCESS;
@@ -165,20 +183,12 @@ StatusCode CaloHitMaker::pre_execute( EventContext &ctx ) const
  */
 StatusCode CaloHitMaker::execute( EventContext &ctx , const G4Step *step ) const
 {
-  SG::ReadHandle<xAOD::CaloHitCollection> collection( m_collectionKey, ctx );
-
-  if( !collection.isValid() ){
-    MSG_FATAL("It's not possible to retrieve the CaloHitCollection using this key: " << m_collectionKey);
-  }
-
   // Get the position
   G4ThreeVector pos = step->GetPreStepPoint()->GetPosition();
 
   // Apply all necessary transformation (x,y,z) to (eta,phi,r) coordinates
   // Get ATLAS coordinates (in transverse plane xy)
   auto vpos = TVector3( pos.x(), pos.y(), pos.z());
-  float eta = vpos.PseudoRapidity();
-  float phi = vpos.Phi();
   float radius = vpos.Perp();
 
   // In plan xy
@@ -188,28 +198,69 @@ StatusCode CaloHitMaker::execute( EventContext &ctx , const G4Step *step ) const
   if( !(pos.z() > m_zMin && pos.z() <= m_zMax))
     return StatusCode::SUCCESS;
 
-  int etaBin = find(m_etaBins, eta);
+  return fill( ctx, step, vpos.PseudoRapidity(), vpos.Phi() );
+}
+
+//!=====================================================================
+
+StatusCode CaloHitMaker::fill( EventContext &ctx, const G4Step *step, float eta, float phi ) const
+{
+  xAOD::CaloHit *hit = this->hit( ctx, eta, phi );
+  
+  if( hit ){
+    // hit->fill( step );
+    hit->fill( step , 1*m_noiseStd); // hit with tof selection sensible by 1*sigma of sampling noise.
+  }
+  return StatusCode::SUCCESS;
+}
+
+//!=====================================================================
+
+StatusCode CaloHitMaker::fill( EventContext &ctx, float eta, float phi, float edep, float t ) const
+{
+  xAOD::CaloHit *hit = this->hit( ctx, eta, phi );
+
+  if( hit ){
+    hit->fill( edep, t, 1*m_noiseStd );
+  }
+  return StatusCode::SUCCESS;
+}
+
+//!=====================================================================
+
+xAOD::CaloHit* CaloHitMaker::hit( EventContext &ctx, float eta, float phi ) const
+{
+  int etaBin = find(m_etaBins, eta, m_etaInvWidth);
 
   if(etaBin < 0) 
-    return StatusCode::SUCCESS;
+    return nullptr;
 
-  int phiBin = find(m_phiBins, phi);
+  int phiBin = find(m_phiBins, phi, m_phiInvWidth);
 
   if(phiBin < 0)
-    return StatusCode::SUCCESS;
+    return nullptr;
+
+  SG::ReadHandle<xAOD::CaloHitCollection> collection( m_collectionKey, ctx );
+
+  if( !collection.isValid() ){
+    MSG_FATAL("It's not possible to retrieve the CaloHitCollection using this key: " << m_collectionKey);
+  }
 
   int bin = m_nPhiBins * etaBin + phiBin;
 
   xAOD::CaloHit *hit=nullptr;
 
-  if(collection->retrieve(hash(bin), hit)){
-    // hit->fill( step );
-    hit->fill( step , 1*m_noiseStd); // hit with tof selection sensible by 1*sigma of sampling noise.
-  }else{
-    MSG_FATAL( "Its not possible to retrieve the hit. Bin ("<< bin << ") not exist");
+  if(!collection->retrieve(hash(bin), hit)){
+    if(!m_sparseHits){
+      MSG_FATAL( "Its not possible to retrieve the hit. Bin ("<< bin << ") not exist");
+    }
+    // first deposit into this cell. The collection was recorded by this maker in pre_execute
+    auto pool = (CaloHitPool*)ctx.getStoreGateSvc()->decorator("CaloHitPool");
+    hit = pool->get( m_cells[bin], m_bc_duration, m_bcid_start, m_bcid_end );
+    const_cast<xAOD::CaloHitCollection*>(collection.ptr())->insert( hit->hash(), hit );
   }
-  
-  return StatusCode::SUCCESS;
+
+  return hit;
 }
 
 //!=====================================================================
@@ -260,11 +311,15 @@ StatusCode CaloHitMaker::fillHistograms( EventContext &ctx ) const
 
 //!=====================================================================
 
-int CaloHitMaker::find( const std::vector<float> &vec, float value) const 
+int CaloHitMaker::find( const std::vector<float> &vec, float value, float invWidth ) const 
 {
-  auto binIterator = std::adjacent_find( vec.begin(), vec.end(), [=](float left, float right){ return left < value and value <= right; }  );
-  if ( binIterator == vec.end() ) return -1;
-  return  binIterator - vec.begin();
+  if( !(value > vec.front() && value <= vec.back()) ) return -1;
+  int last = vec.size() - 2;
+  int bin = std::min( std::max( (int)((value - vec.front()) * invWidth), 0 ), last );
+  // fix the rounding of the edges
+  while( bin > 0 && value <= vec[bin] ) --bin;
+  while( bin < last && value > vec[bin+1] ) ++bin;
+  return bin;
 }
 
 //!=====================================================================
@@ -5,6 +5,7 @@
 #include "GaugiKernel/DataHandle.h"
 #include "GaugiKernel/AlgTool.h"
 #include "CaloHit/CaloHit.h"
+#include "CaloCell/CaloGeometry.h"
 
 
 
@@ -50,10 +51,31 @@ class CaloHitMaker : public Gaugi::Algorithm
     
     virtual StatusCode finalize() override;
 
+    /*! Add the step into the hit of the (eta,phi) bin. The step must be inside of the r/z volume */
+    StatusCode fill( SG::EventContext &ctx, const G4Step *step, float eta, float phi ) const;
+
+    /*! Add the energy (in MeV) at the time t (in ns) into the hit of the (eta,phi) bin (without geant step) */
+    StatusCode fill( SG::EventContext &ctx, float eta, float phi, float edep, float t ) const;
+
+    /*! Volume limits in the transverse plane and along the beam axis */
+    float rMin() const { return m_rMin; };
+    float rMax() const { return m_rMax; };
+    float zMin() const { return m_zMin; };
+    float zMax() const { return m_zMax; };
+    /*! Readout segmentation (bin edges) */
+    const std::vector<float>& etaBins() const { return m_etaBins; };
+    const std::vector<float>& phiBins() const { return m_phiBins; };
+    /*! Sampling id for this maker */
+    int sampling() const { return m_sampling; };
+
   private:
    
-    int find( const std::vector<float> &vec, float value) const;
+    /*! Bin (left < value <= right) for sorted edges. The edges are almost uniform (see SensitiveDetector.py),
+     * so the bin is guessed using the mean width and corrected with the neighbours */
+    int find( const std::vector<float> &vec, float value, float invWidth ) const;
     unsigned long int hash(unsigned bin) const;
+    /*! The hit of the (eta,phi) bin for the current event (nullptr case outside of the bins) */
+    xAOD::CaloHit* hit( SG::EventContext &ctx, float eta, float phi ) const;
 
     /*! collection key */
     std::string m_collectionKey; // output
@@ -82,9 +104,17 @@ class CaloHitMaker : public Gaugi::Algorithm
     std::string m_histPath;
     /*! detailed histogram flags */
     bool m_detailedHistograms;
+    /*! Create the hits only for the touched cells (full granularity otherwise) */
+    bool m_sparseHits;
 
     unsigned int m_nEtaBins;
     unsigned int m_nPhiBins;
+    /*! Inverse of the mean bin width */
+    float m_etaInvWidth;
+    float m_phiInvWidth;
+
+    /*! Static description for each bin (shared by all events and threads) */
+    std::vector<const xAOD::CaloCellGeometry*> m_cells;
 };
 
 
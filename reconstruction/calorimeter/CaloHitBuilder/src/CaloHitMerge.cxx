@@ -121,13 +121,7 @@ StatusCode CaloHitMerge::post_execute( EventContext &ctx ) const
       const xAOD::CaloHit* const_hit=pair.second;
       
       // Create the truth cell 
-      auto hit = new xAOD::CaloHit( const_hit->eta(),
-                                    const_hit->phi(),
-                                    const_hit->deltaEta(),
-                                    const_hit->deltaPhi(),
-                                    const_hit->hash(),
-                                    const_hit->sampling(),
-                                    const_hit->detector(),
+      auto hit = new xAOD::CaloHit( const_hit->geometry(),
                                     const_hit->bc_duration(),
                                     const_hit->bcid_start(),
                                     const_hit->bcid_end()
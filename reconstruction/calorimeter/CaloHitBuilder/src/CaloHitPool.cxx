@@ -0,0 +1,17 @@
+
+#include "CaloHitPool.h"
+
+
+
+xAOD::CaloHit* CaloHitPool::get( const xAOD::CaloCellGeometry *cell, float bc_duration, int bcid_start, int bcid_end )
+{
+  auto &hit = m_hits[cell->hash];
+  if( hit && hit->geometry()==cell && hit->bc_duration()==bc_duration && 
+      hit->bcid_start()==bcid_start && hit->bcid_end()==bcid_end )
+  {
+    hit->reset();
+  }else{
+    hit.reset( new xAOD::CaloHit( cell, bc_duration, bcid_start, bcid_end ) );
+  }
+  return hit.get();
+}
@@ -0,0 +1,42 @@
+#ifndef CaloHitPool_h
+#define CaloHitPool_h
+
+#include "CaloHit/CaloHit.h"
+#include "TObject.h"
+#include <memory>
+#include <unordered_map>
+
+
+/**
+ * @class CaloHitPool
+ * @brief Hits recycled between events (keyed by hash).
+ *
+ * In sparse mode the hit makers create a hit only when the first step lands
+ * into its cell. The hit is taken from this pool, so only the cells touched
+ * for the first time in the job are allocated and all other hits are only
+ * zeroized. It is kept as a StoreGate decorator, so there is one pool for each
+ * store (thread) and the collections that point to the pool are not owners.
+ */
+class CaloHitPool : public TObject
+{
+
+  public:
+
+    /** Constructor **/
+    CaloHitPool()=default;
+
+    /** Destructor **/
+    ~CaloHitPool()=default;
+
+    /*! Get an empty hit for this cell (create it case not exist) */
+    xAOD::CaloHit* get( const xAOD::CaloCellGeometry *cell, float bc_duration, int bcid_start, int bcid_end );
+
+    /*! Number of allocated hits */
+    size_t size() const { return m_hits.size(); };
+
+  private:
+
+    std::unordered_map< unsigned long int, std::unique_ptr<xAOD::CaloHit> > m_hits;
+};
+
+#endif
@@ -0,0 +1,178 @@
+
+#include "CaloShowerLibraryMaker.h"
+#include "G4Kernel/ShowerLibrary.h"
+#include "G4Event.hh"
+#include "G4EventManager.hh"
+#include "G4PrimaryParticle.hh"
+#include "G4PrimaryVertex.hh"
+#include "G4Step.hh"
+#include "G4SystemOfUnits.hh"
+#include "TObject.h"
+#include "TTree.h"
+
+using namespace Gaugi;
+using namespace SG;
+
+
+namespace{
+  /*! The shower of the current event (StoreGate decorator, one for each thread). It
+   * also holds the buffers of the library tree branches */
+  struct ShowerRecord : public TObject
+  {
+    bool started=false;
+    int pdgid=0;
+    float energy=0, eta=0, t0=0;
+    G4ThreeVector origin, dir, u, v;
+    std::vector<float> l_, u_, v_, e_, t_;
+
+    void clear(){
+      started=false;
+      l_.clear(); u_.clear(); v_.clear(); e_.clear(); t_.clear();
+    }
+  };
+}
+
+
+
+/**
+ * @class CaloShowerLibraryMaker
+ * @brief Records frozen showers for the fast simulation.
+ * 
+ * Properties:
+ * - Regions: Volume names where the shower can start.
+ * - NtupleName: Name of the library tree (ShowerLibrary).
+ */
+CaloShowerLibraryMaker::CaloShowerLibraryMaker( std::string name ) : 
+  IMsgService(name),
+  Algorithm()
+{
+  declareProperty( "Regions"                  , m_regions={}                          );
+  declareProperty( "NtupleName"               , m_ntupleName="ShowerLibrary"          );
+  declareProperty( "OutputLevel"              , m_outputLevel=1                       );
+}
+
+//!=====================================================================
+
+StatusCode CaloShowerLibraryMaker::initialize()
+{
+  CHECK_INIT();
+  setMsgLevel( (MSG::Level)m_outputLevel );
+  m_regionSet = std::set<std::string>( m_regions.begin(), m_regions.end() );
+  return StatusCode::SUCCESS;
+}
+
+//!=====================================================================
+
+StatusCode CaloShowerLibraryMaker::finalize()
+{
+  return StatusCode::SUCCESS;
+}
+
+//!=====================================================================
+
+StatusCode CaloShowerLibraryMaker::bookHistograms( EventContext &ctx ) const
+{
+  auto store = ctx.getStoreGateSvc();
+  // the branches are bound once to the record of this store, filled for each event
+  auto record = new ShowerRecord();
+  store->decorate( "ShowerRecord", record );
+
+  store->cd();
+  TTree *tree = new TTree(m_ntupleName.c_str(), "");
+  tree->Branch( "pdgid"  , &record->pdgid , "pdgid/I"  );
+  tree->Branch( "energy" , &record->energy, "energy/F" );
+  tree->Branch( "eta"    , &record->eta   , "eta/F"    );
+  tree->Branch( "spot_l" , &record->l_ );
+  tree->Branch( "spot_u" , &record->u_ );
+  tree->Branch( "spot_v" , &record->v_ );
+  tree->Branch( "spot_e" , &record->e_ );
+  tree->Branch( "spot_t" , &record->t_ );
+  store->add( tree );
+  return StatusCode::SUCCESS;
+}
+
+//!=====================================================================
+
+StatusCode CaloShowerLibraryMaker::pre_execute( EventContext &ctx ) const
+{
+  auto record = (ShowerRecord*)ctx.getStoreGateSvc()->decorator("ShowerRecord");
+  record->clear();
+  return StatusCode::SUCCESS;
+}
+
+//!=====================================================================
+
+/**
+ * @brief Add the energy deposit as a spot of the shower.
+ * 
+ * The shower starts with the first deposit into one of the regions. The
+ * energy and the direction come from the primary particle.
+ */
+StatusCode CaloShowerLibraryMaker::execute( EventContext &ctx, const G4Step *step ) const
+{
+  auto record = (ShowerRecord*)ctx.getStoreGateSvc()->decorator("ShowerRecord");
+  const G4StepPoint *point = step->GetPreStepPoint();
+
+  if( !record->started ){
+    auto volume = point->GetPhysicalVolume();
+    if( !volume || !m_regionSet.count( volume->GetLogicalVolume()->GetRegion()->GetName() ) )
+      return StatusCode::SUCCESS;
+
+    auto event = G4EventManager::GetEventManager()->GetConstCurrentEvent();
+    if( !event || !event->GetPrimaryVertex(0) || !event->GetPrimaryVertex(0)->GetPrimary(0) )
+      return StatusCode::SUCCESS;
+
+    auto primary = event->GetPrimaryVertex(0)->GetPrimary(0);
+    record->started = true;
+    record->pdgid   = primary->GetPDGcode();
+    record->energy  = primary->GetKineticEnergy();
+    record->dir     = primary->GetMomentumDirection();
+    record->eta     = record->dir.eta();
+    record->origin  = point->GetPosition();
+    record->t0      = point->GetGlobalTime();
+    ShowerLibrary::frame( record->dir, record->u, record->v );
+  }
+
+  G4ThreeVector d = point->GetPosition() - record->origin;
+  record->l_.push_back( d.dot(record->dir) );
+  record->u_.push_back( d.dot(record->u) );
+  record->v_.push_back( d.dot(record->v) );
+  record->e_.push_back( step->GetTotalEnergyDeposit() / record->energy );
+  record->t_.push_back( point->GetGlobalTime() - record->t0 );
+  return StatusCode::SUCCESS;
+}
+
+//!=====================================================================
+
+// standlone execute
+StatusCode CaloShowerLibraryMaker::execute( EventContext &/*ctx*/, int /*evt*/ ) const
+{
+  MSG_ERROR("This method can not be execute in standalone mode.");
+  return StatusCode::FAILURE;
+}
+
+//!=====================================================================
+
+StatusCode CaloShowerLibraryMaker::post_execute( EventContext &/*ctx*/ ) const
+{
+  return StatusCode::SUCCESS;
+}
+
+//!=====================================================================
+
+StatusCode CaloShowerLibraryMaker::fillHistograms( EventContext &ctx ) const
+{
+  auto store = ctx.getStoreGateSvc();
+  auto record = (ShowerRecord*)store->decorator("ShowerRecord");
+  if( !record->started || record->energy <= 0 ){
+    MSG_WARNING( "No energy deposit into the regions. Skip this shower." );
+    return StatusCode::SUCCESS;
+  }
+
+  // the branches point to the record (see bookHistograms)
+  store->cd();
+  store->tree(m_ntupleName)->Fill();
+  
+  MSG_DEBUG( "Shower with " << record->e_.size() << " spots for " << record->energy << " MeV." );
+  return StatusCode::SUCCESS;
+}
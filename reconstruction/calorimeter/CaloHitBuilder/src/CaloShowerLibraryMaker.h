@@ -0,0 +1,53 @@
+#ifndef CaloShowerLibraryMaker_h
+#define CaloShowerLibraryMaker_h
+
+#include "GaugiKernel/Algorithm.h"
+#include "GaugiKernel/DataHandle.h"
+#include <set>
+
+
+/**
+ * @class CaloShowerLibraryMaker
+ * @brief Algorithm to record the frozen shower library.
+ * 
+ * Records all energy deposits of the event as spots in the frame of the
+ * primary particle (see ShowerLibrary), starting from the first deposit into
+ * one of the regions. Used with single electrons/photons fired into the
+ * calorimeter, one shower per event.
+ */
+class CaloShowerLibraryMaker : public Gaugi::Algorithm
+{
+  public:
+  
+    /** Contructor **/
+    CaloShowerLibraryMaker( std::string name );
+    /** Destructor **/
+    ~CaloShowerLibraryMaker()=default;
+    
+    /*! initialize the algorithm **/
+    virtual StatusCode initialize() override;
+    /*! Book all histograms into the current storegate **/
+    virtual StatusCode bookHistograms( SG::EventContext &ctx ) const override;
+    /*! Execute in step action step from geant core **/
+    virtual StatusCode execute( SG::EventContext &ctx , const G4Step *step) const override;
+    /*! Execute in ComponentAccumulator **/
+    virtual StatusCode execute( SG::EventContext &ctx , int /*evt*/ ) const override;
+    /*! execute before start the step action **/
+    virtual StatusCode pre_execute( SG::EventContext &ctx ) const override;
+    /*! execute after the step action **/ 
+    virtual StatusCode post_execute( SG::EventContext &ctx ) const override;
+    /*! fill the shower into the tree **/
+    virtual StatusCode fillHistograms( SG::EventContext &ctx ) const override;
+    /*! finalize the algorithm **/ 
+    virtual StatusCode finalize() override;
+
+  private:
+    
+    /*! Regions (volume names) where the shower can start */
+    std::vector<std::string> m_regions;
+    std::set<std::string> m_regionSet;
+    /*! Library tree name */
+    std::string m_ntupleName;
+};
+
+#endif
@@ -2,6 +2,9 @@
 
 #include "src/CaloHitMaker.h"
 #include "src/CaloHitMerge.h"
+#include "src/CaloHitDispatcher.h"
+#include "src/CaloShowerLibraryMaker.h"
+#include "src/CaloFastSimMaker.h"
 
 
 #ifdef __CINT__
@@ -13,5 +16,8 @@
 
 #pragma link C++ class CaloHitMaker+;
 #pragma link C++ class CaloHitMerge+;
+#pragma link C++ class CaloHitDispatcher+;
+#pragma link C++ class CaloShowerLibraryMaker+;
+#pragma link C++ class CaloFastSimMaker+;
 
 #endif
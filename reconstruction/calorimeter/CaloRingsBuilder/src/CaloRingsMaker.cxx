@@ -43,6 +43,9 @@ CaloRingsMaker::CaloRingsMaker( std::string name ) :
   declareProperty( "EtaRange"       , m_etaRange={0,2.5}      );
   declareProperty( "DoSigmaCut"     , m_DoSigmaCut=false      );
   declareProperty( "SigmaCut"       , m_SigmaCut=2.0          );
+
+  setThreadSafe();
+  setReentrant();
 }
 
 //!=====================================================================
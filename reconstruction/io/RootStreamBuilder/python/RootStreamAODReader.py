@@ -2,6 +2,7 @@ __all__ = ["RootStreamAODReader"]
 
 from GaugiKernel import Cpp
 from GaugiKernel.macros import *
+from RootStreamBuilder import RootStreamReaderFlags as flags
 import ROOT
 
 class RootStreamAODReader( Cpp ):
@@ -18,6 +19,9 @@ class RootStreamAODReader( Cpp ):
                 OutputTruthRingerKey  : str,
                 OutputLevel       : int=0, 
                 NtupleName        : str="CollectionTree",
+                CacheSize         : int=flags.CacheSize,
+                CacheLearnEntries : int=flags.CacheLearnEntries,
+                AsyncPrefetch     : bool=flags.AsyncPrefetch,
               ): 
     
     Cpp.__init__(self, ROOT.RootStreamAODReader(name))
@@ -31,6 +35,9 @@ class RootStreamAODReader( Cpp ):
     self.setProperty( "OutputTruthRingerKey"  , OutputTruthRingerKey  )
     self.setProperty( "OutputLevel"           , OutputLevel           ) 
     self.setProperty( "NtupleName"            , NtupleName            )
+    self.setProperty( "CacheSize"             , CacheSize             )
+    self.setProperty( "CacheLearnEntries"     , CacheLearnEntries     )
+    self.setProperty( "AsyncPrefetch"         , AsyncPrefetch         )
     self.setProperty( "InputFile"             , InputFile             ) 
     
     f = ROOT.TFile( self.InputFile,"read")
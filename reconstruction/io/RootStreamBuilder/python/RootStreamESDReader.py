@@ -2,6 +2,7 @@ __all__ = ["RootStreamESDReader"]
 
 from GaugiKernel import Cpp
 from GaugiKernel.macros import *
+from RootStreamBuilder import RootStreamReaderFlags as flags
 import ROOT
 
 class RootStreamESDReader( Cpp ):
@@ -15,6 +16,9 @@ class RootStreamESDReader( Cpp ):
                 InputFile           : str,
                 OutputLevel         : int=0, 
                 NtupleName          : str="CollectionTree",
+                CacheSize           : int=flags.CacheSize,
+                CacheLearnEntries   : int=flags.CacheLearnEntries,
+                AsyncPrefetch       : bool=flags.AsyncPrefetch,
               ): 
     
     Cpp.__init__(self, ROOT.RootStreamESDReader(name))
@@ -25,6 +29,9 @@ class RootStreamESDReader( Cpp ):
     self.setProperty( "OutputSeedsKey"      , OutputSeedsKey      )
     self.setProperty( "OutputLevel"         , OutputLevel         ) 
     self.setProperty( "NtupleName"          , NtupleName          )
+    self.setProperty( "CacheSize"           , CacheSize           )
+    self.setProperty( "CacheLearnEntries"   , CacheLearnEntries   )
+    self.setProperty( "AsyncPrefetch"       , AsyncPrefetch       )
     self.setProperty( "InputFile"           , InputFile           )
 
     f = ROOT.TFile( self.InputFile,"read")
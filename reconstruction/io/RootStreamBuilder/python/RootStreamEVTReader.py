@@ -0,0 +1,45 @@
+__all__ = ["RootStreamEVTReader"]
+
+from GaugiKernel import Cpp
+from GaugiKernel.macros import *
+from RootStreamBuilder import RootStreamReaderFlags as flags
+import ROOT
+
+
+class RootStreamEVTReader( Cpp ):
+
+  def __init__( self, name,
+                OutputEventKey   : str,
+                OutputTruthKey   : str,
+                OutputSeedsKey   : str,
+                InputFile        : str,
+                OutputLevel      : int=0, 
+                NtupleName       : str="particles",
+                CacheSize        : int=flags.CacheSize,
+                CacheLearnEntries: int=flags.CacheLearnEntries,
+                AsyncPrefetch    : bool=flags.AsyncPrefetch,
+              ): 
+    
+    Cpp.__init__(self, ROOT.RootStreamEVTReader(name))
+    self.setProperty( "OutputEventKey"  , OutputEventKey  )
+    self.setProperty( "OutputTruthKey"  , OutputTruthKey  )
+    self.setProperty( "OutputSeedsKey"  , OutputSeedsKey  )
+    self.setProperty( "OutputLevel"     , OutputLevel     ) 
+    self.setProperty( "NtupleName"      , NtupleName      )
+    self.setProperty( "CacheSize"       , CacheSize       )
+    self.setProperty( "CacheLearnEntries", CacheLearnEntries )
+    self.setProperty( "AsyncPrefetch"   , AsyncPrefetch   )
+    self.setProperty( "InputFile"       , InputFile       )
+
+    f = ROOT.TFile( self.InputFile,"read")
+    t = f.Get( self.NtupleName)
+    self.__entries = t.GetEntries()
+
+
+  def GetEntries(self):
+    return self.__entries
+
+
+  def merge(self, acc):
+    acc.SetReader(self)
+
@@ -1,5 +1,5 @@
 
-__all__ = ["RootStreamHITFlags", "RootStreamESDFlags", "RootStreamAODFlags"]
+__all__ = ["RootStreamHITFlags", "RootStreamESDFlags", "RootStreamAODFlags", "RootStreamReaderFlags"]
 
 
 from GaugiKernel import EnumStringification
@@ -20,3 +20,10 @@ class RootStreamESDFlags(EnumStringification):
 class RootStreamAODFlags(EnumStringification):
 
     DumpCells = True
+
+
+class RootStreamReaderFlags(EnumStringification):
+
+    CacheSize         = 30   # TTreeCache size in MB (0 to disable)
+    CacheLearnEntries = 10
+    AsyncPrefetch     = True # read the next entry while the current one is processed
@@ -25,6 +25,7 @@ class RootStreamHITMaker( Cpp ):
                 EtaWindow        : float=flags.EtaWindow,
                 PhiWindow        : float=flags.PhiWindow,
                 KeepCells        : List[int]=None,
+                SaveTruth        : bool=True,
               ): 
     
     Cpp.__init__(self, ROOT.RootStreamHITMaker(name))
@@ -42,6 +43,7 @@ class RootStreamHITMaker( Cpp ):
     self.setProperty( "OnlyRoI"         , OnlyRoI         )
     self.setProperty( "EtaWindow"       , EtaWindow       )
     self.setProperty( "PhiWindow"       , PhiWindow       )
+    self.setProperty( "SaveTruth"       , SaveTruth       )
     if KeepCells: 
       self.setProperty( "KeepCells"       , KeepCells       )
     
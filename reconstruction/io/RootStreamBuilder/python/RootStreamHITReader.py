@@ -2,6 +2,7 @@ __all__ = ["RootStreamHITReader"]
 
 from GaugiKernel import Cpp
 from GaugiKernel.macros import *
+from RootStreamBuilder import RootStreamReaderFlags as flags
 import ROOT
 
 
@@ -15,6 +16,9 @@ class RootStreamHITReader( Cpp ):
                 InputFile        : str,
                 OutputLevel      : int=0, 
                 NtupleName       : str="CollectionTree",
+                CacheSize        : int=flags.CacheSize,
+                CacheLearnEntries: int=flags.CacheLearnEntries,
+                AsyncPrefetch    : bool=flags.AsyncPrefetch,
               ): 
     
     Cpp.__init__(self, ROOT.RootStreamHITReader(name))
@@ -24,6 +28,9 @@ class RootStreamHITReader( Cpp ):
     self.setProperty( "OutputSeedsKey"  , OutputSeedsKey  )
     self.setProperty( "OutputLevel"     , OutputLevel     ) 
     self.setProperty( "NtupleName"      , NtupleName      )
+    self.setProperty( "CacheSize"       , CacheSize       )
+    self.setProperty( "CacheLearnEntries", CacheLearnEntries )
+    self.setProperty( "AsyncPrefetch"   , AsyncPrefetch   )
     self.setProperty( "InputFile"       , InputFile       )
 
     f = ROOT.TFile( self.InputFile,"read")
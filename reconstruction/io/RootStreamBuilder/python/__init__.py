@@ -36,3 +36,7 @@ from .RootStreamESDReader import *
 from . import RootStreamAODReader
 __all__.extend(RootStreamAODReader.__all__)
 from .RootStreamAODReader import *
+
+from . import RootStreamEVTReader
+__all__.extend(RootStreamEVTReader.__all__)
+from .RootStreamEVTReader import *
@@ -7,6 +7,7 @@
 #include "src/RootStreamHITReader.h"
 #include "src/RootStreamESDReader.h"
 #include "src/RootStreamAODReader.h"
+#include "src/RootStreamEVTReader.h"
 
 
 #ifdef __CINT__
@@ -24,6 +25,7 @@
 #pragma link C++ class RootStreamHITReader+;
 #pragma link C++ class RootStreamESDReader+;
 #pragma link C++ class RootStreamAODReader+;
+#pragma link C++ class RootStreamEVTReader+;
 
 
 
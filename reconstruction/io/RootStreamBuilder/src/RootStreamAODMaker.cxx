@@ -76,6 +76,9 @@ RootStreamAODMaker::RootStreamAODMaker( std::string name ) :
   declareProperty( "OutputLevel"             , m_outputLevel=1                        );
   declareProperty( "NtupleName"              , m_ntupleName="physics"                 );
   declareProperty( "DumpCells"               , m_dumpCells=false                      );
+
+  // the output tree belongs to the event store
+  setReentrant();
 }
 
 //!=====================================================================
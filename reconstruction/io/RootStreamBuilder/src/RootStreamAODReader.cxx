@@ -15,6 +15,7 @@
 #include "CaloRings/CaloRingsConverter.h"
 #include "Egamma/ElectronConverter.h"
 #include "RootStreamAODReader.h"
+#include "RootStreamInput.h"
 #include "GaugiKernel/EDM.h"
 
 
@@ -52,7 +53,13 @@ RootStreamAODReader::RootStreamAODReader( std::string name ) :
   declareProperty( "OutputTruthRingerKey"   , m_truthRingerKey="TruthRings"   );
   declareProperty( "OutputLevel"            , m_outputLevel=1                   );
   declareProperty( "NtupleName"             , m_ntupleName="CollectionTree"     );
+  declareProperty( "CacheSize"              , m_cacheSize=30                    ); // MB
+  declareProperty( "CacheLearnEntries"      , m_cacheLearnEntries=10            );
+  declareProperty( "AsyncPrefetch"          , m_asyncPrefetch=true              );
   declareProperty( "InputFile"              , m_inputFile=""                    );
+
+  // the input file is a decorator of the event store
+  setReentrant();
 }
 
 //!=====================================================================
@@ -81,8 +88,12 @@ StatusCode RootStreamAODReader::finalize()
 StatusCode RootStreamAODReader::bookHistograms( EventContext &ctx ) const
 {
   auto store = ctx.getStoreGateSvc();
-  TFile *file = new TFile(m_inputFile.c_str(), "read");
-  store->decorate( "events", file );
+  auto input = new RootStreamInput( m_inputFile, m_ntupleName, m_cacheSize, m_cacheLearnEntries, m_asyncPrefetch, m_outputLevel );
+  if( !input->isOpen() ){
+    delete input;
+    MSG_FATAL( "It's not possible to read the file " << m_inputFile );
+  }
+  store->decorate( "events", input );
   return StatusCode::SUCCESS; 
 }
 
@@ -133,33 +144,24 @@ StatusCode RootStreamAODReader::fillHistograms( EventContext &ctx ) const
  */
 StatusCode RootStreamAODReader::deserialize( int evt, EventContext &ctx ) const
 {
-  std::vector<xAOD::CaloDetDescriptor_t > *collection_descriptor = nullptr;
-  std::vector<xAOD::CaloCell_t          > *collection_cells      = nullptr;
-  std::vector<xAOD::EventInfo_t         > *collection_event      = nullptr;
-  std::vector<xAOD::Seed_t              > *collection_seeds      = nullptr;
-  std::vector<xAOD::TruthParticle_t     > *collection_truth      = nullptr;
-  std::vector<xAOD::CaloRings_t         > *collection_rings      = nullptr;
-  std::vector<xAOD::CaloCluster_t       > *collection_clus       = nullptr;
-  std::vector<xAOD::Electron_t          > *collection_el         = nullptr;
-  std::vector<xAOD::CaloCluster_t       > *collection_truth_clus = nullptr;
-  std::vector<xAOD::CaloRings_t         > *collection_truth_rings= nullptr;
-
   MSG_DEBUG( "Link all branches..." );
 
   auto store = ctx.getStoreGateSvc();
-  TFile *file = (TFile*)store->decorator("events");
-  TTree *tree = (TTree*)file->Get(m_ntupleName.c_str());
-
-  InitBranch( tree, ("EventInfoContainer_"     + m_eventKey).c_str()       , &collection_event      );
-  InitBranch( tree, ("SeedContainer_"          + m_seedsKey).c_str()       , &collection_seeds      );
-  InitBranch( tree, ("TruthParticleContainer_" + m_truthKey).c_str()       , &collection_truth      );
-  InitBranch( tree, ("CaloRingsContainer_"     + m_ringerKey).c_str()      , &collection_rings      );
-  InitBranch( tree, ("CaloClusterContainer_"   + m_clusterKey).c_str()     , &collection_clus       );
-  InitBranch( tree, ("ElectronContainer_"      + m_electronKey).c_str()    , &collection_el         );
-  InitBranch( tree, ("CaloClusterContainer_"   + m_truthClusterKey).c_str(), &collection_truth_clus );
-  InitBranch( tree, ("CaloRingsContainer_"     + m_truthRingerKey).c_str() , &collection_truth_rings);
-
-  tree->GetEntry( evt );
+  auto input = (RootStreamInput*)store->decorator("events");
+
+  auto collection_event       = input->bind<std::vector<xAOD::EventInfo_t>>( "EventInfoContainer_"+m_eventKey );
+  auto collection_seeds       = input->bind<std::vector<xAOD::Seed_t>>( "SeedContainer_"+m_seedsKey );
+  auto collection_truth       = input->bind<std::vector<xAOD::TruthParticle_t>>( "TruthParticleContainer_"+m_truthKey );
+  auto collection_rings       = input->bind<std::vector<xAOD::CaloRings_t>>( "CaloRingsContainer_"+m_ringerKey );
+  auto collection_clus        = input->bind<std::vector<xAOD::CaloCluster_t>>( "CaloClusterContainer_"+m_clusterKey );
+  auto collection_el          = input->bind<std::vector<xAOD::Electron_t>>( "ElectronContainer_"+m_electronKey );
+  auto collection_truth_clus  = input->bind<std::vector<xAOD::CaloCluster_t>>( "CaloClusterContainer_"+m_truthClusterKey );
+  auto collection_truth_rings = input->bind<std::vector<xAOD::CaloRings_t>>( "CaloRingsContainer_"+m_truthRingerKey );
+
+  if( !input->read( evt ) ){
+    MSG_ERROR( "It's not possible to read the entry " << evt << " from " << m_inputFile );
+    return StatusCode::FAILURE;
+  }
 
 
   MSG_DEBUG("Deserialize TruthParticle...");
@@ -297,35 +299,10 @@ StatusCode RootStreamAODReader::deserialize( int evt, EventContext &ctx ) const
     }
   }
 
-  delete collection_descriptor;
-  delete collection_seeds     ;
-  delete collection_event     ;
-  delete collection_truth     ;
-  delete collection_rings     ;
-  delete collection_clus      ;
-  delete collection_el        ;
-  delete collection_truth_clus;
-  delete collection_truth_rings;
+  // all buffers were converted, start reading the next entry
+  input->prefetch( evt+1 );
 
 
   return StatusCode::SUCCESS;
  
 }
-
-//!=====================================================================
-
-template <class T>
-void RootStreamAODReader::InitBranch(TTree* fChain, std::string branch_name, T* param) const
-{
-  std::string bname = branch_name;
-  if (fChain->GetAlias(bname.c_str()))
-     bname = std::string(fChain->GetAlias(bname.c_str()));
-
-  if (!fChain->FindBranch(bname.c_str()) ) {
-    MSG_WARNING( "unknown branch " << bname );
-    return;
-  }
-  fChain->SetBranchStatus(bname.c_str(), 1.);
-  fChain->SetBranchAddress(bname.c_str(), param);
-}
-
@@ -48,7 +48,6 @@ class RootStreamAODReader : public Gaugi::Algorithm
  
     StatusCode deserialize( int evt, SG::EventContext &ctx ) const;
 
-    template <class T> void InitBranch(TTree* fChain, std::string branch_name, T* param) const;
     
     //std::string m_cellsKey;
     std::string m_eventKey;
@@ -61,6 +60,9 @@ class RootStreamAODReader : public Gaugi::Algorithm
     std::string m_truthClusterKey;
     std::string m_truthRingerKey;
     std::string m_ntupleName;
+    int m_cacheSize;
+    int m_cacheLearnEntries;
+    bool m_asyncPrefetch;
     std::string m_inputFile;
 
     int m_outputLevel;
@@ -48,6 +48,8 @@ RootStreamESDMaker::RootStreamESDMaker( std::string name ) :
   declareProperty( "EtaWindow"          , m_etaWindow=0.6                   );
   declareProperty( "PhiWindow"          , m_phiWindow=0.6                   );
 
+  // the output tree belongs to the event store
+  setReentrant();
 }
 
 //!=====================================================================
@@ -8,6 +8,7 @@
 #include "TruthParticle/TruthParticleConverter.h"
 #include "EventInfo/SeedConverter.h"
 #include "RootStreamESDReader.h"
+#include "RootStreamInput.h"
 #include "GaugiKernel/EDM.h"
 
 
@@ -35,6 +36,12 @@ RootStreamESDReader::RootStreamESDReader( std::string name ) :
   declareProperty( "OutputSeedsKey"     , m_seedsKey="Seeds"                );
   declareProperty( "OutputLevel"        , m_outputLevel=1                   );
   declareProperty( "NtupleName"         , m_ntupleName="CollectionTree"     );
+  declareProperty( "CacheSize"          , m_cacheSize=30                    ); // MB
+  declareProperty( "CacheLearnEntries"  , m_cacheLearnEntries=10            );
+  declareProperty( "AsyncPrefetch"      , m_asyncPrefetch=true              );
+
+  // the input file is a decorator of the event store
+  setReentrant();
 }
 
 //!=====================================================================
@@ -63,8 +70,12 @@ StatusCode RootStreamESDReader::finalize()
 StatusCode RootStreamESDReader::bookHistograms( EventContext &ctx ) const
 {
   auto store = ctx.getStoreGateSvc();
-  TFile *file = new TFile(m_inputFile.c_str(), "read");
-  store->decorate( "events", file );
+  auto input = new RootStreamInput( m_inputFile, m_ntupleName, m_cacheSize, m_cacheLearnEntries, m_asyncPrefetch, m_outputLevel );
+  if( !input->isOpen() ){
+    delete input;
+    MSG_FATAL( "It's not possible to read the file " << m_inputFile );
+  }
+  store->decorate( "events", input );
   return StatusCode::SUCCESS; 
 }
 
@@ -114,27 +125,22 @@ StatusCode RootStreamESDReader::fillHistograms( EventContext &ctx ) const
  */
 StatusCode RootStreamESDReader::deserialize( int evt, EventContext &ctx ) const
 {
-  std::vector<xAOD::CaloDetDescriptor_t > *collection_descriptor    = nullptr;
-  std::vector<xAOD::CaloCell_t          > *collection_cells         = nullptr;
-  std::vector<xAOD::CaloCell_t          > *collection_cells_truth   = nullptr;
-  std::vector<xAOD::EventInfo_t         > *collection_event         = nullptr;
-  std::vector<xAOD::Seed_t              > *collection_seeds         = nullptr;
-  std::vector<xAOD::TruthParticle_t     > *collection_truth         = nullptr;
-
   MSG_DEBUG( "Link all branches..." );
 
   auto store = ctx.getStoreGateSvc();
-  TFile *file = (TFile*)store->decorator("events");
-  TTree *tree = (TTree*)file->Get(m_ntupleName.c_str());
-
-  InitBranch( tree, ("EventInfoContainer_"         + m_eventKey).c_str()      , &collection_event       );
-  InitBranch( tree, ("SeedContainer_"              + m_seedsKey).c_str()      , &collection_seeds       );
-  InitBranch( tree, ("TruthParticleContainer_"     + m_truthKey).c_str()      , &collection_truth       );
-  InitBranch( tree, ("CaloCellContainer_"          + m_cellsKey).c_str()      , &collection_cells       );
-  InitBranch( tree, ("CaloCellContainer_"          + m_cellsTruthKey).c_str() , &collection_cells_truth );
-  InitBranch( tree, ("CaloDetDescriptorContainer_" + m_cellsKey).c_str()      , &collection_descriptor  );
-
-  tree->GetEntry( evt );
+  auto input = (RootStreamInput*)store->decorator("events");
+
+  auto collection_event       = input->bind<std::vector<xAOD::EventInfo_t>>( "EventInfoContainer_"+m_eventKey );
+  auto collection_seeds       = input->bind<std::vector<xAOD::Seed_t>>( "SeedContainer_"+m_seedsKey );
+  auto collection_truth       = input->bind<std::vector<xAOD::TruthParticle_t>>( "TruthParticleContainer_"+m_truthKey );
+  auto collection_cells       = input->bind<std::vector<xAOD::CaloCell_t>>( "CaloCellContainer_"+m_cellsKey );
+  auto collection_cells_truth = input->bind<std::vector<xAOD::CaloCell_t>>( "CaloCellContainer_"+m_cellsTruthKey );
+  auto collection_descriptor  = input->bind<std::vector<xAOD::CaloDetDescriptor_t>>( "CaloDetDescriptorContainer_"+m_cellsKey );
+
+  if( !input->read( evt ) ){
+    MSG_ERROR( "It's not possible to read the entry " << evt << " from " << m_inputFile );
+    return StatusCode::FAILURE;
+  }
 
 
   MSG_DEBUG("Deserialize TruthParticle...");
@@ -270,31 +276,9 @@ StatusCode RootStreamESDReader::deserialize( int evt, EventContext &ctx ) const
   
   
 
-  delete collection_descriptor  ;
-  delete collection_seeds       ;
-  delete collection_cells       ;
-  delete collection_cells_truth ;
-  delete collection_event       ;
-  delete collection_truth       ;
+  // all buffers were converted, start reading the next entry
+  input->prefetch( evt+1 );
 
   return StatusCode::SUCCESS;
  
 }
-
-//!=====================================================================
-
-template <class T>
-void RootStreamESDReader::InitBranch(TTree* fChain, std::string branch_name, T* param) const
-{
-  std::string bname = branch_name;
-  if (fChain->GetAlias(bname.c_str()))
-     bname = std::string(fChain->GetAlias(bname.c_str()));
-
-  if (!fChain->FindBranch(bname.c_str()) ) {
-    MSG_WARNING( "unknown branch " << bname );
-    return;
-  }
-  fChain->SetBranchStatus(bname.c_str(), 1.);
-  fChain->SetBranchAddress(bname.c_str(), param);
-}
-
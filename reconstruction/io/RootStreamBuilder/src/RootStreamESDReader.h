@@ -48,7 +48,6 @@ class RootStreamESDReader : public Gaugi::Algorithm
  
     StatusCode deserialize( int evt, SG::EventContext &ctx ) const;
 
-    template <class T> void InitBranch(TTree* fChain, std::string branch_name, T* param) const;
     
     std::string m_cellsKey;
     std::string m_cellsTruthKey;
@@ -57,6 +56,9 @@ class RootStreamESDReader : public Gaugi::Algorithm
     std::string m_seedsKey;
     std::string m_inputFile;
     std::string m_ntupleName;
+    int m_cacheSize;
+    int m_cacheLearnEntries;
+    bool m_asyncPrefetch;
 
     int m_outputLevel;
 
@@ -0,0 +1,202 @@
+
+
+#include "EventInfo/EventInfoContainer.h"
+#include "EventInfo/SeedContainer.h"
+#include "TruthParticle/TruthParticleContainer.h"
+
+#include "RootStreamEVTReader.h"
+#include "RootStreamInput.h"
+#include "GaugiKernel/EDM.h"
+
+
+using namespace SG;
+using namespace Gaugi;
+
+
+
+/**
+ * @class RootStreamEVTReader
+ * @brief Reads the generated particles from a ROOT file.
+ * 
+ * Builds `xAOD::EventInfo`, `xAOD::Seed` and `xAOD::TruthParticle` objects from
+ * the EVT particles tree and records them in StoreGate. The seeds are the
+ * particles with pdg id equal zero and only the particles from the main event
+ * are recorded as truth, as done by the EventReader.
+ */
+RootStreamEVTReader::RootStreamEVTReader( std::string name ) : 
+  IMsgService(name),
+  Algorithm()
+{
+  declareProperty( "InputFile"          , m_inputFile=""                    );
+  declareProperty( "OutputEventKey"     , m_eventKey="EventInfo"            );
+  declareProperty( "OutputTruthKey"     , m_truthKey="Particles"            );
+  declareProperty( "OutputSeedsKey"     , m_seedsKey="Seeds"                );
+  declareProperty( "OutputLevel"        , m_outputLevel=1                   );
+  declareProperty( "NtupleName"         , m_ntupleName="particles"          );
+  declareProperty( "CacheSize"          , m_cacheSize=30                    ); // MB
+  declareProperty( "CacheLearnEntries"  , m_cacheLearnEntries=10            );
+  declareProperty( "AsyncPrefetch"      , m_asyncPrefetch=true              );
+
+  // the input file is a decorator of the event store
+  setReentrant();
+}
+
+//!=====================================================================
+
+RootStreamEVTReader::~RootStreamEVTReader()
+{}
+
+//!=====================================================================
+
+StatusCode RootStreamEVTReader::initialize()
+{
+  CHECK_INIT();
+  setMsgLevel(m_outputLevel);
+  return StatusCode::SUCCESS;
+}
+
+//!=====================================================================
+
+StatusCode RootStreamEVTReader::finalize()
+{
+  return StatusCode::SUCCESS;
+}
+
+//!=====================================================================
+
+StatusCode RootStreamEVTReader::bookHistograms( EventContext &ctx ) const
+{
+  MSG_DEBUG("Reading file " << m_inputFile);
+  auto store = ctx.getStoreGateSvc();
+  auto input = new RootStreamInput( m_inputFile, m_ntupleName, m_cacheSize, m_cacheLearnEntries, m_asyncPrefetch, m_outputLevel );
+  if( !input->isOpen() ){
+    delete input;
+    MSG_FATAL( "It's not possible to read the file " << m_inputFile );
+  }
+  store->decorate( "events", input );
+  return StatusCode::SUCCESS; 
+}
+
+//!=====================================================================
+
+StatusCode RootStreamEVTReader::pre_execute( EventContext &/*ctx*/ ) const
+{
+  return StatusCode::SUCCESS;
+}
+
+//!=====================================================================
+
+StatusCode RootStreamEVTReader::execute( EventContext &/*ctx*/, const G4Step * /*step*/ ) const
+{
+  return StatusCode::SUCCESS;
+}
+
+//!=====================================================================
+
+StatusCode RootStreamEVTReader::execute( EventContext &ctx, int evt ) const
+{
+  return deserialize( evt, ctx );
+}
+
+//!=====================================================================
+
+StatusCode RootStreamEVTReader::post_execute( EventContext &/*ctx*/ ) const
+{
+  return StatusCode::SUCCESS;
+}
+
+//!=====================================================================
+
+StatusCode RootStreamEVTReader::fillHistograms( EventContext &/*ctx*/ ) const
+{
+  return StatusCode::SUCCESS;
+}
+
+//!=====================================================================
+
+
+/**
+ * @brief Deserializes the generated particles.
+ * 
+ * The energies and momenta are kept in the same units used by the EventReader
+ * (the generator units, GeV) and the production vertex in mm.
+ */
+StatusCode RootStreamEVTReader::deserialize( int evt, EventContext &ctx ) const
+{
+  MSG_DEBUG( "Link all branches..." );
+  
+  auto store = ctx.getStoreGateSvc();
+  auto input = (RootStreamInput*)store->decorator("events");
+
+  auto runNumber   = input->bindValue<int>( "RunNumber" );
+  auto eventNumber = input->bindValue<int>( "EventNumber" );
+  auto avgmu       = input->bindValue<float>( "avg_mu" );
+  auto totmu       = input->bindValue<float>( "tot_mu" );
+  auto p_isMain    = input->bind<std::vector<int>>( "p_isMain" );
+  auto p_pdg_id    = input->bind<std::vector<int>>( "p_pdg_id" );
+  auto p_px        = input->bind<std::vector<float>>( "p_px" );
+  auto p_py        = input->bind<std::vector<float>>( "p_py" );
+  auto p_pz        = input->bind<std::vector<float>>( "p_pz" );
+  auto p_prod_x    = input->bind<std::vector<float>>( "p_prod_x" );
+  auto p_prod_y    = input->bind<std::vector<float>>( "p_prod_y" );
+  auto p_prod_z    = input->bind<std::vector<float>>( "p_prod_z" );
+  auto p_eta       = input->bind<std::vector<float>>( "p_eta" );
+  auto p_phi       = input->bind<std::vector<float>>( "p_phi" );
+  auto p_e         = input->bind<std::vector<float>>( "p_e" );
+  auto p_et        = input->bind<std::vector<float>>( "p_et" );
+
+  if( !input->read( evt ) ){
+    MSG_ERROR( "It's not possible to read the entry " << evt << " from " << m_inputFile );
+    return StatusCode::FAILURE;
+  }
+
+
+  { // deserialize EventInfo
+    SG::WriteHandle<xAOD::EventInfoContainer> container(m_eventKey, ctx);
+    container.record( std::unique_ptr<xAOD::EventInfoContainer>(new xAOD::EventInfoContainer()));
+    xAOD::EventInfo *event = new xAOD::EventInfo();
+    event->setRunNumber( *runNumber );
+    event->setEventNumber( *eventNumber );
+    event->setAvgmu( *avgmu );
+    event->setTotmu( *totmu );
+    MSG_DEBUG( "EventNumber = " << event->eventNumber() << ", Avgmu = " << event->avgmu());
+    container->push_back(event);
+  }
+
+
+  { // deserialize Seed and TruthParticle
+    SG::WriteHandle<xAOD::SeedContainer> seeds(m_seedsKey, ctx);
+    seeds.record( std::unique_ptr<xAOD::SeedContainer>(new xAOD::SeedContainer()));
+
+    SG::WriteHandle<xAOD::TruthParticleContainer> particles(m_truthKey, ctx);
+    particles.record( std::unique_ptr<xAOD::TruthParticleContainer>(new xAOD::TruthParticleContainer()));
+
+    int seed_id = -1;
+    for ( unsigned int i=0; i < p_e->size(); ++i )
+    {
+      if( p_pdg_id->at(i)==0 ){ // is seed?
+        seed_id++;
+        xAOD::Seed *seed = new xAOD::Seed( seed_id, p_e->at(i), p_et->at(i), p_eta->at(i), p_phi->at(i) );
+        MSG_DEBUG( "Seed " << seed_id << " in eta = " << seed->eta() << ", phi = " << seed->phi());
+        seeds->push_back(seed);
+        continue;
+      }
+
+      if( !p_isMain->at(i) ) continue;
+
+      xAOD::TruthParticle *par = new xAOD::TruthParticle( p_pdg_id->at(i), seed_id,
+                                                          p_e->at(i), p_et->at(i), p_eta->at(i), p_phi->at(i),
+                                                          p_px->at(i), p_py->at(i), p_pz->at(i),
+                                                          p_prod_x->at(i), p_prod_y->at(i), p_prod_z->at(i) );
+      MSG_DEBUG( "Particle in eta = " << par->eta() << ", phi = " << par->phi());
+      particles->push_back(par);
+    }
+  }
+
+
+  // all buffers were converted, start reading the next entry
+  input->prefetch( evt+1 );
+  
+  return StatusCode::SUCCESS;
+ 
+}
@@ -0,0 +1,63 @@
+#ifndef RootStreamEVTReader_h
+#define RootStreamEVTReader_h
+
+#include "GaugiKernel/Algorithm.h"
+#include "EventInfo/EventInfo.h"
+#include "EventInfo/Seed.h"
+#include "TruthParticle/TruthParticle.h"
+
+
+/**
+ * @class RootStreamEVTReader
+ * @brief Algorithm to read the generated events (EVT) from a ROOT file.
+ * 
+ * Reads the particles tree written by the generators and records the EventInfo,
+ * Seeds and TruthParticles into the transient Event Store (StoreGate), like the
+ * EventReader does inside of Geant4, but without the detector simulation
+ * (e.g., fast simulation).
+ */
+class RootStreamEVTReader : public Gaugi::Algorithm
+{
+
+  public:
+    /** Constructor **/
+    RootStreamEVTReader( std::string );
+    
+    virtual ~RootStreamEVTReader();
+    
+    virtual StatusCode initialize() override;
+
+    virtual StatusCode bookHistograms( SG::EventContext &ctx ) const override;
+    
+    virtual StatusCode pre_execute( SG::EventContext &ctx ) const override;
+    
+    virtual StatusCode execute( SG::EventContext &ctx , const G4Step *step) const override;
+    
+    virtual StatusCode execute( SG::EventContext &ctx , int evt ) const override;
+
+    virtual StatusCode post_execute( SG::EventContext &ctx ) const override;
+    
+    virtual StatusCode fillHistograms( SG::EventContext &ctx ) const override;
+    
+    virtual StatusCode finalize() override;
+
+
+
+  private:
+ 
+
+    StatusCode deserialize( int evt, SG::EventContext &ctx ) const;
+
+    
+    std::string m_eventKey;
+    std::string m_truthKey;
+    std::string m_seedsKey;
+    std::string m_inputFile;
+    std::string m_ntupleName;
+    int m_cacheSize;
+    int m_cacheLearnEntries;
+    bool m_asyncPrefetch;
+    int m_outputLevel;
+};
+
+#endif
@@ -9,6 +9,7 @@
 #include "RootStreamHITMaker.h"
 #include "GaugiKernel/EDM.h"
 #include "G4Kernel/CaloPhiRange.h"
+#include <cmath>
 
 
 
@@ -27,6 +28,8 @@ using namespace Gaugi;
  * Properties:
  * - OnlyRoI: If true, only saves hits near TruthParticles.
  * - KeepCells: List of specific cell hashes that must always be saved (e.g. for debugging defects).
+ * - SaveTruth: If false, the truth particles and the seeds are saved as empty containers
+ *   (e.g. premixed pileup events, which have no signal).
  */
 RootStreamHITMaker::RootStreamHITMaker( std::string name ) : 
   IMsgService(name),
@@ -46,7 +49,11 @@ RootStreamHITMaker::RootStreamHITMaker( std::string name ) :
   declareProperty( "OnlyRoI"                 , m_onlyRoI=false                         );
   declareProperty( "EtaWindow"               , m_etaWindow=0.6                         );
   declareProperty( "PhiWindow"               , m_phiWindow=0.6                         );
-  declareProperty( "KeepCells"               , m_cellHashes={}                         );                 
+  declareProperty( "KeepCells"               , m_cellHashes={}                         );
+  declareProperty( "SaveTruth"               , m_saveTruth=true                        );
+
+  // the output tree belongs to the event store
+  setReentrant();
 }
 
 //!=====================================================================
@@ -74,6 +81,9 @@ StatusCode RootStreamHITMaker::initialize()
   MSG_INFO("Eta Window: " << m_etaWindow);
   MSG_INFO("Phi Window: " << m_phiWindow);
   MSG_INFO("Keep Cells: " << (m_cellHashes.empty() ? "false" : "true"));
+  m_keepCells.clear();
+  for ( auto hash : m_cellHashes ) 
+    m_keepCells.insert( (unsigned long int)hash );
   return StatusCode::SUCCESS;
 }
 
@@ -168,6 +178,8 @@ void RootStreamHITMaker::InitBranch(TTree* fChain, std::string branch_name, T* p
  * Iterates through the CaloHit container. If `OnlyRoI` is enabled, checks
  * if each hit is within `EtaWindow` x `PhiWindow` of a TruthParticle OR if its
  * hash is in the `KeepCells` list. Matched hits are converted and saved.
+ * The windows are mapped once per event into an eta/phi grid (see buildRoI),
+ * so each hit is only compared with the particles of its grid cell.
  */
 StatusCode RootStreamHITMaker::serialize( EventContext &ctx ) const
 {
@@ -210,6 +222,7 @@ StatusCode RootStreamHITMaker::serialize( EventContext &ctx ) const
   }
   
 
+  if( m_saveTruth )
   { // Serialize Seed
     MSG_DEBUG("Serialize Seed..");
     SG::ReadHandle<xAOD::SeedContainer> container( m_inputSeedsKey, ctx );
@@ -231,7 +244,7 @@ StatusCode RootStreamHITMaker::serialize( EventContext &ctx ) const
   {
     MSG_DEBUG("Serialize CaloHits...");
 
-    bool keepCells = !m_cellHashes.empty();
+    bool keepCells = !m_keepCells.empty();
     MSG_INFO("Keep Cells? " << (keepCells ? "Yes" : "No") );
 
     SG::ReadHandle<xAOD::TruthParticleContainer> particles( m_inputTruthKey, ctx );
@@ -242,32 +255,22 @@ StatusCode RootStreamHITMaker::serialize( EventContext &ctx ) const
         MSG_FATAL("It's not possible to read the xAOD::CaloHitContainer from this Contaxt using this key " << m_inputHitsKey );
     }
 
+    // the phi cells must cover exactly 2pi (wrap around) and be larger than half of the window
+    int nPhiCells = m_phiWindow > 0 ? std::max( (int)std::floor( CaloPhiRange::twopi() / (m_phiWindow/2) ), 1 ) : 1;
+    roi_map_t roi;
+    if(m_onlyRoI) roi = buildRoI( **particles.ptr(), nPhiCells );
+
     float etot=0;
     for (const auto hit : **container.ptr() ){
          
       if(m_onlyRoI){
-        bool match=false;
-        for (const auto& par : **particles.ptr())
+        bool match = inRoI( roi, hit->eta(), hit->phi(), nPhiCells );
+        
+        if (!match && keepCells && m_keepCells.count(hit->hash()))
         {
-          float deltaEta = std::abs( par->eta() - hit->eta() );
-          float deltaPhi = std::abs( CaloPhiRange::diff(par->phi(), hit->phi()) );
-          if ( deltaEta < m_etaWindow/2 && deltaPhi < m_phiWindow/2 )
-          {
-            match=true;
-            // break;
-          }
-          else if (keepCells) 
-          {
-            // Check if hit->hash() is in any of the vectors inside m_cellHash
-            if (std::find(m_cellHashes.begin(), m_cellHashes.end(), hit->hash()) != m_cellHashes.end()) {
-              match = true; // if hash is on list of defect cell, then we keep the hit
-              MSG_INFO("Hit with hash " << hit->hash() << " is marked by the user and will be kept.");
-              // break;
-            }
-          }
-          if (match) break;   // break if we found a match after checking the 2 conditions
-          
-        } // end loop over particles
+          match = true; // if hash is on list of defect cell, then we keep the hit
+          MSG_DEBUG("Hit with hash " << hit->hash() << " is marked by the user and will be kept.");
+        }
 
         if(!match) continue; // skip this hit
 
@@ -293,6 +296,7 @@ StatusCode RootStreamHITMaker::serialize( EventContext &ctx ) const
 
   }
 
+  if( m_saveTruth )
   { // Serialize Truth Particle
     MSG_DEBUG("Serialize TruthParticle...");
     SG::ReadHandle<xAOD::TruthParticleContainer> container( m_inputTruthKey, ctx );
@@ -324,3 +328,68 @@ StatusCode RootStreamHITMaker::serialize( EventContext &ctx ) const
 
 //!=====================================================================
 
+
+//!=====================================================================
+
+long long RootStreamHITMaker::roiKey( float eta, float phi, int nPhiCells ) const
+{
+  long long etaCell = (long long)std::floor( eta / (m_etaWindow/2) );
+  long long phiCell = (long long)std::floor( (phi - CaloPhiRange::phi_min()) / (CaloPhiRange::twopi()/nPhiCells) );
+  phiCell = ( (phiCell % nPhiCells) + nPhiCells ) % nPhiCells;
+  return etaCell * nPhiCells + phiCell;
+}
+
+//!=====================================================================
+
+/**
+ * @brief Map the particle windows into an eta/phi grid.
+ * 
+ * The grid cells are at least half of the window, so each window covers up to
+ * 3x5 cells. A hit inside of the window (|deta| < EtaWindow/2 and |dphi| < PhiWindow/2)
+ * always falls in one of them.
+ */
+RootStreamHITMaker::roi_map_t RootStreamHITMaker::buildRoI( const std::vector<const xAOD::TruthParticle*> &particles, int nPhiCells ) const
+{
+  roi_map_t roi;
+  if( m_etaWindow <= 0 || m_phiWindow <= 0 ) return roi;
+
+  float etaCellSize = m_etaWindow/2;
+  float phiCellSize = CaloPhiRange::twopi()/nPhiCells;
+
+  for ( const auto par : particles )
+  {
+    long long etaFirst = (long long)std::floor( (par->eta() - m_etaWindow/2) / etaCellSize );
+    long long etaLast  = (long long)std::floor( (par->eta() + m_etaWindow/2) / etaCellSize );
+    long long phiFirst = (long long)std::floor( (par->phi() - m_phiWindow/2 - CaloPhiRange::phi_min()) / phiCellSize );
+    long long phiLast  = (long long)std::floor( (par->phi() + m_phiWindow/2 - CaloPhiRange::phi_min()) / phiCellSize );
+    // one more cell in each side for the rounding when phi wraps around
+    phiFirst -= 1; phiLast += 1;
+    // never more than one turn
+    phiLast = std::min( phiLast, phiFirst + nPhiCells - 1 );
+
+    for ( long long etaCell = etaFirst; etaCell <= etaLast; ++etaCell ){
+      for ( long long phiCell = phiFirst; phiCell <= phiLast; ++phiCell ){
+        long long key = etaCell * nPhiCells + ( (phiCell % nPhiCells) + nPhiCells ) % nPhiCells;
+        auto &cands = roi[key];
+        if( cands.empty() || cands.back() != par ) cands.push_back( par );
+      }
+    }
+  }
+  return roi;
+}
+
+//!=====================================================================
+
+bool RootStreamHITMaker::inRoI( const roi_map_t &roi, float eta, float phi, int nPhiCells ) const
+{
+  auto it = roi.find( roiKey( eta, phi, nPhiCells ) );
+  if( it == roi.end() ) return false;
+
+  for ( const auto par : it->second )
+  {
+    float deltaEta = std::abs( par->eta() - eta );
+    float deltaPhi = std::abs( CaloPhiRange::diff(par->phi(), phi) );
+    if ( deltaEta < m_etaWindow/2 && deltaPhi < m_phiWindow/2 ) return true;
+  }
+  return false;
+}
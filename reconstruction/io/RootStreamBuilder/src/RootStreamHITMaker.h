@@ -9,6 +9,9 @@
 #include "GaugiKernel/DataHandle.h"
 #include "GaugiKernel/Algorithm.h"
 #include "GaugiKernel/DataHandle.h"
+#include "TruthParticle/TruthParticleContainer.h"
+#include <unordered_map>
+#include <unordered_set>
 
 
 
@@ -48,9 +51,18 @@ class RootStreamHITMaker : public Gaugi::Algorithm
 
   private:
  
+    /*! Particles whose eta/phi window can hold a point of the grid cell (key) */
+    typedef std::unordered_map< long long, std::vector<const xAOD::TruthParticle*> > roi_map_t;
 
     StatusCode serialize( SG::EventContext &ctx ) const;
 
+    /*! Mark the grid cells covered by the window of each particle (once per event) */
+    roi_map_t buildRoI( const std::vector<const xAOD::TruthParticle*> &particles, int nPhiCells ) const;
+    /*! Grid cell key of the (eta,phi) point */
+    long long roiKey( float eta, float phi, int nPhiCells ) const;
+    /*! True if the point is inside of the window of any particle */
+    bool inRoI( const roi_map_t &roi, float eta, float phi, int nPhiCells ) const;
+
     template <class T> void InitBranch(TTree* fChain, std::string branch_name, T* param) const;
     
     std::string m_ntupleName;
@@ -68,9 +80,12 @@ class RootStreamHITMaker : public Gaugi::Algorithm
     float m_etaWindow;
     float m_phiWindow;
     bool m_onlyRoI;
+    /*! Save the truth particles and the seeds (empty containers case false) */
+    bool m_saveTruth;
 
     // new for including cell defects
     std::vector<int> m_cellHashes;
+    std::unordered_set<unsigned long int> m_keepCells;
 
     int m_outputLevel;
 };
@@ -10,6 +10,7 @@
 #include "EventInfo/SeedConverter.h"
 
 #include "RootStreamHITReader.h"
+#include "RootStreamInput.h"
 #include "GaugiKernel/EDM.h"
 
 
@@ -36,6 +37,12 @@ RootStreamHITReader::RootStreamHITReader( std::string name ) :
   declareProperty( "OutputSeedsKey"     , m_seedsKey="Seeds"                );
   declareProperty( "OutputLevel"        , m_outputLevel=1                   );
   declareProperty( "NtupleName"         , m_ntupleName="CollectionTree"     );
+  declareProperty( "CacheSize"          , m_cacheSize=30                    ); // MB
+  declareProperty( "CacheLearnEntries"  , m_cacheLearnEntries=10            );
+  declareProperty( "AsyncPrefetch"      , m_asyncPrefetch=true              );
+
+  // the input file is a decorator of the event store
+  setReentrant();
 }
 
 //!=====================================================================
@@ -65,8 +72,12 @@ StatusCode RootStreamHITReader::bookHistograms( EventContext &ctx ) const
 {
   MSG_DEBUG("Reading file " << m_inputFile);
   auto store = ctx.getStoreGateSvc();
-  TFile *file = new TFile(m_inputFile.c_str(), "read");
-  store->decorate( "events", file );
+  auto input = new RootStreamInput( m_inputFile, m_ntupleName, m_cacheSize, m_cacheLearnEntries, m_asyncPrefetch, m_outputLevel );
+  if( !input->isOpen() ){
+    delete input;
+    MSG_FATAL( "It's not possible to read the file " << m_inputFile );
+  }
+  store->decorate( "events", input );
   return StatusCode::SUCCESS; 
 }
 
@@ -116,23 +127,20 @@ StatusCode RootStreamHITReader::fillHistograms( EventContext &ctx ) const
  */
 StatusCode RootStreamHITReader::deserialize( int evt, EventContext &ctx ) const
 {
-  std::vector<xAOD::CaloHit_t           > *collection_hits       = nullptr;
-  std::vector<xAOD::EventInfo_t         > *collection_event      = nullptr;
-  std::vector<xAOD::Seed_t              > *collection_seeds      = nullptr;
-  std::vector<xAOD::TruthParticle_t     > *collection_truth      = nullptr;
-
   MSG_DEBUG( "Link all branches..." );
   
   auto store = ctx.getStoreGateSvc();
-  TFile *file = (TFile*)store->decorator("events");
-  TTree *tree = (TTree*)file->Get(m_ntupleName.c_str());
+  auto input = (RootStreamInput*)store->decorator("events");
 
-  InitBranch( tree, ("EventInfoContainer_"+m_eventKey).c_str()     , &collection_event     );
-  InitBranch( tree, ("SeedContainer_"+m_seedsKey).c_str()          , &collection_seeds     );
-  InitBranch( tree, ("TruthParticleContainer_"+m_truthKey).c_str() , &collection_truth     );
-  InitBranch( tree, ("CaloHitContainer_"+m_hitsKey).c_str()        , &collection_hits      );
+  auto collection_event       = input->bind<std::vector<xAOD::EventInfo_t>>( "EventInfoContainer_"+m_eventKey );
+  auto collection_seeds       = input->bind<std::vector<xAOD::Seed_t>>( "SeedContainer_"+m_seedsKey );
+  auto collection_truth       = input->bind<std::vector<xAOD::TruthParticle_t>>( "TruthParticleContainer_"+m_truthKey );
+  auto collection_hits        = input->bind<std::vector<xAOD::CaloHit_t>>( "CaloHitContainer_"+m_hitsKey );
 
-  tree->GetEntry( evt );
+  if( !input->read( evt ) ){
+    MSG_ERROR( "It's not possible to read the entry " << evt << " from " << m_inputFile );
+    return StatusCode::FAILURE;
+  }
 
 
   { // deserialize EventInfo
@@ -173,6 +181,8 @@ StatusCode RootStreamHITReader::deserialize( int evt, EventContext &ctx ) const
     xAOD::EventInfoConverter cnv;
     cnv.convert(  collection_event->at(0), event);
     MSG_DEBUG( "EventNumber = " << event->eventNumber() << ", Avgmu = " << event->avgmu());
+    // the random streams of the next tools follow the generated event, not the file entry
+    ctx.setEventNumber( event->eventNumber() );
     container->push_back(event);
   }
   
@@ -195,32 +205,9 @@ StatusCode RootStreamHITReader::deserialize( int evt, EventContext &ctx ) const
 
 
 
-  delete collection_hits      ;
-  delete collection_event     ;
-  delete collection_truth     ;
-  delete collection_seeds     ; 
+  // all buffers were converted, start reading the next entry
+  input->prefetch( evt+1 );
   
   return StatusCode::SUCCESS;
  
 }
-
-//!=====================================================================
-
-template <class T>
-void RootStreamHITReader::InitBranch(TTree* fChain, std::string branch_name, T* param) const
-{
-  std::string bname = branch_name;
-  if (fChain->GetAlias(bname.c_str()))
-     bname = std::string(fChain->GetAlias(bname.c_str()));
-
-  if (!fChain->FindBranch(bname.c_str()) ) {
-    MSG_WARNING( "unknown branch " << bname );
-    return;
-  }
-  fChain->SetBranchStatus(bname.c_str(), 1.);
-  fChain->SetBranchAddress(bname.c_str(), param);
-}
-
-//!=====================================================================
-
-
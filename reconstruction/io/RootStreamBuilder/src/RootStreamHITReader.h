@@ -47,7 +47,6 @@ class RootStreamHITReader : public Gaugi::Algorithm
 
     StatusCode deserialize( int evt, SG::EventContext &ctx ) const;
 
-    template <class T> void InitBranch(TTree* fChain, std::string branch_name, T* param) const;
     
     std::string m_hitsKey;
     std::string m_eventKey;
@@ -55,6 +54,9 @@ class RootStreamHITReader : public Gaugi::Algorithm
     std::string m_seedsKey;
     std::string m_inputFile;
     std::string m_ntupleName;
+    int m_cacheSize;
+    int m_cacheLearnEntries;
+    bool m_asyncPrefetch;
     int m_outputLevel;
 };
 
@@ -0,0 +1,85 @@
+
+#include "RootStreamInput.h"
+#include "TROOT.h"
+
+
+
+RootStreamInput::RootStreamInput( std::string path, std::string ntupleName, int cacheSize, int learnEntries, bool asyncPrefetch, int outputLevel ):
+  IMsgService("RootStreamInput"),
+  TObject(),
+  m_file(nullptr),
+  m_tree(nullptr),
+  m_asyncPrefetch(asyncPrefetch),
+  m_prefetchEntry(-1)
+{
+  setMsgLevel(outputLevel);
+
+  // the tree will be read by another thread
+  if( m_asyncPrefetch ) ROOT::EnableThreadSafety();
+
+  m_file = new TFile(path.c_str(), "read");
+  if( !m_file || m_file->IsZombie() ){
+    MSG_ERROR( "It's not possible to open the file " << path );
+    return;
+  }
+
+  m_tree = (TTree*)m_file->Get(ntupleName.c_str());
+  if( !m_tree ){
+    MSG_ERROR( "It's not possible to find the tree " << ntupleName << " into " << path );
+    return;
+  }
+
+  // only the bound branches will be read
+  m_tree->SetBranchStatus("*", 0);
+
+  if( cacheSize > 0 ){
+    m_tree->SetCacheSize( (Long64_t)cacheSize*1024*1024 );
+    m_tree->SetCacheLearnEntries( learnEntries );
+    MSG_DEBUG( "TTreeCache with " << cacheSize << " MB and " << learnEntries << " learning entries." );
+  }
+}
+
+//!=====================================================================
+
+RootStreamInput::~RootStreamInput()
+{
+  wait();
+  // the tree must not point to the buffers anymore
+  if( m_tree ) m_tree->ResetBranchAddresses();
+  m_buffers.clear();
+  if( m_file ){
+    m_file->Close();
+    delete m_file;
+  }
+}
+
+//!=====================================================================
+
+void RootStreamInput::wait()
+{
+  if( m_prefetch.valid() ) m_prefetch.get();
+}
+
+//!=====================================================================
+
+bool RootStreamInput::read( Long64_t entry )
+{
+  if( !m_tree ) return false;
+
+  if( m_prefetch.valid() ){
+    Int_t nbytes = m_prefetch.get();
+    // the buffers already hold this entry
+    if( m_prefetchEntry == entry && nbytes > 0 ) return true;
+  }
+  return m_tree->GetEntry( entry ) > 0;
+}
+
+//!=====================================================================
+
+void RootStreamInput::prefetch( Long64_t entry )
+{
+  if( !m_asyncPrefetch || !m_tree || entry >= m_tree->GetEntries() ) return;
+  wait();
+  m_prefetchEntry = entry;
+  m_prefetch = std::async( std::launch::async, [this, entry](){ return m_tree->GetEntry(entry); } );
+}
@@ -0,0 +1,114 @@
+#ifndef RootStreamInput_h
+#define RootStreamInput_h
+
+#include "GaugiKernel/MsgStream.h"
+#include "TObject.h"
+#include "TFile.h"
+#include "TTree.h"
+#include <future>
+#include <map>
+#include <memory>
+#include <string>
+
+
+/**
+ * @class RootStreamInput
+ * @brief Input tree shared by the RootStream readers.
+ *
+ * The tree is opened once and all branches are bound once (bind) to buffers
+ * owned by this object, which are reused for every entry. Only the bound
+ * branches are enabled and a TTreeCache (with learning) is attached to the
+ * tree. Optionally, the next entry is read in a background thread (prefetch)
+ * while the algorithms are processing the current one. It is kept as a
+ * StoreGate decorator, so there is one input for each store.
+ */
+class RootStreamInput : public TObject, public MsgService
+{
+
+  public:
+
+    /** Constructor **/
+    RootStreamInput( std::string path, std::string ntupleName, int cacheSize, int learnEntries, bool asyncPrefetch, int outputLevel );
+
+    /** Destructor **/
+    ~RootStreamInput();
+
+    bool isOpen() const { return m_tree!=nullptr; };
+
+    /*! Number of entries into the tree */
+    Long64_t entries() const { return m_tree ? m_tree->GetEntries() : 0; };
+
+    /*! Bind the branch to a buffer owned by the input (only in the first call, after that it is
+     * only a lookup). Missing branches always return an empty buffer */
+    template <class T> T* bind( std::string branch ) { return bind<T>( branch, true ); };
+
+    /*! Same as bind for the branches of fundamental types (int, float...), stored by value */
+    template <class T> T* bindValue( std::string branch ) { return bind<T>( branch, false ); };
+
+    /*! Read the entry into the bound buffers (wait the prefetch if needed) */
+    bool read( Long64_t entry );
+
+    /*! Start reading the entry in background. Must be called after the buffers were consumed */
+    void prefetch( Long64_t entry );
+
+  private:
+
+    /*! Bind the branch to the buffer using the address of the pointer (object) or the address of the value */
+    template <class T> T* bind( std::string branch, bool object );
+
+    /*! Wait the background read */
+    void wait();
+
+    struct IBuffer {
+      virtual ~IBuffer()=default;
+    };
+
+    template <class T> struct Buffer : public IBuffer {
+      T *ptr = new T();
+      ~Buffer() { delete ptr; };
+    };
+
+    TFile *m_file;
+    TTree *m_tree;
+
+    bool m_asyncPrefetch;
+
+    std::map< std::string, std::unique_ptr<IBuffer> > m_buffers;
+
+    // background read
+    Long64_t m_prefetchEntry;
+    std::future<Int_t> m_prefetch;
+};
+
+//!=====================================================================
+
+template <class T>
+T* RootStreamInput::bind( std::string branch, bool object )
+{
+  auto it = m_buffers.find(branch);
+  if( it != m_buffers.end() )
+    return static_cast<Buffer<T>*>(it->second.get())->ptr;
+
+  wait();
+  auto buffer = new Buffer<T>();
+  m_buffers[branch] = std::unique_ptr<IBuffer>(buffer);
+  if( !m_tree ) return buffer->ptr;
+
+  std::string bname = branch;
+  if (m_tree->GetAlias(bname.c_str()))
+     bname = std::string(m_tree->GetAlias(bname.c_str()));
+
+  if (!m_tree->FindBranch(bname.c_str()) ) {
+    MSG_WARNING( "unknown branch " << bname );
+    return buffer->ptr;
+  }
+  m_tree->SetBranchStatus(bname.c_str(), 1);
+  if( object ){
+    m_tree->SetBranchAddress(bname.c_str(), &buffer->ptr);
+  }else{
+    m_tree->SetBranchAddress(bname.c_str(), buffer->ptr);
+  }
+  return buffer->ptr;
+}
+
+#endif
@@ -54,6 +54,9 @@ RootStreamNtupleMaker::RootStreamNtupleMaker( std::string name ) :
   declareProperty( "InputElectronKey"   , m_electronKey="Electrons"       );
   declareProperty( "OutputLevel"        , m_outputLevel=0                 );
   declareProperty( "OutputNtupleName"   , m_outputNtupleName="events"     );
+
+  // the output tree belongs to the event store
+  setReentrant();
 }
 
 //!=====================================================================
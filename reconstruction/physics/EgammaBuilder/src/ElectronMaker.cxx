@@ -44,6 +44,8 @@ ElectronMaker::ElectronMaker( std::string name ) :
   declareProperty( "FracMaxCuts"        , m_fracMaxCuts={}                );
   declareProperty( "SecondRCuts"        , m_secondRCuts={}                );
   declareProperty( "LambdaCenterCuts"   , m_lambdaCenterCuts={}           );
+
+  setReentrant();
 }
 
 //!=====================================================================
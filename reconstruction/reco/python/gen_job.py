@@ -5,7 +5,7 @@ __all__  = [
 ]
 
 
-import random
+import hashlib
 import joblib
 
 from math               import ceil
@@ -119,8 +119,11 @@ class Parallel:
 
     def build_plan(self): 
     
-        def get_random_seed()->int:
-            return random.randint(1, 900000000 )
+        def get_job_seed( events : List[int] )->int:
+            # derived from the seed and the first event of the job (not from a sequence of draws),
+            # so the seed of one job does not depend on how many jobs come before it
+            digest = hashlib.sha256( f"{self.seed}:{events[0]}".encode() ).digest()
+            return int.from_bytes( digest[:8], 'little' ) % 900000000 + 1
 
         if self.event_numbers:
             event_numbers = [int(event_number) for event_number in self.event_numbers.split(",")] if type(self.event_numbers) is str else self.event_numbers
@@ -130,10 +133,9 @@ class Parallel:
             event_numbers = chunks( list(range(self.number_of_events)) ,self.get_events_per_job() )
         
         plan = {}
-        random.seed(self.seed)
         for idx, events in enumerate(event_numbers):
             output_file = append_index_to_file(self.output_file, idx)
-            plan[output_file] = {"evt":events, "seed": get_random_seed()}
+            plan[output_file] = {"evt":events, "seed": get_job_seed(events)}
         return plan
      
 
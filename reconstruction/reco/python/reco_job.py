@@ -159,7 +159,7 @@ class Parallel:
             
 
 
-def create_parallel_job( args ):
+def create_parallel_job( args, ntuple_name : str="CollectionTree" ):
     return Parallel( 
                 files             = args.input_file,
                 output_file       = args.output_file,
@@ -167,6 +167,7 @@ def create_parallel_job( args ):
                 number_of_events  = args.number_of_events,
                 events_per_job    = args.events_per_job,
                 merge             = args.merge,
+                ntuple_name       = ntuple_name,
                 overwrite         = args.overwrite,
                 dry_run           = args.dry_run
             )   
\ No newline at end of file
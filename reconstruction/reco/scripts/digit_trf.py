@@ -12,7 +12,7 @@ from RootStreamBuilder  import RootStreamHITReader, recordable
 from RootStreamBuilder  import RootStreamESDMaker
 
 from reco.reco_job import merge_args, update_args, create_parallel_job
-from geometry import DetectorConstruction_v1
+from geometry import ReadoutGeometry_v1
 
 
 """
@@ -53,6 +53,18 @@ def parse_args():
     parser.add_argument('--post-exec', action='store',
                         dest='post_exec', required=False, default="''",
                         help="The postexec command")
+    parser.add_argument('--alg-threads', action='store',
+                        dest='alg_threads', required=False,
+                        type=int, default=1,
+                        help="The number of threads used to run independent algorithms of the same event")
+    parser.add_argument('--event-threads', action='store',
+                        dest='event_threads', required=False,
+                        type=int, default=1,
+                        help="The number of threads used to run events in parallel into the same process")
+    parser.add_argument('--seed', action='store',
+                        dest='seed', required=False,
+                        type=int, default=0,
+                        help="The run seed. The random numbers of each event only depend on it and on the event number.")
 
    
     parser = merge_args(parser)
@@ -67,6 +79,9 @@ def main(events : List[int],
          pre_init: str,
          pre_exec: str,
          post_exec: str,
+         alg_threads: int=1,
+         event_threads: int=1,
+         seed: int=0,
         ):
     """
     Main function for the digitization process.
@@ -83,6 +98,9 @@ def main(events : List[int],
         pre_init (str): Hook for pre-initialization code.
         pre_exec (str): Hook for pre-execution code.
         post_exec (str): Hook for post-execution code.
+        alg_threads (int): Number of threads for independent algorithms of the same event.
+        event_threads (int): Number of event loops (threads) into the same process.
+        seed (int): Run seed of the random streams (noise and pulse deformation).
     """
 
     if isinstance(input_file, Path):
@@ -94,7 +112,10 @@ def main(events : List[int],
 
     exec(pre_init)
 
-    acc = ComponentAccumulator("ComponentAccumulator", output_file)
+    acc = ComponentAccumulator("ComponentAccumulator", output_file,
+                               NumberOfThreads=event_threads,
+                               NumberOfAlgThreads=alg_threads,
+                               Seed=seed)
 
     # the reader must be first in sequence
     reader = RootStreamHITReader("HITReader",
@@ -110,7 +131,7 @@ def main(events : List[int],
 
     # digitalization!    
     calorimeter = CaloCellBuilder("CaloCellBuilder", 
-                                  DetectorConstruction_v1("ATLAS"),
+                                  ReadoutGeometry_v1("ATLAS"),
                                   HistogramPath="Expert/Cells",
                                   OutputLevel=outputLevel,
                                   InputHitsKey=recordable("Hits"),
@@ -150,4 +171,7 @@ if __name__ == "__main__":
          pre_init         = args.pre_init,
          pre_exec         = args.pre_exec,
          post_exec        = args.post_exec,
+         alg_threads      = args.alg_threads,
+         event_threads    = args.event_threads,
+         seed             = args.seed,
          )
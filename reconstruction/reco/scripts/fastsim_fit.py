@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+import argparse
+import sys
+import os
+
+import numpy as np
+
+from pathlib            import Path
+from array              import array
+from expand_folders     import expand_folders
+from tqdm               import tqdm
+from GaugiKernel        import Logger, get_argparser_formatter
+import ROOT
+
+mainLogger = Logger.getModuleLogger("fastsim_fit")
+
+
+"""
+Script: fastsim_fit.py
+Purpose: Fits the shower parameters used by the fast simulation (fastsim_trf.py).
+         Reads full simulation Hit files (HIT) of single particles and measures,
+         for each particle class, |eta| bin, energy bin and sampling, the fraction
+         of the particle energy deposited into the sampling (longitudinal profile)
+         and the radial energy density around the particle direction (lateral profile),
+         fitted by two exponentials.
+Usage:
+    fastsim_fit.py -i single_particles.HIT.root -o fastsim.params.root
+"""
+
+
+# same classes used by CaloFastSimMaker
+EM, HADRON, MUON = 0, 1, 2
+
+# default |eta| and energy (MeV) bin edges
+ETA_BINS    = [0, 0.4, 0.8, 1.2, 1.37, 1.52, 1.8, 2.0, 2.5, 3.2]
+ENERGY_BINS = [1e3, 2e3, 5e3, 1e4, 2e4, 5e4, 1e5, 2e5, 5e5, 1e6]
+
+
+def particle_class( pdgid : int ) -> int:
+    pdgid = abs(pdgid)
+    if pdgid in (11, 22):
+        return EM
+    elif pdgid == 13:
+        return MUON
+    elif pdgid in (12, 14, 16):
+        return -1
+    return HADRON
+
+
+def delta_phi( phi1 : float, phi2 : float ) -> float:
+    dphi = phi1 - phi2
+    return (dphi + np.pi) % (2*np.pi) - np.pi
+
+
+def lateral_density( r : np.ndarray, alpha : float, r1 : float, r2 : float) -> np.ndarray:
+    """
+    Same lateral profile used by CaloFastSimMaker (each exponential normalized in the plane).
+    """
+    return ( alpha * np.exp(-r/r1) / r1**2 + (1-alpha) * np.exp(-r/r2) / r2**2 ) / (2*np.pi)
+
+
+def fit_lateral( centers : np.ndarray, density : np.ndarray, rmax : float ):
+    """
+    Fits the two exponentials into the measured density. For each (r1,r2) pair in a
+    logarithmic grid, alpha has a closed solution (the model is linear in alpha), so
+    only the pair with the smallest squared error is kept.
+
+    Returns:
+        tuple: alpha, r1 and r2.
+    """
+    if density.sum() <= 0:
+        return 1.0, rmax/4, rmax/4
+    grid = np.geomspace( rmax/500, rmax, 60 )
+    best = None
+    for i, r1 in enumerate(grid):
+        f1 = np.exp(-centers/r1) / r1**2 / (2*np.pi)
+        for r2 in grid[i:]:
+            f2 = np.exp(-centers/r2) / r2**2 / (2*np.pi)
+            df = f1 - f2
+            norm = (df*df).sum()
+            alpha = ((density-f2)*df).sum()/norm if norm > 0 else 1.0
+            alpha = min(max(alpha, 0.0), 1.0)
+            chi2 = ((lateral_density(centers, alpha, r1, r2) - density)**2).sum()
+            if best is None or chi2 < best[0]:
+                best = (chi2, alpha, r1, r2)
+    return best[1:]
+
+
+class Accumulator:
+    """
+    Energy sums for each particle class, eta bin, energy bin and sampling.
+    """
+    def __init__(self, eta_bins, energy_bins, rmax, number_of_rbins):
+        self.eta_bins    = np.array(eta_bins)
+        self.energy_bins = np.array(energy_bins)
+        self.rmax        = rmax
+        self.r_edges     = np.linspace(0, rmax, number_of_rbins+1)
+        # number of particles for each (class, eta bin, energy bin)
+        self.counts      = {}
+        # sampling energy fraction and radial energy for each (class, eta bin, energy bin, sampling)
+        self.fractions   = {}
+        self.radial      = {}
+
+    def bin(self, particle, eta, energy):
+        eta_bin    = np.searchsorted(self.eta_bins, abs(eta), side='right') - 1
+        energy_bin = np.searchsorted(self.energy_bins, energy, side='right') - 1
+        if eta_bin < 0 or eta_bin >= len(self.eta_bins)-1:
+            return None
+        if energy_bin < 0 or energy_bin >= len(self.energy_bins)-1:
+            return None
+        return (particle, eta_bin, energy_bin)
+
+    def fill(self, particle, eta, phi, energy, hits):
+        key = self.bin(particle, eta, energy)
+        if key is None:
+            return
+        self.counts[key] = self.counts.get(key, 0) + 1
+        for sampling, hit_eta, hit_phi, edep in hits:
+            skey = key + (sampling,)
+            self.fractions[skey] = self.fractions.get(skey, 0) + edep/energy
+            r = np.hypot(hit_eta-eta, delta_phi(hit_phi, phi))
+            if r < self.rmax:
+                if skey not in self.radial:
+                    self.radial[skey] = np.zeros(len(self.r_edges)-1)
+                self.radial[skey][np.searchsorted(self.r_edges, r, side='right')-1] += edep
+
+    def parameters(self):
+        centers = 0.5*(self.r_edges[1:]+self.r_edges[:-1])
+        areas   = np.pi*(self.r_edges[1:]**2-self.r_edges[:-1]**2)
+        for skey in sorted(self.fractions.keys()):
+            particle, eta_bin, energy_bin, sampling = skey
+            fraction = self.fractions[skey]/self.counts[skey[:3]]
+            radial   = self.radial.get(skey, np.zeros(len(centers)))
+            density  = radial/areas/radial.sum() if radial.sum() > 0 else radial
+            alpha, r1, r2 = fit_lateral(centers, density, self.rmax)
+            yield { "particle"   : particle,
+                    "sampling"   : sampling,
+                    "eta_min"    : self.eta_bins[eta_bin],
+                    "eta_max"    : self.eta_bins[eta_bin+1],
+                    "energy_min" : self.energy_bins[energy_bin],
+                    "energy_max" : self.energy_bins[energy_bin+1],
+                    "fraction"   : fraction,
+                    "alpha"      : alpha,
+                    "r1"         : r1,
+                    "r2"         : r2,
+                    "rmax"       : self.rmax }
+
+
+def parse_args():
+    """
+    Parses command-line arguments for the fit job.
+
+    Returns:
+        argparse.ArgumentParser: Arguments specifying the inputs/output and the binning.
+    """
+    parser = argparse.ArgumentParser(
+        description='',
+        formatter_class=get_argparser_formatter(),
+        add_help=False)
+
+    parser.add_argument('-i', '--input-file', action='store',
+                        dest='input_file', required=True,
+                        help="The input HIT file or folder (single particles from simu_trf.py with --save-all-hits).")
+    parser.add_argument('-o', '--output-file', action='store',
+                        dest='output_file', required=True,
+                        help="The output parameters file.")
+    parser.add_argument('--nov', '--number-of-events', action='store',
+                        dest='number_of_events', required=False,
+                        type=int, default=-1,
+                        help="The total number of events to use.")
+    parser.add_argument('--eta-bins', action='store',
+                        dest='eta_bins', required=False, type=float, nargs='+',
+                        default=ETA_BINS,
+                        help="The |eta| bin edges.")
+    parser.add_argument('--energy-bins', action='store',
+                        dest='energy_bins', required=False, type=float, nargs='+',
+                        default=ENERGY_BINS,
+                        help="The energy bin edges (MeV).")
+    parser.add_argument('--rmax', action='store',
+                        dest='rmax', required=False, type=float, default=0.4,
+                        help="The maximum distance (eta x phi) of the lateral profile.")
+    parser.add_argument('--number-of-rbins', action='store',
+                        dest='number_of_rbins', required=False, type=int, default=40,
+                        help="The number of radial bins used in the lateral fit.")
+    parser.add_argument('--hits-key', action='store',
+                        dest='hits_key', required=False, default="Hits",
+                        help="The hits container key.")
+    parser.add_argument('--truth-key', action='store',
+                        dest='truth_key', required=False, default="Particles",
+                        help="The truth particles container key.")
+    parser.add_argument('--ntuple-name', action='store',
+                        dest='ntuple_name', required=False, default="CollectionTree",
+                        help="The HIT tree name.")
+    return parser
+
+
+def main(input_file       : str | Path,
+         output_file      : str | Path,
+         number_of_events : int = -1,
+         eta_bins         : list = ETA_BINS,
+         energy_bins      : list = ENERGY_BINS,
+         rmax             : float = 0.4,
+         number_of_rbins  : int = 40,
+         hits_key         : str = "Hits",
+         truth_key        : str = "Particles",
+         ntuple_name      : str = "CollectionTree",
+         ):
+    """
+    Measures the shower profiles from the full simulation and writes the parameters tree.
+
+    Only the events with one simulated (not neutrino) truth particle are used, so all
+    deposits of the event come from it. The energy is taken from the in time bunch crossing.
+
+    Args:
+        input_file (str | Path): Path to the input HIT file or folder.
+        output_file (str | Path): Path to the output parameters file.
+        number_of_events (int): Number of events to use (all if -1).
+        eta_bins (list): The |eta| bin edges.
+        energy_bins (list): The energy bin edges (MeV).
+        rmax (float): Maximum distance of the lateral profile.
+        number_of_rbins (int): Number of radial bins used in the lateral fit.
+        hits_key (str): The hits container key.
+        truth_key (str): The truth particles container key.
+        ntuple_name (str): The HIT tree name.
+    """
+    input_file = Path(input_file)
+    files = expand_folders(os.path.abspath(input_file)) if input_file.is_dir() else [os.path.abspath(input_file)]
+
+    acc = Accumulator(eta_bins, energy_bins, rmax, number_of_rbins)
+
+    nov = 0
+    for path in files:
+        f = ROOT.TFile(path, "read")
+        tree = f.Get(ntuple_name)
+        for entry in tqdm(range(tree.GetEntries()), desc=f"Reading {os.path.basename(path)}..."):
+            if number_of_events > 0 and nov >= number_of_events:
+                break
+            tree.GetEntry(entry)
+            particles = [ p for p in getattr(tree, "TruthParticleContainer_"+truth_key) if particle_class(p.pdgid) >= 0 ]
+            if len(particles) != 1:
+                continue
+            p = particles[0]
+            # the truth energy comes from the generator (GeV)
+            energy = p.e*1000
+            hits = [ (hit.sampling, hit.eta, hit.phi, hit.edep[-hit.bcid_start])
+                     for hit in getattr(tree, "CaloHitContainer_"+hits_key)
+                     if hit.bcid_start <= 0 <= hit.bcid_end and hit.edep[-hit.bcid_start] > 0 ]
+            acc.fill(particle_class(p.pdgid), p.eta, p.phi, energy, hits)
+            nov+=1
+        f.Close()
+
+    mainLogger.info(f"{nov} events used to fit the shower parameters.")
+
+    # same branches read by CaloFastSimMaker
+    fout = ROOT.TFile(str(output_file), "recreate")
+    tree = ROOT.TTree("FastSimParameters", "")
+    ints   = { name : array('i', [0]) for name in ["particle", "sampling"] }
+    floats = { name : array('f', [0]) for name in ["eta_min", "eta_max", "energy_min", "energy_max",
+                                                    "fraction", "alpha", "r1", "r2", "rmax"] }
+    for name, buffer in ints.items():
+        tree.Branch(name, buffer, f"{name}/I")
+    for name, buffer in floats.items():
+        tree.Branch(name, buffer, f"{name}/F")
+
+    for par in acc.parameters():
+        for name, value in par.items():
+            (ints if name in ints else floats)[name][0] = value
+        tree.Fill()
+
+    mainLogger.info(f"{tree.GetEntries()} parameters saved into {output_file}.")
+    fout.Write()
+    fout.Close()
+
+
+
+if __name__ == "__main__":
+    parser=parse_args()
+    if len(sys.argv) == 1:
+        parser.print_help()
+        sys.exit(1)
+    args = parser.parse_args()
+    main( input_file       = args.input_file,
+          output_file      = args.output_file,
+          number_of_events = args.number_of_events,
+          eta_bins         = args.eta_bins,
+          energy_bins      = args.energy_bins,
+          rmax             = args.rmax,
+          number_of_rbins  = args.number_of_rbins,
+          hits_key         = args.hits_key,
+          truth_key        = args.truth_key,
+          ntuple_name      = args.ntuple_name,
+        )
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+import argparse
+import sys
+
+from pathlib            import Path
+from typing             import List
+from GaugiKernel        import LoggingLevel, get_argparser_formatter
+from GaugiKernel        import ComponentAccumulator
+from RootStreamBuilder  import RootStreamEVTReader, recordable
+from RootStreamBuilder  import RootStreamHITMaker
+from CaloHitBuilder     import CaloHitBuilder
+
+from reco.reco_job import merge_args, update_args, create_parallel_job
+from geometry import ReadoutGeometry_v1
+
+
+"""
+Script: fastsim_trf.py
+Purpose: Runs the fast (parametrized) simulation step in the Lorenzetti framework.
+         Reads generated event files (EVT) and deposits the energy of each particle
+         into the calorimeter hits using the longitudinal and lateral shower profiles
+         fitted from the full simulation (see fastsim_fit.py), without Geant4.
+         The output has the same format as the simu_trf.py output (HIT).
+Usage:
+    fastsim_trf.py -i input.EVT.root -o output.HIT.root -p fastsim.params.root
+"""
+
+def parse_args():
+    """
+    Parses command-line arguments for the fast simulation job.
+
+    Returns:
+        argparse.Namespace: Configuration arguments including the parameters file and execution hooks.
+    """
+    # create the top-level parser
+    parser = argparse.ArgumentParser(
+        description='',
+        formatter_class=get_argparser_formatter(),
+        add_help=False)
+
+    parser.add_argument('-p', '--parameters', action='store',
+                        dest='parameters', required=True,
+                        help="The shower parameters file (fastsim_fit.py output).")
+    parser.add_argument('-l', '--output-level', action='store',
+                        dest='output_level', required=False,
+                        type=str, default='INFO',
+                        help="The output level messenger.")
+    parser.add_argument('--pre-init', action='store',
+                        dest='pre_init', required=False, default="''",
+                        help="The preinit command")
+    parser.add_argument('--pre-exec', action='store',
+                        dest='pre_exec', required=False, default="''",
+                        help="The preexec command")
+    parser.add_argument('--post-exec', action='store',
+                        dest='post_exec', required=False, default="''",
+                        help="The postexec command")
+    parser.add_argument('--save-all-hits', action='store_true',
+                        dest='save_all_hits', required=False,
+                        help="Save all hits into the output file.")
+    parser.add_argument('--sparse-hits', action='store_true',
+                        dest='sparse_hits', required=False,
+                        help="Create only the hits touched by a step. The cells without energy are not saved, "
+                             "so there are no noise only cells and no pileup is merged into them.")
+    parser.add_argument('--event-threads', action='store',
+                        dest='event_threads', required=False,
+                        type=int, default=1,
+                        help="The number of threads used to run events in parallel into the same process")
+
+    parser = merge_args(parser)
+
+    return parser
+
+
+def main(events : List[int],
+         logging_level: str,
+         input_file: str | Path,
+         output_file: str | Path,
+         parameters: str,
+         pre_init: str,
+         pre_exec: str,
+         post_exec: str,
+         save_all_hits: bool = False,
+         event_threads: int = 1,
+         sparse_hits: bool = False,
+        ):
+    """
+    Main function for the fast simulation process.
+
+    Reads the generated particles from the input file, deposits their energy
+    into the calorimeter hits (CaloHitBuilder in fast simulation mode) and
+    produces a HIT file that can be used by merge_trf.py and digit_trf.py.
+
+    Args:
+        events (List[int]): List of event indices to process.
+        logging_level (str): Logging verbosity.
+        input_file (str | Path): Path to input EVT file.
+        output_file (str | Path): Path to output HIT file.
+        parameters (str): Path to the shower parameters file.
+        pre_init (str): Hook for pre-initialization code.
+        pre_exec (str): Hook for pre-execution code.
+        post_exec (str): Hook for post-execution code.
+        save_all_hits (bool): If True, saves all hits regardless of Region of Interest (RoI).
+        event_threads (int): Number of event loops (threads) into the same process.
+        sparse_hits (bool): If True, creates only the hits touched by a step (the cells without energy are not saved).
+    """
+
+    if isinstance(input_file, Path):
+        input_file = str(input_file)
+    if isinstance(output_file, Path):
+        output_file = str(output_file)
+
+    outputLevel = LoggingLevel.toC(logging_level)
+
+    exec(pre_init)
+
+    acc = ComponentAccumulator("ComponentAccumulator", output_file,
+                               NumberOfThreads=event_threads)
+
+    # the reader must be first in sequence
+    reader = RootStreamEVTReader("EVTReader",
+                                 InputFile=input_file,
+                                 OutputEventKey=recordable("Events"),
+                                 OutputTruthKey=recordable("Particles"),
+                                 OutputSeedsKey=recordable("Seeds"),
+                                 OutputLevel=outputLevel,
+                                 )
+    reader.merge(acc)
+
+    calorimeter = CaloHitBuilder("CaloHitBuilder",
+                                 HistogramPath="Expert/Hits",
+                                 OutputLevel=outputLevel,
+                                 OutputHitsKey=recordable("Hits"),
+                                 SparseHits=sparse_hits,
+                                 FastSimParameters=parameters,
+                                 InputTruthKey=recordable("Particles"),
+                                 Detector=ReadoutGeometry_v1("ATLAS"),
+                                 )
+    calorimeter.merge(acc)
+
+    HIT = RootStreamHITMaker("RootStreamHITMaker",
+                             OutputLevel=outputLevel,
+                             OnlyRoI= not save_all_hits,
+                             InputHitsKey=recordable("Hits"),
+                             InputEventKey=recordable("Events"),
+                             InputTruthKey=recordable("Particles"),
+                             InputSeedsKey=recordable("Seeds"),
+                             )
+    acc += HIT
+
+    exec(pre_exec)
+    acc.run(events)
+    exec(post_exec)
+
+
+
+
+if __name__ == "__main__":
+    parser=parse_args()
+    if len(sys.argv) == 1:
+        parser.print_help()
+        sys.exit(1)
+    args = parser.parse_args()
+    args = update_args(args)
+    # the entries are counted into the generated particles tree
+    pool  = create_parallel_job(args, ntuple_name="particles")
+    pool( main, 
+         logging_level    = args.output_level,
+         parameters       = args.parameters,
+         pre_init         = args.pre_init,
+         pre_exec         = args.pre_exec,
+         post_exec        = args.post_exec,
+         save_all_hits    = args.save_all_hits,
+         event_threads    = args.event_threads,
+         sparse_hits      = args.sparse_hits,
+         )
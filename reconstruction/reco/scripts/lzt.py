@@ -11,6 +11,7 @@ basepath           = os.environ["LORENZETTI_SCRIPTS_DIR"]
 simu_trf           = importfile(f'{basepath}/reco/simu_trf.py')
 digit_trf          = importfile(f'{basepath}/reco/digit_trf.py')
 merge_trf          = importfile(f'{basepath}/reco/merge_trf.py')
+premix_trf         = importfile(f'{basepath}/reco/premix_trf.py')
 reco_trf           = importfile(f'{basepath}/reco/reco_trf.py')
 ntuple_trf         = importfile(f'{basepath}/reco/ntuple_trf.py')
 gen_zee            = importfile(f'{basepath}/filters/gen_zee.py')
@@ -33,6 +34,9 @@ def build_argparser():
     option.add_parser("simu"    , parents = [simu_trf.parse_args()   ], help='Run the transformation from EVT to HIT.',formatter_class=formatter_class)
     option.add_parser("digit"   , parents = [digit_trf.parse_args()  ], help='Run the transformation from HIT to ESD',formatter_class=formatter_class)
     option.add_parser("merge"   , parents = [merge_trf.parse_args()  ], help='Merge minimum bias HIT events into the main HIT events.',formatter_class=formatter_class)
+    premix_parser = premix_trf.parse_args()
+    option.add_parser("premix"  , parents = [premix_parser           ], help='Produce premixed pileup HIT events to be reused by merge.',
+                      description=premix_parser.description, formatter_class=formatter_class)
     option.add_parser("reco"    , parents = [reco_trf.parse_args()   ], help='Run the transformation from ESD to AOD',formatter_class=formatter_class)
     option.add_parser("ntuple"  , parents = [ntuple_trf.parse_args() ], help='Run the transformation from AOD to NTUPLE',formatter_class=formatter_class)
     mode.add_parser( "trf", parents=[run_parent], help="",formatter_class=formatter_class)
@@ -58,6 +62,8 @@ def run_parser(args):
             digit_trf.run(args)
         elif args.option == "merge":
             merge_trf.run(args)        
+        elif args.option == "premix":
+            premix_trf.run(args)
         elif args.option == "reco":
             reco_trf.run(args)   
         elif args.option == "ntuple":
@@ -9,7 +9,7 @@ from expand_folders     import expand_folders
 from GaugiKernel        import LoggingLevel, get_argparser_formatter
 from GaugiKernel        import ComponentAccumulator
 from RootStreamBuilder  import RootStreamHITReader, recordable
-from CaloCellBuilder    import PileupMerge
+from CaloCellBuilder    import PileupMerge, create_pileup_library
 from RootStreamBuilder  import RootStreamHITMaker
 
 from reco.reco_job import merge_args, update_args, create_parallel_job
@@ -31,19 +31,33 @@ def parse_args():
                         dest='command', required=False, default="''",
                         help="The preexec command")
     parser.add_argument('--low-pileup-files', action='store', 
-                        dest='low_pileup_files', required = True,
-                        help = "The event HIT file to be merged (pileup).")
+                        dest='low_pileup_files', required = False, default=None,
+                        help = "The event HIT file to be merged (pileup). Required without --premixed-files.")
     parser.add_argument('--high-pileup-files', action='store', 
-                        dest='high_pileup_files', required = True,
-                        help = "The event HIT file to be merged (pileup).")
+                        dest='high_pileup_files', required = False, default=None,
+                        help = "The event HIT file to be merged (pileup). Required without --premixed-files.")
     parser.add_argument('--pileup-avg', action='store',
-                        dest='pileup_avg', required=True,
-                        type=int,
-                        help="The pileup average.")
+                        dest='pileup_avg', required=False,
+                        type=int, default=None,
+                        help="The pileup average. Required without --premixed-files.")
     parser.add_argument('--pileup-sigma', action='store',
-                        dest='pileup_sigma', required=True,
-                        type=int,
-                        help="The pileup sigma.")
+                        dest='pileup_sigma', required=False,
+                        type=int, default=None,
+                        help="The pileup sigma. Required without --premixed-files.")
+    parser.add_argument('--premixed-files', action='store',
+                        dest='premixed_files', required=False, default=None,
+                        help="The premixed (pileup only) HIT files from premix_trf.py. If given, exactly one premixed event is overlaid into each signal event, in place of the minbias sampling.")
+    parser.add_argument('--pileup-library', action='store',
+                        dest='pileup_library', required=False, default=None,
+                        help="Folder to store the minbias libraries. If given, the pileup files are loaded once into memory-mapped libraries shared by all jobs.")
+    parser.add_argument('--pileup-threads', action='store',
+                        dest='pileup_threads', required=False,
+                        type=int, default=1,
+                        help="The number of threads used to merge the bunch crossings of each event (into each job). All available if zero.")
+    parser.add_argument('--seed', action='store',
+                        dest='seed', required=False,
+                        type=int, default=0,
+                        help="The run seed. The random numbers of each event only depend on it and on the event number.")
 
     return merge_args(parser)
 
@@ -56,7 +70,12 @@ def main(events: List[int],
          high_pileup_files: List[str],
          pileup_avg : int,
          pileup_sigma : int,
-         command: str):
+         command: str,
+         low_pileup_library: str="",
+         high_pileup_library: str="",
+         pileup_threads: int=1,
+         seed: int=0,
+         premixed_library: str=""):
 
     if isinstance(input_file, Path):
         input_file = str(input_file)
@@ -67,7 +86,7 @@ def main(events: List[int],
 
     exec(command)
 
-    acc = ComponentAccumulator("ComponentAccumulator", output_file)
+    acc = ComponentAccumulator("ComponentAccumulator", output_file, Seed=seed)
 
     reader = RootStreamHITReader("HITReader", 
                                   InputFile       = input_file,
@@ -88,6 +107,10 @@ def main(events: List[int],
                           InputEventKey       = recordable("Events"),
                           OutputHitsKey       = "Hits_Merged",
                           OutputEventKey      = "Events_Merged",
+                          LowPileupLibrary    = low_pileup_library,
+                          HighPileupLibrary   = high_pileup_library,
+                          NumberOfThreads     = pileup_threads,
+                          PremixedLibrary     = premixed_library,
                           OutputLevel         = outputLevel
                         )
     acc += pileup
@@ -107,33 +130,53 @@ def main(events: List[int],
 
 
 
+def expand_pileup_files( path : str, name : str ) -> List[str]:
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"{name} input files {path} not found.")
+    if path.is_dir():
+        return expand_folders(os.path.abspath(path))
+    return [os.path.abspath(path)]
+
+
 def run(args):
 
-    args.low_pileup_files  = Path(args.low_pileup_files)
-    args.high_pileup_files = Path(args.high_pileup_files)
+    low_pileup_library = high_pileup_library = premixed_library = ""
 
-    if not args.low_pileup_files.exists():
-        raise FileNotFoundError(f"Low Pileup input files {args.low_pileup_files} not found.")
-    if args.low_pileup_files.is_dir():
-        args.low_pileup_files = expand_folders(os.path.abspath(args.low_pileup_files))
-    else:
-        args.low_pileup_files = [os.path.abspath(args.low_pileup_files)]
-   
-    if not args.high_pileup_files.exists():
-        raise FileNotFoundError(f"High Pileup input files {args.high_pileup_files} not found.")
-    if args.high_pileup_files.is_dir():
-        args.high_pileup_files = expand_folders(os.path.abspath(args.high_pileup_files))
+    if args.premixed_files:
+        # one premixed event per signal event, the minbias files are not used
+        premixed_files = expand_pileup_files(args.premixed_files, "Premixed")
+        library_path = args.pileup_library if args.pileup_library else os.path.dirname(os.path.abspath(args.output_file))
+        os.makedirs(library_path, exist_ok=True)
+        premixed_library = create_pileup_library( premixed_files, os.path.join(library_path, "premixed.lib") )
+        args.low_pileup_files = args.high_pileup_files = []
+        args.pileup_avg = args.pileup_sigma = 0
     else:
-        args.high_pileup_files = [os.path.abspath(args.high_pileup_files)]
+        for key in ["low_pileup_files", "high_pileup_files", "pileup_avg", "pileup_sigma"]:
+            if getattr(args, key) is None:
+                raise ValueError(f"--{key.replace('_','-')} is required without --premixed-files.")
+        args.low_pileup_files  = expand_pileup_files(args.low_pileup_files , "Low Pileup" )
+        args.high_pileup_files = expand_pileup_files(args.high_pileup_files, "High Pileup")
+
+        # build the libraries once before launching the jobs. All jobs map the same files.
+        if args.pileup_library:
+            os.makedirs(args.pileup_library, exist_ok=True)
+            low_pileup_library  = create_pileup_library( args.low_pileup_files , os.path.join(args.pileup_library, "low_minbias.lib" ) )
+            high_pileup_library = create_pileup_library( args.high_pileup_files, os.path.join(args.pileup_library, "high_minbias.lib") )
 
     pool = create_parallel_job(args)
     pool( main, 
-         logging_level    = args.output_level,
-         low_pileup_files = args.low_pileup_files,
-         high_pileup_files= args.high_pileup_files,
-         pileup_avg       = args.pileup_avg,
-         pileup_sigma     = args.pileup_sigma,
-         command          = args.command
+         logging_level       = args.output_level,
+         low_pileup_files    = args.low_pileup_files,
+         high_pileup_files   = args.high_pileup_files,
+         pileup_avg          = args.pileup_avg,
+         pileup_sigma        = args.pileup_sigma,
+         command             = args.command,
+         low_pileup_library  = low_pileup_library,
+         high_pileup_library = high_pileup_library,
+         pileup_threads      = args.pileup_threads,
+         seed                = args.seed,
+         premixed_library    = premixed_library,
          )
     
    
@@ -42,6 +42,10 @@ def parse_args():
                         dest='output_level', required=False,
                         type=str, default='INFO',
                         help="The output level messenger.")
+    parser.add_argument('--event-threads', action='store',
+                        dest='event_threads', required=False,
+                        type=int, default=1,
+                        help="The number of threads used to run events in parallel into the same process")
    
     return merge_args(parser)
 
@@ -50,6 +54,7 @@ def main(events : List[int],
          logging_level: str,
          input_file: str | Path,
          output_file: str | Path,
+         event_threads: int=1,
         ):
     """
     Main function for Ntuple generation.
@@ -63,6 +68,7 @@ def main(events : List[int],
         logging_level (str): Logging verbosity.
         input_file (str | Path): Path to input AOD file.
         output_file (str | Path): Path to output Ntuple file.
+        event_threads (int): Number of event loops (threads) into the same process.
     """
 
     if isinstance(input_file, Path):
@@ -73,7 +79,7 @@ def main(events : List[int],
     outputLevel = LoggingLevel.toC(logging_level)
 
   
-    acc = ComponentAccumulator("ComponentAccumulator", output_file)
+    acc = ComponentAccumulator("ComponentAccumulator", output_file, NumberOfThreads=event_threads)
 
 
   
@@ -121,4 +127,5 @@ if __name__ == "__main__":
     pool = create_parallel_job(args)
     pool( main, 
          logging_level    = args.output_level,
+         event_threads    = args.event_threads,
          )
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+import argparse
+import sys
+import os
+
+from pathlib            import Path
+from typing             import List
+from expand_folders     import expand_folders
+from GaugiKernel        import LoggingLevel, get_argparser_formatter
+from GaugiKernel        import ComponentAccumulator
+from RootStreamBuilder  import RootStreamHITReader, recordable
+from CaloCellBuilder    import PileupMerge, create_pileup_library
+from RootStreamBuilder  import RootStreamHITMaker
+
+from reco.reco_job import merge_args, update_args, create_parallel_job
+
+
+"""
+Script: premix_trf.py
+Purpose: Produces premixed pileup events. Each output event holds only the pileup
+         (minbias hits sampled for each bunch crossing of the window) summed into
+         all cells of the template event, so the expensive sampling of many minbias
+         events is done once. The premixed files can be reused by many signal samples
+         with merge_trf.py --premixed-files, which overlays exactly one premixed event
+         into each signal event.
+Usage:
+    premix_trf.py -i template.HIT.root -o premixed.HIT.root --low-pileup-files low/ \
+                  --high-pileup-files high/ --pileup-avg 200 --pileup-sigma 0
+    The template must be saved with all hits (simu_trf.py --save-all-hits), since only
+    the cells of the template are filled.
+"""
+
+
+def parse_args():
+    # create the top-level parser
+    parser = argparse.ArgumentParser(
+        description="Produces one premixed pileup event (only the pileup, without truth and seeds) "
+                    "for each event of the template (--input-file), so the number of premixed events is "
+                    "the number of template events. The template must be simulated with "
+                    "simu_trf.py --save-all-hits: the pileup is only added into the cells of the template "
+                    "and the pileup of any other cell is lost.",
+        formatter_class=get_argparser_formatter(),
+        add_help=False)
+
+    parser.add_argument('-l', '--output-level', action='store',
+                        dest='output_level', required=False,
+                        type=str, default='INFO',
+                        help="The output level messenger.")
+    parser.add_argument('-c', '--command', action='store',
+                        dest='command', required=False, default="''",
+                        help="The preexec command")
+    parser.add_argument('--low-pileup-files', action='store',
+                        dest='low_pileup_files', required = True,
+                        help = "The event HIT file to be merged (pileup).")
+    parser.add_argument('--high-pileup-files', action='store',
+                        dest='high_pileup_files', required = True,
+                        help = "The event HIT file to be merged (pileup).")
+    parser.add_argument('--pileup-avg', action='store',
+                        dest='pileup_avg', required=True,
+                        type=int,
+                        help="The pileup average.")
+    parser.add_argument('--pileup-sigma', action='store',
+                        dest='pileup_sigma', required=True,
+                        type=int,
+                        help="The pileup sigma.")
+    parser.add_argument('--pileup-library', action='store',
+                        dest='pileup_library', required=False, default=None,
+                        help="Folder to store the minbias libraries. If given, the pileup files are loaded once into memory-mapped libraries shared by all jobs.")
+    parser.add_argument('--pileup-threads', action='store',
+                        dest='pileup_threads', required=False,
+                        type=int, default=1,
+                        help="The number of threads used to merge the bunch crossings of each event (into each job). All available if zero.")
+    parser.add_argument('--seed', action='store',
+                        dest='seed', required=False,
+                        type=int, default=0,
+                        help="The run seed. The random numbers of each event only depend on it and on the event number.")
+
+    return merge_args(parser)
+
+
+def main(events: List[int],
+         input_file: str | Path,
+         output_file: str | Path,
+         logging_level: str,
+         low_pileup_files: List[str],
+         high_pileup_files: List[str],
+         pileup_avg : int,
+         pileup_sigma : int,
+         command: str,
+         low_pileup_library: str="",
+         high_pileup_library: str="",
+         pileup_threads: int=1,
+         seed: int=0):
+
+    if isinstance(input_file, Path):
+        input_file = str(input_file)
+    if isinstance(output_file, Path):
+        output_file = str(output_file)
+
+    outputLevel = LoggingLevel.toC(logging_level)
+
+    exec(command)
+
+    acc = ComponentAccumulator("ComponentAccumulator", output_file, Seed=seed)
+
+    reader = RootStreamHITReader("HITReader",
+                                  InputFile       = input_file,
+                                  OutputHitsKey   = recordable("Hits"),
+                                  OutputEventKey  = recordable("Events"),
+                                  OutputTruthKey  = recordable("Particles"),
+                                  OutputSeedsKey  = recordable("Seeds"),
+                                  OutputLevel     = outputLevel,
+                                )
+    reader.merge(acc)
+
+    # the template energy is dropped, only the pileup is kept into the cells
+    pileup = PileupMerge( "PileupMerge",
+                          LowPileupInputFiles = low_pileup_files,
+                          HighPileupInputFiles= high_pileup_files,
+                          PileupAvg           = pileup_avg,
+                          PileupSigma         = pileup_sigma,
+                          InputHitsKey        = recordable("Hits"),
+                          InputEventKey       = recordable("Events"),
+                          OutputHitsKey       = "Hits_Premixed",
+                          OutputEventKey      = "Events_Premixed",
+                          LowPileupLibrary    = low_pileup_library,
+                          HighPileupLibrary   = high_pileup_library,
+                          NumberOfThreads     = pileup_threads,
+                          OnlyPileup          = True,
+                          OutputLevel         = outputLevel
+                        )
+    acc += pileup
+
+    # all cells are saved, since the signal RoIs are not known here. The template truth
+    # and seeds are not signal, so they are saved as empty containers
+    HIT = RootStreamHITMaker( "RootStreamHITMaker",
+                               # input from context
+                               InputHitsKey    = "Hits_Premixed",
+                               InputEventKey   = "Events_Premixed",
+                               InputTruthKey   = recordable("Particles"),
+                               InputSeedsKey   = recordable("Seeds"),
+                               # output to file
+                               OutputHitsKey   = recordable("Hits"),
+                               OutputEventKey  = recordable("Events"),
+                               OnlyRoI         = False,
+                               SaveTruth       = False,
+                               OutputLevel     = outputLevel)
+    acc += HIT
+    acc.run(events)
+
+
+
+def run(args):
+
+    for key, name in [("low_pileup_files", "Low Pileup"), ("high_pileup_files", "High Pileup")]:
+        path = Path(getattr(args, key))
+        if not path.exists():
+            raise FileNotFoundError(f"{name} input files {path} not found.")
+        setattr(args, key, expand_folders(os.path.abspath(path)) if path.is_dir() else [os.path.abspath(path)])
+
+    # build the libraries once before launching the jobs. All jobs map the same files.
+    low_pileup_library = high_pileup_library = ""
+    if args.pileup_library:
+        os.makedirs(args.pileup_library, exist_ok=True)
+        low_pileup_library  = create_pileup_library( args.low_pileup_files , os.path.join(args.pileup_library, "low_minbias.lib" ) )
+        high_pileup_library = create_pileup_library( args.high_pileup_files, os.path.join(args.pileup_library, "high_minbias.lib") )
+
+    pool = create_parallel_job(args)
+    pool( main,
+         logging_level       = args.output_level,
+         low_pileup_files    = args.low_pileup_files,
+         high_pileup_files   = args.high_pileup_files,
+         pileup_avg          = args.pileup_avg,
+         pileup_sigma        = args.pileup_sigma,
+         command             = args.command,
+         low_pileup_library  = low_pileup_library,
+         high_pileup_library = high_pileup_library,
+         pileup_threads      = args.pileup_threads,
+         seed                = args.seed,
+         )
+
+
+
+if __name__ == "__main__":
+    parser=parse_args()
+    if len(sys.argv) == 1:
+        parser.print_help()
+        sys.exit(1)
+    args = parser.parse_args()
+    args = update_args(args)
+    run(args)
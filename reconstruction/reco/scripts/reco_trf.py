@@ -49,6 +49,14 @@ def parse_args():
     parser.add_argument('-c', '--command', action='store',
                         dest='command', required=False, default="''",
                         help="The preexec command")
+    parser.add_argument('--alg-threads', action='store',
+                        dest='alg_threads', required=False,
+                        type=int, default=1,
+                        help="The number of threads used to run independent algorithms of the same event")
+    parser.add_argument('--event-threads', action='store',
+                        dest='event_threads', required=False,
+                        type=int, default=1,
+                        help="The number of threads used to run events in parallel into the same process")
    
     return merge_args(parser)
 
@@ -58,6 +66,8 @@ def main(events : List[int],
          input_file: str | Path,
          output_file: str | Path,
          command: str,
+         alg_threads: int=1,
+         event_threads: int=1,
         ):
     """
     Main function for the reconstruction workflow.
@@ -75,6 +85,8 @@ def main(events : List[int],
         input_file (str | Path): Path to input ESD file.
         output_file (str | Path): Path to output AOD file.
         command (str): Optional command to execute before the sequence.
+        alg_threads (int): Number of threads for independent algorithms of the same event.
+        event_threads (int): Number of event loops (threads) into the same process.
     """
 
     if isinstance(input_file, Path):
@@ -89,7 +101,9 @@ def main(events : List[int],
     exec(command)
 
 
-    acc = ComponentAccumulator("ComponentAccumulator", output_file)
+    acc = ComponentAccumulator("ComponentAccumulator", output_file,
+                               NumberOfThreads=event_threads,
+                               NumberOfAlgThreads=alg_threads)
 
 
     ESD = RootStreamESDReader("ESDReader", 
@@ -203,5 +217,7 @@ if __name__ == "__main__":
     pool = create_parallel_job(args)
     pool( main, 
          logging_level    = args.output_level,
-         command          = args.command
+         command          = args.command,
+         alg_threads      = args.alg_threads,
+         event_threads    = args.event_threads
          )
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+import argparse
+import subprocess
+import json
+import time
+import sys
+import os
+
+from pathlib     import Path
+from GaugiKernel import get_argparser_formatter
+
+
+"""
+Script: simu_startup_bench.py
+Purpose: Measures the startup time of the Geant4 simulation (simu_trf.py).
+         Runs the simulation of a few events for each number of threads, in a
+         new process each time, and reports the wall time of each startup step
+         (saved by the RunManager into <output>.startup.json, up to the first event)
+         and the time spent outside of it (python configuration, event loop and output).
+Usage:
+    simu_startup_bench.py -i single_event.EVT.root -nt 1 4 8 --repeat 3
+"""
+
+
+def parse_args():
+    """
+    Parses command-line arguments for the startup benchmark.
+
+    Returns:
+        argparse.ArgumentParser: Arguments specifying the input, threads and repetitions.
+    """
+    parser = argparse.ArgumentParser(
+        description='',
+        formatter_class=get_argparser_formatter(),
+        add_help=False)
+
+    parser.add_argument('-i', '--input-file', action='store',
+                        dest='input_file', required=True,
+                        help="The input EVT file (one small event is enough).")
+    parser.add_argument('-o', '--output-dir', action='store',
+                        dest='output_dir', required=False, default="startup_bench",
+                        help="The folder for the simulation outputs.")
+    parser.add_argument('--nov', '--number-of-events', action='store',
+                        dest='number_of_events', required=False,
+                        type=int, default=1,
+                        help="The number of events simulated in each job.")
+    parser.add_argument('-nt', '--number-of-threads', action='store',
+                        dest='number_of_threads', required=False,
+                        type=int, nargs='+', default=[1],
+                        help="The number of threads of each job.")
+    parser.add_argument('--repeat', action='store',
+                        dest='repeat', required=False, type=int, default=3,
+                        help="The number of jobs for each number of threads.")
+    return parser
+
+
+def run_job( input_file : str, output_file : str, number_of_events : int, number_of_threads : int ):
+    """
+    Runs one simulation job and reads its startup profile.
+
+    Returns:
+        tuple: The job wall time (ms) and the startup steps {step: wall time (ms)}.
+    """
+    command = ["simu_trf.py", "-i", input_file, "-o", output_file,
+               "--nov", str(number_of_events), "-nt", str(number_of_threads)]
+    start = time.perf_counter()
+    subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+    wall = (time.perf_counter() - start)*1000
+    with open(output_file + ".startup.json") as f:
+        profile = json.load(f)
+    steps = { step["step"] : step["wall"] for step in profile["steps"] }
+    steps["outside of the startup"] = wall - profile["total"]
+    return wall, steps
+
+
+def main(input_file        : str | Path,
+         output_dir        : str | Path = "startup_bench",
+         number_of_events  : int = 1,
+         number_of_threads : list = [1],
+         repeat            : int = 3,
+         ):
+    """
+    Runs the jobs and prints the mean wall time of each startup step.
+
+    Args:
+        input_file (str | Path): Path to the input EVT file.
+        output_dir (str | Path): Folder for the simulation outputs.
+        number_of_events (int): Number of events simulated in each job.
+        number_of_threads (list): Number of threads of each job.
+        repeat (int): Number of jobs for each number of threads.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    results = {}
+    for nt in number_of_threads:
+        walls, steps = [], {}
+        for idx in range(repeat):
+            output_file = os.path.join(output_dir, f"startup.nt{nt}.{idx}.HIT.root")
+            wall, job_steps = run_job(str(input_file), output_file, number_of_events, nt)
+            walls.append(wall)
+            for step, value in job_steps.items():
+                steps.setdefault(step, []).append(value)
+        results[nt] = { "wall" : sum(walls)/len(walls),
+                        "steps": { step : sum(values)/len(values) for step, values in steps.items() } }
+
+        print(f"{nt} thread(s), mean of {repeat} job(s) with {number_of_events} event(s):")
+        for step, value in results[nt]["steps"].items():
+            print(f"  {step:<40}{value:>14.3f} ms")
+        print(f"  {'job':<40}{results[nt]['wall']:>14.3f} ms")
+
+    with open(os.path.join(output_dir, "startup_bench.json"), "w") as f:
+        json.dump(results, f, indent=2)
+
+
+
+if __name__ == "__main__":
+    parser=parse_args()
+    if len(sys.argv) == 1:
+        parser.print_help()
+        sys.exit(1)
+    args = parser.parse_args()
+    main( input_file        = args.input_file,
+          output_dir        = args.output_dir,
+          number_of_events  = args.number_of_events,
+          number_of_threads = args.number_of_threads,
+          repeat            = args.repeat,
+        )
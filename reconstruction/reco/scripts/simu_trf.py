@@ -9,7 +9,7 @@ from GaugiKernel.constants  import MINUTES
 from GaugiKernel            import LoggingLevel, get_argparser_formatter
 from G4Kernel               import ComponentAccumulator, EventReader
 from RootStreamBuilder      import recordable
-from CaloHitBuilder         import CaloHitBuilder
+from CaloHitBuilder         import CaloHitBuilder, CaloShowerLibraryMaker
 from RootStreamBuilder      import RootStreamHITMaker
 
 from geometry import DetectorConstruction_v1
@@ -74,6 +74,29 @@ def parse_args():
     parser.add_argument('--save-all-hits', action='store_true',
                         dest='save_all_hits', required=False,
                         help="Save all hits into the output file.")
+    parser.add_argument('--sparse-hits', action='store_true',
+                        dest='sparse_hits', required=False,
+                        help="Create only the hits touched by a step. The cells without energy are not saved, "
+                             "so there are no noise only cells and no pileup is merged into them.")
+    parser.add_argument('--use-tasking', action='store_true',
+                        dest='use_tasking', required=False,
+                        help="Use the geant task run manager (thread pool) instead of the MT run manager.")
+    parser.add_argument('--roi-cone-size', action='store',
+                        dest='roi_cone_size', required=False,
+                        type=float, default=0,
+                        help="Transport only the tracks inside of this deltaR around the truth particles (off if zero or with --save-all-hits). "
+                             "The saved hits are unchanged only if the cone covers the RoI window (0.6 x 0.6, deltaR > 0.43) "
+                             "with a margin for the tracks that deposit energy back into it.")
+    parser.add_argument('--shower-library', action='store',
+                        dest='shower_library', required=False, default="",
+                        help="Frozen shower library used for the low energy electrons and photons (fast simulation).")
+    parser.add_argument('--shower-library-energy-max', action='store',
+                        dest='shower_library_energy_max', required=False,
+                        type=float, default=1000,
+                        help="Maximum kinetic energy (in MeV) of the frozen showers.")
+    parser.add_argument('--build-shower-library', action='store_true',
+                        dest='build_shower_library', required=False,
+                        help="Record the frozen shower library (single electrons or photons) into the output file.")
     parser.add_argument('--dry-run', action='store_true',
                         dest='dry_run', required=False,
                         help="Run the script without executing the main logic.")
@@ -92,6 +115,12 @@ def main(logging_level: str,
          number_of_events: int,
          number_of_threads: int,
          dry_run: bool,
+         shower_library: str = "",
+         shower_library_energy_max: float = 1000,
+         build_shower_library: bool = False,
+         roi_cone_size: float = 0,
+         use_tasking: bool = False,
+         sparse_hits: bool = False,
          ):
     """
     Main function to drive the Geant4 simulation.
@@ -115,6 +144,12 @@ def main(logging_level: str,
         number_of_events (int): Number of events to process.
         number_of_threads (int): Number of Geant4 threads.
         dry_run (bool): If True, sets up but does not execute the run.
+        shower_library (str): Frozen shower library for the fast simulation (off if empty).
+        shower_library_energy_max (float): Maximum kinetic energy (MeV) of the frozen showers.
+        build_shower_library (bool): Record the frozen shower library into the output file.
+        roi_cone_size (float): Kill the tracks outside of this deltaR around the truth particles (off if zero).
+        use_tasking (bool): Use the geant task run manager instead of the MT run manager.
+        sparse_hits (bool): If True, creates only the hits touched by a step (the cells without energy are not saved).
     """
 
     if isinstance(input_file, Path):
@@ -126,11 +161,17 @@ def main(logging_level: str,
     outputLevel = LoggingLevel.toC(logging_level)
     exec(pre_init)
 
+    detector = DetectorConstruction_v1( "ATLAS", UseMagneticField=enable_magnetic_field,
+                                        ShowerLibrary=shower_library,
+                                        ShowerLibraryEnergyMax=shower_library_energy_max)
     acc = ComponentAccumulator("ComponentAccumulator", 
-                               DetectorConstruction_v1( "ATLAS", UseMagneticField=enable_magnetic_field),
+                               detector,
                                NumberOfThreads=number_of_threads,
                                OutputFile=output_file,
-                               Timeout=timeout * MINUTES)
+                               Timeout=timeout * MINUTES,
+                               # the hits outside of the RoIs are not saved anyway
+                               RoIConeSize=0 if save_all_hits else roi_cone_size,
+                               UseTasking=use_tasking)
 
     gun = EventReader("EventReader", input_file,
                       # outputs
@@ -141,7 +182,8 @@ def main(logging_level: str,
     calorimeter = CaloHitBuilder("CaloHitBuilder",
                                  HistogramPath="Expert/Hits",
                                  OutputLevel=outputLevel,
-                                 OutputHitsKey=recordable("Hits")
+                                 OutputHitsKey=recordable("Hits"),
+                                 SparseHits=sparse_hits,
                                  )
     
     gun.merge(acc)
@@ -155,6 +197,11 @@ def main(logging_level: str,
                              InputSeedsKey=recordable("Seeds"),
                              )
     acc += HIT
+
+    if build_shower_library:
+        acc += CaloShowerLibraryMaker("CaloShowerLibraryMaker",
+                                      Regions=detector.ShowerLibraryRegions,
+                                      OutputLevel=outputLevel)
     
     exec(pre_exec)
     if not dry_run:
@@ -193,6 +240,12 @@ if __name__ == "__main__":
              number_of_events      = args.number_of_events,
              number_of_threads     = args.number_of_threads,
              dry_run               = args.dry_run,
+             shower_library        = args.shower_library,
+             shower_library_energy_max = args.shower_library_energy_max,
+             build_shower_library  = args.build_shower_library,
+             roi_cone_size         = args.roi_cone_size,
+             use_tasking           = args.use_tasking,
+             sparse_hits           = args.sparse_hits,
         )
 
 